@@ -0,0 +1,74 @@
+class CacheBackend:
+    """
+    Interface for storage that holds cached pipeline artifacts.
+
+    Artifacts are addressed by a relative, forward-slash separated key (e.g.
+    "audio/2025-02-02/sermon/audio.m4a") so every node resolves the same key
+    to the same object, regardless of where its local `cache/` lives.
+    """
+
+    def exists(self, key):
+        """
+        Check whether an artifact is stored under the given key.
+
+        Args:
+            key (str): The artifact key.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement the `exists` method.")
+
+    def fetch(self, key, destination):
+        """
+        Copy the artifact stored under `key` to a local file.
+
+        Args:
+            key (str): The artifact key.
+            destination (str): The local file path to write to.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement the `fetch` method.")
+
+    def store(self, key, source_path):
+        """
+        Store a local file under the given key.
+
+        Args:
+            key (str): The artifact key.
+            source_path (str): The local file to store.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement the `store` method.")
+
+    def content_hash(self, key):
+        """
+        Return the SHA-256 digest recorded for the artifact, if any.
+
+        Args:
+            key (str): The artifact key.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError(
+            "Subclasses must implement the `content_hash` method."
+        )
+
+    def read_range(self, key, start, length):
+        """
+        Read `length` bytes of the artifact starting at byte offset `start`.
+
+        Args:
+            key (str): The artifact key.
+            start (int): Byte offset to start reading from.
+            length (int): Number of bytes to read.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement the `read_range` method.")
@@ -0,0 +1,123 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from app.caches.local_cache import LocalCacheBackend
+from app.caches.s3_cache import S3CacheBackend
+from app.utils.checksums import write_checksum
+from app.utils.tracing import trace_span
+
+
+class CacheSync:
+    """
+    Keeps the local `cache/` directory in sync with a shared cache backend.
+
+    Reads are read-through: a local miss is filled from the shared backend
+    before any network pull or re-encode happens. Writes are write-back:
+    freshly produced files are uploaded in the background and `flush()` waits
+    for them to land.
+    """
+
+    def __init__(self, backend, root="cache", write_back=True, max_workers=2):
+        """
+        Args:
+            backend (CacheBackend): The shared backend to read from and write to.
+            root (str): Local cache root; keys are paths relative to it.
+            write_back (bool): Upload in the background instead of blocking.
+            max_workers (int): Number of concurrent background uploads.
+        """
+        self.backend = backend
+        self.root = root
+        self.write_back = write_back
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers) if write_back else None
+        )
+        self._pending = []
+
+    def key_for(self, path):
+        """
+        Returns the backend key for a local path under the cache root.
+        """
+        relative_path = os.path.relpath(
+            os.path.abspath(path), os.path.abspath(self.root)
+        )
+        if relative_path.startswith(".."):
+            raise ValueError(f"Path is outside of the cache root {self.root}: {path}")
+        return relative_path.replace(os.sep, "/")
+
+    def pull(self, path):
+        """
+        Fills `path` from the shared backend if another node already produced it.
+
+        Args:
+            path (str): Local path under the cache root.
+
+        Returns:
+            bool: True if the file was fetched, False on a shared cache miss.
+        """
+        key = self.key_for(path)
+        with trace_span("shared cache lookup", "cache", key=key) as span:
+            if not self.backend.exists(key):
+                print(f"Shared cache miss: {key}")
+                span.set(hit=False)
+                return False
+
+            print(f"Shared cache hit: {key}")
+            self.backend.fetch(key, path)
+            # Keep the verified digest, so later local cache hits can be checked
+            content_hash = self.backend.content_hash(key)
+            if content_hash:
+                write_checksum(path, content_hash)
+            span.set(hit=True, bytes=os.path.getsize(path))
+            return True
+
+    def push(self, path):
+        """
+        Publishes a locally produced file to the shared backend.
+
+        Args:
+            path (str): Local path under the cache root.
+        """
+        key = self.key_for(path)
+        if self._executor is None:
+            self.backend.store(key, path)
+        else:
+            self._pending.append(self._executor.submit(self.backend.store, key, path))
+
+    def flush(self):
+        """
+        Blocks until all background uploads have finished.
+
+        Raises:
+            Exception: The first error raised by a background upload, if any.
+        """
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+
+def create_cache_sync(cache_conf, root="cache"):
+    """
+    Builds a `CacheSync` from the `cache` section of the pipeline config.
+
+    Args:
+        cache_conf (dict): The `cache` config section, or None.
+        root (str): Local cache root.
+
+    Returns:
+        CacheSync: The configured cache sync, or None if no shared cache is set.
+    """
+    if not cache_conf:
+        return None
+
+    backend_type = cache_conf.get("backend")
+    if backend_type == "local":
+        backend = LocalCacheBackend(cache_conf["path"])
+    elif backend_type == "s3":
+        backend = S3CacheBackend(
+            bucket=cache_conf["bucket"],
+            prefix=cache_conf.get("prefix", ""),
+            endpoint_url=cache_conf.get("endpoint_url"),
+        )
+    else:
+        raise ValueError(f"Unsupported cache backend: {backend_type}")
+
+    return CacheSync(backend, root=root, write_back=cache_conf.get("write_back", True))
@@ -0,0 +1,93 @@
+import hashlib
+import os
+from app.caches.base_cache import CacheBackend
+from app.utils.checksums import read_checksum, read_chunks, write_checksum
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    Cache backend backed by a directory on disk (local or a shared mount).
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _get_path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def _copy(self, source_path, destination):
+        """
+        Copies a file and returns its SHA-256 digest, computed in the same pass.
+        """
+        digest = hashlib.sha256()
+        with open(destination, "wb") as f:
+            for chunk in read_chunks(source_path, digest=digest):
+                f.write(chunk)
+        return digest.hexdigest()
+
+    def exists(self, key):
+        return os.path.exists(self._get_path(key))
+
+    def fetch(self, key, destination):
+        """
+        Copies the cached artifact to `destination`, verifying its content hash.
+
+        Args:
+            key (str): The artifact key.
+            destination (str): The local file path to write to.
+
+        Returns:
+            str: The destination path.
+
+        Raises:
+            FileNotFoundError: If nothing is stored under `key`.
+            ValueError: If the copied file does not match the recorded hash.
+        """
+        source_path = self._get_path(key)
+        if not os.path.exists(source_path):
+            raise FileNotFoundError(f"No cached artifact for key: {key}")
+
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        tmp_path = f"{destination}.part"
+        content_hash = self._copy(source_path, tmp_path)
+
+        expected_hash = self.content_hash(key)
+        if expected_hash and content_hash != expected_hash:
+            os.remove(tmp_path)
+            raise ValueError(f"Content hash mismatch for cached artifact: {key}")
+
+        os.replace(tmp_path, destination)
+        return destination
+
+    def store(self, key, source_path):
+        """
+        Copies `source_path` into the cache and records its SHA-256 digest in a
+        `sha256sum`-style sidecar, like every other checksum (see `checksums`).
+
+        Args:
+            key (str): The artifact key.
+            source_path (str): The local file to store.
+
+        Returns:
+            str: The hex digest of the stored file.
+        """
+        target_path = self._get_path(key)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+        # Write under a temporary name so readers never see a partial file
+        tmp_path = f"{target_path}.part"
+        content_hash = self._copy(source_path, tmp_path)
+        write_checksum(target_path, content_hash)
+        os.replace(tmp_path, target_path)
+
+        return content_hash
+
+    def content_hash(self, key):
+        # Also reads the bare digests written by earlier versions
+        return read_checksum(self._get_path(key))
+
+    def read_range(self, key, start, length):
+        with open(self._get_path(key), "rb") as f:
+            f.seek(start)
+            return f.read(length)
@@ -0,0 +1,131 @@
+import os
+from app.caches.base_cache import CacheBackend
+from app.utils.checksums import sha256_file
+
+NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+
+
+def _is_not_found(error):
+    """Returns True if a client error means the object does not exist."""
+    response = getattr(error, "response", None) or {}
+    return str(response.get("Error", {}).get("Code")) in NOT_FOUND_CODES
+
+
+class S3CacheBackend(CacheBackend):
+    """
+    Cache backend backed by an S3-compatible object store (AWS S3, MinIO, R2...).
+
+    The SHA-256 digest of each artifact is stored in the object's metadata so
+    other nodes can verify what they pull.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, client=None):
+        """
+        Args:
+            bucket (str): Name of the bucket holding the cache.
+            prefix (str): Optional key prefix inside the bucket.
+            endpoint_url (str): Optional endpoint for non-AWS object stores.
+            client: Optional boto3-compatible S3 client. Created lazily if omitted.
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Only pull in boto3 when a remote cache is actually used
+            import boto3
+
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self._client
+
+    def _get_object_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _head(self, key):
+        try:
+            return self.client.head_object(
+                Bucket=self.bucket, Key=self._get_object_key(key)
+            )
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+    def exists(self, key):
+        return self._head(key) is not None
+
+    def fetch(self, key, destination):
+        """
+        Downloads the artifact to `destination`, verifying its content hash.
+
+        Args:
+            key (str): The artifact key.
+            destination (str): The local file path to write to.
+
+        Returns:
+            str: The destination path.
+
+        Raises:
+            ValueError: If the downloaded file does not match the recorded hash.
+        """
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        tmp_path = f"{destination}.part"
+        print(f"Fetching s3://{self.bucket}/{self._get_object_key(key)}...")
+        self.client.download_file(self.bucket, self._get_object_key(key), tmp_path)
+
+        expected_hash = self.content_hash(key)
+        if expected_hash and sha256_file(tmp_path) != expected_hash:
+            os.remove(tmp_path)
+            raise ValueError(f"Content hash mismatch for cached artifact: {key}")
+
+        os.replace(tmp_path, destination)
+        return destination
+
+    def store(self, key, source_path):
+        """
+        Uploads `source_path` and records its SHA-256 digest in the object metadata.
+
+        Args:
+            key (str): The artifact key.
+            source_path (str): The local file to upload.
+
+        Returns:
+            str: The hex digest of the uploaded file.
+        """
+        content_hash = sha256_file(source_path)
+        print(
+            f"Uploading {source_path} to s3://{self.bucket}/{self._get_object_key(key)}..."
+        )
+        self.client.upload_file(
+            source_path,
+            self.bucket,
+            self._get_object_key(key),
+            ExtraArgs={"Metadata": {"sha256": content_hash}},
+        )
+        return content_hash
+
+    def content_hash(self, key):
+        head = self._head(key)
+        if head is None:
+            return None
+        return head.get("Metadata", {}).get("sha256")
+
+    def read_range(self, key, start, length):
+        if length <= 0:
+            return b""
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(f"No cached artifact for key: {key}")
+        # S3 rejects a range that starts past the end; read like a local file
+        end = min(start + length, head["ContentLength"])
+        if start >= end:
+            return b""
+        response = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self._get_object_key(key),
+            Range=f"bytes={start}-{end - 1}",
+        )
+        return response["Body"].read()
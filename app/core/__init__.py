@@ -1,3 +1,9 @@
 from .pipeline_runner import PipelineRunner, run_pipeline
+from .async_pipeline_runner import AsyncPipelineRunner, run_pipelines_concurrently
 
-__all__ = ["PipelineRunner", "run_pipeline"]
+__all__ = [
+    "PipelineRunner",
+    "run_pipeline",
+    "AsyncPipelineRunner",
+    "run_pipelines_concurrently",
+]
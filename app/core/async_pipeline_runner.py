@@ -0,0 +1,290 @@
+import asyncio
+import contextvars
+import inspect
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List
+from app.data_models.pipeline_data import PipelineData
+from app.utils.observers import (
+    PipelineObserver,
+    emit,
+    get_event_bus,
+    set_current_job,
+)
+from app.utils.tracing import start_trace, stop_trace, trace_span
+from scripts.config_loader import load_and_validate_config
+from colorama import Fore, Style
+
+
+class AsyncPipelineRunner:
+    """
+    Runs many pipeline jobs concurrently from a single lightweight process.
+
+    Async steps are awaited on the event loop; the existing synchronous steps
+    run in a thread pool so their blocking ffmpeg calls never stall other jobs.
+    A semaphore caps how many jobs are in flight at once.
+    """
+
+    def __init__(
+        self,
+        pipeline_factory: Callable[[dict], list],
+        max_concurrent_jobs: int = 4,
+        max_workers: int = None,
+        trace_dir: str = None,
+        observers: List[PipelineObserver] = None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            pipeline_factory: Function that takes config and returns pipeline steps
+            max_concurrent_jobs: Maximum number of jobs running at the same time
+            max_workers: Threads available to synchronous steps
+                (default: two per concurrent job)
+            trace_dir: If set, `run_many` writes one trace covering all jobs here
+            observers: Observers notified of every job's events during `run_many`
+        """
+        self.pipeline_factory = pipeline_factory
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_workers = max_workers or max_concurrent_jobs * 2
+        self.trace_dir = trace_dir
+        self.observers = list(observers or [])
+        self.pipeline_name = getattr(pipeline_factory, "__name__", "pipeline").replace(
+            "create_", ""
+        )
+
+    async def _run_step(self, step_fn, data, executor):
+        loop = asyncio.get_running_loop()
+        if inspect.iscoroutinefunction(step_fn):
+            return await step_fn(data)
+
+        # Carry the job context into the worker thread so events stay attributed
+        context = contextvars.copy_context()
+        result = await loop.run_in_executor(executor, context.run, step_fn, data)
+        # Lambdas wrapping async steps hand back a coroutine; await it on the loop
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def run_job(
+        self,
+        config_path: str = "config/pipeline_config.json",
+        schema_path: str = "config/pipeline_schema.json",
+        executor: ThreadPoolExecutor = None,
+    ) -> PipelineData:
+        """
+        Execute a single pipeline job.
+
+        Args:
+            config_path: Path to the configuration file
+            schema_path: Path to the configuration schema file
+            executor: Thread pool for synchronous steps (default: the loop's default)
+
+        Returns:
+            PipelineData: The final pipeline data after execution
+        """
+        # Absolute, so configs with the same file name in different folders stay apart
+        job_name = os.path.abspath(config_path)
+
+        config = load_and_validate_config(
+            config_file=config_path, schema_file=schema_path
+        )
+        data = PipelineData()
+        # Each job runs in its own task, so this doesn't leak into other jobs
+        set_current_job(job_name)
+        start_time = datetime.now()
+        emit("job_started", job=job_name, pipeline=self.pipeline_name, config=config)
+        try:
+            # Jobs share the event loop thread; a track per job keeps their
+            # spans from overlapping on one row of the trace
+            with trace_span("pipeline", "pipeline", track=job_name, config=config_path):
+                data = await self._run_steps(config, data, job_name, executor)
+        except Exception as e:
+            emit(
+                "job_failed",
+                job=job_name,
+                pipeline=self.pipeline_name,
+                error=e,
+                elapsed_seconds=(datetime.now() - start_time).total_seconds(),
+            )
+            raise
+
+        elapsed_time = datetime.now() - start_time
+        emit(
+            "job_finished",
+            job=job_name,
+            pipeline=self.pipeline_name,
+            elapsed_seconds=elapsed_time.total_seconds(),
+        )
+        print(
+            Fore.GREEN
+            + f"[{job_name}] Total elapsed time: {elapsed_time}"
+            + Style.RESET_ALL
+        )
+
+        return data
+
+    async def _run_steps(self, config, data, job_name, executor):
+        loop = asyncio.get_running_loop()
+
+        # Building a pipeline may hit the network (upload date lookup)
+        pipeline = await loop.run_in_executor(executor, self.pipeline_factory, config)
+
+        for description, step_fn in pipeline:
+            step_start_time = datetime.now()
+            print(
+                Fore.YELLOW
+                + f"[{job_name}] Starting step: "
+                + Fore.GREEN
+                + f"{description}"
+                + Style.RESET_ALL
+            )
+            emit(
+                "step_started",
+                job=job_name,
+                pipeline=self.pipeline_name,
+                step=description,
+            )
+
+            try:
+                with trace_span(description, "step", track=job_name, job=job_name):
+                    data = await self._run_step(step_fn, data, executor)
+            except Exception as e:
+                emit(
+                    "step_failed",
+                    job=job_name,
+                    pipeline=self.pipeline_name,
+                    step=description,
+                    error=e,
+                    elapsed_seconds=(datetime.now() - step_start_time).total_seconds(),
+                )
+                raise
+
+            step_elapsed_time = datetime.now() - step_start_time
+            emit(
+                "step_finished",
+                job=job_name,
+                pipeline=self.pipeline_name,
+                step=description,
+                elapsed_seconds=step_elapsed_time.total_seconds(),
+                data=data,
+            )
+            print(
+                Fore.YELLOW
+                + f"[{job_name}] Completed step: "
+                + Fore.GREEN
+                + f"{description} ({step_elapsed_time})"
+                + Style.RESET_ALL
+            )
+
+        return data
+
+    def _config_metrics(self, config_paths, schema_path):
+        """Metrics observers requested by the configs' `metrics` sections."""
+        sections = {}
+        for config_path in config_paths:
+            try:
+                config = load_and_validate_config(
+                    config_file=config_path, schema_file=schema_path
+                )
+            except Exception:
+                # run_job reports the broken config as that job's result
+                continue
+            if config.get("metrics"):
+                section = config["metrics"]
+                sections[json.dumps(section, sort_keys=True)] = section
+
+        if not sections:
+            return []
+        if len(sections) > 1:
+            raise ValueError(
+                "Jobs in a batch share one set of metrics, but their configs have "
+                "different `metrics` sections; make them match or use "
+                "--metrics-textfile/--metrics-port instead"
+            )
+
+        # prometheus_client is only worth importing when metrics are on
+        from app.utils.metrics_observer import create_metrics_observer
+
+        return [create_metrics_observer(next(iter(sections.values())))]
+
+    async def run_many(
+        self,
+        config_paths: List[str],
+        schema_path: str = "config/pipeline_schema.json",
+    ) -> list:
+        """
+        Execute one job per config file, at most `max_concurrent_jobs` at a time.
+
+        Each config must point at a different stream/date, since jobs share the
+        `cache/` and `output/` directories. A `metrics` section in the configs
+        applies to the whole batch, so every config that has one must agree.
+
+        Args:
+            config_paths: Paths to the configuration files
+            schema_path: Path to the configuration schema file
+
+        Returns:
+            list: For each config, the final PipelineData or the exception it raised
+
+        Raises:
+            ValueError: If the configs have different `metrics` sections
+        """
+        observers = self.observers + self._config_metrics(config_paths, schema_path)
+        semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+        tracer = start_trace("batch") if self.trace_dir else None
+        event_bus = get_event_bus()
+        for observer in observers:
+            event_bus.subscribe(observer)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+
+                async def run_limited(config_path):
+                    async with semaphore:
+                        return await self.run_job(config_path, schema_path, executor)
+
+                return await asyncio.gather(
+                    *(run_limited(config_path) for config_path in config_paths),
+                    return_exceptions=True,
+                )
+        finally:
+            for observer in observers:
+                event_bus.unsubscribe(observer)
+            if tracer:
+                stop_trace()
+                chrome_trace_path, _ = tracer.export(self.trace_dir)
+                print(f"Trace written to {chrome_trace_path} (open in Perfetto)")
+
+
+def run_pipelines_concurrently(
+    pipeline_factory: Callable[[dict], list],
+    config_paths: List[str],
+    schema_path: str = "config/pipeline_schema.json",
+    max_concurrent_jobs: int = 4,
+    trace_dir: str = None,
+    observers: List[PipelineObserver] = None,
+) -> list:
+    """
+    Convenience function to run several pipeline jobs on one event loop.
+
+    Args:
+        pipeline_factory: Function that takes config and returns pipeline steps
+        config_paths: Paths to the configuration files, one per job
+        schema_path: Path to the configuration schema file
+        max_concurrent_jobs: Maximum number of jobs running at the same time
+        trace_dir: Optional directory for the batch's trace files
+        observers: Optional observers notified of every job's events
+
+    Returns:
+        list: For each config, the final PipelineData or the exception it raised
+    """
+    runner = AsyncPipelineRunner(
+        pipeline_factory,
+        max_concurrent_jobs=max_concurrent_jobs,
+        trace_dir=trace_dir,
+        observers=observers,
+    )
+    return asyncio.run(runner.run_many(config_paths, schema_path))
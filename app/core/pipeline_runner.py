@@ -1,6 +1,18 @@
+import asyncio
+import inspect
+import os
 from datetime import datetime
-from typing import Callable, Any
+from typing import Callable, Any, List
 from app.data_models.pipeline_data import PipelineData
+from app.utils.observers import (
+    PipelineObserver,
+    emit,
+    get_event_bus,
+    reset_current_job,
+    set_current_job,
+)
+from app.utils.profiling import profile_section, start_profile, stop_profile
+from app.utils.tracing import start_trace, stop_trace, trace_span
 from scripts.config_loader import load_and_validate_config
 from colorama import Fore, Style
 
@@ -10,14 +22,34 @@ class PipelineRunner:
     Shared pipeline execution logic for both audio and video processing.
     """
 
-    def __init__(self, pipeline_factory: Callable[[dict], list]):
+    def __init__(
+        self,
+        pipeline_factory: Callable[[dict], list],
+        trace_dir: str = None,
+        observers: List[PipelineObserver] = None,
+        profile_dir: str = None,
+    ):
         """
         Initialize the pipeline runner with a pipeline factory function.
 
         Args:
             pipeline_factory: Function that takes config and returns pipeline steps
+            trace_dir: If set, write a Chrome trace and a JSONL span log of each
+                run into this directory
+            observers: Observers notified of job/step events during each run; a
+                metrics observer is added when the config has a `metrics` section
+            profile_dir: If set, profile each run (cProfile, tracemalloc and
+                ffmpeg benchmarks) and write a profile bundle into this directory
         """
         self.pipeline_factory = pipeline_factory
+        self.trace_dir = trace_dir
+        self.observers = list(observers or [])
+        self.profile_dir = profile_dir
+        # Named after the factory (or the function a `partial` wraps)
+        factory = getattr(pipeline_factory, "func", pipeline_factory)
+        self.pipeline_name = getattr(factory, "__name__", "pipeline").replace(
+            "create_", ""
+        )
 
     def run(
         self,
@@ -34,12 +66,76 @@ class PipelineRunner:
         Returns:
             PipelineData: The final pipeline data after execution
         """
-        config = load_and_validate_config(
-            config_file=config_path, schema_file=schema_path
-        )
+        profiler = start_profile(self.pipeline_name) if self.profile_dir else None
+        try:
+            with profile_section("load config"):
+                config = load_and_validate_config(
+                    config_file=config_path, schema_file=schema_path
+                )
+        except Exception:
+            self._export_profile(profiler)
+            raise
         data = PipelineData()
+        # Absolute, so configs with the same file name in different folders stay apart
+        job_name = os.path.abspath(config_path)
+
+        observers = list(self.observers)
+        if config.get("metrics"):
+            # prometheus_client is only worth importing when metrics are on
+            from app.utils.metrics_observer import create_metrics_observer
+
+            observers.append(create_metrics_observer(config["metrics"]))
+        event_bus = get_event_bus()
+        for observer in observers:
+            event_bus.subscribe(observer)
+
+        tracer = start_trace(self.pipeline_name) if self.trace_dir else None
+        job_token = set_current_job(job_name)
+        start_time = datetime.now()
+        emit("job_started", job=job_name, pipeline=self.pipeline_name, config=config)
+        try:
+            with trace_span("pipeline", "pipeline", config=config_path):
+                data = self._run_steps(config, data, job_name)
+        except Exception as e:
+            emit(
+                "job_failed",
+                job=job_name,
+                pipeline=self.pipeline_name,
+                error=e,
+                elapsed_seconds=(datetime.now() - start_time).total_seconds(),
+            )
+            raise
+        else:
+            emit(
+                "job_finished",
+                job=job_name,
+                pipeline=self.pipeline_name,
+                elapsed_seconds=(datetime.now() - start_time).total_seconds(),
+            )
+        finally:
+            reset_current_job(job_token)
+            for observer in observers:
+                event_bus.unsubscribe(observer)
+            if tracer:
+                stop_trace()
+                chrome_trace_path, _ = tracer.export(self.trace_dir)
+                print(f"Trace written to {chrome_trace_path} (open in Perfetto)")
+            self._export_profile(profiler)
+
+        return data
 
-        pipeline = self.pipeline_factory(config)
+    def _export_profile(self, profiler):
+        if not profiler:
+            return
+        stop_profile()
+        bundle = profiler.export(self.profile_dir)
+        print(f"Profile written to {bundle} (see summary.txt)")
+
+    def _run_steps(
+        self, config: dict, data: PipelineData, job_name: str = None
+    ) -> PipelineData:
+        with profile_section("build pipeline"):
+            pipeline = self.pipeline_factory(config)
         start_time = datetime.now()
 
         for description, step_fn in pipeline:
@@ -47,11 +143,41 @@ class PipelineRunner:
             print(Fore.YELLOW + "===")
             print(f"Starting step: " + Fore.GREEN + f"{description}" + Style.RESET_ALL)
 
+            emit(
+                "step_started",
+                job=job_name,
+                pipeline=self.pipeline_name,
+                step=description,
+            )
+
             # Execute the pipeline step
-            data = step_fn(data)
+            try:
+                with trace_span(description, "step"), profile_section(description):
+                    data = step_fn(data)
+                    # Async steps (e.g. downloads) hand back a coroutine; drive it to completion
+                    if inspect.isawaitable(data):
+                        data = asyncio.run(data)
+            except Exception as e:
+                emit(
+                    "step_failed",
+                    job=job_name,
+                    pipeline=self.pipeline_name,
+                    step=description,
+                    error=e,
+                    elapsed_seconds=(datetime.now() - step_start_time).total_seconds(),
+                )
+                raise
 
             step_end_time = datetime.now()
             step_elapsed_time = step_end_time - step_start_time
+            emit(
+                "step_finished",
+                job=job_name,
+                pipeline=self.pipeline_name,
+                step=description,
+                elapsed_seconds=step_elapsed_time.total_seconds(),
+                data=data,
+            )
             print(Fore.YELLOW + f"Completed step: " + Fore.GREEN + f"{description}")
             print(Fore.GREEN + f"Step elapsed time: {step_elapsed_time}" + Fore.YELLOW)
             print("===" + Style.RESET_ALL)
@@ -69,6 +195,9 @@ def run_pipeline(
     pipeline_factory: Callable[[dict], list],
     config_path: str = "config/pipeline_config.json",
     schema_path: str = "config/pipeline_schema.json",
+    trace_dir: str = None,
+    observers: List[PipelineObserver] = None,
+    profile_dir: str = None,
 ) -> PipelineData:
     """
     Convenience function to run a pipeline with a factory function.
@@ -77,9 +206,17 @@ def run_pipeline(
         pipeline_factory: Function that takes config and returns pipeline steps
         config_path: Path to the configuration file
         schema_path: Path to the configuration schema file
+        trace_dir: Optional directory for the run's trace files
+        observers: Optional observers notified of job/step events
+        profile_dir: Optional directory for the run's profile bundle
 
     Returns:
         PipelineData: The final pipeline data after execution
     """
-    runner = PipelineRunner(pipeline_factory)
+    runner = PipelineRunner(
+        pipeline_factory,
+        trace_dir=trace_dir,
+        observers=observers,
+        profile_dir=profile_dir,
+    )
     return runner.run(config_path, schema_path)
@@ -0,0 +1,191 @@
+# app/data_models/media_info.py
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
+# Encoder names as passed to ffmpeg -> codec names as reported by ffprobe
+ENCODER_CODECS = {"libx264": "h264", "libx265": "hevc", "libmp3lame": "mp3"}
+
+
+def codec_name(encoder):
+    """
+    Returns the codec ffprobe will report for a file written with `encoder`.
+    """
+    return ENCODER_CODECS.get(encoder, encoder)
+
+
+def _frame_rate(value):
+    """
+    Converts an ffprobe rate like "30000/1001" to frames per second.
+    """
+    try:
+        numerator, _, denominator = str(value).partition("/")
+        rate = float(numerator) / float(denominator or 1)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return rate or None
+
+
+def _number(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class StreamInfo:
+    """
+    One audio, video or other stream of a media file.
+    """
+
+    index: int
+    type: Optional[str]
+    codec: Optional[str]
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    pix_fmt: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    bit_rate: Optional[int] = None
+    duration: Optional[float] = None
+
+    @classmethod
+    def from_ffprobe(cls, stream):
+        return cls(
+            index=stream.get("index", 0),
+            type=stream.get("codec_type"),
+            codec=stream.get("codec_name"),
+            width=stream.get("width"),
+            height=stream.get("height"),
+            fps=_frame_rate(stream.get("avg_frame_rate"))
+            or _frame_rate(stream.get("r_frame_rate")),
+            pix_fmt=stream.get("pix_fmt"),
+            sample_rate=_number(stream.get("sample_rate"), int),
+            channels=stream.get("channels"),
+            bit_rate=_number(stream.get("bit_rate"), int),
+            duration=_number(stream.get("duration")),
+        )
+
+
+@dataclass
+class MediaInfo:
+    """
+    Everything the pipeline needs to know about a media file.
+
+    Filled from a single `ffprobe -show_format -show_streams` call, or derived
+    from another file when a step already knows what it wrote (`probed` is
+    False then). `size` and `mtime_ns` identify the file version it describes.
+    """
+
+    path: str
+    format_name: Optional[str] = None
+    duration: Optional[float] = None
+    bit_rate: Optional[int] = None
+    streams: List[StreamInfo] = field(default_factory=list)
+    # Keyframe timestamps in seconds, once something has indexed them
+    keyframes: Optional[List[float]] = None
+    probed: bool = True
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+
+    @classmethod
+    def from_ffprobe(cls, path, probe):
+        """
+        Builds a `MediaInfo` from ffprobe's JSON output.
+
+        Args:
+            path (str): The probed file.
+            probe (dict): Parsed `ffprobe -of json -show_format -show_streams` output.
+
+        Returns:
+            MediaInfo: The file's details.
+        """
+        media_format = probe.get("format", {})
+        streams = [StreamInfo.from_ffprobe(s) for s in probe.get("streams", [])]
+        duration = _number(media_format.get("duration"))
+        if duration is None:
+            durations = [s.duration for s in streams if s.duration]
+            duration = max(durations) if durations else None
+        return cls(
+            path=path,
+            format_name=media_format.get("format_name"),
+            duration=duration,
+            bit_rate=_number(media_format.get("bit_rate"), int),
+            streams=streams,
+        )
+
+    def _first(self, stream_type):
+        return next((s for s in self.streams if s.type == stream_type), None)
+
+    @property
+    def video(self) -> Optional[StreamInfo]:
+        return self._first("video")
+
+    @property
+    def audio(self) -> Optional[StreamInfo]:
+        return self._first("audio")
+
+    @property
+    def resolution(self):
+        """The video size as "WIDTHxHEIGHT", or None for audio-only files."""
+        video = self.video
+        return f"{video.width}x{video.height}" if video and video.width else None
+
+    @property
+    def fps(self):
+        return self.video.fps if self.video else None
+
+    @property
+    def sample_rate(self):
+        return self.audio.sample_rate if self.audio else None
+
+    def derive(self, path, duration=None, video=None, audio=None, drop_video=False):
+        """
+        Describes a file a step produced from this one, without probing it.
+
+        Args:
+            path (str): The new file.
+            duration (float): Its duration (default: unchanged).
+            video (dict): `StreamInfo` fields the step set on the video stream.
+            audio (dict): `StreamInfo` fields the step set on the audio stream.
+            drop_video (bool): The output has no video stream.
+
+        Returns:
+            MediaInfo: The derived details (`probed` is False).
+        """
+        duration = self.duration if duration is None else duration
+        streams = []
+        for stream in self.streams:
+            if stream.type == "video" and drop_video:
+                continue
+            updates = {"video": video, "audio": audio}.get(stream.type) or {}
+            if updates:
+                # A re-encode; what the encoder picks isn't known up front
+                updates = dict({"bit_rate": None, "pix_fmt": None}, **updates)
+            streams.append(replace(stream, duration=duration, **updates))
+        return MediaInfo(
+            path=path,
+            format_name=None,
+            duration=duration,
+            streams=streams,
+            probed=False,
+        )
+
+    def summary(self):
+        """
+        Returns the details as a plain dict, e.g. for the job manifest.
+        """
+        streams = []
+        for stream in self.streams:
+            summary = {"type": stream.type, "codec": stream.codec}
+            if stream.type == "video":
+                summary.update(width=stream.width, height=stream.height, fps=stream.fps)
+            elif stream.type == "audio":
+                summary.update(sample_rate=stream.sample_rate, channels=stream.channels)
+            streams.append(summary)
+        return {
+            "format": self.format_name,
+            "duration": self.duration,
+            "streams": streams,
+        }
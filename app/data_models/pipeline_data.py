@@ -1,6 +1,7 @@
 # app/data_models/pipeline_data.py
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
+from app.data_models.media_info import MediaInfo
 
 
 @dataclass
@@ -17,3 +18,19 @@ class PipelineData:
     final_output_path: Optional[str] = None
     downloaded_files: List[str] = field(default_factory=list)
     intermediate_files: List[str] = field(default_factory=list)
+    published: List[Dict] = field(default_factory=list)
+    # SHA-256 digests of the files above, keyed by path, as they were produced
+    checksums: Dict[str, str] = field(default_factory=dict)
+    manifest_path: Optional[str] = None
+    # The trim window that was applied, and whether it was detected or configured
+    trim: Optional[Dict] = None
+    # Waveform peaks files of the active file, finest zoom level first
+    waveform_files: List[str] = field(default_factory=list)
+    # Extra deliverables of the active file (see `Rendition`), keyed by name
+    rendition_files: Dict[str, str] = field(default_factory=dict)
+    # Clips of the joins rendered by a preview run
+    preview_files: List[str] = field(default_factory=list)
+    # Highlight clips cut from the output
+    clip_files: List[str] = field(default_factory=list)
+    # What is known about each media file (see `get_media_info`), keyed by path
+    media: Dict[str, MediaInfo] = field(default_factory=dict)
@@ -1,10 +1,76 @@
+import asyncio
+import contextvars
 import os
+import re
+from colorama import Fore, Style
+from app.utils.checksums import (
+    read_checksum,
+    record_checksum,
+    sidecar_path,
+    verify_checksum,
+)
+from app.utils.observers import emit
+from app.utils.tracing import trace_span
+
+
+def _file_size(path):
+    return os.path.getsize(path) if path and os.path.isfile(path) else None
+
+
+def _is_intact(path):
+    """
+    Checks a cached file against the digest recorded when it was downloaded.
+
+    Only files written after their digest are re-hashed, so cache hits stay
+    cheap; `scripts/verify_artifacts.py` does the full check. A file that doesn't
+    match is removed so it gets downloaded again. Files cached before digests
+    were recorded are trusted.
+    """
+    checksum_path = sidecar_path(path)
+    if not os.path.exists(checksum_path) or os.path.getmtime(path) <= os.path.getmtime(
+        checksum_path
+    ):
+        return True
+    if verify_checksum(path)["status"] == "ok":
+        return True
+    print(
+        Fore.YELLOW
+        + f"Cached file is corrupt, downloading it again: {path}"
+        + Style.RESET_ALL
+    )
+    os.remove(path)
+    return False
+
+
+def _record_checksum(path):
+    # Downloaders that hash while writing (S3) have already recorded it
+    if path and os.path.isfile(path) and not read_checksum(path):
+        record_checksum(path)
+
+
+def _record_path(cache_path):
+    """
+    Where the name a templated download (e.g. `audio.%(ext)s`) resolved to is
+    recorded, so later lookups find the file without asking the downloader.
+    """
+    return re.sub(r"\.?%\(\w+\)s", "", cache_path) + ".download"
+
+
+def _is_templated(cache_path):
+    return "%(" in cache_path
+
+
+def _record_download(cache_path, downloaded_path):
+    if downloaded_path and _is_templated(cache_path):
+        with open(_record_path(cache_path), "w") as f:
+            f.write(os.path.basename(downloaded_path))
 
 
 class DownloaderProxy:
-    def __init__(self, real_downloader, cache_dir="cache"):
+    def __init__(self, real_downloader, cache_dir="cache", cache_sync=None):
         self.real_downloader = real_downloader
         self.cache_dir = cache_dir
+        self.cache_sync = cache_sync
         os.makedirs(self.cache_dir, exist_ok=True)
 
     def _get_cache_path(self, date, stream_id, filename):
@@ -20,23 +86,115 @@ class DownloaderProxy:
         os.makedirs(sub_dir, exist_ok=True)
         return os.path.join(sub_dir, filename)
 
+    def _expected_path(self, cache_path):
+        """
+        Returns where a download to `cache_path` ended up, or None when that
+        isn't known yet. Only local (or shared cache) records are read: the
+        real downloader is never imported or asked, so a hit costs no network.
+        """
+        if not _is_templated(cache_path):
+            return cache_path
+        record_path = _record_path(cache_path)
+        if not os.path.exists(record_path) and not (
+            self.cache_sync and self.cache_sync.pull(record_path)
+        ):
+            return None
+        with open(record_path) as f:
+            return os.path.join(os.path.dirname(cache_path), f.read().strip())
+
+    def _find_cached(self, url, cache_path):
+        """
+        Returns the cached file for `url`, or None if it has to be downloaded.
+        """
+        with trace_span("cache lookup", "cache", url=url) as span:
+            expected_path = self._expected_path(cache_path)
+            span.set(path=expected_path, hit=False)
+
+            # If the file already exists, just use that filepath...
+            if (
+                expected_path
+                and os.path.exists(expected_path)
+                and _is_intact(expected_path)
+            ):
+                print(f"Using cached file for {url}: {expected_path}")
+                span.set(hit=True)
+                emit("cache_lookup", url=url, hit=True)
+                return expected_path
+
+            # ...or pull it from the shared cache if another node already downloaded it
+            if (
+                expected_path
+                and self.cache_sync
+                and self.cache_sync.pull(expected_path)
+            ):
+                print(f"Using shared cached file for {url}: {expected_path}")
+                span.set(hit=True, shared=True)
+                emit("cache_lookup", url=url, hit=True, shared=True)
+                return expected_path
+
+            emit("cache_lookup", url=url, hit=False)
+            return None
+
+    def _push(self, cache_path, downloaded_path):
+        self.cache_sync.push(downloaded_path)
+        if _is_templated(cache_path):
+            self.cache_sync.push(_record_path(cache_path))
+
     def download(self, url, date, stream_id, filename):
         cache_path = self._get_cache_path(date, stream_id, filename)
 
-        # If the downloader has a `get_output_path` method, use it to predict the output path
-        if hasattr(self.real_downloader, "get_output_path"):
-            expected_path = self.real_downloader.get_output_path(url, cache_path)
-        else:
-            # Fallback to the base cache path if `get_output_path` is not available
-            expected_path = cache_path
-
-        # If the file already exists, just use that filepath...
-        if os.path.exists(expected_path):
-            print(f"Using cached file for {url}: {expected_path}")
-            return expected_path
+        cached_path = self._find_cached(url, cache_path)
+        if cached_path:
+            return cached_path
 
         # ...but if it doesn't, then actually download the file
         print(f"Downloading {url} to cache...")
-        downloaded_path = self.real_downloader.download(url, cache_path)
+        with trace_span("download", "download", url=url) as span:
+            downloaded_path = self.real_downloader.download(url, cache_path)
+            span.set(path=downloaded_path, bytes=_file_size(downloaded_path))
+        emit("download_finished", url=url, size_bytes=span.attributes["bytes"])
         print(f"Downloaded and cached: {downloaded_path}")
+        _record_checksum(downloaded_path)
+        _record_download(cache_path, downloaded_path)
+
+        if self.cache_sync:
+            self._push(cache_path, downloaded_path)
+
+        return downloaded_path
+
+    async def download_async(self, url, date, stream_id, filename):
+        """
+        Same as `download`, without blocking the event loop.
+
+        Downloaders with a `download_async` method are awaited directly; blocking
+        work (yt-dlp extraction, shared cache fetches) runs in the default executor.
+        """
+        loop = asyncio.get_running_loop()
+        cache_path = self._get_cache_path(date, stream_id, filename)
+
+        cached_path = await loop.run_in_executor(
+            None, contextvars.copy_context().run, self._find_cached, url, cache_path
+        )
+        if cached_path:
+            return cached_path
+
+        print(f"Downloading {url} to cache...")
+        with trace_span("download", "download", url=url) as span:
+            if hasattr(self.real_downloader, "download_async"):
+                downloaded_path = await self.real_downloader.download_async(
+                    url, cache_path
+                )
+            else:
+                downloaded_path = await loop.run_in_executor(
+                    None, self.real_downloader.download, url, cache_path
+                )
+            span.set(path=downloaded_path, bytes=_file_size(downloaded_path))
+        emit("download_finished", url=url, size_bytes=span.attributes["bytes"])
+        print(f"Downloaded and cached: {downloaded_path}")
+        await loop.run_in_executor(None, _record_checksum, downloaded_path)
+        _record_download(cache_path, downloaded_path)
+
+        if self.cache_sync:
+            self._push(cache_path, downloaded_path)
+
         return downloaded_path
@@ -0,0 +1,9 @@
+from app.utils.lazy import LazyRegistry
+
+# Imported on first use: yt-dlp alone takes a few hundred ms to import
+DOWNLOADERS = LazyRegistry(
+    {
+        "youtube": "app.downloaders.youtube_downloader:YouTubeDownloader",
+        "s3": "app.downloaders.s3_downloader:S3Downloader",
+    }
+)
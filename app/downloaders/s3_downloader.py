@@ -1,6 +1,34 @@
+import hashlib
+import httpx
 import requests
 import os
 from app.downloaders.base_downloader import Downloader
+from app.utils.checksums import write_checksum
+
+
+def _expected_length(headers):
+    # With a Content-Encoding the body is decoded, so its length won't match
+    if headers.get("Content-Encoding"):
+        return None
+    length = headers.get("Content-Length")
+    return int(length) if length and str(length).isdigit() else None
+
+
+def _finish_download(tmp_path, destination, digest, written, expected_length):
+    """
+    Moves a completed download into place and records its SHA-256 digest.
+
+    Raises:
+        IOError: If fewer bytes arrived than the server announced.
+    """
+    if expected_length is not None and written != expected_length:
+        os.remove(tmp_path)
+        raise IOError(
+            f"Truncated download for {destination}: "
+            f"got {written} of {expected_length} bytes"
+        )
+    os.replace(tmp_path, destination)
+    write_checksum(destination, digest.hexdigest())
 
 
 class S3Downloader(Downloader):
@@ -9,6 +37,9 @@ class S3Downloader(Downloader):
         """
         Download a file from an S3 URL.
 
+        The file is hashed while it is written and only appears under its
+        final name once it is complete.
+
         Args:
             url (str): S3 file URL (e.g., https://s3.amazonaws.com/bucket/intro.mp4).
             destination (str): Local file path to save the file.
@@ -17,8 +48,42 @@ class S3Downloader(Downloader):
         print(f"Downloading S3 file from {url}...")
         response = requests.get(url, stream=True)
         response.raise_for_status()
-        with open(destination, "wb") as f:
+        digest = hashlib.sha256()
+        written = 0
+        tmp_path = f"{destination}.part"
+        with open(tmp_path, "wb") as f:
             for chunk in response.iter_content(chunk_size=8192):
+                digest.update(chunk)
+                written += len(chunk)
                 f.write(chunk)
+        _finish_download(
+            tmp_path, destination, digest, written, _expected_length(response.headers)
+        )
+        print(f"Downloaded S3 file to {destination}")
+        return destination
+
+    async def download_async(self, url, destination):
+        """
+        Download a file from an S3 URL without blocking the event loop.
+
+        Args:
+            url (str): S3 file URL (e.g., https://s3.amazonaws.com/bucket/intro.mp4).
+            destination (str): Local file path to save the file.
+        """
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        print(f"Downloading S3 file from {url}...")
+        digest = hashlib.sha256()
+        written = 0
+        tmp_path = f"{destination}.part"
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(chunk_size=65536):
+                        digest.update(chunk)
+                        written += len(chunk)
+                        f.write(chunk)
+                expected_length = _expected_length(response.headers)
+        _finish_download(tmp_path, destination, digest, written, expected_length)
         print(f"Downloaded S3 file to {destination}")
         return destination
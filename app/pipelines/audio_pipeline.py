@@ -1,5 +1,6 @@
-from app.pipelines.base_pipeline import BasePipelineBuilder
-from app.steps.merge_audio_step import merge_audio_step
+from app.pipelines.base_pipeline import PREVIEW_SECONDS, BasePipelineBuilder
+from app.steps.registry import STEPS
+from app.utils.renditions import renditions_from_config
 
 
 class AudioPipelineBuilder(BasePipelineBuilder):
@@ -7,8 +8,8 @@ class AudioPipelineBuilder(BasePipelineBuilder):
     Builder for audio processing pipelines.
     """
 
-    def __init__(self):
-        super().__init__("audio")
+    def __init__(self, preview=None):
+        super().__init__("audio", preview=preview)
 
     def build_pipeline(self, config):
         """
@@ -20,7 +21,11 @@ class AudioPipelineBuilder(BasePipelineBuilder):
 
         # Get date and create downloader proxies
         date = self._get_date_from_config(config)
-        audio_proxy, s3_proxy = self._create_downloader_proxies(config)
+        cache_sync = self._create_cache_sync(config)
+        self._configure_resources(config)
+        renditions = renditions_from_config(audio_conf, allow_video=False)
+        audio_proxy, s3_proxy = self._create_downloader_proxies(config, cache_sync)
+        publish_queue = self._create_publish_queue(config)
 
         # Build pipeline steps
         steps = [
@@ -38,18 +43,41 @@ class AudioPipelineBuilder(BasePipelineBuilder):
                 )
             )
 
+        trim_step = self._create_trim_step(
+            audio_conf, ffmpeg_hide_banner=True, cache_sync=cache_sync
+        )
+        if self.preview:
+            steps.extend(
+                [
+                    trim_step,
+                    self._create_preview_step(stream_id, date, fade_duration=1),
+                    self._create_cleanup_step(),
+                ]
+            )
+            return steps
+
         # Add processing steps
         steps.extend(
             [
-                self._create_trim_step(audio_conf, ffmpeg_hide_banner=True),
+                trim_step,
                 self._create_fade_step(
                     fade_duration=1, ffmpeg_loglevel="info", is_video=False
                 ),
                 (
                     "Merge audio",
-                    lambda data: merge_audio_step(data, output_format="wav"),
+                    lambda data: STEPS["merge_audio"](
+                        data,
+                        output_format="wav",
+                        cache_sync=cache_sync,
+                        waveform=audio_conf.get("waveform", False),
+                        renditions=renditions,
+                    ),
                 ),
                 self._create_move_step(stream_id, date, "wav"),
+                self._create_manifest_step(stream_id, date),
+                self._create_publish_step(publish_queue, stream_id, date, "wav"),
+                self._create_cache_flush_step(cache_sync),
+                self._create_publish_wait_step(publish_queue),
                 self._create_cleanup_step(),
             ]
         )
@@ -63,3 +91,12 @@ def create_audio_pipeline(config):
     """
     builder = AudioPipelineBuilder()
     return builder.build_pipeline(config)
+
+
+def create_audio_preview_pipeline(config, seconds=PREVIEW_SECONDS):
+    """
+    Builds a pipeline that only renders the joins of the audio, `seconds` on
+    each side, for review before the full render.
+    """
+    builder = AudioPipelineBuilder(preview=seconds)
+    return builder.build_pipeline(config)
@@ -1,31 +1,37 @@
 from datetime import datetime
-from typing import Dict, List, Tuple, Callable, Any
+from typing import Dict, List, Optional, Tuple, Callable, Any
+from app.caches.cache_sync import CacheSync, create_cache_sync
 from app.constants import PipelineKeys
-from app.downloaders.youtube_downloader import YouTubeDownloader
-from app.downloaders.s3_downloader import S3Downloader
 from app.downloaders.downloader_proxy import DownloaderProxy
-from app.steps.delete_files_step import delete_files_step
-from app.steps.download_step import download_step
-from app.steps.fade_in_out_step import fade_in_out_step
-from app.steps.manual_load_step import manual_load_step
-from app.steps.trim_step import trim_step
-from app.steps.move_step import move_step
+from app.downloaders.registry import DOWNLOADERS
+from app.publishers.publish_queue import PublishQueue, create_publish_queue
+from app.steps.registry import STEPS
+from app.utils.resource_scheduler import configure_scheduler
 from app.utils.youtube import get_youtube_upload_date
 
+# One file per YouTube URL already looked up, so reruns skip the yt-dlp call
+UPLOAD_DATES_DIR = "cache/upload_dates"
+
+# Seconds rendered on each side of a join in a preview
+PREVIEW_SECONDS = 10.0
+
 
 class BasePipelineBuilder:
     """
     Base class for building media processing pipelines with shared logic.
     """
 
-    def __init__(self, media_type: str):
+    def __init__(self, media_type: str, preview: Optional[float] = None):
         """
         Initialize the pipeline builder.
 
         Args:
             media_type: Type of media being processed ("audio" or "video")
+            preview: If set, build a preview pipeline instead: only the joins
+                are rendered, this many seconds on each side, small and fast
         """
         self.media_type = media_type
+        self.preview = preview
         self._validate_media_type()
 
     def _validate_media_type(self):
@@ -45,7 +51,7 @@ class BasePipelineBuilder:
         """
         youtube_url = config.get("youtube_url")
         if youtube_url:
-            date = get_youtube_upload_date(youtube_url)
+            date = get_youtube_upload_date(youtube_url, record_dir=UPLOAD_DATES_DIR)
             if not date:
                 print("Failed to fetch upload date. Falling back to the current date.")
                 date = datetime.now().strftime("%Y-%m-%d")
@@ -53,29 +59,73 @@ class BasePipelineBuilder:
             date = datetime.now().strftime("%Y-%m-%d")
         return date
 
+    def _create_cache_sync(self, config: Dict[str, Any]) -> Optional[CacheSync]:
+        """
+        Create the shared cache sync from the optional `cache` config section.
+
+        Args:
+            config: Pipeline configuration
+
+        Returns:
+            CacheSync, or None if no shared cache is configured
+        """
+        return create_cache_sync(config.get("cache"))
+
+    def _create_publish_queue(self, config: Dict[str, Any]) -> Optional[PublishQueue]:
+        """
+        Create the publish queue from the optional `publish` config section.
+
+        Args:
+            config: Pipeline configuration
+
+        Returns:
+            PublishQueue, or None if nothing is published for this media type
+        """
+        return create_publish_queue(config.get("publish"), self.media_type)
+
+    def _configure_resources(self, config: Dict[str, Any]):
+        """
+        Size the process-wide CPU scheduler from the optional `resources` section.
+
+        Args:
+            config: Pipeline configuration
+        """
+        if "resources" in config:
+            configure_scheduler(config["resources"])
+
     def _create_downloader_proxies(
-        self, config: Dict[str, Any]
+        self, config: Dict[str, Any], cache_sync: Optional[CacheSync] = None
     ) -> Tuple[DownloaderProxy, DownloaderProxy]:
         """
         Create downloader proxies for YouTube and S3 downloads.
 
+        The real downloaders are only imported and built on their first
+        download, so cache hits and manual runs never import yt-dlp. With the
+        upload date recorded too (see `_get_date_from_config`), a rerun of a
+        cached stream makes no yt-dlp call at all.
+
         Args:
             config: Pipeline configuration
+            cache_sync: Optional shared cache the proxies read through and write back to
 
         Returns:
             Tuple of (main_downloader_proxy, s3_downloader_proxy)
         """
         if self.media_type == "audio":
-            main_downloader = YouTubeDownloader(audio_only=True)
+            main_downloader = DOWNLOADERS.create("youtube", audio_only=True)
             cache_dir = "cache/audio"
         else:  # video
-            main_downloader = YouTubeDownloader(quiet=True)
+            main_downloader = DOWNLOADERS.create("youtube", quiet=True)
             cache_dir = "cache/video"
 
         main_proxy = DownloaderProxy(
-            real_downloader=main_downloader, cache_dir=cache_dir
+            real_downloader=main_downloader, cache_dir=cache_dir, cache_sync=cache_sync
+        )
+        s3_proxy = DownloaderProxy(
+            real_downloader=DOWNLOADERS.create("s3"),
+            cache_dir="cache/s3",
+            cache_sync=cache_sync,
         )
-        s3_proxy = DownloaderProxy(real_downloader=S3Downloader(), cache_dir="cache/s3")
 
         return main_proxy, s3_proxy
 
@@ -96,7 +146,7 @@ class BasePipelineBuilder:
         return (
             f"Download intro {self.media_type}",
             lambda data: (
-                download_step(
+                STEPS["download"](
                     data,
                     downloader=s3_proxy,
                     url=media_conf.get("intro_url"),
@@ -125,7 +175,7 @@ class BasePipelineBuilder:
         return (
             f"Download outro {self.media_type}",
             lambda data: (
-                download_step(
+                STEPS["download"](
                     data,
                     downloader=s3_proxy,
                     url=media_conf.get("outro_url"),
@@ -160,7 +210,7 @@ class BasePipelineBuilder:
         """
         return (
             f"Download YouTube {self.media_type}",
-            lambda data: download_step(
+            lambda data: STEPS["download"](
                 data,
                 downloader=main_proxy,
                 url=config.get("youtube_url"),
@@ -186,7 +236,7 @@ class BasePipelineBuilder:
         manual_path = media_conf.get("manual_path")
         return (
             f"Load manually downloaded {self.media_type}",
-            lambda data: manual_load_step(data, manual_path=manual_path),
+            lambda data: STEPS["manual_load"](data, manual_path=manual_path),
         )
 
     def _create_trim_step(
@@ -195,6 +245,11 @@ class BasePipelineBuilder:
         """
         Create trim step.
 
+        With `trim.auto`, the times are detected from the audio and the
+        configured ones (if any) are only a fallback. With
+        `trim.detect_boundaries` (video), the cut is moved past slates and
+        end cards. In a preview, the window is resolved but not cut.
+
         Args:
             media_conf: Media-specific configuration (audio or video)
             **kwargs: Additional arguments for trim_step
@@ -202,13 +257,30 @@ class BasePipelineBuilder:
         Returns:
             Tuple of (step_description, step_function)
         """
+        trim_conf = media_conf.get("trim", {})
+        if self.preview:
+            # Previews seek into the source; only the window is needed
+            kwargs = dict(kwargs, cut=False)
+        if trim_conf.get("detect_boundaries"):
+            kwargs = dict(kwargs, detect_boundaries=True)
+        if trim_conf.get("auto"):
+            return (
+                f"Auto-trim {self.media_type}",
+                lambda data: STEPS["auto_trim"](
+                    data,
+                    min_confidence=trim_conf.get("min_confidence", 0.6),
+                    start_time=trim_conf.get("start_time"),
+                    end_time=trim_conf.get("end_time"),
+                    **kwargs,
+                ),
+            )
         return (
             f"Trim {self.media_type}",
             lambda data: (
-                trim_step(
+                STEPS["trim"](
                     data,
-                    start_time=media_conf.get("trim", {}).get("start_time"),
-                    end_time=media_conf.get("trim", {}).get("end_time"),
+                    start_time=trim_conf.get("start_time"),
+                    end_time=trim_conf.get("end_time"),
                     **kwargs,
                 )
                 if "trim" in media_conf
@@ -228,7 +300,37 @@ class BasePipelineBuilder:
         """
         return (
             "Apply fade-in/out",
-            lambda data: fade_in_out_step(data, **kwargs),
+            lambda data: STEPS["fade_in_out"](data, **kwargs),
+        )
+
+    def _create_clip_step(
+        self, media_conf: Dict[str, Any], stream_id: str, date: str, **kwargs
+    ) -> Tuple[str, Callable]:
+        """
+        Create step that cuts the configured highlight clips from the output.
+
+        Args:
+            media_conf: Media-specific configuration (its `clips` list)
+            stream_id: Stream identifier
+            date: Date string
+            **kwargs: Additional arguments for clip_step
+
+        Returns:
+            Tuple of (step_description, step_function)
+        """
+        clips = media_conf.get("clips", [])
+        return (
+            "Cut highlight clips",
+            lambda data: (
+                STEPS["clip"](
+                    data,
+                    clips=clips,
+                    output_dir=f"output/{stream_id}/{date}_clips",
+                    **kwargs,
+                )
+                if clips
+                else data
+            ),
         )
 
     def _create_move_step(
@@ -247,13 +349,126 @@ class BasePipelineBuilder:
         """
         return (
             f"Move final {self.media_type}",
-            lambda data: move_step(
+            lambda data: STEPS["move"](
                 data,
                 source_key=PipelineKeys.ACTIVE_FILE_PATH,
                 output_filename=f"output/{stream_id}/{date}.{file_extension}",
             ),
         )
 
+    def _create_manifest_step(self, stream_id: str, date: str) -> Tuple[str, Callable]:
+        """
+        Create step that writes the job's integrity manifest next to the output.
+
+        Args:
+            stream_id: Stream identifier
+            date: Date string
+
+        Returns:
+            Tuple of (step_description, step_function)
+        """
+        return (
+            "Write manifest",
+            lambda data: STEPS["manifest"](
+                data,
+                manifest_path=f"output/{stream_id}/{date}.manifest.json",
+                job={"stream_id": stream_id, "date": date, "media": self.media_type},
+            ),
+        )
+
+    def _create_publish_step(
+        self,
+        publish_queue: Optional[PublishQueue],
+        stream_id: str,
+        date: str,
+        file_extension: str,
+    ) -> Tuple[str, Callable]:
+        """
+        Create step that starts publishing the final file in the background.
+
+        Args:
+            publish_queue: Optional publish destinations
+            stream_id: Stream identifier
+            date: Date string
+            file_extension: Output file extension
+
+        Returns:
+            Tuple of (step_description, step_function)
+        """
+        return (
+            f"Publish final {self.media_type}",
+            lambda data: STEPS["publish"](
+                data,
+                publish_queue=publish_queue,
+                key=f"{stream_id}/{date}.{file_extension}",
+            ),
+        )
+
+    def _create_publish_wait_step(
+        self, publish_queue: Optional[PublishQueue]
+    ) -> Tuple[str, Callable]:
+        """
+        Create step that waits for the background publishes to finish.
+
+        Args:
+            publish_queue: Optional publish destinations
+
+        Returns:
+            Tuple of (step_description, step_function)
+        """
+        return (
+            "Wait for publishing",
+            lambda data: STEPS["wait_for_publish"](data, publish_queue=publish_queue),
+        )
+
+    def _create_cache_flush_step(
+        self, cache_sync: Optional[CacheSync]
+    ) -> Tuple[str, Callable]:
+        """
+        Create step that waits for background uploads to the shared cache.
+
+        Must run before the cleanup step so no file is deleted mid-upload.
+
+        Args:
+            cache_sync: Optional shared cache
+
+        Returns:
+            Tuple of (step_description, step_function)
+        """
+
+        def flush(data):
+            if cache_sync:
+                cache_sync.flush()
+            return data
+
+        return ("Flush shared cache", flush)
+
+    def _create_preview_step(
+        self, stream_id: str, date: str, **kwargs
+    ) -> Tuple[str, Callable]:
+        """
+        Create step that renders the joins of a preview next to where the
+        output would go.
+
+        Args:
+            stream_id: Stream identifier
+            date: Date string
+            **kwargs: Additional arguments for preview_step
+
+        Returns:
+            Tuple of (step_description, step_function)
+        """
+        return (
+            f"Preview {self.media_type} joins",
+            lambda data: STEPS["preview"](
+                data,
+                output_base=f"output/{stream_id}/{date}",
+                seconds=self.preview,
+                is_video=self.media_type == "video",
+                **kwargs,
+            ),
+        )
+
     def _create_cleanup_step(self) -> Tuple[str, Callable]:
         """
         Create cleanup step for intermediate files.
@@ -263,7 +478,7 @@ class BasePipelineBuilder:
         """
         return (
             "Delete intermediate files",
-            lambda data: delete_files_step(
+            lambda data: STEPS["delete_files"](
                 data,
                 file_keys=[PipelineKeys.INTERMEDIATE_FILES],
             ),
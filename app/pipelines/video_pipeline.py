@@ -1,5 +1,7 @@
-from app.pipelines.base_pipeline import BasePipelineBuilder
-from app.steps.merge_video_step import merge_video_step
+from app.pipelines.base_pipeline import PREVIEW_SECONDS, BasePipelineBuilder
+from app.steps.registry import STEPS
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.renditions import renditions_from_config
 
 
 class VideoPipelineBuilder(BasePipelineBuilder):
@@ -7,8 +9,8 @@ class VideoPipelineBuilder(BasePipelineBuilder):
     Builder for video processing pipelines.
     """
 
-    def __init__(self):
-        super().__init__("video")
+    def __init__(self, preview=None):
+        super().__init__("video", preview=preview)
 
     def build_pipeline(self, config):
         """
@@ -20,7 +22,12 @@ class VideoPipelineBuilder(BasePipelineBuilder):
 
         # Get date and create downloader proxies
         date = self._get_date_from_config(config)
-        video_proxy, s3_proxy = self._create_downloader_proxies(config)
+        cache_sync = self._create_cache_sync(config)
+        self._configure_resources(config)
+        encoder_profile = get_encoder_profile(config.get("encoding"))
+        renditions = renditions_from_config(video_conf, config.get("encoding"))
+        video_proxy, s3_proxy = self._create_downloader_proxies(config, cache_sync)
+        publish_queue = self._create_publish_queue(config)
 
         # Build pipeline steps
         steps = [
@@ -38,25 +45,61 @@ class VideoPipelineBuilder(BasePipelineBuilder):
                 )
             )
 
+        trim_step = self._create_trim_step(
+            video_conf,
+            ffmpeg_loglevel="info",
+            ffmpeg_hide_banner=True,
+            cache_sync=cache_sync,
+            keyframe_index=True,
+        )
+        if self.preview:
+            steps.extend(
+                [
+                    trim_step,
+                    self._create_preview_step(
+                        stream_id,
+                        date,
+                        fade_duration=1,
+                        keyframe_index=True,
+                        encoder_profile=get_encoder_profile(
+                            config.get("encoding"), name="preview"
+                        ),
+                    ),
+                    self._create_cleanup_step(),
+                ]
+            )
+            return steps
+
         # Add processing steps
         steps.extend(
             [
-                self._create_trim_step(
-                    video_conf, ffmpeg_loglevel="info", ffmpeg_hide_banner=True
-                ),
+                trim_step,
                 self._create_fade_step(
-                    fade_duration=1, ffmpeg_loglevel="info", is_video=True
+                    fade_duration=1,
+                    ffmpeg_loglevel="info",
+                    is_video=True,
+                    encoder_profile=encoder_profile,
                 ),
                 (
                     "Merge clips",
-                    lambda data: merge_video_step(
+                    lambda data: STEPS["merge_video"](
                         data,
                         output_format="mp4",
                         ffmpeg_loglevel="info",
                         ffmpeg_hide_banner=True,
+                        cache_sync=cache_sync,
+                        encoder_profile=encoder_profile,
+                        renditions=renditions,
                     ),
                 ),
+                self._create_clip_step(
+                    video_conf, stream_id, date, encoder_profile=encoder_profile
+                ),
                 self._create_move_step(stream_id, date, "mp4"),
+                self._create_manifest_step(stream_id, date),
+                self._create_publish_step(publish_queue, stream_id, date, "mp4"),
+                self._create_cache_flush_step(cache_sync),
+                self._create_publish_wait_step(publish_queue),
                 self._create_cleanup_step(),
             ]
         )
@@ -70,3 +113,12 @@ def create_video_pipeline(config):
     """
     builder = VideoPipelineBuilder()
     return builder.build_pipeline(config)
+
+
+def create_video_preview_pipeline(config, seconds=PREVIEW_SECONDS):
+    """
+    Builds a pipeline that only renders the joins of the video, `seconds` on
+    each side, for review before the full render.
+    """
+    builder = VideoPipelineBuilder(preview=seconds)
+    return builder.build_pipeline(config)
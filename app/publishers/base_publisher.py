@@ -0,0 +1,37 @@
+class Publisher:
+    """
+    Interface for a destination that final artifacts are published to.
+
+    Artifacts are addressed by a relative, forward-slash separated key (e.g.
+    "my-weekly-sermon/2025-02-02.mp4") that each destination maps onto its own
+    directory, bucket prefix or remote path.
+    """
+
+    def describe(self, key):
+        """
+        Return a human-readable location for the key (a path or URL).
+
+        Args:
+            key (str): The artifact key.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement the `describe` method.")
+
+    def publish(self, key, source_path):
+        """
+        Send a local file to the destination under the given key.
+
+        Args:
+            key (str): The artifact key.
+            source_path (str): The local file to publish.
+
+        Returns:
+            dict: `location`, `bytes` and `sha256` (None if the destination
+                can't hash the file while sending it).
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement the `publish` method.")
@@ -0,0 +1,44 @@
+import hashlib
+import os
+from app.publishers.base_publisher import Publisher
+from app.utils.checksums import read_chunks
+
+
+class LocalPublisher(Publisher):
+    """
+    Publishes to a directory (local disk or a mounted share).
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _get_path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def describe(self, key):
+        return self._get_path(key)
+
+    def publish(self, key, source_path):
+        """
+        Copies the file into the directory, hashing it while copying.
+
+        The copy is written under a temporary name and renamed into place, so
+        whatever watches the directory never sees half a file.
+        """
+        target_path = self._get_path(key)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+        digest = hashlib.sha256()
+        tmp_path = f"{target_path}.part"
+        with open(tmp_path, "wb") as f:
+            for chunk in read_chunks(source_path, digest=digest):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target_path)
+
+        return {
+            "location": target_path,
+            "bytes": os.path.getsize(target_path),
+            "sha256": digest.hexdigest(),
+        }
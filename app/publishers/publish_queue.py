@@ -0,0 +1,214 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+from colorama import Fore, Style
+from app.publishers.base_publisher import Publisher
+from app.publishers.local_publisher import LocalPublisher
+from app.publishers.rsync_publisher import RsyncPublisher
+from app.publishers.s3_publisher import DEFAULT_PART_SIZE, S3Publisher
+from app.utils.checksums import sha256_file
+from app.utils.tracing import trace_span
+
+
+@dataclass
+class Destination:
+    """
+    A publish target with its own retry policy.
+    """
+
+    name: str
+    publisher: Publisher
+    retries: int = 3
+    retry_delay: float = 5.0
+    media_types: Optional[List[str]] = None
+
+    def accepts(self, media_type):
+        return not self.media_types or media_type in self.media_types
+
+
+class PublishQueue:
+    """
+    Publishes final artifacts to every destination at once, in the background.
+
+    `submit` returns straight away so the rest of the pipeline keeps going;
+    `wait` blocks until every destination has the file (or gave up), and
+    checks that they all received the same bytes.
+    """
+
+    def __init__(self, destinations: List[Destination], max_workers=None):
+        """
+        Args:
+            destinations (list[Destination]): Where to publish.
+            max_workers (int): Concurrent publishes (default: one per destination).
+        """
+        self.destinations = destinations
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(len(destinations), 1),
+            thread_name_prefix="publish",
+        )
+        self._pending = []
+        self._known_digests = {}
+
+    def submit(self, key, source_path, sha256=None):
+        """
+        Starts publishing `source_path` under `key` to every destination.
+
+        Args:
+            key (str): The artifact key, e.g. "my-weekly-sermon/2025-02-02.mp4".
+            source_path (str): The local file to publish.
+            sha256 (str): Optional known digest (e.g. from the job manifest);
+                every destination must have received exactly that content.
+        """
+        if sha256:
+            self._known_digests[source_path] = sha256
+        for destination in self.destinations:
+            future = self._executor.submit(self._publish, destination, key, source_path)
+            self._pending.append((destination, source_path, future))
+
+    def _publish(self, destination, key, source_path):
+        with trace_span(
+            "publish", "upload", destination=destination.name, key=key
+        ) as span:
+            start = time.monotonic()
+            for attempt in range(1, destination.retries + 2):
+                try:
+                    result = destination.publisher.publish(key, source_path)
+                    break
+                except Exception as e:
+                    if attempt > destination.retries:
+                        span.set(attempts=attempt)
+                        raise
+                    delay = destination.retry_delay * 2 ** (attempt - 1)
+                    print(
+                        Fore.YELLOW
+                        + f"Publishing to {destination.name} failed ({e}); "
+                        + f"retrying in {delay:.0f}s ({attempt}/{destination.retries})"
+                        + Style.RESET_ALL
+                    )
+                    time.sleep(delay)
+
+            result = dict(
+                result,
+                destination=destination.name,
+                key=key,
+                attempts=attempt,
+                seconds=time.monotonic() - start,
+            )
+            span.set(bytes=result["bytes"], attempts=attempt)
+            print(
+                Fore.GREEN
+                + f"Published to {destination.name}: {result['location']}"
+                + Style.RESET_ALL
+            )
+            return result
+
+    def wait(self):
+        """
+        Blocks until everything submitted so far is published.
+
+        Returns:
+            list[dict]: One result per destination and file: `destination`,
+                `location`, `bytes`, `sha256`, `attempts` and `seconds`.
+
+        Raises:
+            RuntimeError: If a destination failed after all its retries.
+            ValueError: If destinations received different content.
+        """
+        pending, self._pending = self._pending, []
+        results, failures = [], []
+        for destination, source_path, future in pending:
+            try:
+                results.append((source_path, future.result()))
+            except Exception as e:
+                failures.append((destination.name, e))
+
+        if failures:
+            names = ", ".join(name for name, _ in failures)
+            raise RuntimeError(f"Publishing failed for: {names}") from failures[0][1]
+
+        return self._reconcile_checksums(results)
+
+    def _reconcile_checksums(self, results):
+        digests = {path: {digest} for path, digest in self._known_digests.items()}
+        for source_path, result in results:
+            if result["sha256"]:
+                digests.setdefault(source_path, set()).add(result["sha256"])
+
+        for source_path, found in digests.items():
+            if len(found) > 1:
+                raise ValueError(
+                    f"Destinations received different content for {source_path}"
+                )
+
+        reconciled = []
+        for source_path, result in results:
+            if not result["sha256"]:
+                # Only hash again if no destination did it while sending
+                if source_path not in digests:
+                    digests[source_path] = {sha256_file(source_path)}
+                result["sha256"] = next(iter(digests[source_path]))
+            reconciled.append(result)
+        return reconciled
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def _create_publisher(conf, state_dir):
+    destination_type = conf.get("type")
+    if destination_type == "local":
+        return LocalPublisher(conf["path"])
+    if destination_type == "s3":
+        return S3Publisher(
+            bucket=conf["bucket"],
+            prefix=conf.get("prefix", ""),
+            endpoint_url=conf.get("endpoint_url"),
+            part_size=(
+                conf["part_size_mb"] * 1024 * 1024
+                if conf.get("part_size_mb")
+                else DEFAULT_PART_SIZE
+            ),
+            max_concurrency=conf.get("max_concurrency", 4),
+            state_dir=state_dir,
+        )
+    if destination_type == "rsync":
+        return RsyncPublisher(
+            conf["target"],
+            ssh_args=conf.get("ssh_args"),
+            bandwidth_limit_kbps=conf.get("bandwidth_limit_kbps"),
+        )
+    raise ValueError(f"Unsupported publish destination: {destination_type}")
+
+
+def create_publish_queue(publish_conf, media_type, state_dir="cache/publish"):
+    """
+    Builds a `PublishQueue` from the `publish` section of the pipeline config.
+
+    Args:
+        publish_conf (dict): The `publish` config section, or None.
+        media_type (str): "audio" or "video"; destinations limited to other
+            media types are skipped.
+        state_dir (str): Where resumable S3 uploads keep their state.
+
+    Returns:
+        PublishQueue: The queue, or None if nothing is published for this media.
+    """
+    if not publish_conf:
+        return None
+
+    destinations = [
+        Destination(
+            name=conf.get("name") or f"{conf['type']}-{index}",
+            publisher=_create_publisher(conf, state_dir),
+            retries=conf.get("retries", 3),
+            retry_delay=conf.get("retry_delay", 5.0),
+            media_types=conf.get("media"),
+        )
+        for index, conf in enumerate(publish_conf.get("destinations", []))
+    ]
+    destinations = [d for d in destinations if d.accepts(media_type)]
+    if not destinations:
+        return None
+
+    return PublishQueue(destinations, max_workers=publish_conf.get("max_workers"))
@@ -0,0 +1,53 @@
+import os
+from app.publishers.base_publisher import Publisher
+from app.utils.commands import run_command
+
+
+class RsyncPublisher(Publisher):
+    """
+    Publishes to a remote host over SSH with `rsync` (or to any rsync target).
+
+    `--partial` keeps an interrupted transfer on the remote side, so a retry
+    sends only what is missing. The remote file only appears under its final
+    name once the transfer has completed.
+    """
+
+    def __init__(self, target, ssh_args=None, bandwidth_limit_kbps=None):
+        """
+        Args:
+            target (str): Remote root, e.g. "archive@media.example.org:/srv/sermons".
+            ssh_args (list[str]): Extra `ssh` options (port, identity file...).
+            bandwidth_limit_kbps (int): Optional cap so uploads don't starve
+                the rest of the network.
+        """
+        self.target = target.rstrip("/")
+        self.ssh_args = list(ssh_args or [])
+        self.bandwidth_limit_kbps = bandwidth_limit_kbps
+
+    def describe(self, key):
+        return f"{self.target}/{key}"
+
+    def command(self, key, source_path):
+        command = [
+            "rsync",
+            "--partial",
+            "--partial-dir=.rsync-partial",
+            "--mkpath",
+            "--times",
+        ]
+        if self.ssh_args:
+            command += ["-e", " ".join(["ssh"] + self.ssh_args)]
+        if self.bandwidth_limit_kbps:
+            command.append(f"--bwlimit={self.bandwidth_limit_kbps}")
+        return command + [source_path, self.describe(key)]
+
+    def publish(self, key, source_path):
+        print(f"Publishing {source_path} to {self.describe(key)}...")
+        run_command(self.command(key, source_path), check=True)
+        # rsync does its own block checksums; the SHA-256 comes from another
+        # destination's read pass (see PublishQueue)
+        return {
+            "location": self.describe(key),
+            "bytes": os.path.getsize(source_path),
+            "sha256": None,
+        }
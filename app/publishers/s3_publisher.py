@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.publishers.base_publisher import Publisher
+from app.utils.checksums import read_chunks
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3's minimum for every part but the last
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+HASH_SUFFIX = ".sha256"
+
+
+def _error_code(error):
+    response = getattr(error, "response", None) or {}
+    return str(response.get("Error", {}).get("Code"))
+
+
+class S3Publisher(Publisher):
+    """
+    Publishes to an S3-compatible bucket (AWS S3, MinIO, R2...).
+
+    Large files go up as a multipart upload with several parts in flight at
+    once. The upload id is kept in a small state file, so after a crash or a
+    failed attempt the next try only sends the parts that are missing. The
+    SHA-256 of the file is computed while the parts are read and stored next
+    to the object as `<key>.sha256`.
+    """
+
+    def __init__(
+        self,
+        bucket,
+        prefix="",
+        endpoint_url=None,
+        part_size=DEFAULT_PART_SIZE,
+        max_concurrency=4,
+        state_dir="cache/publish",
+        client=None,
+    ):
+        """
+        Args:
+            bucket (str): Bucket to publish to.
+            prefix (str): Optional key prefix inside the bucket.
+            endpoint_url (str): Optional endpoint for non-AWS object stores.
+            part_size (int): Bytes per multipart part (at least 5 MiB).
+            max_concurrency (int): Parts uploaded at the same time.
+            state_dir (str): Where in-progress upload ids are kept for resuming.
+            client: Optional boto3-compatible S3 client. Created lazily if omitted.
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_concurrency = max_concurrency
+        self.state_dir = state_dir
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Only pull in boto3 when something is actually published to S3
+            import boto3
+
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self._client
+
+    def _get_object_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def describe(self, key):
+        return f"s3://{self.bucket}/{self._get_object_key(key)}"
+
+    def publish(self, key, source_path):
+        object_key = self._get_object_key(key)
+        size = os.path.getsize(source_path)
+        print(f"Publishing {source_path} to {self.describe(key)}...")
+
+        if size <= self.part_size:
+            digest = self._put(object_key, source_path)
+        else:
+            digest = self._multipart_upload(object_key, source_path)
+
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=f"{object_key}{HASH_SUFFIX}",
+            Body=f"{digest}  {os.path.basename(object_key)}\n".encode(),
+        )
+        return {"location": self.describe(key), "bytes": size, "sha256": digest}
+
+    def _put(self, object_key, source_path):
+        digest = hashlib.sha256()
+        body = b"".join(read_chunks(source_path, digest=digest))
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=object_key,
+            Body=body,
+            Metadata={"sha256": digest.hexdigest()},
+        )
+        return digest.hexdigest()
+
+    def _state_path(self, object_key, source_path):
+        stat = os.stat(source_path)
+        # A changed file (size/mtime) gets a fresh upload instead of a bad resume
+        identity = f"{self.bucket}/{object_key}:{stat.st_size}:{stat.st_mtime_ns}"
+        name = hashlib.sha1(identity.encode()).hexdigest()[:16]
+        return os.path.join(self.state_dir, f"{name}.json")
+
+    def _uploaded_parts(self, object_key, upload_id):
+        """
+        Returns part number -> ETag for the parts S3 already has.
+        """
+        parts = {}
+        marker = 0
+        while True:
+            response = self.client.list_parts(
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                PartNumberMarker=marker,
+            )
+            for part in response.get("Parts", []):
+                parts[part["PartNumber"]] = part["ETag"]
+            if not response.get("IsTruncated"):
+                return parts
+            marker = response["NextPartNumberMarker"]
+
+    def _resume_or_start(self, object_key, state_path):
+        if os.path.exists(state_path):
+            with open(state_path, "r") as f:
+                upload_id = json.load(f)["upload_id"]
+            try:
+                parts = self._uploaded_parts(object_key, upload_id)
+                print(
+                    f"Resuming upload of {object_key}: {len(parts)} parts already sent"
+                )
+                return upload_id, parts
+            except Exception as e:
+                if _error_code(e) != "NoSuchUpload":
+                    raise
+                # Expired or aborted upload; start over
+
+        upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=object_key
+        )["UploadId"]
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(state_path, "w") as f:
+            json.dump(
+                {"bucket": self.bucket, "key": object_key, "upload_id": upload_id}, f
+            )
+        return upload_id, {}
+
+    def _multipart_upload(self, object_key, source_path):
+        state_path = self._state_path(object_key, source_path)
+        upload_id, uploaded = self._resume_or_start(object_key, state_path)
+
+        digest = hashlib.sha256()
+        etags = {}
+        futures = []
+        # Bounds how many parts are held in memory waiting for a free worker
+        in_flight = threading.BoundedSemaphore(self.max_concurrency * 2)
+
+        def upload_part(part_number, body):
+            try:
+                response = self.client.upload_part(
+                    Bucket=self.bucket,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                )
+            finally:
+                in_flight.release()
+            return part_number, response["ETag"]
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            chunks = read_chunks(source_path, chunk_size=self.part_size, digest=digest)
+            for part_number, chunk in enumerate(chunks, start=1):
+                # S3 reports a part's MD5 as its ETag: skip parts it already has
+                etag = f'"{hashlib.md5(chunk).hexdigest()}"'
+                if uploaded.get(part_number) == etag:
+                    etags[part_number] = etag
+                    continue
+                in_flight.acquire()
+                futures.append(executor.submit(upload_part, part_number, chunk))
+
+            for future in futures:
+                part_number, etag = future.result()
+                etags[part_number] = etag
+
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=object_key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": number, "ETag": etag}
+                    for number, etag in sorted(etags.items())
+                ]
+            },
+        )
+        os.remove(state_path)
+        return digest.hexdigest()
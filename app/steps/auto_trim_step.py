@@ -0,0 +1,65 @@
+from colorama import Fore, Style
+from app.data_models.pipeline_data import PipelineData
+from app.steps.trim_step import trim_step
+from app.utils.auto_trim import get_trim_suggestion
+
+
+def auto_trim_step(
+    data: PipelineData,
+    min_confidence=0.6,
+    start_time=None,
+    end_time=None,
+    **trim_kwargs,
+):
+    """
+    Trims the active file to the sermon, found from its silence/music/speech
+    transitions instead of hand-entered times.
+
+    Args:
+        data (PipelineData): Current pipeline data object.
+        min_confidence (float): Lowest confidence (0-1) at which the detected
+            times are used.
+        start_time (str): Optional fallback start ("HH:MM:SS"), used when the
+            detection isn't confident enough.
+        end_time (str): Optional fallback end.
+        **trim_kwargs: Passed to `trim_step`.
+
+    Returns:
+        PipelineData: Updated data object with the trimmed file as the active file.
+
+    Raises:
+        ValueError: If the detection isn't confident enough and there are no
+            fallback times.
+    """
+    # Cached by content, so re-runs don't decode the whole stream again
+    suggestion = get_trim_suggestion(data.active_file_path)
+    if suggestion is not None and suggestion.confidence >= min_confidence:
+        print(
+            Fore.GREEN
+            + f"Detected the sermon from {suggestion.start_time} to "
+            + f"{suggestion.end_time} (confidence {suggestion.confidence:.2f})"
+            + Style.RESET_ALL
+        )
+        start_time, end_time = suggestion.start_time, suggestion.end_time
+        data.trim = dict(suggestion.summary(), source="auto")
+    else:
+        found = (
+            f"confidence {suggestion.confidence:.2f} from {suggestion.start_time} "
+            f"to {suggestion.end_time}"
+            if suggestion
+            else "no sermon found"
+        )
+        if not (start_time and end_time):
+            raise ValueError(
+                f"Could not detect the trim times ({found}); "
+                "set trim.start_time and trim.end_time in the config."
+            )
+        print(
+            Fore.YELLOW
+            + f"Auto-trim not confident enough ({found}); "
+            + f"using the configured {start_time} to {end_time}."
+            + Style.RESET_ALL
+        )
+        data.trim = {"start_time": start_time, "end_time": end_time, "source": "config"}
+
+    return trim_step(data, start_time, end_time, **trim_kwargs)
@@ -0,0 +1,245 @@
+import os
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+from colorama import Fore, Style
+from app.data_models.pipeline_data import PipelineData
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.ffmpeg import parse_timestamp, run_ffmpeg
+from app.utils.file_ops import place_file
+from app.utils.helpers import add_intermediate_filepath
+from app.utils.keyframe_index import INDEX_SUFFIX, get_keyframe_index
+from app.utils.media_probe import get_media_info
+from app.utils.parallel_encode import run_encodes
+from app.utils.resource_scheduler import get_scheduler, split_slots
+
+# A start this close after a keyframe is cut on it (about half a frame at 30 fps)
+KEYFRAME_TOLERANCE = 0.015
+
+
+@dataclass
+class Clip:
+    """
+    One highlight to cut from the output, times as seen in the output.
+    """
+
+    name: str
+    start: float
+    end: float
+    aspect: Optional[str] = None  # "W:H", e.g. "9:16"; None keeps the frame
+
+    @classmethod
+    def from_config(cls, entry):
+        """
+        Args:
+            entry (dict): `name`, `start_time`, `end_time` and optional `aspect`.
+        """
+        clip = cls(
+            name=entry["name"],
+            start=parse_timestamp(entry["start_time"]),
+            end=parse_timestamp(entry["end_time"]),
+            aspect=entry.get("aspect"),
+        )
+        if clip.end <= clip.start:
+            raise ValueError(f"Clip {clip.name} ends before it starts")
+        return clip
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def crop_filter(self, width, height):
+        """
+        Returns the centred crop to `aspect`, or None if the frame already has it.
+        """
+        if not self.aspect:
+            return None
+        aspect_width, aspect_height = (int(n) for n in self.aspect.split(":"))
+        if width * aspect_height == height * aspect_width:
+            return None
+        ratio = aspect_width / aspect_height
+        # Even sizes, as yuv420p needs
+        return (
+            f"crop=w='trunc(min(iw,ih*{ratio:.6f})/2)*2'"
+            f":h='trunc(min(ih,iw/{ratio:.6f})/2)*2'"
+        )
+
+
+def copy_command(source, clip, output_path, ffmpeg_loglevel="info"):
+    """
+    Cuts a clip that starts on a keyframe without re-encoding.
+    """
+    return [
+        "ffmpeg",
+        "-loglevel",
+        ffmpeg_loglevel,
+        "-hide_banner",
+        "-ss",
+        f"{clip.start:.6f}",
+        "-i",
+        source,
+        "-t",
+        f"{clip.duration:.6f}",
+        "-map",
+        "0",
+        "-c",
+        "copy",
+        "-avoid_negative_ts",
+        "make_zero",
+        "-y",
+        output_path,
+    ]
+
+
+def encode_command(
+    source, clip, output_path, encoder_profile, crop=None, ffmpeg_loglevel="info"
+):
+    """
+    Cuts a clip by re-encoding it; the input seek still skips straight to the
+    keyframe before the start, so only the clip itself is decoded.
+    """
+    command = [
+        "ffmpeg",
+        "-loglevel",
+        ffmpeg_loglevel,
+        "-hide_banner",
+        "-ss",
+        f"{clip.start:.6f}",
+        "-i",
+        source,
+        "-t",
+        f"{clip.duration:.6f}",
+    ]
+    if crop:
+        command.extend(["-vf", crop])
+    command.extend(
+        [
+            *encoder_profile.ffmpeg_args(),
+            "-c:a",
+            "aac",
+            "-b:a",
+            "192k",
+            "-movflags",
+            "+faststart",
+            "-y",
+            output_path,
+        ]
+    )
+    return command
+
+
+def _extract(command, duration, cpu_slots):
+    with get_scheduler().reserve(cpu_slots) as budget:
+        command = [
+            "ffmpeg",
+            *budget.global_args(),
+            *command[1:-1],
+            *budget.output_args(),
+            command[-1],
+        ]
+        run_ffmpeg(budget.wrap(command), duration=duration)
+
+
+def clip_step(
+    data: PipelineData,
+    clips,
+    output_dir,
+    encoder_profile=None,
+    keyframe_index=True,
+    ffmpeg_loglevel="info",
+):
+    """
+    Cuts highlight clips out of the active (merged) file, all side by side.
+
+    Each clip seeks on the input side, so it reads only its own stretch of
+    the file. A clip that starts on a keyframe (looked up in the keyframe index)
+    and keeps the frame is stream-copied. Any other clip is re-encoded: one that
+    starts between keyframes, or one that is cropped to another aspect, e.g.
+    "9:16" for vertical video.
+
+    Args:
+        data (PipelineData): Current pipeline data object.
+        clips (list[dict]): `name`, `start_time`, `end_time` (in the output's
+            time, "HH:MM:SS[.ms]") and optional `aspect` ("W:H") per clip.
+        output_dir (str): Where the clips go, as `<name>.mp4`. They are cut next
+            to the source first and placed there atomically (see `place_file`).
+        encoder_profile (EncoderProfile): Video encoder settings for re-encoded
+            clips (default: "publish").
+        keyframe_index (bool): Look the keyframes up to stream-copy clips that
+            start on one; without it every clip is re-encoded.
+
+    Returns:
+        PipelineData: Data object with `clip_files` set.
+    """
+    source = data.active_file_path
+    if not source:
+        raise ValueError("No file to cut clips from.")
+    clips = [Clip.from_config(entry) for entry in clips]
+    if not clips:
+        return data
+
+    encoder_profile = encoder_profile or get_encoder_profile()
+    video = get_media_info(data, source).video
+    if video is None:
+        raise ValueError(f"No video stream in {source}")
+
+    index = None
+    if keyframe_index:
+        index_existed = os.path.exists(f"{source}{INDEX_SUFFIX}")
+        index = get_keyframe_index(source, data)
+        if not index_existed:
+            # The index of an intermediate file goes with it
+            data = add_intermediate_filepath(data, f"{source}{INDEX_SUFFIX}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    # Clips are cut next to the source and placed into the output when done,
+    # so anything watching the output never sees a partial file
+    base, _ = os.path.splitext(source)
+    copies, encodes = [], []
+    for clip in clips:
+        output_path = f"{base}.clip-{clip.name}.mp4"
+        crop = clip.crop_filter(video.width, video.height)
+        on_keyframe = (
+            index is not None
+            and clip.start - index.keyframe_before(clip.start) <= KEYFRAME_TOLERANCE
+        )
+        if on_keyframe and crop is None:
+            print(f"Clip {clip.name}: starts on a keyframe, copying")
+            command = copy_command(source, clip, output_path, ffmpeg_loglevel)
+            copies.append((output_path, command, clip.duration))
+        else:
+            reason = (
+                "cropping to " + clip.aspect if crop else "starts between keyframes"
+            )
+            print(f"Clip {clip.name}: {reason}, re-encoding")
+            command = encode_command(
+                source, clip, output_path, encoder_profile, crop, ffmpeg_loglevel
+            )
+            encodes.append((output_path, command, clip.duration))
+
+    # Copies are I/O bound and take one slot; the re-encodes share one encode's
+    # CPU budget by length
+    slots = [1] * len(copies) + split_slots(
+        get_scheduler().slots_per_encode, [duration for _, _, duration in encodes]
+    )
+    run_encodes(
+        [
+            (output_path, partial(_extract, command, duration, cpu_slots))
+            for (output_path, command, duration), cpu_slots in zip(
+                copies + encodes, slots
+            )
+        ]
+    )
+
+    data.clip_files = []
+    for clip in clips:
+        clip_path = os.path.join(output_dir, f"{clip.name}.mp4")
+        place_file(f"{base}.clip-{clip.name}.mp4", clip_path)
+        data.clip_files.append(clip_path)
+    print(
+        Fore.GREEN
+        + f"Cut {len(clips)} clips ({len(copies)} copied, {len(encodes)} re-encoded) "
+        + f"into {output_dir}"
+        + Style.RESET_ALL
+    )
+    return data
@@ -1,13 +1,11 @@
 import os
 from app.data_models.pipeline_data import PipelineData
 from app.constants import PipelineKeys
+from app.utils.checksums import read_checksum
 from app.utils.paths import file_ext
 
 
-def download_step(
-    data: PipelineData, downloader, url, filename, key, date=None, stream_id=None
-):
-    path = downloader.download(url, date=date, stream_id=stream_id, filename=filename)
+def _record_download(data: PipelineData, path, key):
     if not path or not os.path.exists(path):
         raise FileNotFoundError(f"Downloaded file not found: {path}")
 
@@ -19,4 +17,26 @@ def download_step(
         raise ValueError(f"Invalid file extension detected: {path}")
 
     data.downloaded_files.append(path)
+    content_hash = read_checksum(path)
+    if content_hash:
+        data.checksums[path] = content_hash
     return data
+
+
+def download_step(
+    data: PipelineData, downloader, url, filename, key, date=None, stream_id=None
+):
+    path = downloader.download(url, date=date, stream_id=stream_id, filename=filename)
+    return _record_download(data, path, key)
+
+
+async def download_step_async(
+    data: PipelineData, downloader, url, filename, key, date=None, stream_id=None
+):
+    """
+    Async variant of `download_step` for downloaders exposing `download_async`.
+    """
+    path = await downloader.download_async(
+        url, date=date, stream_id=stream_id, filename=filename
+    )
+    return _record_download(data, path, key)
@@ -1,9 +1,12 @@
-import subprocess
-
 from app.constants import PipelineKeys
+from app.data_models.media_info import codec_name
 from app.data_models.pipeline_data import PipelineData
+from app.utils.encoder_profiles import get_encoder_profile
 from app.utils.helpers import add_intermediate_filepath
 from app.utils.paths import file_ext
+from app.utils.resource_scheduler import get_scheduler
+from app.utils.media_probe import attach_media, get_media_info
+from app.utils.ffmpeg import run_ffmpeg
 
 
 def fade_in_out_step(
@@ -11,14 +14,17 @@ def fade_in_out_step(
     fade_duration: int = 2,
     ffmpeg_loglevel="info",
     is_video=False,
+    encoder_profile=None,
 ):
     """
     Adds fade-in and fade-out effects to a video file.
 
     Args:
         fade_duration (int): Duration of the fade-in and fade-out in seconds (default: 2).
+        encoder_profile (EncoderProfile): Video encoder settings (default: "publish").
     """
 
+    encoder_profile = encoder_profile or get_encoder_profile()
     file_key = PipelineKeys.ACTIVE_FILE_PATH
     input_path = getattr(data, file_key, None)
 
@@ -28,19 +34,9 @@ def fade_in_out_step(
     ext = file_ext(input_path)
     output_path = input_path.replace(ext, f"_faded{ext}")
 
-    # Get the video duration
-    probe_command = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        input_path,
-    ]
-    result = subprocess.run(probe_command, capture_output=True, text=True, check=True)
-    total_duration = float(result.stdout.strip())
+    # Read the duration from the shared probe cache instead of another ffprobe
+    input_info = get_media_info(data, input_path)
+    total_duration = input_info.duration
 
     # Calculate the start time for the fade-out
     fade_out_start = total_duration - fade_duration
@@ -67,25 +63,37 @@ def fade_in_out_step(
             [
                 "-vf",
                 f"fade=t=in:st=0:d={fade_duration},fade=t=out:st={fade_out_start}:d={fade_duration}",
-                "-c:v",
-                "libx264",
-                "-crf",
-                "16",
-                "-preset",
-                "ultrafast",
+                *encoder_profile.ffmpeg_args(),
             ]
         )
 
-    command.extend(
-        [
+    # Audio-only fades are effectively single threaded; video gets a full budget
+    cpu_slots = None if is_video else 1
+    with get_scheduler().reserve(cpu_slots) as budget:
+        command = [
+            "ffmpeg",
+            *budget.global_args(),
+            *command[1:],
+            *budget.output_args(),
             output_path,
         ]
-    )
 
-    print(f"Applying fade-in and fade-out to {input_path}, saving to {output_path}...")
-    subprocess.run(command, check=True)
+        print(
+            f"Applying fade-in and fade-out to {input_path}, saving to {output_path}..."
+        )
+        run_ffmpeg(budget.wrap(command), duration=total_duration)
     setattr(data, PipelineKeys.ACTIVE_FILE_PATH, output_path)
 
+    # Fades don't change the length; only the codecs we just chose are new
+    attach_media(
+        data,
+        input_info.derive(
+            output_path,
+            audio={"codec": "aac"},
+            video={"codec": codec_name(encoder_profile.codec)} if is_video else None,
+        ),
+    )
+
     data = add_intermediate_filepath(data, output_path)
 
     return data
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.data_models.pipeline_data import PipelineData
+from app.utils.checksums import record_checksum
+from app.utils.manifest import manifest_entry, write_manifest
+
+
+def manifest_step(data: PipelineData, manifest_path, job=None):
+    """
+    Records the job's sources and final output in an integrity manifest.
+
+    Digests computed while the sources were downloaded are reused; the final
+    output is hashed once here (it was just written, so it is read from the page
+    cache) and gets a `.sha256` next to it as well.
+
+    Args:
+        data (PipelineData): Current pipeline data object.
+        manifest_path (str): Where to write the manifest.
+        job (dict): Optional job details stored in the manifest.
+
+    Returns:
+        PipelineData: Data object with `manifest_path` and the output's digest.
+    """
+    if not data.final_output_path:
+        raise ValueError("No final output to record in the manifest.")
+
+    data.checksums[data.final_output_path] = record_checksum(data.final_output_path)
+
+    sources = list(data.downloaded_files)
+    if data.main_file_path and data.main_file_path not in sources:
+        # Manually loaded files aren't in `downloaded_files`
+        sources.append(data.main_file_path)
+    artifacts = [(path, "source") for path in sources]
+    artifacts.append((data.final_output_path, "output"))
+    artifacts.extend((path, "rendition") for path in data.rendition_files.values())
+    artifacts.extend((path, "clip") for path in data.clip_files)
+
+    # One ffprobe per file; run them side by side
+    with ThreadPoolExecutor(max_workers=len(artifacts)) as executor:
+        entries = list(
+            executor.map(
+                lambda item: manifest_entry(
+                    item[0], item[1], sha256=data.checksums.get(item[0])
+                ),
+                artifacts,
+            )
+        )
+
+    if data.trim:
+        job = dict(job or {}, trim=data.trim)
+    write_manifest(manifest_path, entries, job=job)
+    print(f"Wrote manifest: {manifest_path}")
+    data.manifest_path = manifest_path
+    return data
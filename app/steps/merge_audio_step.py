@@ -1,18 +1,58 @@
 import os
-import subprocess
+from contextlib import ExitStack
+from functools import partial
 from app.constants import PipelineKeys
 from app.data_models.pipeline_data import PipelineData
 from app.utils.helpers import add_intermediate_filepath
+from app.utils.resource_scheduler import get_scheduler
+from app.utils.media_probe import attach_media, get_media_info
+from app.utils.loudness import TARGET_I, TARGET_LRA, TARGET_TP
 from app.utils.normalize_audio import normalize_audio
+from app.utils.normalized_cache import normalized_file
+from app.utils.parallel_encode import run_encodes
+from app.utils.ffmpeg import run_ffmpeg
+from app.utils.waveform import ZOOM_LEVELS, WaveformTap
 
+# What the intro, main and outro are normalized to, so they concatenate. The
+# in-process meter keeps the two-pass analysis far cheaper than the apply pass
+NORMALIZED_AUDIO = dict(codec="pcm_s16le", sample_rate=44100, two_pass=True, meter=True)
 
-def merge_audio_step(data: PipelineData, output_format="mp3"):
+
+def _normalize(path, normalized_path, duration, cache_sync=None):
+    # Audio normalization is single threaded; take one CPU slot
+    with get_scheduler().reserve(1):
+        normalize_audio(
+            str(path),
+            str(normalized_path),
+            duration=duration,
+            **NORMALIZED_AUDIO,
+        )
+    if cache_sync:
+        cache_sync.push(normalized_path)
+
+
+def merge_audio_step(
+    data: PipelineData,
+    output_format="mp3",
+    cache_sync=None,
+    waveform=False,
+    waveform_zoom_levels=ZOOM_LEVELS,
+    renditions=(),
+):
     """
     Merges intro, main, and outro audio files into a single output file.
 
     Args:
         data (PipelineData): The pipeline data object.
         output_format (str): The desired output format (default: "mp3").
+        cache_sync (CacheSync): Optional shared cache for the normalized intro/outro.
+        waveform (bool): Also write the merged audio's waveform peaks next to
+            it, from the samples the merge decodes anyway (see `WaveformTap`).
+        waveform_zoom_levels (tuple[int]): Samples per min/max pair for each
+            peaks file, finest first.
+        renditions (list[Rendition]): Extra deliverables (e.g. a 128k MP3),
+            encoded as further outputs of the same merge, so each one costs
+            only its own encode.
 
     Returns:
         PipelineData: Updated data object with the merged audio path.
@@ -26,17 +66,53 @@ def merge_audio_step(data: PipelineData, output_format="mp3"):
 
     # Normalize all files to a consistent format (e.g., WAV)
     normalized_paths = []
+    shared_paths = []
+    encodes = []
+    total_duration = 0.0
     for path in [intro_path, main_path, outro_path]:
-        base, ext = os.path.splitext(path)
-        normalized_path = f"{base}_normalized.{output_format}"
-        normalize_audio(
-            str(path),
-            str(normalized_path),
-            codec="pcm_s16le",
-            sample_rate=44100,
+        # One probe per input, shared with every other step that needs it
+        info = get_media_info(data, path)
+        if info.audio is None:
+            raise ValueError(f"No audio stream in {path}")
+        if path == main_path:
+            main_info = info
+        total_duration += info.duration or 0.0
+
+        # Every setting is part of the file name, so a shared intro/outro
+        # normalized with other settings is never reused
+        normalized_path = normalized_file(
+            path,
+            output_format,
+            dict(NORMALIZED_AUDIO, loudness_target=(TARGET_I, TARGET_TP, TARGET_LRA)),
         )
 
+        # The intro and outro are the same every week, so their normalized
+        # versions are kept and shared instead of being re-encoded each run
+        is_shared = cache_sync is not None and path != main_path
+        if is_shared and (
+            os.path.exists(normalized_path) or cache_sync.pull(normalized_path)
+        ):
+            print(f"Using cached normalized audio: {normalized_path}")
+        else:
+            encodes.append(
+                (
+                    normalized_path,
+                    partial(
+                        _normalize,
+                        path,
+                        normalized_path,
+                        info.duration,
+                        cache_sync if is_shared else None,
+                    ),
+                )
+            )
+
         normalized_paths.append(normalized_path)
+        if is_shared:
+            shared_paths.append(normalized_path)
+
+    # The intro and outro normalize alongside the main file instead of after it
+    run_encodes(encodes, keep=shared_paths)
 
     # Create the file list for `ffmpeg`
     base, _ = os.path.splitext(main_path)
@@ -48,14 +124,8 @@ def merge_audio_step(data: PipelineData, output_format="mp3"):
     # Determine output file name dynamically
     output_file = f"{base}_merged.{output_format}"
 
-    command = [
-        "ffmpeg",
-        "-f",
-        "concat",
-        "-safe",
-        "0",
-        "-i",
-        str(file_list_path),
+    input_args = ["-f", "concat", "-safe", "0", "-i", str(file_list_path)]
+    encode_args = [
         "-c:a",
         "pcm_s16le" if output_format == "wav" else "libmp3lame",
         # These parameters should match normalization
@@ -65,22 +135,68 @@ def merge_audio_step(data: PipelineData, output_format="mp3"):
         "2",
         "-b:a",
         "192k",
-        output_file,
     ]
 
-    # Run `ffmpeg` command
-    print(f"Merging files into {output_file}...")
-    subprocess.run(command, check=True)
+    # Every rendition is one more output of the same decode
+    rendition_files = {}
+    rendition_args = []
+    for rendition in renditions:
+        rendition_files[rendition.name] = rendition.path(f"{base}_merged")
+        rendition_args.extend(
+            ["-map", "0:a:0", *rendition.audio_args(), rendition_files[rendition.name]]
+        )
+
+    # Concatenating is a single-threaded remux/audio encode
+    with get_scheduler().reserve(1) as budget, ExitStack() as stack:
+        tap_args, pass_fds = [], ()
+        if waveform:
+            # The waveform is a second output of the same decode
+            tap = stack.enter_context(WaveformTap(44100, waveform_zoom_levels))
+            tap_args, pass_fds = tap.output_args(), tap.pass_fds
+        command = [
+            "ffmpeg",
+            *budget.global_args(),
+            *input_args,
+            *tap_args,
+            *rendition_args,
+            *encode_args,
+            *budget.output_args(),
+            output_file,
+        ]
+
+        # Run `ffmpeg` command
+        print(f"Merging files into {output_file}...")
+        run_ffmpeg(
+            budget.wrap(command), duration=total_duration or None, pass_fds=pass_fds
+        )
+    if waveform:
+        data.waveform_files = tap.save(base + "_merged")
+        print(f"Wrote waveform peaks: {', '.join(data.waveform_files)}")
+
+    data.rendition_files = rendition_files
 
     # Clean up temporary files
     if os.path.exists(file_list_path):
         os.remove(file_list_path)
     for path in normalized_paths:
-        if os.path.exists(path):
+        if path not in shared_paths and os.path.exists(path):
             os.remove(path)
 
     # Update pipeline data with the merged file path
     data.active_file_path = output_file
+    attach_media(
+        data,
+        main_info.derive(
+            output_file,
+            duration=total_duration,
+            audio={
+                "codec": "pcm_s16le" if output_format == "wav" else "mp3",
+                "sample_rate": 44100,
+                "channels": 2,
+            },
+            drop_video=True,
+        ),
+    )
 
     data = add_intermediate_filepath(data, output_file)
 
@@ -1,8 +1,28 @@
 import os
-import subprocess
+from functools import partial
+from app.data_models.media_info import codec_name
 from app.data_models.pipeline_data import PipelineData
 from app.utils.helpers import add_intermediate_filepath
+from app.utils.resource_scheduler import get_scheduler, split_slots
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.media_probe import attach_media, get_media_info
 from app.utils.normalize_video import normalize_video
+from app.utils.normalized_cache import normalized_file
+from app.utils.parallel_encode import run_encodes
+from app.utils.ffmpeg import run_ffmpeg
+
+# Audio of every normalized video, so the parts concatenate
+NORMALIZED_AUDIO = dict(
+    audio_codec="aac", audio_sample_rate=44100, audio_channels=2, audio_bitrate="192k"
+)
+
+
+def _normalize(kwargs, cache_sync, cpu_slots):
+    normalize_video(cpu_slots=cpu_slots, **kwargs)
+    if cache_sync:
+        cache_sync.push(kwargs["output_path"])
+        for path, _, _ in kwargs["extra_outputs"]:
+            cache_sync.push(path)
 
 
 def merge_video_step(
@@ -12,6 +32,9 @@ def merge_video_step(
     frame_rate=30,
     ffmpeg_loglevel="info",
     ffmpeg_hide_banner=False,
+    cache_sync=None,
+    encoder_profile=None,
+    renditions=(),
 ):
     """
     Merges intro, main, and outro video files into a single output file.
@@ -21,6 +44,12 @@ def merge_video_step(
         output_format (str): Desired output format (default: "mp4").
         resolution (str): Target resolution for the output video.
         frame_rate (int): Target frame rate for the output video.
+        cache_sync (CacheSync): Optional shared cache for the normalized intro/outro.
+        encoder_profile (EncoderProfile): Video encoder settings for the normalization.
+        renditions (list[Rendition]): Extra deliverables. A video rendition is
+            one more output of each normalization, from the same decode, and is
+            concatenated by stream copy like the main file; an audio-only one
+            is encoded from the concatenated audio.
 
     Returns:
         PipelineData: Updated data object with the merged video path.
@@ -32,27 +61,104 @@ def merge_video_step(
     if not all([intro_path, main_path, outro_path]):
         raise ValueError("Missing one or more required video file paths.")
 
+    encoder_profile = encoder_profile or get_encoder_profile()
+    video_renditions = [r for r in renditions if r.has_video]
+    audio_renditions = [r for r in renditions if not r.has_video]
+
     # Normalize all files to consistent format
     normalized_paths = []
+    rendition_paths = {r.name: [] for r in video_renditions}
+    shared_paths = []
+    pending = []
+    total_duration = 0.0
     for path in [intro_path, main_path, outro_path]:
-
-        base, _ = os.path.splitext(path)
-        normalized_path = f"{base}_normalized.{output_format}"
-
-        normalize_video(
-            input_path=path,
-            output_path=normalized_path,
-            ffmpeg_loglevel=ffmpeg_loglevel,
+        # One probe per input, shared with every other step that needs it
+        info = get_media_info(data, path)
+        if info.video is None:
+            raise ValueError(f"No video stream in {path}")
+        if path == main_path:
+            main_info = info
+        total_duration += info.duration or 0.0
+
+        # Every setting is part of the file name, so a shared intro/outro
+        # normalized with other settings is never concatenated by stream copy
+        settings = dict(
+            resolution=resolution,
+            frame_rate=frame_rate,
+            profile=encoder_profile,
+            **NORMALIZED_AUDIO,
         )
+        normalized_path = normalized_file(path, output_format, settings)
+        extra_outputs = []
+        for r in video_renditions:
+            rendition_settings = dict(
+                settings,
+                resolution=r.resolution or resolution,
+                profile=r.encoder_profile or encoder_profile,
+            )
+            extra_outputs.append(
+                (
+                    normalized_file(path, r.format, rendition_settings, name=r.name),
+                    rendition_settings["resolution"],
+                    rendition_settings["profile"],
+                )
+            )
+        outputs = [normalized_path] + [out for out, _, _ in extra_outputs]
+
+        # The intro and outro are the same every week, so their normalized
+        # versions are kept and shared instead of being re-encoded each run
+        is_shared = cache_sync is not None and path != main_path
+        if is_shared and all(
+            os.path.exists(out) or cache_sync.pull(out) for out in outputs
+        ):
+            print(f"Using cached normalized video: {normalized_path}")
+        else:
+            pending.append(
+                (
+                    dict(
+                        input_path=path,
+                        output_path=normalized_path,
+                        profile=encoder_profile,
+                        resolution=resolution,
+                        frame_rate=frame_rate,
+                        ffmpeg_loglevel=ffmpeg_loglevel,
+                        duration=info.duration,
+                        extra_outputs=extra_outputs,
+                        **NORMALIZED_AUDIO,
+                    ),
+                    cache_sync if is_shared else None,
+                )
+            )
 
         normalized_paths.append(normalized_path)
+        for r, (out, _, _) in zip(video_renditions, extra_outputs):
+            rendition_paths[r.name].append(out)
+        if is_shared:
+            shared_paths.extend(outputs)
+
+    # Run the normalizations side by side, splitting one encode's CPU budget
+    # by duration so the short intro/outro don't take slots from the main file
+    slots = split_slots(
+        get_scheduler().slots_per_encode,
+        [kwargs["duration"] or 1.0 for kwargs, _ in pending],
+    )
+    encodes = [
+        (kwargs["output_path"], partial(_normalize, kwargs, shared, cpu_slots))
+        for (kwargs, shared), cpu_slots in zip(pending, slots)
+    ]
+    run_encodes(encodes, keep=shared_paths)
 
-    # Create the file list for `ffmpeg`
+    # Create the file lists for `ffmpeg`, one per video rendition
     base, _ = os.path.splitext(main_path)
     file_list_path = f"{base}_file_list.txt"
-    with open(file_list_path, "w") as f:
-        for normalized_path in normalized_paths:
-            f.write(f"file '{normalized_path}'\n")
+    list_paths = {None: file_list_path}
+    list_paths.update(
+        (r.name, f"{base}_file_list.{r.name}.txt") for r in video_renditions
+    )
+    for name, list_path in list_paths.items():
+        with open(list_path, "w") as f:
+            for normalized_path in rendition_paths.get(name, normalized_paths):
+                f.write(f"file '{normalized_path}'\n")
 
     # Determine output file name dynamically
     output_file = f"{base}_merged.{output_format}"
@@ -60,14 +166,32 @@ def merge_video_step(
     command = ["ffmpeg", "-loglevel", ffmpeg_loglevel]
     if ffmpeg_hide_banner:
         command.append("-hide_banner")
+    for list_path in list_paths.values():
+        command.extend(["-f", "concat", "-safe", "0", "-i", list_path])
+
+    # Every rendition is one more output of the same concatenation
+    rendition_files = {}
+    for index, r in enumerate(video_renditions, start=1):
+        rendition_files[r.name] = r.path(f"{base}_merged")
+        command.extend(
+            [
+                "-map",
+                f"{index}:v",
+                "-map",
+                f"{index}:a",
+                "-c:v",
+                "copy",
+                *r.audio_args(),
+                rendition_files[r.name],
+            ]
+        )
+    for r in audio_renditions:
+        rendition_files[r.name] = r.path(f"{base}_merged")
+        command.extend(["-map", "0:a", *r.audio_args(), rendition_files[r.name]])
+    if renditions:
+        command.extend(["-map", "0:v", "-map", "0:a"])
     command.extend(
         [
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            file_list_path,
             "-c:v",
             "copy",  # Copy video stream without re-encoding, we already normalized
             "-c:a",
@@ -76,19 +200,47 @@ def merge_video_step(
         ]
     )
 
-    # Run `ffmpeg` command
-    print(f"Merging files into {output_file}...")
-    subprocess.run(command, check=True)
+    # Concatenating is a single-threaded remux/audio encode
+    with get_scheduler().reserve(1) as budget:
+        command = [
+            "ffmpeg",
+            *budget.global_args(),
+            *command[1:-1],
+            *budget.output_args(),
+            output_file,
+        ]
+
+        # Run `ffmpeg` command
+        print(f"Merging files into {output_file}...")
+        run_ffmpeg(budget.wrap(command), duration=total_duration or None)
+
+    data.rendition_files = rendition_files
 
     # Clean up temporary files
-    if os.path.exists(file_list_path):
-        os.remove(file_list_path)
-    for path in normalized_paths:
-        if os.path.exists(path):
+    for list_path in list_paths.values():
+        if os.path.exists(list_path):
+            os.remove(list_path)
+    for path in normalized_paths + sum(rendition_paths.values(), []):
+        if path not in shared_paths and os.path.exists(path):
             os.remove(path)
 
     # Update pipeline data with the merged file path
     data.active_file_path = output_file
+    width, height = (int(n) for n in resolution.split("x"))
+    attach_media(
+        data,
+        main_info.derive(
+            output_file,
+            duration=total_duration,
+            video={
+                "codec": codec_name(encoder_profile.codec),
+                "width": width,
+                "height": height,
+                "fps": float(frame_rate),
+            },
+            audio={"codec": "aac", "sample_rate": 44100, "channels": 2},
+        ),
+    )
 
     data = add_intermediate_filepath(data, output_file)
 
@@ -1,12 +1,18 @@
 import os
-import shutil
+from dataclasses import replace
 from app.data_models.pipeline_data import PipelineData
+from app.utils.file_ops import place_file
+from app.utils.media_probe import attach_media, forget_media
 
 
 def move_step(data: PipelineData, source_key=None, output_filename=None):
     """
     Moves the file from the source to the final output directory.
 
+    The destination only ever appears complete: a rename on the same
+    filesystem, otherwise a kernel-side copy to a temporary name that is
+    fsynced and renamed into place (see `place_file`).
+
     Args:
         data (PipelineData): Current pipeline data object.
         source_key (str): Optional key in `PipelineData` where the source file path is stored.
@@ -31,9 +37,36 @@ def move_step(data: PipelineData, source_key=None, output_filename=None):
 
     # Move the file
     print(f"Moving file from {source_path} to {destination_path}...")
-    shutil.move(source_path, destination_path)
+    placement = place_file(source_path, destination_path)
+    if placement["method"] != "rename" and placement["throughput_mb_s"]:
+        print(
+            f"Copied {placement['bytes'] / 1_000_000:.1f} MB across devices with "
+            f"{placement['method']} at {placement['throughput_mb_s']:.1f} MB/s."
+        )
 
     # Update the data object with the final path
     data.final_output_path = destination_path
 
+    # Waveform peaks and renditions stay next to the file they belong to
+    source_base = os.path.splitext(source_path)[0]
+    destination_base = os.path.splitext(destination_path)[0]
+
+    def move_alongside(path):
+        if path.startswith(source_base) and os.path.exists(path):
+            moved_path = destination_base + path[len(source_base) :]
+            place_file(path, moved_path)
+            return moved_path
+        return path
+
+    data.waveform_files = [move_alongside(path) for path in data.waveform_files]
+    data.rendition_files = {
+        name: move_alongside(path) for name, path in data.rendition_files.items()
+    }
+
+    # What is known about the file moves with it
+    info = data.media.pop(source_path, None)
+    forget_media(source_path)
+    if info is not None:
+        attach_media(data, replace(info, path=destination_path))
+
     return data
@@ -0,0 +1,227 @@
+import os
+from functools import partial
+from colorama import Fore, Style
+from app.data_models.pipeline_data import PipelineData
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.ffmpeg import format_timestamp, parse_timestamp, run_ffmpeg
+from app.utils.keyframe_index import get_keyframe_index
+from app.utils.loudness import LOUDNESS_CACHE, get_loudness, loudnorm_filter
+from app.utils.media_probe import get_media_info
+from app.utils.parallel_encode import run_encodes
+from app.utils.resource_scheduler import get_scheduler, split_slots
+
+
+def _video_chain(label, resolution, frame_rate, fade=None):
+    width, height = resolution.split("x")
+    chain = (
+        f"[{label}:v]scale={width}:{height},fps={frame_rate},setsar=1,format=yuv420p"
+    )
+    return chain + (f",{fade}" if fade else "") + f"[v{label}]"
+
+
+def _audio_chain(label, loudnorm, fade=None):
+    # loudnorm resamples to 192 kHz, so aformat comes after it
+    chain = f"[{label}:a]{loudnorm},aformat=sample_rates=44100:channel_layouts=stereo"
+    return chain + (f",{fade}" if fade else "") + f"[a{label}]"
+
+
+def join_command(
+    first,
+    second,
+    output_path,
+    fades,
+    loudness=(None, None),
+    is_video=False,
+    resolution="640x360",
+    frame_rate=30,
+    encoder_profile=None,
+    audio_bitrate="64k",
+):
+    """
+    Builds the ffmpeg command that renders one join from two input slices.
+
+    Args:
+        first (list[str]): Input options and `-i` for the clip before the join.
+        second (list[str]): Input options and `-i` for the clip after it.
+        output_path (str): The preview file.
+        fades (tuple[str]): The video fade for each side, or None; the audio
+            fade is the same with `afade`.
+        loudness (tuple[LoudnessMeasurement]): Each input's measurement, or
+            None for loudnorm's single-pass mode.
+        is_video (bool): Render video too.
+        resolution (str): Preview resolution.
+        frame_rate (int): Preview frame rate.
+        encoder_profile (EncoderProfile): Video encoder settings.
+        audio_bitrate (str): Audio bitrate.
+
+    Returns:
+        list[str]: The command, without the CPU budget flags.
+    """
+    filters = []
+    for label, (fade, measurement) in enumerate(zip(fades, loudness)):
+        if is_video:
+            filters.append(_video_chain(label, resolution, frame_rate, fade))
+        filters.append(
+            _audio_chain(
+                label, loudnorm_filter(measurement), f"a{fade}" if fade else None
+            )
+        )
+
+    if is_video:
+        filters.append("[v0][a0][v1][a1]concat=n=2:v=1:a=1[v][a]")
+        maps = ["-map", "[v]", "-map", "[a]", *encoder_profile.ffmpeg_args()]
+        audio_codec = "aac"
+    else:
+        filters.append("[a0][a1]concat=n=2:v=0:a=1[a]")
+        maps = ["-map", "[a]"]
+        audio_codec = "libmp3lame"
+
+    return [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-hide_banner",
+        *first,
+        *second,
+        "-filter_complex",
+        ";".join(filters),
+        *maps,
+        "-c:a",
+        audio_codec,
+        "-b:a",
+        audio_bitrate,
+        "-y",
+        output_path,
+    ]
+
+
+def _render(command, duration, cpu_slots):
+    with get_scheduler().reserve(cpu_slots) as budget:
+        command = [
+            "ffmpeg",
+            *budget.global_args(),
+            *command[1:-1],
+            *budget.output_args(),
+            command[-1],
+        ]
+        run_ffmpeg(budget.wrap(command), duration=duration)
+
+
+def preview_step(
+    data: PipelineData,
+    output_base,
+    seconds=10,
+    fade_duration=1,
+    is_video=False,
+    resolution="640x360",
+    frame_rate=30,
+    encoder_profile=None,
+    audio_bitrate="64k",
+    keyframe_index=False,
+    loudness_cache=LOUDNESS_CACHE,
+):
+    """
+    Renders just the joins of the final file, small and fast, to check the trim
+    points and the intro/outro transitions before the full render.
+
+    Two clips are rendered side by side: the last `seconds` of the intro into
+    the first `seconds` of the sermon, and the last `seconds` of the sermon into
+    the first of the outro. The sermon is read straight from the source at the
+    trim window in `data.trim` (see `trim_step(cut=False)`), with the same fades
+    as the full render, so nothing long is cut or encoded. The intro and outro
+    get the full render's two-pass loudness normalization (their measurements
+    are shared through the cache); the sermon uses single-pass loudnorm, since
+    measuring it would mean decoding the whole service.
+
+    Args:
+        data (PipelineData): Current pipeline data object.
+        output_base (str): Output path without extension; the clips are
+            `<output_base>.preview-intro.<ext>` and `.preview-outro.<ext>`.
+        seconds (float): Seconds on each side of a join.
+        fade_duration (float): The sermon's fade in/out, as in the full render.
+        is_video (bool): Render video (mp4) instead of audio only (mp3).
+        resolution (str): Preview resolution.
+        frame_rate (int): Preview frame rate.
+        encoder_profile (EncoderProfile): Video encoder settings (default: the
+            "preview" profile).
+        audio_bitrate (str): Audio bitrate.
+        keyframe_index (bool): Start the sermon on the keyframe at or before
+            the trim start, as the full video trim does.
+        loudness_cache (str): JSON file of earlier loudness measurements.
+
+    Returns:
+        PipelineData: Data object with `preview_files` set.
+    """
+    main_path = data.active_file_path
+    if not (data.intro_file_path and main_path and data.outro_file_path):
+        raise ValueError("Missing one or more required file paths.")
+
+    trim = data.trim or {}
+    start = parse_timestamp(trim["start_time"]) if trim.get("start_time") else 0.0
+    end = (
+        parse_timestamp(trim["end_time"])
+        if trim.get("end_time")
+        else get_media_info(data, main_path).duration
+    )
+    if keyframe_index:
+        start = get_keyframe_index(main_path, data).keyframe_before(start)
+    seconds = min(seconds, (end - start) / 2)
+    fade = min(fade_duration, seconds)
+
+    loudness = {
+        path: get_loudness(path, cache_path=loudness_cache)
+        for path in (data.intro_file_path, data.outro_file_path)
+    }
+    loudness[main_path] = None
+
+    ext = "mp4" if is_video else "mp3"
+    options = dict(
+        is_video=is_video,
+        resolution=resolution,
+        frame_rate=frame_rate,
+        encoder_profile=encoder_profile or get_encoder_profile(name="preview"),
+        audio_bitrate=audio_bitrate,
+    )
+    intro_join = f"{output_base}.preview-intro.{ext}"
+    outro_join = f"{output_base}.preview-outro.{ext}"
+    joins = {
+        intro_join: join_command(
+            ["-sseof", f"-{seconds:.3f}", "-i", data.intro_file_path],
+            ["-ss", f"{start:.3f}", "-t", f"{seconds:.3f}", "-i", main_path],
+            intro_join,
+            (None, f"fade=t=in:st=0:d={fade}"),
+            (loudness[data.intro_file_path], loudness[main_path]),
+            **options,
+        ),
+        outro_join: join_command(
+            ["-ss", f"{end - seconds:.3f}", "-t", f"{seconds:.3f}", "-i", main_path],
+            ["-t", f"{seconds:.3f}", "-i", data.outro_file_path],
+            outro_join,
+            (f"fade=t=out:st={seconds - fade:.3f}:d={fade}", None),
+            (loudness[main_path], loudness[data.outro_file_path]),
+            **options,
+        ),
+    }
+
+    os.makedirs(os.path.dirname(output_base) or ".", exist_ok=True)
+    # Audio encodes are single threaded; the two video joins share one budget
+    slots = (
+        split_slots(get_scheduler().slots_per_encode, [1.0, 1.0])
+        if is_video
+        else [1, 1]
+    )
+    run_encodes(
+        [
+            (path, partial(_render, command, 2 * seconds, cpu_slots))
+            for (path, command), cpu_slots in zip(joins.items(), slots)
+        ]
+    )
+
+    data.preview_files = [intro_join, outro_join]
+    print(
+        Fore.GREEN
+        + f"Preview of the joins at {format_timestamp(start)} and "
+        + f"{format_timestamp(end)}: {', '.join(data.preview_files)}"
+        + Style.RESET_ALL
+    )
+    return data
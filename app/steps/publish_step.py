@@ -0,0 +1,51 @@
+import os
+from app.data_models.pipeline_data import PipelineData
+
+
+def publish_step(data: PipelineData, publish_queue, key, source_key=None):
+    """
+    Starts publishing the final file to every configured destination.
+
+    Returns immediately; the uploads run in the background while the rest of
+    the pipeline carries on. `wait_for_publish_step` collects the results.
+
+    Args:
+        data (PipelineData): Current pipeline data object.
+        publish_queue (PublishQueue): Destinations to publish to, or None.
+        key (str): Artifact key, e.g. "my-weekly-sermon/2025-02-02.mp4".
+        source_key (str): Optional `PipelineData` key of the file to publish
+            (default: the final output path).
+
+    Returns:
+        PipelineData: The unchanged data object.
+    """
+    if publish_queue is None:
+        return data
+
+    source_path = getattr(data, source_key) if source_key else data.final_output_path
+    if not source_path or not os.path.exists(source_path):
+        raise ValueError(f"Nothing to publish: {source_path}")
+
+    publish_queue.submit(key, source_path, sha256=data.checksums.get(source_path))
+    return data
+
+
+def wait_for_publish_step(data: PipelineData, publish_queue):
+    """
+    Waits for the background publishes and records where the file went.
+
+    Args:
+        data (PipelineData): Current pipeline data object.
+        publish_queue (PublishQueue): The queue used by `publish_step`, or None.
+
+    Returns:
+        PipelineData: Data object with one entry per destination in `published`.
+    """
+    if publish_queue is None:
+        return data
+
+    try:
+        data.published.extend(publish_queue.wait())
+    finally:
+        publish_queue.close()
+    return data
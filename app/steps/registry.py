@@ -0,0 +1,21 @@
+from app.utils.lazy import LazyRegistry
+
+# Steps are imported when they first run, so building a pipeline stays cheap
+STEPS = LazyRegistry(
+    {
+        "auto_trim": "app.steps.auto_trim_step:auto_trim_step",
+        "clip": "app.steps.clip_step:clip_step",
+        "delete_files": "app.steps.delete_files_step:delete_files_step",
+        "download": "app.steps.download_step:download_step_async",
+        "fade_in_out": "app.steps.fade_in_out_step:fade_in_out_step",
+        "manifest": "app.steps.manifest_step:manifest_step",
+        "manual_load": "app.steps.manual_load_step:manual_load_step",
+        "merge_audio": "app.steps.merge_audio_step:merge_audio_step",
+        "merge_video": "app.steps.merge_video_step:merge_video_step",
+        "move": "app.steps.move_step:move_step",
+        "preview": "app.steps.preview_step:preview_step",
+        "publish": "app.steps.publish_step:publish_step",
+        "wait_for_publish": "app.steps.publish_step:wait_for_publish_step",
+        "trim": "app.steps.trim_step:trim_step",
+    }
+)
@@ -1,10 +1,13 @@
 # app/steps/trim_step.py
 import os
-import subprocess
 from app.data_models.pipeline_data import PipelineData
 from app.constants import PipelineKeys
 from app.utils.helpers import add_intermediate_filepath
-from app.utils.paths import file_ext
+from app.utils.ffmpeg import format_timestamp, parse_timestamp, run_ffmpeg
+from app.utils.keyframe_index import get_keyframe_index
+from app.utils.media_probe import attach_media, get_media_info
+from app.utils.normalized_cache import trimmed_file
+from app.utils.video_boundaries import find_video_boundaries
 
 
 def trim_step(
@@ -14,7 +17,35 @@ def trim_step(
     ffmpeg_loglevel="info",
     ffmpeg_hide_banner=False,
     overwrite=False,
+    cache_sync=None,
+    keyframe_index=False,
+    detect_boundaries=False,
+    cut=True,
 ):
+    """
+    Cuts the active file to [start_time, end_time] without re-encoding.
+
+    Args:
+        data (PipelineData): Current pipeline data object.
+        start_time (str): Start timestamp ("HH:MM:SS[.ms]").
+        end_time (str): End timestamp.
+        overwrite (bool): Re-trim even if the output already exists.
+        cache_sync (CacheSync): Optional shared cache for the trimmed file.
+        keyframe_index (bool): For video: seek straight to the keyframe at or
+            before `start_time`, found in the source's keyframe index, instead
+            of reading everything before it. The cut starts on that keyframe,
+            so the copy decodes cleanly from its first frame.
+        detect_boundaries (bool): For video: look at the frames just after the
+            start and before the end and move the cut past a countdown slate,
+            black frames or a dark end card. Without times, the whole file's
+            edges are checked.
+        cut (bool): Cut the file. Without it the window is only resolved
+            (including any detection) and recorded in `data.trim`, and the
+            active file is left as it is; previews seek into it directly.
+
+    Returns:
+        PipelineData: Updated data object with the trimmed file as the active file.
+    """
 
     file_key = PipelineKeys.ACTIVE_FILE_PATH
     input_file = getattr(data, file_key, None)
@@ -22,38 +53,118 @@ def trim_step(
     if not input_file:
         raise ValueError(f"No input file found for {file_key}")
 
-    ext = file_ext(input_file)
-    output_file = input_file.replace(ext, f"_trimmed{ext}")
+    # Keyed by the requested window, so a changed window is cut again
+    output_file = trimmed_file(
+        input_file,
+        dict(
+            start_time=start_time,
+            end_time=end_time,
+            keyframe_index=keyframe_index,
+            detect_boundaries=detect_boundaries,
+        ),
+    )
 
-    if os.path.exists(output_file) and not overwrite:
+    if cut and os.path.exists(output_file) and not overwrite:
         print(f"Output file already exists: {output_file}. Skipping trim step.")
         setattr(data, file_key, output_file)
         return data
 
+    if cut and cache_sync and not overwrite and cache_sync.pull(output_file):
+        print(f"Using shared cached trim: {output_file}. Skipping trim step.")
+        setattr(data, file_key, output_file)
+        return data
+
     command = ["ffmpeg", "-loglevel", ffmpeg_loglevel]
     if ffmpeg_hide_banner:
         command.extend(["-hide_banner"])
 
-    command.extend(
-        [
-            "-i",
-            input_file,
-            "-ss",
-            start_time,
-            "-to",
-            end_time,
-            "-c",
-            "copy",
-            output_file,
-        ]
-    )
+    if detect_boundaries:
+        start_seconds = parse_timestamp(start_time) if start_time else 0.0
+        end_seconds = (
+            parse_timestamp(end_time)
+            if end_time
+            else get_media_info(data, input_file).duration
+        )
+        boundaries = find_video_boundaries(
+            input_file, start_seconds, end_seconds, data=data
+        )
+        if boundaries.head or boundaries.tail:
+            print(
+                f"Skipping {boundaries.head or 'nothing'} at the start and "
+                f"{boundaries.tail or 'nothing'} at the end"
+            )
+        start_time = format_timestamp(boundaries.start)
+        end_time = format_timestamp(boundaries.end)
+        data.trim = dict(
+            data.trim or {},
+            start_time=start_time,
+            end_time=end_time,
+            boundaries=boundaries.summary(),
+        )
+
+    if not cut:
+        print(f"Trim window: {start_time} to {end_time} (not cut)")
+        data.trim = dict(data.trim or {}, start_time=start_time, end_time=end_time)
+        return data
+
+    start_seconds = parse_timestamp(start_time)
+    end_seconds = parse_timestamp(end_time)
+    if keyframe_index:
+        seek_seconds = get_keyframe_index(input_file, data).keyframe_before(
+            start_seconds
+        )
+        print(
+            f"Cutting from the keyframe at {seek_seconds:.3f}s "
+            f"(requested {start_seconds:.3f}s)"
+        )
+        command.extend(
+            [
+                "-ss",
+                f"{seek_seconds:.6f}",
+                "-i",
+                input_file,
+                "-t",
+                f"{end_seconds - seek_seconds:.6f}",
+                "-c",
+                "copy",
+                "-avoid_negative_ts",
+                "make_zero",
+                output_file,
+            ]
+        )
+        start_seconds = seek_seconds
+    else:
+        command.extend(
+            [
+                "-i",
+                input_file,
+                "-ss",
+                start_time,
+                "-to",
+                end_time,
+                "-c",
+                "copy",
+                output_file,
+            ]
+        )
 
     print(
         f"Trimming file from {start_time} to {end_time}: {input_file} -> {output_file}"
     )
-    subprocess.run(command, check=True)
+    run_ffmpeg(command, duration=end_seconds - start_seconds)
+    if keyframe_index:
+        # A stream copy: same streams, and we know exactly where the cut starts
+        attach_media(
+            data,
+            get_media_info(data, input_file).derive(
+                output_file, duration=end_seconds - start_seconds
+            ),
+        )
     setattr(data, file_key, output_file)
 
+    if cache_sync:
+        cache_sync.push(output_file)
+
     data = add_intermediate_filepath(data, output_file)
 
     return data
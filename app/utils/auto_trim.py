@@ -0,0 +1,310 @@
+import json
+import os
+import threading
+import warnings
+from dataclasses import dataclass
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from app.utils.ffmpeg import format_timestamp
+from app.utils.loudness import file_fingerprint
+from app.utils.loudness_meter import decode_pcm
+from app.utils.tracing import trace_span
+
+# The envelope only needs the level over time: mono at 8 kHz decodes fast
+ANALYSIS_SAMPLE_RATE = 8000
+STEP_SECONDS = 0.05  # one RMS value per 50 ms
+FRAME_SECONDS = 1.0  # one silence/music/speech decision per second
+CONTEXT_SECONDS = 4.0  # audio each decision looks at
+
+# Below this (dBFS RMS), or 40 dB under the loud parts, a second is silence
+SILENCE_DB = -50.0
+SILENCE_BELOW_PEAK_DB = 40.0
+# Speech stops between words and phrases; music doesn't. A second is speech
+# when this share of its context sits at least PAUSE_DB under the context level
+PAUSE_DB = 12.0
+SPEECH_PAUSE_SHARE = 0.1
+
+# Pauses or a short song inside the sermon don't end it
+MAX_GAP_SECONDS = 45.0
+MIN_PROGRAM_SECONDS = 60.0
+# Context compared on each side of a boundary for the confidence score
+BOUNDARY_SECONDS = 60.0
+
+SILENCE, MUSIC, SPEECH = 0, 1, 2
+
+TRIM_CACHE = "cache/auto_trim.json"
+
+_suggestions = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class TrimSuggestion:
+    """
+    Where the sermon starts and ends, and how sure the analyzer is.
+    """
+
+    start: float
+    end: float
+    confidence: float
+    labels: "np.ndarray"  # SILENCE/MUSIC/SPEECH per second
+
+    @property
+    def start_time(self):
+        return format_timestamp(round(self.start))
+
+    @property
+    def end_time(self):
+        return format_timestamp(round(self.end))
+
+    def summary(self):
+        return {
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "confidence": round(self.confidence, 2),
+        }
+
+
+def rms_envelope(blocks, sample_rate, step_seconds=STEP_SECONDS):
+    """
+    Reduces mono PCM blocks to one RMS level (dBFS) per step.
+
+    Blocks can be any size; samples left over at the end of one are carried
+    into the next, so the result doesn't depend on how the audio was split.
+
+    Args:
+        blocks (iterable[np.ndarray]): Mono float samples, shape (frames,) or
+            (frames, 1).
+        sample_rate (int): Sample rate in Hz.
+        step_seconds (float): Envelope resolution.
+
+    Returns:
+        np.ndarray: dBFS per step (-inf for digital silence).
+    """
+    step = int(round(sample_rate * step_seconds))
+    pending = np.empty(0, dtype=np.float64)
+    powers = []
+    for block in blocks:
+        samples = np.concatenate((pending, np.asarray(block, np.float64).ravel()))
+        whole = len(samples) // step * step
+        if whole:
+            powers.append((samples[:whole].reshape(-1, step) ** 2).mean(axis=1))
+        pending = samples[whole:]
+    power = np.concatenate(powers) if powers else np.empty(0)
+    with np.errstate(divide="ignore"):
+        return 10 * np.log10(power)
+
+
+def classify(envelope_db, step_seconds=STEP_SECONDS, silence_db=SILENCE_DB):
+    """
+    Labels each second of an envelope as SILENCE, MUSIC or SPEECH.
+
+    Args:
+        envelope_db (np.ndarray): Levels from `rms_envelope`.
+        step_seconds (float): The envelope's resolution.
+        silence_db (float): Absolute level under which audio is silence.
+
+    Returns:
+        np.ndarray: One label per second.
+    """
+    frame = int(round(FRAME_SECONDS / step_seconds))
+    context = int(round(CONTEXT_SECONDS / step_seconds))
+    frames = len(envelope_db) // frame
+    if not frames:
+        return np.empty(0, dtype=np.int8)
+
+    envelope_db = np.maximum(envelope_db[: frames * frame], -120.0)
+
+    # Silence is judged on each second itself
+    own_power = (10 ** (envelope_db / 10)).reshape(frames, frame).mean(axis=1)
+    own_level = 10 * np.log10(own_power)
+    loud = np.percentile(own_level, 95)
+    silent = own_level < max(silence_db, loud - SILENCE_BELOW_PEAK_DB)
+
+    # The context around each second, centred, leaving out silent seconds so
+    # a gap between songs doesn't read as pauses in speech
+    pad = (context - frame) // 2
+    levels = np.where(np.repeat(silent, frame), np.nan, envelope_db)
+    levels = np.pad(levels, (pad, context), constant_values=np.nan)
+    windows = sliding_window_view(levels, context)[: frames * frame : frame]
+
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        level = 10 * np.log10(np.nanmean(10 ** (windows / 10), axis=1))
+        below = np.where(np.isnan(windows), np.nan, windows < level[:, None] - PAUSE_DB)
+        pause_share = np.nanmean(below, axis=1)
+
+    labels = np.where(pause_share >= SPEECH_PAUSE_SHARE, SPEECH, MUSIC)
+    labels[silent] = SILENCE
+    return labels.astype(np.int8)
+
+
+def _runs(mask):
+    """
+    Returns (start, end) index pairs of the True runs in `mask`.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def find_program(labels, max_gap=MAX_GAP_SECONDS, min_length=MIN_PROGRAM_SECONDS):
+    """
+    Finds the longest stretch of speech, bridging pauses shorter than `max_gap`.
+
+    Args:
+        labels (np.ndarray): Labels per second from `classify`.
+        max_gap (float): Longest non-speech gap kept inside the program.
+        min_length (float): Shortest stretch that counts as the program.
+
+    Returns:
+        tuple: (start, end) in seconds, or None if there is no such stretch.
+    """
+    speech = labels == SPEECH
+    bridged = speech.copy()
+    for start, end in _runs(~speech):
+        if 0 < start and end < len(labels) and end - start <= max_gap:
+            bridged[start:end] = True
+
+    runs = [(start, end) for start, end in _runs(bridged) if end - start >= min_length]
+    if not runs:
+        return None
+    start, end = max(runs, key=lambda run: run[1] - run[0])
+    return int(start), int(end)
+
+
+def _share(values, label, default=1.0):
+    return float((values != label).mean()) if len(values) else default
+
+
+def suggest_trim(
+    envelope_db,
+    step_seconds=STEP_SECONDS,
+    silence_db=SILENCE_DB,
+    max_gap=MAX_GAP_SECONDS,
+    min_length=MIN_PROGRAM_SECONDS,
+):
+    """
+    Suggests trim times from an envelope.
+
+    The confidence is the share of speech inside the span times how clearly
+    each boundary separates speech from what is outside it (the share of
+    non-speech in the minute before the start and after the end).
+
+    Returns:
+        TrimSuggestion: The suggestion, or None if no speech stretch was found.
+    """
+    labels = classify(envelope_db, step_seconds, silence_db)
+    program = find_program(labels, max_gap, min_length)
+    if program is None:
+        return None
+    start, end = program
+
+    inside = float((labels[start:end] == SPEECH).mean())
+    boundary = int(BOUNDARY_SECONDS)
+    before = _share(labels[max(start - boundary, 0) : start], SPEECH)
+    after = _share(labels[end : end + boundary], SPEECH)
+    return TrimSuggestion(
+        start=float(start),
+        end=float(end),
+        confidence=inside * (before + after) / 2,
+        labels=labels,
+    )
+
+
+def detect_trim(path, sample_rate=ANALYSIS_SAMPLE_RATE, **kwargs):
+    """
+    Finds the sermon in a recording from its silence/music/speech transitions.
+
+    The audio is decoded once to low-rate mono and reduced to an RMS envelope
+    block by block, so a 3-hour stream is analysed in seconds with flat memory.
+
+    Args:
+        path (str): The recording.
+        sample_rate (int): Rate to decode at for the analysis.
+        **kwargs: Passed to `suggest_trim`.
+
+    Returns:
+        TrimSuggestion: The suggestion, or None if no sermon was found.
+    """
+    with trace_span("auto trim", "analysis", path=path) as span:
+        envelope_db = rms_envelope(decode_pcm(path, sample_rate, 1), sample_rate)
+        suggestion = suggest_trim(envelope_db, **kwargs)
+        if suggestion is not None:
+            span.set(**suggestion.summary())
+    return suggestion
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _store(cache_path, key, suggestion):
+    suggestions = _load_cache(cache_path)
+    suggestions[key] = suggestion and {
+        "start": suggestion.start,
+        "end": suggestion.end,
+        "confidence": suggestion.confidence,
+        # One digit per second keeps a 3-hour stream to about 10 KB
+        "labels": "".join(str(int(label)) for label in suggestion.labels),
+    }
+    directory = os.path.dirname(cache_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(suggestions, f, indent=2, sort_keys=True)
+    os.replace(temp_path, cache_path)
+
+
+def _from_stored(stored):
+    if stored is None:
+        return None
+    return TrimSuggestion(
+        start=stored["start"],
+        end=stored["end"],
+        confidence=stored["confidence"],
+        labels=np.array([int(label) for label in stored["labels"]], dtype=np.int8),
+    )
+
+
+def get_trim_suggestion(
+    path, sample_rate=ANALYSIS_SAMPLE_RATE, cache_path=TRIM_CACHE, **kwargs
+):
+    """
+    Returns `detect_trim(path)`, analysing each recording only once.
+
+    Suggestions (including "no sermon found") are kept in memory and in
+    `cache_path` (a JSON file), keyed by the file's fingerprint and the
+    analysis settings, so a re-run of a 3-hour stream skips the decode.
+
+    Args:
+        path (str): The recording.
+        sample_rate (int): Rate to decode at for the analysis.
+        cache_path (str): JSON file of earlier suggestions (None: memory only).
+        **kwargs: Passed to `suggest_trim`.
+
+    Returns:
+        TrimSuggestion: The suggestion, or None if no sermon was found.
+    """
+    key = json.dumps(
+        [file_fingerprint(path), sample_rate, sorted(kwargs.items())], default=str
+    )
+    with _lock:
+        if key in _suggestions:
+            return _suggestions[key]
+        if cache_path:
+            stored = _load_cache(cache_path)
+            if key in stored:
+                suggestion = _suggestions[key] = _from_stored(stored[key])
+                return suggestion
+
+    suggestion = detect_trim(path, sample_rate, **kwargs)
+    with _lock:
+        _suggestions[key] = suggestion
+        if cache_path:
+            _store(cache_path, key, suggestion)
+    return suggestion
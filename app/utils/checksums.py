@@ -0,0 +1,117 @@
+import hashlib
+import os
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path, chunk_size=CHUNK_SIZE):
+    """
+    Computes the SHA-256 hex digest of a file without loading it into memory.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int): Number of bytes read per iteration (default: 1 MiB).
+
+    Returns:
+        str: The hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, digest=None):
+    """
+    Yields a file's contents chunk by chunk, feeding each chunk to `digest`.
+
+    Lets a copy or upload hash the file in the same read pass.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int): Number of bytes per chunk (default: 1 MiB).
+        digest: Optional hashlib object updated with every chunk.
+
+    Yields:
+        bytes: The next chunk.
+    """
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+
+
+SIDECAR_SUFFIX = ".sha256"
+
+
+def sidecar_path(path):
+    return f"{path}{SIDECAR_SUFFIX}"
+
+
+def write_checksum(path, digest):
+    """
+    Records `digest` next to the file as `<path>.sha256`, in `sha256sum` format.
+
+    Args:
+        path (str): The file the digest belongs to.
+        digest (str): Its SHA-256 hex digest.
+    """
+    tmp_path = f"{sidecar_path(path)}.part"
+    with open(tmp_path, "w") as f:
+        f.write(f"{digest}  {os.path.basename(path)}\n")
+    os.replace(tmp_path, sidecar_path(path))
+
+
+def read_checksum(path):
+    """
+    Returns the digest recorded for `path`, or None if there is none.
+
+    Accepts both `sha256sum` lines and a bare digest.
+    """
+    try:
+        with open(sidecar_path(path), "r") as f:
+            content = f.read().split()
+    except FileNotFoundError:
+        return None
+    return content[0] if content else None
+
+
+def record_checksum(path):
+    """
+    Hashes a file and records the digest next to it (see `write_checksum`).
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = sha256_file(path)
+    write_checksum(path, digest)
+    return digest
+
+
+def verify_checksum(path, expected=None, expected_bytes=None):
+    """
+    Re-hashes a file and compares it to the recorded or expected digest.
+
+    Args:
+        path (str): The file to check.
+        expected (str): The digest it should have (default: its `.sha256` sidecar).
+        expected_bytes (int): Optional size it should have; a truncated file
+            fails without being read.
+
+    Returns:
+        dict: `path`, `expected`, `actual` and `status` ("ok", "mismatch",
+            "missing" or "unrecorded").
+    """
+    expected = expected or read_checksum(path)
+    result = {"path": path, "expected": expected, "actual": None}
+    if not os.path.exists(path):
+        return dict(result, status="missing")
+    if expected is None:
+        return dict(result, status="unrecorded")
+    if expected_bytes is not None and os.path.getsize(path) != expected_bytes:
+        return dict(result, status="mismatch")
+
+    result["actual"] = sha256_file(path)
+    return dict(result, status="ok" if result["actual"] == expected else "mismatch")
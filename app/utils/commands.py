@@ -0,0 +1,60 @@
+import os
+import subprocess
+from app.utils.tracing import trace_span
+
+
+def file_size(path):
+    return os.path.getsize(path) if path and os.path.isfile(path) else None
+
+
+def command_inputs(command):
+    return [
+        command[index + 1]
+        for index, arg in enumerate(command[:-1])
+        if arg == "-i" and command[index + 1] != "-"
+    ]
+
+
+def program_index(command):
+    """
+    Returns the index of the actual program, skipping wrappers like `taskset -c 0,1`.
+    """
+    return 3 if command[0] == "taskset" else 0
+
+
+def run_command(command, span_attributes=None, **kwargs):
+    """
+    Runs an external command (ffmpeg, ffprobe...) inside a tracing span.
+
+    Takes the same keyword arguments as `subprocess.run`. The span records the
+    program, exit code, input bytes and, for ffmpeg, output bytes.
+
+    Args:
+        command (list[str]): The command and its arguments.
+        span_attributes (dict): Extra span attributes, e.g. the input duration.
+        **kwargs: Passed through to `subprocess.run`.
+
+    Returns:
+        subprocess.CompletedProcess: The finished process.
+    """
+    program = os.path.basename(command[program_index(command)])
+    inputs = command_inputs(command)
+
+    with trace_span(
+        program,
+        "subprocess",
+        command=" ".join(command),
+        inputs=inputs,
+        input_bytes=sum(file_size(path) or 0 for path in inputs),
+        **(span_attributes or {}),
+    ) as span:
+        try:
+            result = subprocess.run(command, **kwargs)
+        except subprocess.CalledProcessError as e:
+            span.set(exit_code=e.returncode)
+            raise
+
+        span.set(exit_code=getattr(result, "returncode", None))
+        if program == "ffmpeg":
+            span.set(output_bytes=file_size(command[-1]))
+        return result
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from typing import List, Optional
+from colorama import Fore, Style
+from app.utils.encoder_profiles import EncoderProfile
+from app.utils.resource_scheduler import get_scheduler
+from app.utils.media_probe import probe_media
+from app.utils.ffmpeg import run_ffmpeg
+
+DEFAULT_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"]
+
+
+@dataclass
+class CalibrationResult:
+    """
+    How one preset/CRF combination performed on this machine.
+    """
+
+    preset: str
+    crf: int
+    elapsed_seconds: float
+    realtime_factor: float
+    fps: float
+    bitrate_kbps: float
+    size_bytes: int
+
+
+def probe_duration(input_path):
+    """
+    Returns the duration of a media file in seconds.
+    """
+    return probe_media(input_path).duration
+
+
+def encode_sample(
+    input_path,
+    output_path,
+    profile: EncoderProfile,
+    start_time,
+    sample_seconds,
+    resolution="1920x1080",
+    frame_rate=30,
+) -> CalibrationResult:
+    """
+    Encodes a slice of the source with the given profile and measures it.
+
+    The slice is scaled like `normalize_video` does, so the numbers match a
+    real render. Audio is dropped since it doesn't depend on the profile.
+
+    Args:
+        input_path (str): The source video.
+        output_path (str): Where to write the encoded sample.
+        profile (EncoderProfile): The settings to measure.
+        start_time (float): Offset into the source in seconds.
+        sample_seconds (float): Length of the slice in seconds.
+        resolution (str): Target resolution (default: 1920x1080).
+        frame_rate (int): Target frame rate (default: 30).
+
+    Returns:
+        CalibrationResult: Speed and size of the encode.
+    """
+    with get_scheduler().reserve() as budget:
+        command = [
+            "ffmpeg",
+            *budget.global_args(),
+            "-loglevel",
+            "error",
+            "-hide_banner",
+            "-y",
+            "-ss",
+            str(start_time),
+            "-t",
+            str(sample_seconds),
+            "-i",
+            input_path,
+            "-vf",
+            f"scale={resolution},fps={frame_rate}",
+            "-an",
+            *profile.ffmpeg_args(),
+            *budget.output_args(),
+            output_path,
+        ]
+
+        start = time.perf_counter()
+        run_ffmpeg(budget.wrap(command), duration=sample_seconds)
+        elapsed = time.perf_counter() - start
+
+    size_bytes = os.path.getsize(output_path)
+    return CalibrationResult(
+        preset=profile.preset,
+        crf=profile.crf,
+        elapsed_seconds=elapsed,
+        realtime_factor=sample_seconds / elapsed,
+        fps=sample_seconds * frame_rate / elapsed,
+        bitrate_kbps=size_bytes * 8 / sample_seconds / 1000,
+        size_bytes=size_bytes,
+    )
+
+
+def choose_setting(
+    results: List[CalibrationResult], target_rtf
+) -> Optional[CalibrationResult]:
+    """
+    Picks the smallest output among the settings that encode fast enough.
+
+    Args:
+        results (list[CalibrationResult]): The measured settings.
+        target_rtf (float): Minimum real-time factor (1.0 = as fast as playback).
+
+    Returns:
+        CalibrationResult: The chosen setting, or the fastest one if none meets the
+            target (None if there are no results).
+    """
+    if not results:
+        return None
+
+    fast_enough = [r for r in results if r.realtime_factor >= target_rtf]
+    if not fast_enough:
+        print(
+            Fore.YELLOW
+            + f"No setting reached {target_rtf}x realtime; using the fastest one."
+            + Style.RESET_ALL
+        )
+        return max(results, key=lambda r: r.realtime_factor)
+
+    return min(fast_enough, key=lambda r: r.size_bytes)
+
+
+def calibrate_profile(
+    input_path,
+    profile: EncoderProfile,
+    target_rtf=1.0,
+    sample_seconds=20,
+    presets=None,
+    crfs=None,
+):
+    """
+    Encodes a sample of the actual source at several presets/CRFs and tunes the
+    profile to the smallest output that still meets the target real-time factor.
+
+    Args:
+        input_path (str): The source video to sample.
+        profile (EncoderProfile): The profile being tuned.
+        target_rtf (float): Minimum real-time factor (default: 1.0).
+        sample_seconds (float): Length of the sample in seconds (default: 20).
+        presets (list[str]): x264 presets to try (default: ultrafast..medium).
+        crfs (list[int]): CRF values to try (default: the profile's CRF).
+
+    Returns:
+        tuple: (tuned EncoderProfile, list[CalibrationResult])
+    """
+    presets = presets or DEFAULT_PRESETS
+    crfs = crfs or [profile.crf]
+
+    # Sample from the middle, away from intros/slates at either end
+    duration = probe_duration(input_path)
+    sample_seconds = min(sample_seconds, duration)
+    start_time = max(0.0, (duration - sample_seconds) / 2)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for crf in crfs:
+            for preset in presets:
+                candidate = replace(profile, preset=preset, crf=crf)
+                output_path = os.path.join(tmp_dir, f"{preset}_{crf}.mp4")
+                result = encode_sample(
+                    input_path, output_path, candidate, start_time, sample_seconds
+                )
+                print(
+                    f"{preset:>10} crf {crf:>2}: {result.realtime_factor:6.2f}x realtime, "
+                    f"{result.fps:7.1f} fps, {result.bitrate_kbps:8.0f} kb/s"
+                )
+                results.append(result)
+
+    chosen = choose_setting(results, target_rtf)
+    return replace(profile, preset=chosen.preset, crf=chosen.crf), results
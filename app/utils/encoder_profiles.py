@@ -0,0 +1,60 @@
+from dataclasses import dataclass, replace
+from typing import List
+
+DEFAULT_PROFILE_NAME = "publish"
+
+
+@dataclass
+class EncoderProfile:
+    """
+    Named x264 settings used for every video encode.
+    """
+
+    name: str
+    codec: str = "libx264"
+    preset: str = "veryfast"
+    crf: int = 20
+
+    def ffmpeg_args(self) -> List[str]:
+        """
+        Returns the ffmpeg video encoder flags for this profile.
+        """
+        return ["-c:v", self.codec, "-crf", str(self.crf), "-preset", self.preset]
+
+
+DEFAULT_PROFILES = {
+    # Near-lossless master we keep around
+    "archive": EncoderProfile("archive", preset="slow", crf=18),
+    # What goes to YouTube and the website
+    "publish": EncoderProfile("publish", preset="veryfast", crf=20),
+    # Quick checks of trims and transitions
+    "preview": EncoderProfile("preview", preset="ultrafast", crf=28),
+}
+
+
+def get_encoder_profile(encoding_conf=None, name=None) -> EncoderProfile:
+    """
+    Resolves an encoder profile from the optional `encoding` config section.
+
+    Profiles in `encoding.profiles` override the matching built-in profile
+    field by field, or define new ones.
+
+    Args:
+        encoding_conf (dict): The `encoding` config section, or None.
+        name (str): Profile to resolve (default: `encoding.profile`, else "publish").
+
+    Returns:
+        EncoderProfile: The resolved profile.
+
+    Raises:
+        ValueError: If no profile with that name exists.
+    """
+    encoding_conf = encoding_conf or {}
+    name = name or encoding_conf.get("profile", DEFAULT_PROFILE_NAME)
+
+    overrides = encoding_conf.get("profiles", {}).get(name)
+    base_profile = DEFAULT_PROFILES.get(name)
+    if base_profile is None and overrides is None:
+        raise ValueError(f"Unknown encoder profile: {name}")
+
+    return replace(base_profile or EncoderProfile(name), **(overrides or {}))
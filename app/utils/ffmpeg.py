@@ -0,0 +1,314 @@
+import contextvars
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from colorama import Fore, Style
+from app.utils.commands import command_inputs, file_size, program_index
+from app.utils.observers import emit
+from app.utils.profiling import get_profiler, parse_ffmpeg_benchmark
+from app.utils.tracing import trace_span
+
+# How often the default reporter prints a progress line, in seconds
+REPORT_INTERVAL = 5.0
+
+_progress_listeners: List[Callable] = []
+
+# Set by `run_encodes` in each encode's context; ffmpeg stops when it fires
+_cancel_event = contextvars.ContextVar("ffmpeg_cancel_event", default=None)
+
+
+class FfmpegCancelled(Exception):
+    """
+    Raised by `run_ffmpeg` when the run was cancelled and ffmpeg was killed.
+    """
+
+
+@dataclass
+class FfmpegProgress:
+    """
+    A snapshot of a running ffmpeg encode, parsed from `-progress` output.
+    """
+
+    label: str
+    out_time_seconds: float = 0.0
+    speed: Optional[float] = None
+    fps: Optional[float] = None
+    frame: Optional[int] = None
+    total_size: Optional[int] = None
+    duration: Optional[float] = None
+    elapsed_seconds: float = 0.0
+    finished: bool = False
+
+    @property
+    def realtime_factor(self):
+        """Media seconds processed per wall-clock second, averaged over the run."""
+        if not self.elapsed_seconds:
+            return None
+        return self.out_time_seconds / self.elapsed_seconds
+
+    @property
+    def percent(self):
+        if not self.duration:
+            return None
+        return min(100.0, 100.0 * self.out_time_seconds / self.duration)
+
+    @property
+    def eta_seconds(self):
+        """Remaining wall-clock seconds, if the expected duration is known."""
+        rate = self.speed or self.realtime_factor
+        if not self.duration or not rate:
+            return None
+        return max(0.0, (self.duration - self.out_time_seconds) / rate)
+
+
+def add_progress_listener(listener: Callable[[FfmpegProgress], None]):
+    """
+    Registers a callback that receives progress from every ffmpeg run.
+    """
+    _progress_listeners.append(listener)
+
+
+def remove_progress_listener(listener: Callable[[FfmpegProgress], None]):
+    if listener in _progress_listeners:
+        _progress_listeners.remove(listener)
+
+
+def set_cancel_event(event):
+    """
+    Makes every `run_ffmpeg` in this context (thread/task) kill ffmpeg and raise
+    `FfmpegCancelled` once `event` is set.
+
+    Args:
+        event (threading.Event): The event to watch.
+    """
+    _cancel_event.set(event)
+
+
+def _parse_number(value, cast=float):
+    try:
+        return cast(value.rstrip("x").strip())
+    except (AttributeError, ValueError):
+        # ffmpeg reports "N/A" until it knows a value
+        return None
+
+
+def _update_progress(progress: FfmpegProgress, key, value):
+    if key == "out_time_us":
+        out_time_us = _parse_number(value, int)
+        if out_time_us is not None:
+            progress.out_time_seconds = out_time_us / 1_000_000
+    elif key == "speed":
+        progress.speed = _parse_number(value)
+    elif key == "fps":
+        progress.fps = _parse_number(value)
+    elif key == "frame":
+        progress.frame = _parse_number(value, int)
+    elif key == "total_size":
+        progress.total_size = _parse_number(value, int)
+
+
+def parse_timestamp(timestamp):
+    """
+    Converts an ffmpeg timestamp ("HH:MM:SS[.ms]" or plain seconds) to seconds.
+    """
+    seconds = 0.0
+    for part in str(timestamp).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_timestamp(seconds):
+    """
+    Converts seconds to an ffmpeg timestamp, "HH:MM:SS" or "HH:MM:SS.mmm".
+    """
+    milliseconds = int(round(seconds * 1000))
+    whole, milliseconds = divmod(milliseconds, 1000)
+    timestamp = _format_seconds(whole)
+    return f"{timestamp}.{milliseconds:03d}" if milliseconds else timestamp
+
+
+def _format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(progress: FfmpegProgress):
+    """
+    Returns a one-line summary, e.g. "00:12:30 (41%) 3.20x realtime, 96.1 fps, 212.4 MB, ETA 00:05:37".
+    """
+    parts = [_format_seconds(progress.out_time_seconds)]
+    if progress.percent is not None:
+        parts[0] += f" ({progress.percent:.0f}%)"
+    if progress.speed is not None:
+        parts.append(f"{progress.speed:.2f}x realtime")
+    if progress.fps:
+        parts.append(f"{progress.fps:.1f} fps")
+    if progress.total_size is not None:
+        parts.append(f"{progress.total_size / 1_000_000:.1f} MB")
+    if progress.eta_seconds is not None and not progress.finished:
+        parts.append(f"ETA {_format_seconds(progress.eta_seconds)}")
+    return ", ".join(parts)
+
+
+def _print_progress(progress: FfmpegProgress, last_report):
+    now = time.monotonic()
+    if not progress.finished and now - last_report < REPORT_INTERVAL:
+        return last_report
+    print(
+        Fore.CYAN + f"{progress.label}: " + format_progress(progress) + Style.RESET_ALL
+    )
+    return now
+
+
+def _with_repeat_logging(command):
+    """
+    Adds the `repeat` log flag, which stops ffmpeg folding identical bench
+    lines into "repeated n times". An existing `-loglevel`/`-v` keeps its
+    level; a second `-loglevel` would reset it.
+    """
+    for index, arg in enumerate(command[:-1]):
+        if arg in ("-loglevel", "-v"):
+            level = command[index + 1]
+            if "repeat" not in level:
+                level = f"repeat+{level.lstrip('+')}"
+                command = command[: index + 1] + [level] + command[index + 2 :]
+            return command, []
+    return command, ["-loglevel", "+repeat"]
+
+
+def _collect_benchmark(profiler, label, command, stderr):
+    stderr.seek(0)
+    lines = stderr.readlines()
+    stderr.close()
+    # Pass ffmpeg's own messages through, so errors still show up
+    sys.stderr.writelines(line for line in lines if not line.startswith("bench:"))
+    profiler.record_ffmpeg(label, command, parse_ffmpeg_benchmark(lines))
+
+
+def run_ffmpeg(
+    command,
+    duration=None,
+    label=None,
+    on_progress: Callable[[FfmpegProgress], None] = None,
+    span_attributes=None,
+    check=True,
+    pass_fds=(),
+) -> FfmpegProgress:
+    """
+    Runs ffmpeg with machine-readable progress instead of the raw stats line.
+
+    Adds `-progress pipe:1 -nostats`, parses `out_time_us`, `speed`, `fps`,
+    `frame` and `total_size` as they arrive, and reports them to `on_progress`,
+    to every registered listener and, every few seconds, to the terminal. The
+    final throughput numbers are recorded on the command's tracing span. While
+    a profile is running, ffmpeg's `-benchmark_all` stage timings are added to it.
+
+    Args:
+        command (list[str]): The ffmpeg command (optionally wrapped by `taskset`).
+        duration (float): Expected output duration in seconds, used for % and ETA.
+        label (str): Name shown in progress lines (default: the output file name).
+        on_progress (callable): Called with an `FfmpegProgress` on every update.
+        span_attributes (dict): Extra tracing span attributes.
+        check (bool): Raise if ffmpeg exits with a non-zero code (default: True).
+        pass_fds (tuple[int]): File descriptors ffmpeg inherits, for `pipe:N`
+            outputs.
+
+    Returns:
+        FfmpegProgress: The final progress snapshot (throughput, frames, bytes).
+
+    Raises:
+        subprocess.CalledProcessError: If `check` is set and ffmpeg fails.
+        FfmpegCancelled: If the cancel event of this context (see
+            `set_cancel_event`) was set; ffmpeg is killed.
+    """
+    cancel = _cancel_event.get()
+    profiler = get_profiler()
+    extra_flags = ["-progress", "pipe:1", "-nostats"]
+    if profiler:
+        command, log_flags = _with_repeat_logging(command)
+        extra_flags += ["-benchmark", "-benchmark_all"] + log_flags
+    index = program_index(command) + 1
+    command = command[:index] + extra_flags + command[index:]
+    inputs = command_inputs(command)
+    progress = FfmpegProgress(
+        label=label or os.path.basename(command[-1]), duration=duration
+    )
+    listeners = [on_progress] if on_progress else []
+    listeners.extend(_progress_listeners)
+    if cancel is not None and cancel.is_set():
+        raise FfmpegCancelled(progress.label)
+
+    with trace_span(
+        "ffmpeg",
+        "subprocess",
+        command=" ".join(command),
+        inputs=inputs,
+        input_bytes=sum(file_size(path) or 0 for path in inputs),
+        input_duration=duration,
+        **(span_attributes or {}),
+    ) as span:
+        start = time.monotonic()
+        last_report = start
+        # The benchmark lines go to stderr; collect them rather than flood the terminal
+        stderr = tempfile.TemporaryFile("w+") if profiler else None
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+            pass_fds=pass_fds,
+        )
+        drained = False
+        try:
+            for line in process.stdout:
+                # Progress arrives every half second, so this reacts quickly
+                if cancel is not None and cancel.is_set():
+                    raise FfmpegCancelled(progress.label)
+                key, _, value = line.strip().partition("=")
+                if key != "progress":
+                    _update_progress(progress, key, value)
+                    continue
+
+                progress.elapsed_seconds = time.monotonic() - start
+                progress.finished = value == "end"
+                for listener in listeners:
+                    listener(progress)
+                emit("ffmpeg_progress", progress=progress)
+                last_report = _print_progress(progress, last_report)
+            drained = True
+        finally:
+            if not drained:
+                # Cancelled, or a listener raised: nobody reads the progress pipe
+                # any more, so ffmpeg would block on it and never exit
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+            if stderr:
+                try:
+                    if drained:
+                        _collect_benchmark(profiler, progress.label, command, stderr)
+                finally:
+                    stderr.close()
+
+        progress.elapsed_seconds = time.monotonic() - start
+        span.set(
+            exit_code=returncode,
+            output_bytes=progress.total_size,
+            frames=progress.frame,
+            out_time_seconds=progress.out_time_seconds,
+            realtime_factor=progress.realtime_factor,
+            fps=(
+                progress.frame / progress.elapsed_seconds
+                if progress.frame and progress.elapsed_seconds
+                else None
+            ),
+        )
+
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return progress
@@ -0,0 +1,173 @@
+import errno
+import os
+import shutil
+import time
+from app.utils.tracing import trace_span
+
+# Bytes handed to the kernel per copy_file_range/sendfile call
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# The kernel call isn't available for this pair of files; try the next one
+_FALLBACK_ERRORS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.EINVAL,
+    errno.EBADF,
+}
+
+
+def _copy_range(source_fd, destination_fd, size, copy_call):
+    copied = 0
+    while copied < size:
+        sent = copy_call(source_fd, destination_fd, min(COPY_CHUNK_SIZE, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _copy_file_range(source_fd, destination_fd, count):
+    return os.copy_file_range(source_fd, destination_fd, count)
+
+
+def _sendfile(source_fd, destination_fd, count):
+    return os.sendfile(destination_fd, source_fd, None, count)
+
+
+def kernel_copy(source_fd, destination_fd, size):
+    """
+    Copies `size` bytes between open files without passing them through Python.
+
+    Tries `copy_file_range` (can share blocks on CoW filesystems), then
+    `sendfile`, then a plain buffered copy.
+
+    Args:
+        source_fd (int): File descriptor to read from (at offset 0).
+        destination_fd (int): File descriptor to write to (empty, at offset 0).
+        size (int): Number of bytes to copy.
+
+    Returns:
+        str: The method used: "copy_file_range", "sendfile" or "copy".
+    """
+    for method, copy_call, available in [
+        ("copy_file_range", _copy_file_range, hasattr(os, "copy_file_range")),
+        ("sendfile", _sendfile, hasattr(os, "sendfile")),
+    ]:
+        if not available:
+            continue
+        try:
+            if _copy_range(source_fd, destination_fd, size, copy_call) == size:
+                return method
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRORS:
+                raise
+        # Start over with the next method on a clean destination
+        os.lseek(source_fd, 0, os.SEEK_SET)
+        os.lseek(destination_fd, 0, os.SEEK_SET)
+        os.ftruncate(destination_fd, 0)
+
+    with os.fdopen(os.dup(source_fd), "rb") as src, os.fdopen(
+        os.dup(destination_fd), "wb"
+    ) as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+    return "copy"
+
+
+def fsync_directory(path):
+    """
+    Flushes a directory entry (a rename or a new file) to disk.
+    """
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some filesystems (and non-Linux platforms) can't fsync directories
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_copy(source_path, destination_path):
+    """
+    Copies a file so the destination only ever appears complete.
+
+    The data goes to a temporary file next to the destination with a kernel-side
+    copy, is fsynced, and then renamed over the destination.
+
+    Args:
+        source_path (str): File to copy.
+        destination_path (str): Where it should end up.
+
+    Returns:
+        str: The copy method used (see `kernel_copy`).
+    """
+    directory = os.path.dirname(destination_path) or "."
+    tmp_path = os.path.join(
+        directory, f".{os.path.basename(destination_path)}.{os.getpid()}.tmp"
+    )
+    try:
+        with open(source_path, "rb") as src, open(tmp_path, "wb") as dst:
+            method = kernel_copy(
+                src.fileno(), dst.fileno(), os.fstat(src.fileno()).st_size
+            )
+            os.fsync(dst.fileno())
+        shutil.copystat(source_path, tmp_path)
+        os.replace(tmp_path, destination_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    fsync_directory(directory)
+    return method
+
+
+def place_file(source_path, destination_path, move=True):
+    """
+    Puts a finished file at its final path atomically, as fast as the
+    filesystems allow.
+
+    On the same filesystem this is a single `rename`. Across devices (e.g.
+    Docker volumes) the file is copied kernel-side into a temporary name,
+    fsynced and renamed into place, and the source is removed when moving.
+    Either way, anything watching the destination never sees a partial file.
+
+    Args:
+        source_path (str): The finished file.
+        destination_path (str): Its final path; the directory must exist.
+        move (bool): Remove the source afterwards (default: True).
+
+    Returns:
+        dict: `method` ("rename", "copy_file_range", "sendfile" or "copy"),
+            `bytes`, `seconds` and `throughput_mb_s`.
+    """
+    size = os.path.getsize(source_path)
+    with trace_span(
+        "place file", "io", source=source_path, destination=destination_path
+    ) as span:
+        start = time.perf_counter()
+        method = None
+        if move:
+            try:
+                os.rename(source_path, destination_path)
+                fsync_directory(os.path.dirname(destination_path))
+                method = "rename"
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+
+        if method is None:
+            method = atomic_copy(source_path, destination_path)
+            if move:
+                os.remove(source_path)
+
+        seconds = time.perf_counter() - start
+        throughput = size / 1_000_000 / seconds if seconds > 0 else None
+        span.set(method=method, bytes=size, throughput_mb_s=throughput)
+
+    return {
+        "method": method,
+        "bytes": size,
+        "seconds": seconds,
+        "throughput_mb_s": throughput,
+    }
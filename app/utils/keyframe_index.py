@@ -0,0 +1,239 @@
+import os
+import struct
+import subprocess
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict
+from app.utils.tracing import trace_span
+
+INDEX_SUFFIX = ".kfindex"
+_MAGIC = b"KFIX"
+_VERSION = 1
+# magic, version, source size, source mtime_ns, packet count, keyframe count
+_HEADER = struct.Struct("<4sHqqqq")
+
+_indexes: Dict[str, "KeyframeIndex"] = {}
+_lock = threading.Lock()
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class KeyframeIndex:
+    """
+    Where the keyframes of a video are: timestamps, byte offsets and the
+    number of packets in each GOP, kept in flat arrays.
+
+    Lookups are binary searches, so deciding where to cut a 3-hour livestream
+    doesn't touch the file at all.
+    """
+
+    def __init__(
+        self, times, offsets, gop_packets, packet_count, size=None, mtime_ns=None
+    ):
+        """
+        Args:
+            times (array): Keyframe presentation times in seconds, ascending.
+            offsets (array): Byte offset of each keyframe packet (-1 if unknown).
+            gop_packets (array): Packets from each keyframe to the next one.
+            packet_count (int): Video packets in the whole file.
+            size (int): Size of the indexed file version.
+            mtime_ns (int): mtime of the indexed file version.
+        """
+        self.times = times
+        self.offsets = offsets
+        self.gop_packets = gop_packets
+        self.packet_count = packet_count
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __len__(self):
+        return len(self.times)
+
+    def is_current(self, path):
+        """Whether the index still describes the file at `path`."""
+        stat = os.stat(path)
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+    def keyframe_before(self, seconds):
+        """
+        Returns the last keyframe time at or before `seconds` (0.0 if none).
+        """
+        position = bisect_right(self.times, seconds + 1e-6) - 1
+        return self.times[position] if position >= 0 else 0.0
+
+    def keyframe_after(self, seconds):
+        """
+        Returns the first keyframe time at or after `seconds`, or None.
+        """
+        position = bisect_left(self.times, seconds - 1e-6)
+        return self.times[position] if position < len(self.times) else None
+
+    def offset_before(self, seconds):
+        """
+        Returns the byte offset of the keyframe at or before `seconds`.
+        """
+        position = max(bisect_right(self.times, seconds + 1e-6) - 1, 0)
+        return self.offsets[position] if self.offsets else 0
+
+    def keyframes_between(self, start, end):
+        """
+        Returns the keyframe times in [start, end).
+        """
+        return self.times[bisect_left(self.times, start) : bisect_left(self.times, end)]
+
+    def save(self, path):
+        """
+        Writes the index as a small binary file (header plus raw arrays).
+        """
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    _VERSION,
+                    self.size or 0,
+                    self.mtime_ns or 0,
+                    self.packet_count,
+                    len(self.times),
+                )
+            )
+            for values in (self.times, self.offsets, self.gop_packets):
+                _little_endian(values).tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by `save`.
+
+        Returns:
+            KeyframeIndex: The index, or None if the file is missing or unreadable.
+        """
+        try:
+            with open(path, "rb") as f:
+                magic, version, size, mtime_ns, packet_count, count = _HEADER.unpack(
+                    f.read(_HEADER.size)
+                )
+                if magic != _MAGIC or version != _VERSION:
+                    return None
+                arrays = []
+                for typecode in ("d", "q", "q"):
+                    values = array(typecode)
+                    values.fromfile(f, count)
+                    arrays.append(_little_endian(values))
+        except (OSError, EOFError, struct.error):
+            return None
+        return cls(*arrays, packet_count=packet_count, size=size, mtime_ns=mtime_ns)
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def build_keyframe_index(path):
+    """
+    Indexes the keyframes of a video's first video stream in one streaming pass.
+
+    ffprobe reads the packets (it doesn't decode anything) and its output is
+    parsed line by line, so memory stays flat even for multi-hour files.
+
+    Args:
+        path (str): The video.
+
+    Returns:
+        KeyframeIndex: The index (empty for files without video).
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails.
+    """
+    stat = os.stat(path)
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,pos,flags",
+        "-of",
+        "csv=p=0",
+        path,
+    ]
+    keyframes = []
+    gop_packets = array("q")
+    packet_count = 0
+    with trace_span("keyframe index", "subprocess", command=" ".join(command)) as span:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        for line in process.stdout:
+            pts_time, _, rest = line.strip().partition(",")
+            pos, _, flags = rest.partition(",")
+            packet_count += 1
+            seconds = _parse_float(pts_time)
+            if "K" in flags and seconds is not None:
+                keyframes.append((seconds, int(pos) if pos.isdigit() else -1))
+                gop_packets.append(0)
+            if gop_packets:
+                gop_packets[-1] += 1
+        returncode = process.wait()
+        span.set(exit_code=returncode, packets=packet_count, keyframes=len(keyframes))
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+
+    # Keyframes come in decode order; make sure lookups can bisect
+    order = sorted(range(len(keyframes)), key=lambda i: keyframes[i][0])
+    return KeyframeIndex(
+        array("d", (keyframes[i][0] for i in order)),
+        array("q", (keyframes[i][1] for i in order)),
+        array("q", (gop_packets[i] for i in order)),
+        packet_count=packet_count,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+    )
+
+
+def get_keyframe_index(path, data=None):
+    """
+    Returns the keyframe index of a video, building it only once per file version.
+
+    The index is kept in memory and stored next to the file as
+    `<path>.kfindex`, so later runs on the same cached download reuse it.
+
+    Args:
+        path (str): The video.
+        data (PipelineData): Optional; the keyframe times are also recorded on
+            the file's `MediaInfo` in `data.media`.
+
+    Returns:
+        KeyframeIndex: The index.
+    """
+    key = os.path.abspath(path)
+    with _lock:
+        index = _indexes.get(key)
+    if index is None or not index.is_current(path):
+        index = KeyframeIndex.load(f"{path}{INDEX_SUFFIX}")
+        if index is None or not index.is_current(path):
+            print(f"Indexing keyframes of {path}...")
+            index = build_keyframe_index(path)
+            index.save(f"{path}{INDEX_SUFFIX}")
+        with _lock:
+            _indexes[key] = index
+
+    info = data.media.get(path) if data is not None else None
+    if info is not None:
+        info.keyframes = index.times
+    return index
+
+
+def clear_keyframe_indexes():
+    with _lock:
+        _indexes.clear()
@@ -0,0 +1,88 @@
+import importlib
+import threading
+
+
+class LazyRegistry:
+    """
+    Maps names to "module:attribute" paths and imports them on first use.
+
+    Keeps heavy dependencies (yt-dlp, requests, httpx...) out of startup: a
+    module is only imported when something it provides is actually needed.
+    """
+
+    def __init__(self, entries=None):
+        """
+        Args:
+            entries (dict): Name -> "package.module:attribute".
+        """
+        self._entries = dict(entries or {})
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, path):
+        """
+        Adds or replaces an entry.
+
+        Args:
+            name (str): Name to look the object up by.
+            path (str): Where it lives, as "package.module:attribute".
+        """
+        with self._lock:
+            self._entries[name] = path
+            self._loaded.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __getitem__(self, name):
+        """
+        Imports (once) and returns the registered object.
+
+        Raises:
+            KeyError: If nothing is registered under `name`.
+        """
+        with self._lock:
+            if name not in self._loaded:
+                if name not in self._entries:
+                    raise KeyError(f"Nothing registered as {name!r}")
+                module_name, _, attribute = self._entries[name].partition(":")
+                module = importlib.import_module(module_name)
+                self._loaded[name] = getattr(module, attribute)
+            return self._loaded[name]
+
+    def names(self):
+        return list(self._entries)
+
+    def loaded(self, name):
+        """Returns True once `name` has been imported."""
+        return name in self._loaded
+
+    def create(self, name, *args, **kwargs):
+        """
+        Returns a placeholder that builds `registry[name](*args, **kwargs)` on
+        first attribute access, so nothing is imported until it's used.
+        """
+        return LazyInstance(lambda: self[name](*args, **kwargs))
+
+
+class LazyInstance:
+    """
+    Stands in for an object that is only constructed when first used.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        with self._lock:
+            if self._instance is None:
+                self._instance = self._factory()
+            return self._instance
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the placeholder itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._resolve(), name)
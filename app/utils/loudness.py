@@ -0,0 +1,267 @@
+import json
+import math
+import os
+import subprocess
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict
+from app.utils.checksums import read_checksum, sidecar_path
+from app.utils.commands import run_command
+
+# Measurements already taken, so re-runs and the weekly intro/outro skip analysis
+LOUDNESS_CACHE = "cache/loudness.json"
+
+# EBU R128 targets: -16 LUFS integrated, true peaks below -1 dBTP
+TARGET_I = -16.0
+TARGET_TP = -1.0
+TARGET_LRA = 11.0
+
+_measurements: Dict[str, "LoudnessMeasurement"] = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class LoudnessMeasurement:
+    """
+    What the `loudnorm` analysis pass measured, as needed by the apply pass.
+    """
+
+    input_i: float
+    input_tp: float
+    input_lra: float
+    input_thresh: float
+    target_offset: float
+
+    @classmethod
+    def from_loudnorm(cls, stats):
+        """
+        Builds a measurement from loudnorm's `print_format=json` output.
+        """
+        return cls(**{name: float(stats[name]) for name in cls.__dataclass_fields__})
+
+    @property
+    def usable(self):
+        """
+        Whether the values can drive a linear pass (silence measures as -inf).
+        """
+        return all(math.isfinite(value) for value in asdict(self).values())
+
+
+def _targets(target_i, target_tp, target_lra):
+    return f"I={target_i:g}:TP={target_tp:g}:LRA={target_lra:g}"
+
+
+def loudnorm_filter(
+    measurement=None, target_i=TARGET_I, target_tp=TARGET_TP, target_lra=TARGET_LRA
+):
+    """
+    Returns the `loudnorm` filter for the apply pass.
+
+    With a usable measurement this is a linear (constant gain) normalization;
+    without one, loudnorm's single-pass dynamic mode.
+
+    Args:
+        measurement (LoudnessMeasurement): Result of the analysis pass.
+        target_i (float): Integrated loudness target in LUFS.
+        target_tp (float): True peak ceiling in dBTP.
+        target_lra (float): Loudness range target in LU.
+
+    Returns:
+        str: The filter.
+    """
+    targets = _targets(target_i, target_tp, target_lra)
+    if measurement is None or not measurement.usable:
+        return f"loudnorm={targets}"
+    return (
+        f"loudnorm={targets}"
+        f":measured_I={measurement.input_i:.2f}"
+        f":measured_TP={measurement.input_tp:.2f}"
+        f":measured_LRA={measurement.input_lra:.2f}"
+        f":measured_thresh={measurement.input_thresh:.2f}"
+        f":offset={measurement.target_offset:.2f}"
+        ":linear=true"
+    )
+
+
+def _parse_loudnorm_stats(stderr):
+    start, end = stderr.rfind("{"), stderr.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("loudnorm printed no measurements")
+    return json.loads(stderr[start : end + 1])
+
+
+def measure_loudness(
+    path,
+    target_i=TARGET_I,
+    target_tp=TARGET_TP,
+    target_lra=TARGET_LRA,
+    analysis_sample_rate=None,
+):
+    """
+    Runs the `loudnorm` analysis pass over a file's first audio stream.
+
+    Only the audio is decoded and nothing is encoded or written.
+
+    Args:
+        path (str): The media file.
+        target_i (float): Integrated loudness target in LUFS.
+        target_tp (float): True peak ceiling in dBTP.
+        target_lra (float): Loudness range target in LU.
+        analysis_sample_rate (int): Resample to this rate before measuring, to
+            make the pass cheaper (default: measure at the native rate).
+
+    Returns:
+        LoudnessMeasurement: The measured values.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails.
+        ValueError: If loudnorm printed no measurements.
+    """
+    targets = _targets(target_i, target_tp, target_lra)
+    filters = [f"loudnorm={targets}:print_format=json"]
+    if analysis_sample_rate:
+        filters.insert(0, f"aresample={analysis_sample_rate}")
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        path,
+        "-map",
+        "0:a:0",
+        "-af",
+        ",".join(filters),
+        "-f",
+        "null",
+        "-",
+    ]
+    print(f"Measuring loudness: {path}")
+    result = run_command(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, command, stderr=result.stderr
+        )
+    return LoudnessMeasurement.from_loudnorm(_parse_loudnorm_stats(result.stderr))
+
+
+def meter_loudness(path, analysis_sample_rate=None):
+    """
+    Measures a file with the in-process BS.1770 meter instead of a `loudnorm`
+    pass: one decode to PCM and a little NumPy, several times cheaper than
+    loudnorm, which upsamples everything to 192 kHz before measuring.
+
+    The sample peak stands in for the true peak. It can read slightly low
+    (inter-sample peaks), which the 1 dB between the -1 dBTP target and full
+    scale absorbs.
+
+    Args:
+        path (str): The media file.
+        analysis_sample_rate (int): Decode at this rate (default: the file's
+            own). Lower rates drop the high frequencies K-weighting counts, so
+            the result reads low.
+
+    Returns:
+        LoudnessMeasurement: The measured values.
+    """
+    # NumPy/SciPy only load when a file is actually metered
+    from app.utils.loudness_meter import measure_loudness_series
+
+    print(f"Metering loudness: {path}")
+    series = measure_loudness_series(path, analysis_sample_rate)
+    return LoudnessMeasurement(
+        input_i=series.integrated,
+        input_tp=series.sample_peak,
+        input_lra=series.loudness_range,
+        input_thresh=series.threshold,
+        target_offset=0.0,
+    )
+
+
+def file_fingerprint(path):
+    """
+    Identifies a file's content: its recorded SHA-256 when the sidecar is
+    current (the same intro on every node), else its path, size and mtime.
+    """
+    stat = os.stat(path)
+    digest = read_checksum(path)
+    if digest and os.stat(sidecar_path(path)).st_mtime_ns >= stat.st_mtime_ns:
+        return f"sha256:{digest}"
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _store(cache_path, key, measurement):
+    measurements = _load_cache(cache_path)
+    measurements[key] = asdict(measurement)
+    directory = os.path.dirname(cache_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(measurements, f, indent=2, sort_keys=True)
+    os.replace(temp_path, cache_path)
+
+
+def get_loudness(
+    path,
+    target_i=TARGET_I,
+    target_tp=TARGET_TP,
+    target_lra=TARGET_LRA,
+    analysis_sample_rate=None,
+    cache_path=LOUDNESS_CACHE,
+    meter=False,
+):
+    """
+    Returns a file's loudness measurement, analysing it only once per content.
+
+    Measurements are kept in memory and in `cache_path` (a JSON file), keyed by
+    the file's fingerprint and the targets.
+
+    Args:
+        path (str): The media file.
+        target_i (float): Integrated loudness target in LUFS.
+        target_tp (float): True peak ceiling in dBTP.
+        target_lra (float): Loudness range target in LU.
+        analysis_sample_rate (int): See `measure_loudness`.
+        cache_path (str): JSON file of earlier measurements (None: memory only).
+        meter (bool): On a miss, measure with `meter_loudness` rather than a
+            `loudnorm` analysis pass.
+
+    Returns:
+        LoudnessMeasurement: The measured values.
+    """
+    key = f"{file_fingerprint(path)}|{_targets(target_i, target_tp, target_lra)}"
+    if analysis_sample_rate:
+        key += f"|{analysis_sample_rate}"
+    with _lock:
+        measurement = _measurements.get(key)
+        if measurement is None and cache_path:
+            stored = _load_cache(cache_path).get(key)
+            if stored:
+                measurement = _measurements[key] = LoudnessMeasurement(**stored)
+    if measurement is not None:
+        return measurement
+
+    if meter:
+        measurement = meter_loudness(path, analysis_sample_rate)
+    else:
+        measurement = measure_loudness(
+            path, target_i, target_tp, target_lra, analysis_sample_rate
+        )
+    with _lock:
+        _measurements[key] = measurement
+        if cache_path:
+            _store(cache_path, key, measurement)
+    return measurement
+
+
+def clear_loudness_cache():
+    with _lock:
+        _measurements.clear()
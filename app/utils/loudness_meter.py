@@ -0,0 +1,290 @@
+import math
+import subprocess
+from dataclasses import dataclass
+import numpy as np
+from scipy.signal import sosfilt
+from app.utils.media_probe import probe_media
+from app.utils.tracing import trace_span
+
+# Meter resolution: momentary and short-term loudness are reported every 100 ms
+STEP_SECONDS = 0.1
+MOMENTARY_STEPS = 4  # 400 ms
+SHORT_TERM_STEPS = 30  # 3 s
+
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+LRA_RELATIVE_GATE = -20.0
+
+# Seconds of audio decoded per block
+DECODE_BLOCK_SECONDS = 10.0
+
+# BS.1770 channel weights by position in ffmpeg's 5.1 layout (LFE is ignored)
+SURROUND_WEIGHTS = [1.0, 1.0, 1.0, 0.0, 1.41, 1.41]
+
+
+def k_weighting(sample_rate):
+    """
+    Returns the BS.1770 K-weighting filter for `sample_rate` as second-order
+    sections: the head-related high shelf, then the RLB high-pass.
+
+    The coefficients are derived from the analogue prototypes, so any sample
+    rate works (at 48 kHz they match the tables in the standard).
+    """
+    # High shelf, +4 dB above ~1.7 kHz
+    k = math.tan(math.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh**0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = [
+        (vh + vb * k / q + k * k) / a0,
+        2 * (k * k - vh) / a0,
+        (vh - vb * k / q + k * k) / a0,
+        1.0,
+        2 * (k * k - 1) / a0,
+        (1 - k / q + k * k) / a0,
+    ]
+
+    # High-pass at ~38 Hz
+    k = math.tan(math.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    high_pass = [1.0, -2.0, 1.0, 1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+    return np.array([shelf, high_pass])
+
+
+def channel_weights(channels):
+    if channels == 6:
+        return np.array(SURROUND_WEIGHTS)
+    return np.ones(channels)
+
+
+def _to_lufs(mean_square):
+    with np.errstate(divide="ignore"):
+        return -0.691 + 10 * np.log10(mean_square)
+
+
+def _windowed(step_powers, steps):
+    """
+    Mean power over sliding windows of `steps` steps, one window per step.
+    """
+    if len(step_powers) < steps:
+        return np.empty(0)
+    cumulative = np.concatenate(([0.0], np.cumsum(step_powers)))
+    return (cumulative[steps:] - cumulative[:-steps]) / steps
+
+
+def _gated_loudness(powers, relative_gate):
+    """
+    Applies the absolute and relative gates to block powers.
+
+    Returns:
+        tuple: (gated blocks' loudness, relative threshold), or (-inf, -inf).
+    """
+    powers = powers[_to_lufs(powers) > ABSOLUTE_GATE]
+    if not len(powers):
+        return float("-inf"), float("-inf")
+    threshold = float(_to_lufs(powers.mean())) + relative_gate
+    gated = powers[_to_lufs(powers) > threshold]
+    return float(_to_lufs(gated.mean())), threshold
+
+
+@dataclass
+class LoudnessSeries:
+    """
+    Loudness of a file over time, as measured by `LoudnessMeter`.
+
+    `momentary` and `short_term` have one value (LUFS) per 100 ms step, for
+    the 400 ms or 3 s window starting at that step.
+    """
+
+    sample_rate: int
+    momentary: "np.ndarray"
+    short_term: "np.ndarray"
+    integrated: float
+    threshold: float
+    loudness_range: float
+    sample_peak: float
+    step_seconds: float = STEP_SECONDS
+
+    @property
+    def duration(self):
+        return (len(self.momentary) + MOMENTARY_STEPS - 1) * self.step_seconds
+
+    def times(self, values):
+        """
+        Returns the start time in seconds of each window in `values`
+        (`momentary` or `short_term`).
+        """
+        return np.arange(len(values)) * self.step_seconds
+
+    def summary(self):
+        return {
+            "integrated_lufs": round(self.integrated, 2),
+            "loudness_range_lu": round(self.loudness_range, 2),
+            "threshold_lufs": round(self.threshold, 2),
+            "sample_peak_dbfs": round(self.sample_peak, 2),
+        }
+
+
+class LoudnessMeter:
+    """
+    ITU-R BS.1770 / EBU R128 loudness meter over blocks of PCM samples.
+
+    Feed it float samples (frames x channels) in blocks of any size; it
+    K-weights them, keeps one mean-square value per 100 ms step and derives the
+    momentary (400 ms), short-term (3 s), integrated and range measurements
+    from those when `result` is called. Memory grows by one float per step.
+    """
+
+    def __init__(self, sample_rate, channels):
+        """
+        Args:
+            sample_rate (int): Sample rate in Hz.
+            channels (int): Number of channels.
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._sos = k_weighting(sample_rate)
+        self._zi = np.zeros((self._sos.shape[0], 2, channels))
+        self._weights = channel_weights(channels)
+        self._step_samples = int(round(sample_rate * STEP_SECONDS))
+        self._pending = np.empty((0, channels))
+        self._steps = []
+        self._peak = 0.0
+
+    def add(self, samples):
+        """
+        Meters a block of samples.
+
+        Args:
+            samples (np.ndarray): Float samples, shape (frames, channels).
+        """
+        if not len(samples):
+            return
+        self._peak = max(self._peak, float(np.abs(samples).max()))
+        filtered, self._zi = sosfilt(self._sos, samples, axis=0, zi=self._zi)
+        filtered = np.concatenate((self._pending, filtered))
+
+        whole_steps = len(filtered) // self._step_samples
+        used = whole_steps * self._step_samples
+        if whole_steps:
+            squares = filtered[:used].reshape(whole_steps, self._step_samples, -1) ** 2
+            self._steps.append(squares.mean(axis=1) @ self._weights)
+        self._pending = filtered[used:]
+
+    def result(self):
+        """
+        Returns:
+            LoudnessSeries: The measurements for everything added so far.
+        """
+        steps = np.concatenate(self._steps) if self._steps else np.empty(0)
+        momentary = _windowed(steps, MOMENTARY_STEPS)
+        short_term = _windowed(steps, SHORT_TERM_STEPS)
+
+        integrated, threshold = _gated_loudness(momentary, RELATIVE_GATE)
+
+        loudness_range = 0.0
+        if len(short_term):
+            short_term_powers = short_term[_to_lufs(short_term) > ABSOLUTE_GATE]
+            if len(short_term_powers):
+                gate = float(_to_lufs(short_term_powers.mean())) + LRA_RELATIVE_GATE
+                values = _to_lufs(short_term_powers)
+                values = values[values > gate]
+                if len(values):
+                    low, high = np.percentile(values, [10, 95])
+                    loudness_range = float(high - low)
+
+        with np.errstate(divide="ignore"):
+            sample_peak = float(20 * np.log10(self._peak))
+        return LoudnessSeries(
+            sample_rate=self.sample_rate,
+            momentary=_to_lufs(momentary),
+            short_term=_to_lufs(short_term),
+            integrated=integrated,
+            threshold=threshold,
+            loudness_range=loudness_range,
+            sample_peak=sample_peak,
+        )
+
+
+def decode_pcm(path, sample_rate, channels, block_seconds=DECODE_BLOCK_SECONDS):
+    """
+    Decodes a file's first audio stream once, yielding float32 NumPy blocks.
+
+    ffmpeg writes raw samples to a pipe, so only one block is in memory at a
+    time.
+
+    Args:
+        path (str): The media file.
+        sample_rate (int): Rate to decode at.
+        channels (int): Channels to decode to.
+        block_seconds (float): Seconds of audio per block.
+
+    Yields:
+        np.ndarray: Samples, shape (frames, channels).
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails.
+    """
+    command = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        path,
+        "-map",
+        "0:a:0",
+        "-f",
+        "f32le",
+        "-ac",
+        str(channels),
+        "-ar",
+        str(sample_rate),
+        "-",
+    ]
+    frame_bytes = 4 * channels
+    block_bytes = int(block_seconds * sample_rate) * frame_bytes
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    try:
+        while True:
+            chunk = process.stdout.read(block_bytes)
+            if not chunk:
+                break
+            usable = len(chunk) - len(chunk) % frame_bytes
+            yield np.frombuffer(chunk[:usable], dtype="<f4").reshape(-1, channels)
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+
+
+def measure_loudness_series(path, sample_rate=None):
+    """
+    Meters a whole file in process and returns its loudness over time.
+
+    Args:
+        path (str): The media file.
+        sample_rate (int): Rate to decode at (default: the file's own rate).
+
+    Returns:
+        LoudnessSeries: Momentary/short-term series and the summary values.
+
+    Raises:
+        ValueError: If the file has no audio stream.
+    """
+    audio = probe_media(path).audio
+    if audio is None:
+        raise ValueError(f"No audio stream in {path}")
+    sample_rate = sample_rate or audio.sample_rate or 48000
+    channels = audio.channels or 2
+
+    with trace_span("loudness meter", "analysis", path=path) as span:
+        meter = LoudnessMeter(sample_rate, channels)
+        for block in decode_pcm(path, sample_rate, channels):
+            meter.add(block)
+        series = meter.result()
+        span.set(**series.summary())
+    return series
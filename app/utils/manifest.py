@@ -0,0 +1,130 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.utils.checksums import (
+    SIDECAR_SUFFIX,
+    read_checksum,
+    sha256_file,
+    verify_checksum,
+)
+from app.utils.media_probe import probe_media
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _media_summary(path):
+    try:
+        return probe_media(path, exact=True).summary()
+    except ValueError:
+        # Not a media file ffprobe understands
+        return None
+
+
+def manifest_entry(path, role, sha256=None):
+    """
+    Describes one artifact for the manifest.
+
+    Args:
+        path (str): The file.
+        role (str): What it is to the job, e.g. "source" or "output".
+        sha256 (str): Its digest, if it was computed while the file was written.
+            Otherwise its `.sha256` sidecar is used, or the file is hashed now.
+
+    Returns:
+        dict: `path`, `role`, `bytes`, `sha256` and `media` (see
+            `MediaInfo.summary`; from ffprobe, memoized per file version).
+    """
+    return {
+        "path": path,
+        "role": role,
+        "bytes": os.path.getsize(path),
+        "sha256": sha256 or read_checksum(path) or sha256_file(path),
+        "media": _media_summary(path),
+    }
+
+
+def write_manifest(manifest_path, entries, job=None):
+    """
+    Writes the per-job integrity manifest (atomically).
+
+    Args:
+        manifest_path (str): Where to write it, e.g. "output/sermon/2025-02-02.manifest.json".
+        entries (list[dict]): Artifacts, as returned by `manifest_entry`.
+        job (dict): Optional job details (stream id, date, media type...).
+
+    Returns:
+        dict: The manifest.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "job": job or {},
+        "artifacts": entries,
+    }
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = f"{manifest_path}.part"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def find_artifacts(roots):
+    """
+    Collects every file with a known digest under the given directories.
+
+    Digests come from `*.manifest.json` files (which also know the size) and
+    from `.sha256` sidecars.
+
+    Args:
+        roots (list[str]): Directories to search, e.g. ["cache", "output"].
+
+    Returns:
+        dict: Path -> (sha256, bytes or None).
+    """
+    artifacts = {}
+    manifests = []
+    for root in roots:
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if filename.endswith(MANIFEST_SUFFIX):
+                    manifests.append(path)
+                elif filename.endswith(SIDECAR_SUFFIX):
+                    target = path[: -len(SIDECAR_SUFFIX)]
+                    artifacts.setdefault(target, (read_checksum(target), None))
+
+    # Manifests also know the size, so a truncated file fails without a read
+    for manifest_path in manifests:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        for entry in manifest.get("artifacts", []):
+            # Cached sources may have been cleaned up since; outputs must exist
+            if entry.get("role") == "output" or os.path.exists(entry["path"]):
+                artifacts[entry["path"]] = (entry["sha256"], entry.get("bytes"))
+    return artifacts
+
+
+def verify_artifacts(roots, max_workers=None):
+    """
+    Re-hashes every known artifact under `roots` in parallel.
+
+    Files are streamed in chunks, never loaded whole. hashlib releases the GIL
+    while hashing, so the worker threads use all cores.
+
+    Args:
+        roots (list[str]): Directories to check.
+        max_workers (int): Files hashed at once (default: one per CPU).
+
+    Returns:
+        list[dict]: One `verify_checksum` result per artifact, sorted by path.
+    """
+    artifacts = find_artifacts(roots)
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        results = executor.map(
+            lambda item: verify_checksum(item[0], item[1][0], item[1][1]),
+            sorted(artifacts.items()),
+        )
+        return list(results)
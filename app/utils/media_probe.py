@@ -0,0 +1,133 @@
+import json
+import os
+import subprocess
+import threading
+from typing import Dict
+from app.data_models.media_info import MediaInfo
+from app.utils.commands import run_command
+
+# Absolute path -> what we know about the file, for as long as it is unchanged
+_media_cache: Dict[str, MediaInfo] = {}
+_lock = threading.Lock()
+
+
+def _stamp(info: MediaInfo, stat):
+    info.size = stat.st_size
+    info.mtime_ns = stat.st_mtime_ns
+    return info
+
+
+def _is_current(info: MediaInfo, stat, exact=False):
+    if exact and not info.probed:
+        return False
+    return info.size == stat.st_size and info.mtime_ns == stat.st_mtime_ns
+
+
+def _run_ffprobe(path):
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_format",
+        "-show_streams",
+        "-of",
+        "json",
+        path,
+    ]
+    try:
+        result = run_command(command, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError:
+        raise ValueError(f"Invalid or unsupported media file: {path}")
+    return json.loads(result.stdout)
+
+
+def probe_media(path, exact=False) -> MediaInfo:
+    """
+    Returns a file's `MediaInfo`, running ffprobe at most once per file version.
+
+    Results are memoized per path, size and mtime, so a file that hasn't
+    changed is never probed twice, whichever step asks.
+
+    Args:
+        path (str): The media file.
+        exact (bool): Ignore details derived by a step and probe the file itself.
+
+    Returns:
+        MediaInfo: The file's details.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+        ValueError: If ffprobe can't read it.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(path)
+    with _lock:
+        info = _media_cache.get(key)
+    if info is not None and _is_current(info, stat, exact):
+        return info
+
+    info = _stamp(MediaInfo.from_ffprobe(path, _run_ffprobe(path)), stat)
+    with _lock:
+        _media_cache[key] = info
+    return info
+
+
+def remember_media(info: MediaInfo):
+    """
+    Stores details a step already knows about a file it wrote, so nothing has
+    to probe it. The file must exist.
+
+    Args:
+        info (MediaInfo): The details, e.g. from `MediaInfo.derive`.
+
+    Returns:
+        MediaInfo: The stored details, stamped with the file's size and mtime.
+    """
+    info = _stamp(info, os.stat(info.path))
+    with _lock:
+        _media_cache[os.path.abspath(info.path)] = info
+    return info
+
+
+def forget_media(path):
+    with _lock:
+        _media_cache.pop(os.path.abspath(path), None)
+
+
+def clear_media_cache():
+    with _lock:
+        _media_cache.clear()
+
+
+def get_media_info(data, path, exact=False) -> MediaInfo:
+    """
+    Returns a file's `MediaInfo` from the pipeline data, probing only if needed.
+
+    Args:
+        data (PipelineData): Current pipeline data; the result is attached to
+            `data.media` so later steps (and the manifest) reuse it.
+        path (str): The media file.
+        exact (bool): Don't settle for details derived by a step.
+
+    Returns:
+        MediaInfo: The file's details.
+    """
+    info = data.media.get(path) if data is not None else None
+    if info is None or not _is_current(info, os.stat(path), exact):
+        info = probe_media(path, exact=exact)
+    if data is not None:
+        data.media[path] = info
+    return info
+
+
+def attach_media(data, info: MediaInfo):
+    """
+    Records details a step knows about its output, on `data` and in the memo.
+
+    Returns:
+        MediaInfo: The stored details.
+    """
+    info = remember_media(info)
+    if data is not None:
+        data.media[info.path] = info
+    return info
@@ -0,0 +1,165 @@
+import os
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    start_http_server,
+    write_to_textfile,
+)
+from app.utils.observers import PipelineObserver
+
+# Steps range from instant bookkeeping to hour-long encodes
+STEP_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+
+class MetricsObserver(PipelineObserver):
+    """
+    Turns pipeline events into Prometheus metrics.
+
+    The metrics can be scraped from an HTTP endpoint (`serve`) and/or written
+    to a file for node_exporter's textfile collector after every job.
+    """
+
+    def __init__(self, textfile_path=None, registry=None):
+        """
+        Args:
+            textfile_path (str): If set, write the metrics here (Prometheus text
+                format) whenever a job finishes or fails.
+            registry (CollectorRegistry): Registry to use (default: a new one).
+        """
+        super().__init__()
+        self.textfile_path = textfile_path
+        self.registry = registry or CollectorRegistry()
+
+        self.step_duration = Histogram(
+            "sermon_step_duration_seconds",
+            "Wall-clock duration of pipeline steps.",
+            ["pipeline", "step"],
+            buckets=STEP_DURATION_BUCKETS,
+            registry=self.registry,
+        )
+        self.step_failures = Counter(
+            "sermon_step_failures",
+            "Pipeline steps that raised.",
+            ["pipeline", "step"],
+            registry=self.registry,
+        )
+        self.jobs = Counter(
+            "sermon_jobs",
+            "Finished pipeline jobs by outcome.",
+            ["pipeline", "status"],
+            registry=self.registry,
+        )
+        self.active_jobs = Gauge(
+            "sermon_active_jobs",
+            "Pipeline jobs currently running.",
+            ["pipeline"],
+            registry=self.registry,
+        )
+        self.last_job_timestamp = Gauge(
+            "sermon_last_job_timestamp_seconds",
+            "Unix time the last job of each outcome ended.",
+            ["pipeline", "status"],
+            registry=self.registry,
+        )
+        self.last_job_duration = Gauge(
+            "sermon_last_job_duration_seconds",
+            "Duration of the last job.",
+            ["pipeline"],
+            registry=self.registry,
+        )
+        self.downloaded_bytes = Counter(
+            "sermon_downloaded_bytes",
+            "Bytes downloaded from YouTube/S3 (cache misses).",
+            registry=self.registry,
+        )
+        self.cache_lookups = Counter(
+            "sermon_cache_lookups",
+            "Download cache lookups by result.",
+            ["result"],
+            registry=self.registry,
+        )
+        self.cache_hit_ratio = Gauge(
+            "sermon_cache_hit_ratio",
+            "Share of download cache lookups that were hits.",
+            registry=self.registry,
+        )
+        self.ffmpeg_speed = Gauge(
+            "sermon_ffmpeg_speed_ratio",
+            "Latest ffmpeg encode speed (media seconds per second).",
+            registry=self.registry,
+        )
+        self._cache_hits = 0
+        self._cache_lookups = 0
+
+    def serve(self, port, addr="0.0.0.0"):
+        """
+        Exposes the metrics on `http://<addr>:<port>/metrics` from a daemon thread.
+        """
+        start_http_server(port, addr=addr, registry=self.registry)
+
+    def write_textfile(self):
+        if not self.textfile_path:
+            return
+        directory = os.path.dirname(self.textfile_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written to a temp file and renamed, so the collector never sees half a file
+        write_to_textfile(self.textfile_path, self.registry)
+
+    def on_job_started(self, job, pipeline, config=None):
+        self.active_jobs.labels(pipeline).inc()
+
+    def _job_ended(self, pipeline, status, elapsed_seconds):
+        self.active_jobs.labels(pipeline).dec()
+        self.jobs.labels(pipeline, status).inc()
+        self.last_job_timestamp.labels(pipeline, status).set_to_current_time()
+        self.last_job_duration.labels(pipeline).set(elapsed_seconds)
+        self.write_textfile()
+
+    def on_job_finished(self, job, pipeline, elapsed_seconds):
+        self._job_ended(pipeline, "success", elapsed_seconds)
+
+    def on_job_failed(self, job, pipeline, error, elapsed_seconds):
+        self._job_ended(pipeline, "failure", elapsed_seconds)
+
+    def on_step_finished(self, job, pipeline, step, elapsed_seconds, data):
+        self.step_duration.labels(pipeline, step).observe(elapsed_seconds)
+
+    def on_step_failed(self, job, pipeline, step, error, elapsed_seconds):
+        self.step_duration.labels(pipeline, step).observe(elapsed_seconds)
+        self.step_failures.labels(pipeline, step).inc()
+
+    def on_ffmpeg_progress(self, progress):
+        if progress.speed is not None:
+            self.ffmpeg_speed.set(progress.speed)
+
+    def on_cache_lookup(self, url, hit, shared=False):
+        self.cache_lookups.labels("hit" if hit else "miss").inc()
+        self._cache_lookups += 1
+        self._cache_hits += 1 if hit else 0
+        self.cache_hit_ratio.set(self._cache_hits / self._cache_lookups)
+
+    def on_download_finished(self, url, size_bytes):
+        self.downloaded_bytes.inc(size_bytes or 0)
+
+
+def create_metrics_observer(metrics_conf):
+    """
+    Creates a metrics observer from the optional `metrics` config section.
+
+    Args:
+        metrics_conf (dict): `textfile` (path for the textfile collector) and/or
+            `port` (serve /metrics over HTTP), or None.
+
+    Returns:
+        MetricsObserver: The observer, or None if metrics aren't configured.
+    """
+    if not metrics_conf:
+        return None
+
+    observer = MetricsObserver(textfile_path=metrics_conf.get("textfile"))
+    if metrics_conf.get("port"):
+        observer.serve(metrics_conf["port"])
+    return observer
@@ -1,4 +1,5 @@
-import subprocess
+from app.utils.ffmpeg import run_ffmpeg
+from app.utils.loudness import LOUDNESS_CACHE, get_loudness, loudnorm_filter
 
 
 def normalize_audio(
@@ -7,20 +8,43 @@ def normalize_audio(
     codec="pcm_s16le",
     sample_rate=44100,
     ffmpeg_loglevel="info",
+    duration=None,
+    two_pass=True,
+    analysis_sample_rate=None,
+    loudness_cache=LOUDNESS_CACHE,
+    meter=False,
 ):
     """
     Normalize audio file with consistent loudness, sample rate, and format.
 
+    With `two_pass`, the input's loudness is measured first (or taken from the
+    measurement cache) and applied as a linear gain, so every file lands on the
+    same -16 LUFS target. Otherwise loudnorm runs in its single-pass dynamic mode.
+
     Args:
         input_path (str): Path to input audio file
         output_path (str): Path for output audio file
         codec (str): Audio codec to use (default: pcm_s16le)
         sample_rate (int): Sample rate in Hz (default: 44100)
+        duration (float): Input duration in seconds, for progress and ETA
+        two_pass (bool): Measure first and normalize linearly (default: True)
+        analysis_sample_rate (int): Resample to this rate for the measurement pass
+        loudness_cache (str): JSON file of earlier measurements
+        meter (bool): Measure with the in-process meter instead of a loudnorm
+            analysis pass (see `meter_loudness`)
     """
+    measurement = None
+    if two_pass:
+        measurement = get_loudness(
+            input_path,
+            analysis_sample_rate=analysis_sample_rate,
+            cache_path=loudness_cache,
+            meter=meter,
+        )
 
     # Add loudnorm filter to normalize perceived loudness
     filter_chain = [
-        "loudnorm=I=-16:TP=-1:LRA=11:linear=true"  # Target -16 lu's, prevent true peaks above -1dB
+        loudnorm_filter(measurement)  # Target -16 lu's, prevent true peaks above -1dB
     ]
 
     command = [
@@ -43,4 +67,4 @@ def normalize_audio(
     ]
 
     print(f"Normalizing audio file: {input_path} -> {output_path}")
-    subprocess.run(command, check=True)
+    run_ffmpeg(command, duration=duration)
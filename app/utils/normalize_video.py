@@ -1,11 +1,13 @@
-import subprocess
 from colorama import Fore, Style
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.resource_scheduler import get_scheduler, split_slots
+from app.utils.ffmpeg import run_ffmpeg
 
 
 def normalize_video(
     input_path,
     output_path,
-    codec="libx264",
+    profile=None,
     resolution="1920x1080",
     frame_rate=30,
     audio_codec="aac",
@@ -13,6 +15,9 @@ def normalize_video(
     audio_channels=2,
     audio_bitrate="192k",
     ffmpeg_loglevel="info",
+    cpu_slots=None,
+    duration=None,
+    extra_outputs=(),
 ):
     """
     Normalize video file to consistent resolution, frame rate, and audio settings.
@@ -20,45 +25,103 @@ def normalize_video(
     Args:
         input_path (str): Path to input video file.
         output_path (str): Path for output video file.
-        codec (str): Video codec to use (default: libx264).
+        profile (EncoderProfile): Video encoder settings (default: the "publish" profile).
         resolution (str): Target resolution for the output video (default: 1920x1080).
         frame_rate (int): Target frame rate for the output video (default: 30).
         audio_codec (str): Audio codec to use (default: aac).
         audio_sample_rate (int): Target audio sample rate (default: 44100 Hz).
         audio_channels (int): Number of audio channels (default: 2 for stereo).
         audio_bitrate (str): Target audio bitrate (default: 192k).
+        cpu_slots (int): CPU slots reserved for the encode (default: the scheduler's
+            per-encode budget).
+        duration (float): Input duration in seconds, for progress and ETA.
+        extra_outputs (list[tuple]): `(output_path, resolution, profile)` for
+            further renditions of the same input. The input is decoded once and
+            its frames split between the encoders; `profile` None means `profile`.
+            The encoders share the CPU budget's threads by frame size.
     """
 
-    # Construct the ffmpeg command
-    command = [
-        "ffmpeg",
-        "-loglevel",
-        ffmpeg_loglevel,
-        "-hide_banner",
-        "-i",
-        input_path,
-        "-vf",
-        f"scale={resolution},fps={frame_rate}",
-        "-crf",
-        "16",
-        "-preset",
-        "ultrafast",
-        "-c:v",
-        codec,
-        "-c:a",
-        audio_codec,
-        "-ar",
-        str(audio_sample_rate),
-        "-ac",
-        str(audio_channels),
-        "-b:a",
-        audio_bitrate,
-        output_path,
-    ]
+    profile = profile or get_encoder_profile()
+    if extra_outputs:
+        # Every encoder needs at least one thread of its own
+        cpu_slots = max(
+            cpu_slots or get_scheduler().slots_per_encode, 1 + len(extra_outputs)
+        )
 
-    print(
-        Fore.GREEN
-        + f"Normalizing video file: {input_path} -> {output_path}"
-        + Style.RESET_ALL
-    )
-    subprocess.run(command, check=True)
+    # Wait for a CPU budget so concurrent encodes don't oversubscribe the node
+    with get_scheduler().reserve(cpu_slots) as budget:
+        # Construct the ffmpeg command
+        audio_args = [
+            "-c:a",
+            audio_codec,
+            "-ar",
+            str(audio_sample_rate),
+            "-ac",
+            str(audio_channels),
+            "-b:a",
+            audio_bitrate,
+        ]
+        command = [
+            "ffmpeg",
+            *budget.global_args(),
+            "-loglevel",
+            ffmpeg_loglevel,
+            "-hide_banner",
+            "-i",
+            input_path,
+        ]
+        if extra_outputs:
+            # One decode and frame rate conversion, scaled once per rendition
+            outputs = [
+                (output_path, resolution, profile),
+                *(
+                    (path, size, extra_profile or profile)
+                    for path, size, extra_profile in extra_outputs
+                ),
+            ]
+            labels = "".join(f"[s{i}]" for i in range(len(outputs)))
+            filters = [f"[0:v]fps={frame_rate},split={len(outputs)}{labels}"]
+            filters.extend(
+                f"[s{i}]scale={size}[v{i}]" for i, (_, size, _) in enumerate(outputs)
+            )
+            command.extend(["-filter_complex", ";".join(filters)])
+            # The encoders share the reservation, by frame size
+            threads = split_slots(
+                budget.threads,
+                [
+                    int(width) * int(height)
+                    for width, height in (size.split("x") for _, size, _ in outputs)
+                ],
+            )
+            # The main output stays last, as the budget flags expect
+            for i, (path, _, output_profile) in reversed(list(enumerate(outputs))):
+                command.extend(
+                    [
+                        "-map",
+                        f"[v{i}]",
+                        "-map",
+                        "0:a?",
+                        *output_profile.ffmpeg_args(),
+                        *audio_args,
+                        *budget.output_args(threads[i]),
+                        path,
+                    ]
+                )
+        else:
+            command.extend(
+                [
+                    "-vf",
+                    f"scale={resolution},fps={frame_rate}",
+                    *profile.ffmpeg_args(),
+                    *audio_args,
+                    *budget.output_args(),
+                    output_path,
+                ]
+            )
+
+        print(
+            Fore.GREEN
+            + f"Normalizing video file: {input_path} -> {output_path}"
+            + Style.RESET_ALL
+        )
+        run_ffmpeg(budget.wrap(command), duration=duration)
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, is_dataclass
+from app.utils.loudness import file_fingerprint
+
+
+def _plain(value):
+    return asdict(value) if is_dataclass(value) else str(value)
+
+
+def settings_key(path, settings):
+    """
+    Returns a short key for normalizing `path` with `settings`.
+
+    The key covers the input's content (see `file_fingerprint`) and every
+    setting, so changing the codec, size, frame rate or loudness mode gives a
+    new key instead of reusing a file encoded the old way.
+
+    Args:
+        path (str): The input file.
+        settings (dict): Everything the normalized output depends on.
+    """
+    key = json.dumps(
+        {"input": file_fingerprint(path), "settings": settings},
+        sort_keys=True,
+        default=_plain,
+    )
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def normalized_file(path, ext, settings, name=None):
+    """
+    Returns where the normalized version of `path` goes, e.g.
+    `intro_normalized.<key>.mp4`, or `intro_normalized.720p.<key>.mp4` for a
+    named rendition. The same path doubles as the shared cache key.
+
+    Args:
+        path (str): The input file.
+        ext (str): Extension of the normalized file.
+        settings (dict): Everything the normalized output depends on.
+        name (str): Optional rendition name.
+    """
+    base, _ = os.path.splitext(path)
+    label = f"{name}." if name else ""
+    return f"{base}_normalized.{label}{settings_key(path, settings)}.{ext}"
+
+
+def trimmed_file(path, settings):
+    """
+    Returns where the cut of `path` goes, e.g. `sermon_trimmed.<key>.mp4`,
+    keyed like `normalized_file` so a different trim window never reuses an
+    old cut, locally or from the shared cache.
+
+    Args:
+        path (str): The input file.
+        settings (dict): The requested window and how it is resolved.
+    """
+    base, ext = os.path.splitext(path)
+    return f"{base}_trimmed.{settings_key(path, settings)}{ext}"
@@ -1,5 +1,15 @@
 # app/utils/observers.py
+import contextvars
+import threading
+from colorama import Fore, Style
+
+
 class PipelineObserver:
+    """
+    Receives pipeline events. Subclasses override the hooks they care about;
+    every hook is a no-op by default, except that finished steps are logged.
+    """
+
     def __init__(self):
         self.logs = []
 
@@ -13,3 +23,109 @@ class PipelineObserver:
         """
         self.logs.append(f"Step: {step_name}, Data: {data}")
         print(f"LOG: Step '{step_name}' completed. Data state: {data}")
+
+    def on_job_started(self, job, pipeline, config=None):
+        pass
+
+    def on_job_finished(self, job, pipeline, elapsed_seconds):
+        pass
+
+    def on_job_failed(self, job, pipeline, error, elapsed_seconds):
+        pass
+
+    def on_step_started(self, job, pipeline, step):
+        pass
+
+    def on_step_finished(self, job, pipeline, step, elapsed_seconds, data):
+        self.log(step, data)
+
+    def on_step_failed(self, job, pipeline, step, error, elapsed_seconds):
+        pass
+
+    def on_ffmpeg_progress(self, progress):
+        pass
+
+    def on_cache_lookup(self, url, hit, shared=False):
+        pass
+
+    def on_download_finished(self, url, size_bytes):
+        pass
+
+
+class EventBus:
+    """
+    Fans pipeline events out to the subscribed observers.
+
+    A failing observer is reported and skipped; metrics must never break a run.
+    """
+
+    def __init__(self):
+        self._observers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, observer: PipelineObserver):
+        with self._lock:
+            if observer not in self._observers:
+                self._observers.append(observer)
+
+    def unsubscribe(self, observer: PipelineObserver):
+        with self._lock:
+            if observer in self._observers:
+                self._observers.remove(observer)
+
+    def emit(self, event, **payload):
+        """
+        Calls `on_<event>(**payload)` on every subscribed observer.
+
+        Args:
+            event (str): Event name, e.g. "step_finished".
+            **payload: The hook's keyword arguments.
+        """
+        with self._lock:
+            observers = list(self._observers)
+
+        for observer in observers:
+            try:
+                getattr(observer, f"on_{event}")(**payload)
+            except Exception as e:
+                print(
+                    Fore.RED
+                    + f"Observer {type(observer).__name__} failed on {event}: {e}"
+                    + Style.RESET_ALL
+                )
+
+
+_event_bus = EventBus()
+
+# The job whose step is running; lets observers attribute events raised deep in
+# the steps (cache lookups, ffmpeg progress) when several jobs run at once
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+def get_event_bus():
+    return _event_bus
+
+
+def emit(event, **payload):
+    """
+    Publishes an event on the process-wide bus (cheap when nobody listens).
+    """
+    _event_bus.emit(event, **payload)
+
+
+def set_current_job(job):
+    """
+    Marks `job` as the one running in this context (thread/task).
+
+    Returns:
+        contextvars.Token: Pass to `reset_current_job` when the job ends.
+    """
+    return _current_job.set(job)
+
+
+def reset_current_job(token):
+    _current_job.reset(token)
+
+
+def get_current_job():
+    return _current_job.get()
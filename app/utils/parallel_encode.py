@@ -0,0 +1,74 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from colorama import Fore, Style
+from app.utils.ffmpeg import set_cancel_event
+
+
+def _run_cancellable(encode, cancel):
+    # Runs in a copied context, so the event only applies to this encode
+    set_cancel_event(cancel)
+    return encode()
+
+
+def run_encodes(encodes, keep=()):
+    """
+    Runs independent encodes (e.g. the intro, main and outro normalizations)
+    side by side and waits for all of them.
+
+    Each encode reserves its own CPU slots from the resource scheduler, so the
+    pool never oversubscribes the node; it only removes the wait for one encode
+    to finish before the next can start. Each callable should do everything that
+    belongs to its output (e.g. pushing it to the shared cache) so that happens
+    as soon as that output is ready.
+
+    If any encode fails, encodes that haven't started are cancelled, running
+    ffmpeg processes are killed (see `set_cancel_event`) rather than left to
+    finish a long encode nobody will use, and the outputs of the batch are
+    removed so no partial file is mistaken for a finished one later.
+
+    Args:
+        encodes (list[tuple[str, callable]]): (output path, function) pairs.
+        keep (iterable[str]): Outputs to keep if their own encode succeeded,
+            e.g. shared intro/outro files that may still be uploading.
+
+    Raises:
+        Exception: The first error raised by an encode.
+    """
+    if not encodes:
+        return
+
+    cancel = threading.Event()
+    with ThreadPoolExecutor(
+        max_workers=len(encodes), thread_name_prefix="encode"
+    ) as executor:
+        futures = {
+            # Each thread gets its own copy of the job/tracing context
+            executor.submit(
+                contextvars.copy_context().run, _run_cancellable, encode, cancel
+            ): output_path
+            for output_path, encode in encodes
+        }
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = [f for f in done if f.exception() is not None]
+        if not failed:
+            return
+
+        cancel.set()
+        for future in pending:
+            future.cancel()
+        wait(pending)
+
+    for future, output_path in futures.items():
+        succeeded = future.done() and not future.cancelled() and not future.exception()
+        if succeeded and output_path in keep:
+            continue
+        if os.path.exists(output_path):
+            os.remove(output_path)
+    print(
+        Fore.RED
+        + f"Encoding {futures[failed[0]]} failed; removed the outputs of this batch."
+        + Style.RESET_ALL
+    )
+    raise failed[0].exception()
@@ -0,0 +1,369 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_PROFILE_DIR = "output/profiles"
+
+# How many functions/allocation sites the summary lists
+TOP_N = 25
+
+# `-benchmark_all`: "bench:   1946 user   0 sys   1991 real encode_audio 0.1"
+# (microseconds spent in one decode/encode/flush call for stream file:index)
+_STAGE_LINE = re.compile(
+    r"^bench:\s+(\d+) user\s+(\d+) sys\s+(\d+) real (\w+) (\S+)\s*$"
+)
+# `-benchmark`: "bench: utime=0.012s stime=0.001s rtime=0.013s"
+_TOTAL_LINE = re.compile(r"^bench: utime=([\d.]+)s stime=([\d.]+)s rtime=([\d.]+)s\s*$")
+# `-benchmark`: "bench: maxrss=18688KiB"
+_MAXRSS_LINE = re.compile(r"^bench: maxrss=(\d+)KiB\s*$")
+
+
+def _microseconds(value):
+    value = int(value)
+    # ffmpeg prints unsigned deltas; a clock going backwards wraps around 2**64
+    return value / 1_000_000 if value < 2**63 else 0.0
+
+
+def parse_ffmpeg_benchmark(lines):
+    """
+    Sums ffmpeg's `-benchmark` / `-benchmark_all` output.
+
+    Args:
+        lines (iterable[str]): ffmpeg's stderr lines.
+
+    Returns:
+        dict: `stages` ("encode_video 0:0" -> calls and user/sys/real seconds,
+            slowest first), plus `user_seconds`, `sys_seconds`, `real_seconds`
+            and `maxrss_kib` for the whole run when ffmpeg reported them.
+    """
+    stages = {}
+    result = {}
+    for line in lines:
+        line = line.strip()
+        match = _STAGE_LINE.match(line)
+        if match:
+            user, sys_, real, stage, stream = match.groups()
+            totals = stages.setdefault(
+                f"{stage} {stream}",
+                {
+                    "calls": 0,
+                    "user_seconds": 0.0,
+                    "sys_seconds": 0.0,
+                    "real_seconds": 0.0,
+                },
+            )
+            totals["calls"] += 1
+            totals["user_seconds"] += _microseconds(user)
+            totals["sys_seconds"] += _microseconds(sys_)
+            totals["real_seconds"] += _microseconds(real)
+            continue
+        match = _TOTAL_LINE.match(line)
+        if match:
+            user, sys_, real = map(float, match.groups())
+            result.update(user_seconds=user, sys_seconds=sys_, real_seconds=real)
+            continue
+        match = _MAXRSS_LINE.match(line)
+        if match:
+            result["maxrss_kib"] = int(match.group(1))
+
+    result["stages"] = dict(
+        sorted(stages.items(), key=lambda item: item[1]["real_seconds"], reverse=True)
+    )
+    return result
+
+
+def _top_functions(stats, limit=TOP_N):
+    """Returns the functions with the most cumulative time in a `pstats.Stats`."""
+    rows = []
+    for (filename, line, function), stat in stats.stats.items():
+        _, calls, total, cumulative, _ = stat
+        rows.append(
+            {
+                "function": f"{function} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "total_seconds": total,
+                "cumulative_seconds": cumulative,
+            }
+        )
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:limit]
+
+
+def _top_allocations(snapshot, limit=TOP_N):
+    """Returns the source lines holding the most memory in a tracemalloc snapshot."""
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+class Profiler:
+    """
+    Profiles one run: cProfile and tracemalloc around each step, plus ffmpeg's
+    own `-benchmark_all` timings for every encode.
+    """
+
+    def __init__(self, run_name="pipeline"):
+        self.run_name = run_name
+        self.started_at = datetime.now()
+        self.sections = []
+        self.ffmpeg_runs = []
+        self._lock = threading.Lock()
+        self._owns_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+    def stop(self):
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    @contextmanager
+    def section(self, name):
+        """
+        Profiles the code in the block (the calling thread only).
+
+        Args:
+            name (str): What is being profiled (a step name, "load config").
+        """
+        profile = cProfile.Profile()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        error = None
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (a nested section); it covers this one
+            profile = None
+        try:
+            yield
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            if profile:
+                profile.disable()
+            elapsed = time.perf_counter() - start
+            record = {
+                "name": name,
+                "elapsed_seconds": elapsed,
+                "error": error,
+                "profile": profile,
+                "peak_bytes": None,
+                "snapshot": None,
+            }
+            if tracemalloc.is_tracing():
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                record["snapshot"] = tracemalloc.take_snapshot()
+            with self._lock:
+                self.sections.append(record)
+
+    def record_ffmpeg(self, label, command, benchmark):
+        """
+        Stores one ffmpeg run's parsed benchmark (see `parse_ffmpeg_benchmark`).
+        """
+        with self._lock:
+            self.ffmpeg_runs.append(
+                {"label": label, "command": " ".join(command), **benchmark}
+            )
+
+    def report(self):
+        """
+        Summarizes the run: top functions and peak allocations per section and
+        overall, and the ffmpeg stage timings.
+
+        Returns:
+            dict: The JSON-serializable report.
+        """
+        sections = []
+        combined = None
+        for section in self.sections:
+            entry = {
+                "name": section["name"],
+                "elapsed_seconds": section["elapsed_seconds"],
+                "error": section["error"],
+                "peak_bytes": section["peak_bytes"],
+                "top_functions": [],
+                "top_allocations": [],
+            }
+            if section["profile"] is not None:
+                stats = pstats.Stats(section["profile"], stream=io.StringIO())
+                entry["top_functions"] = _top_functions(stats)
+                if combined is None:
+                    combined = pstats.Stats(section["profile"], stream=io.StringIO())
+                else:
+                    combined.add(section["profile"])
+            if section["snapshot"] is not None:
+                entry["top_allocations"] = _top_allocations(section["snapshot"])
+            sections.append(entry)
+
+        return {
+            "run": self.run_name,
+            "started_at": self.started_at.isoformat(),
+            "sections": sections,
+            "top_functions": _top_functions(combined) if combined else [],
+            "peak_bytes": max(
+                (s["peak_bytes"] for s in sections if s["peak_bytes"]), default=None
+            ),
+            "ffmpeg": self.ffmpeg_runs,
+        }
+
+    def export(self, profile_dir):
+        """
+        Writes a profile bundle, `<profile_dir>/<timestamp>_<run>/`, containing:
+
+        - `report.json`: everything in `report()`
+        - `summary.txt`: the same, readable
+        - `<n>_<section>.prof`: raw cProfile data per section, for
+          `python -m pstats` or snakeviz
+
+        Args:
+            profile_dir (str): Directory to create the bundle in.
+
+        Returns:
+            str: The bundle directory.
+        """
+        bundle = os.path.join(
+            profile_dir,
+            f"{self.started_at.strftime('%Y%m%d_%H%M%S')}_{self.run_name}",
+        )
+        os.makedirs(bundle, exist_ok=True)
+
+        for position, section in enumerate(self.sections):
+            if section["profile"] is None:
+                continue
+            slug = re.sub(r"[^A-Za-z0-9]+", "_", section["name"]).strip("_").lower()
+            section["profile"].dump_stats(
+                os.path.join(bundle, f"{position:02d}_{slug}.prof")
+            )
+
+        report = self.report()
+        with open(os.path.join(bundle, "report.json"), "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        with open(os.path.join(bundle, "summary.txt"), "w") as f:
+            f.write(format_report(report))
+        return bundle
+
+
+def _megabytes(size_bytes):
+    return f"{size_bytes / 1_000_000:.1f} MB" if size_bytes is not None else "-"
+
+
+def format_report(report, limit=10):
+    """
+    Renders a profile report as plain text.
+
+    Args:
+        report (dict): A `Profiler.report()`.
+        limit (int): Rows per table.
+
+    Returns:
+        str: The summary.
+    """
+    lines = [f"Profile of {report['run']} ({report['started_at']})", ""]
+
+    lines.append("Sections:")
+    for section in report["sections"]:
+        status = f"  FAILED {section['error']}" if section["error"] else ""
+        lines.append(
+            f"  {section['name']:<40} {section['elapsed_seconds']:>9.2f}s "
+            f"peak {_megabytes(section['peak_bytes'])}{status}"
+        )
+
+    lines += ["", "Top functions (cumulative, all sections):"]
+    for row in report["top_functions"][:limit]:
+        lines.append(
+            f"  {row['cumulative_seconds']:>9.3f}s {row['calls']:>8} calls  "
+            f"{row['function']}"
+        )
+
+    lines += ["", "Peak allocations:"]
+    for section in report["sections"]:
+        if not section["top_allocations"]:
+            continue
+        lines.append(f"  {section['name']}:")
+        for row in section["top_allocations"][:3]:
+            lines.append(f"    {_megabytes(row['size_bytes']):>10} {row['location']}")
+
+    lines += ["", "ffmpeg:"]
+    for run in report["ffmpeg"]:
+        lines.append(
+            f"  {run['label']}: {run.get('real_seconds', 0):.2f}s real, "
+            f"{run.get('user_seconds', 0):.2f}s user, "
+            f"max RSS {run.get('maxrss_kib', 0) / 1024:.0f} MiB"
+        )
+        for stage, totals in list(run["stages"].items())[:limit]:
+            lines.append(
+                f"    {stage:<24} {totals['real_seconds']:>9.3f}s real "
+                f"{totals['user_seconds']:>9.3f}s user {totals['calls']:>7} calls"
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+_active_profiler = None
+
+
+def start_profile(run_name="pipeline"):
+    """
+    Starts profiling process-wide (tracemalloc, ffmpeg benchmarks).
+
+    Returns:
+        Profiler: The active profiler.
+    """
+    global _active_profiler
+    _active_profiler = Profiler(run_name)
+    _active_profiler.start()
+    return _active_profiler
+
+
+def stop_profile():
+    """
+    Stops profiling.
+
+    Returns:
+        Profiler: The profiler that was active, or None.
+    """
+    global _active_profiler
+    profiler, _active_profiler = _active_profiler, None
+    if profiler:
+        profiler.stop()
+    return profiler
+
+
+def get_profiler():
+    return _active_profiler
+
+
+@contextmanager
+def profile_section(name):
+    """
+    Profiles the block on the active profiler; a no-op when profiling is off.
+
+    Args:
+        name (str): What is being profiled.
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+
+    with profiler.section(name):
+        yield
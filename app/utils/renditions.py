@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from app.utils.encoder_profiles import EncoderProfile, get_encoder_profile
+
+# Audio encoder per container
+AUDIO_CODECS = {
+    "wav": "pcm_s16le",
+    "mp3": "libmp3lame",
+    "m4a": "aac",
+    "mp4": "aac",
+}
+VIDEO_FORMATS = ("mp4",)
+
+
+@dataclass
+class Rendition:
+    """
+    One extra deliverable rendered alongside the main output, e.g. a 128k MP3
+    for the podcast feed or a 720p MP4 for slow connections.
+    """
+
+    name: str
+    format: str
+    resolution: Optional[str] = None  # video only (default: the main output's)
+    audio_bitrate: str = "192k"
+    encoder_profile: Optional[EncoderProfile] = None  # video only
+
+    @classmethod
+    def from_config(cls, entry, encoding_conf=None):
+        """
+        Args:
+            entry (dict): `name`, `format` and optional `resolution`,
+                `audio_bitrate` and `encoder_profile` (a profile name).
+            encoding_conf (dict): The `encoding` config section, to resolve
+                `encoder_profile` in.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if entry["format"] not in AUDIO_CODECS:
+            raise ValueError(f"Unknown rendition format: {entry['format']}")
+        profile_name = entry.get("encoder_profile")
+        return cls(
+            name=entry["name"],
+            format=entry["format"],
+            resolution=entry.get("resolution"),
+            audio_bitrate=entry.get("audio_bitrate", "192k"),
+            encoder_profile=(
+                get_encoder_profile(encoding_conf, name=profile_name)
+                if profile_name
+                else None
+            ),
+        )
+
+    @property
+    def has_video(self):
+        return self.format in VIDEO_FORMATS
+
+    def path(self, base):
+        """
+        Returns the rendition's file for an output path without extension.
+        """
+        return f"{base}.{self.name}.{self.format}"
+
+    def audio_args(self, sample_rate=44100, channels=2) -> List[str]:
+        """
+        Returns the ffmpeg audio encoder flags for this rendition.
+        """
+        args = ["-c:a", AUDIO_CODECS[self.format]]
+        if self.format != "wav":
+            args.extend(["-b:a", self.audio_bitrate])
+        return args + ["-ar", str(sample_rate), "-ac", str(channels)]
+
+
+def renditions_from_config(media_conf, encoding_conf=None, allow_video=True):
+    """
+    Reads the `renditions` list of an `audio` or `video` config section.
+
+    Raises:
+        ValueError: If a video rendition is configured where there is no video.
+    """
+    renditions = [
+        Rendition.from_config(entry, encoding_conf)
+        for entry in media_conf.get("renditions", [])
+    ]
+    for rendition in renditions:
+        if rendition.has_video and not allow_video:
+            raise ValueError(
+                f"Rendition {rendition.name}: {rendition.format} needs video"
+            )
+    return renditions
@@ -0,0 +1,223 @@
+import os
+import threading
+from contextlib import contextmanager
+from colorama import Fore, Style
+
+
+def _available_cores():
+    """Returns the CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class CpuBudget:
+    """
+    The CPU slots granted to a single ffmpeg encode.
+    """
+
+    def __init__(self, cores, pin_cores=False):
+        self.cores = cores
+        self.pin_cores = pin_cores
+
+    @property
+    def threads(self):
+        return len(self.cores)
+
+    def global_args(self):
+        """
+        Global ffmpeg flags; go right after `ffmpeg`.
+        """
+        return ["-filter_threads", str(self.threads)]
+
+    def output_args(self, threads=None):
+        """
+        Per-output ffmpeg flags; go right before the output path.
+
+        Args:
+            threads (int): This output's share, when one ffmpeg writes several
+                outputs from the same budget (default: the whole budget).
+        """
+        return ["-threads", str(threads or self.threads)]
+
+    def wrap(self, command):
+        """
+        Pins the command to the granted cores with `taskset`, if pinning is on.
+
+        Args:
+            command (list[str]): The command to run.
+
+        Returns:
+            list[str]: The (possibly prefixed) command.
+        """
+        if not self.pin_cores:
+            return command
+        return ["taskset", "-c", ",".join(str(core) for core in self.cores)] + command
+
+
+class ResourceScheduler:
+    """
+    Hands out CPU slots to ffmpeg encodes so concurrent jobs don't oversubscribe
+    the node. An encode that can't get its slots waits until enough are freed.
+    """
+
+    def __init__(self, total_slots=None, slots_per_encode=None, pin_cores=False):
+        """
+        Args:
+            total_slots (int): CPU slots on this node (default: all usable cores).
+            slots_per_encode (int): Default budget of one encode (default: all slots).
+            pin_cores (bool): Pin each encode to its cores with `taskset`.
+        """
+        self._cores = _available_cores()
+        self._reserved = []
+        self._free_cores = []
+        self._condition = threading.Condition()
+        self.resize(total_slots, slots_per_encode, pin_cores)
+
+    def resize(self, total_slots=None, slots_per_encode=None, pin_cores=False):
+        """
+        Changes the node's slots in place. Cores held by running encodes stay
+        taken until they are released, so jobs that are already running keep
+        counting against the new size.
+
+        Args:
+            total_slots (int): CPU slots on this node (default: all usable cores).
+            slots_per_encode (int): Default budget of one encode (default: all slots).
+            pin_cores (bool): Pin each encode to its cores with `taskset`.
+        """
+        with self._condition:
+            self.total_slots = max(
+                1, min(total_slots or len(self._cores), len(self._cores))
+            )
+            self.slots_per_encode = max(
+                1, min(slots_per_encode or self.total_slots, self.total_slots)
+            )
+            self.pin_cores = pin_cores
+            self._free_cores = [
+                core
+                for core in self._cores[: self.total_slots]
+                if core not in self._reserved
+            ]
+            self._condition.notify_all()
+
+    @property
+    def free_slots(self):
+        with self._condition:
+            return len(self._free_cores)
+
+    @contextmanager
+    def reserve(self, slots=None):
+        """
+        Reserves CPU slots for the duration of an encode.
+
+        Args:
+            slots (int): Slots needed (default: `slots_per_encode`), capped at
+                the node's total.
+
+        Yields:
+            CpuBudget: The granted cores.
+        """
+        with self._condition:
+            slots = max(1, min(slots or self.slots_per_encode, self.total_slots))
+            if len(self._free_cores) < slots:
+                print(
+                    Fore.YELLOW
+                    + f"Node saturated, queueing encode for {slots} CPU slot(s)..."
+                    + Style.RESET_ALL
+                )
+            while len(self._free_cores) < slots:
+                self._condition.wait()
+                # The node may have been resized while waiting
+                slots = max(1, min(slots, self.total_slots))
+            cores = self._free_cores[:slots]
+            del self._free_cores[:slots]
+            self._reserved.extend(cores)
+            pin_cores = self.pin_cores
+
+        try:
+            yield CpuBudget(cores, pin_cores=pin_cores)
+        finally:
+            with self._condition:
+                managed = self._cores[: self.total_slots]
+                for core in cores:
+                    self._reserved.remove(core)
+                    # Cores dropped by a resize are not handed out again
+                    if core in managed and core not in self._reserved:
+                        self._free_cores.append(core)
+                self._free_cores.sort()
+                self._condition.notify_all()
+
+
+def split_slots(total_slots, weights):
+    """
+    Splits a CPU budget between encodes that run side by side, by weight.
+
+    Every encode gets at least one slot; the rest is shared out in proportion
+    to the weights (e.g. the input durations), so the long main encode keeps
+    most of the cores while the short intro and outro take one each.
+
+    Args:
+        total_slots (int): The budget to split.
+        weights (list[float]): One weight per encode.
+
+    Returns:
+        list[int]: Slots per encode, in the same order.
+    """
+    weights = [max(weight or 0, 0) for weight in weights]
+    if not any(weights):
+        weights = [1] * len(weights)
+    spare = max(total_slots - len(weights), 0)
+    shares = [spare * weight / sum(weights) for weight in weights]
+    slots = [1 + int(share) for share in shares]
+
+    # Hand out what rounding left over, largest remainder first
+    leftover = spare - sum(int(share) for share in shares)
+    by_remainder = sorted(
+        range(len(shares)), key=lambda i: shares[i] - int(shares[i]), reverse=True
+    )
+    for i in by_remainder[:leftover]:
+        slots[i] += 1
+    return slots
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    Returns the process-wide scheduler, creating a default one on first use.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ResourceScheduler()
+        return _scheduler
+
+
+def configure_scheduler(resources_conf=None):
+    """
+    Sizes the process-wide scheduler from the `resources` config section.
+
+    An existing scheduler is resized in place rather than replaced, so the
+    slots of jobs that are already encoding stay counted.
+
+    Args:
+        resources_conf (dict): The `resources` config section, or None for defaults.
+
+    Returns:
+        ResourceScheduler: The process-wide scheduler.
+    """
+    global _scheduler
+    resources_conf = resources_conf or {}
+    settings = dict(
+        total_slots=resources_conf.get("cpu_slots"),
+        slots_per_encode=resources_conf.get("slots_per_encode"),
+        pin_cores=resources_conf.get("pin_cores", False),
+    )
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ResourceScheduler(**settings)
+        else:
+            _scheduler.resize(**settings)
+    return _scheduler
@@ -0,0 +1,397 @@
+import hashlib
+import json
+import os
+import platform
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from app.utils.ffmpeg import parse_timestamp
+from app.utils.observers import PipelineObserver, get_current_job
+
+DEFAULT_HISTORY_PATH = "output/run_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline TEXT NOT NULL,
+    job TEXT,
+    config_hash TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT,
+    duration_seconds REAL,
+    source_duration_seconds REAL,
+    bytes_in INTEGER,
+    bytes_out INTEGER,
+    cache_hits INTEGER,
+    cache_misses INTEGER,
+    hostname TEXT,
+    platform TEXT,
+    cpu_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    position INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_pipeline_started ON runs (pipeline, started_at);
+CREATE INDEX IF NOT EXISTS steps_run ON steps (run_id);
+"""
+
+
+def config_hash(config):
+    """
+    Returns a short, stable hash of a config (key order doesn't matter).
+    """
+    encoded = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:12]
+
+
+def source_duration(config, media_type):
+    """
+    Returns the seconds of main media a config will process (its trim window).
+
+    Args:
+        config (dict): Pipeline configuration.
+        media_type (str): "audio" or "video".
+
+    Returns:
+        float: The trimmed length in seconds, or None without a trim window.
+    """
+    trim = (config or {}).get(media_type, {}).get("trim")
+    if not trim or not (trim.get("start_time") and trim.get("end_time")):
+        # Auto-trim without fallback times: the window is only known at run time
+        return None
+    return parse_timestamp(trim["end_time"]) - parse_timestamp(trim["start_time"])
+
+
+def media_type_for(pipeline):
+    """Maps a pipeline name like "video_pipeline" to its media type."""
+    return "video" if "video" in pipeline else "audio"
+
+
+def percentile(values, fraction):
+    """
+    Linear-interpolated percentile of `values` (fraction in [0, 1]).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RunHistory:
+    """
+    SQLite store of past runs and their step timings.
+    """
+
+    def __init__(self, db_path=DEFAULT_HISTORY_PATH):
+        self.db_path = db_path
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            # Created on first use, so constructing a history has no side effects
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        # A connection per call keeps this safe to use from worker threads
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        if not self._initialized:
+            connection.executescript(SCHEMA)
+            self._initialized = True
+        try:
+            with connection:  # commits, or rolls back on error
+                yield connection
+        finally:
+            connection.close()
+
+    def record_run(self, run, steps):
+        """
+        Stores a finished run.
+
+        Args:
+            run (dict): Column -> value for the `runs` table.
+            steps (list[tuple]): (step, status, duration_seconds) in run order.
+
+        Returns:
+            int: The new run's id.
+        """
+        columns = ", ".join(run)
+        placeholders = ", ".join("?" for _ in run)
+        with self._connect() as connection:
+            cursor = connection.execute(
+                f"INSERT INTO runs ({columns}) VALUES ({placeholders})",
+                list(run.values()),
+            )
+            run_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO steps (run_id, position, step, status, duration_seconds) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, position, step, status, duration)
+                    for position, (step, status, duration) in enumerate(steps)
+                ],
+            )
+        return run_id
+
+    def runs(self, pipeline=None, since=None, status=None):
+        """
+        Returns past runs, oldest first.
+
+        Args:
+            pipeline (str): Only this pipeline (e.g. "video_pipeline").
+            since (float): Only runs started after this Unix time.
+            status (str): Only runs with this status ("success"/"failure").
+
+        Returns:
+            list[sqlite3.Row]: The matching runs.
+        """
+        clauses, params = [], []
+        for column, operator, value in [
+            ("pipeline", "=", pipeline),
+            ("started_at", ">=", since),
+            ("status", "=", status),
+        ]:
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as connection:
+            return connection.execute(
+                f"SELECT * FROM runs {where} ORDER BY started_at", params
+            ).fetchall()
+
+    def _successful_steps(self, run_ids):
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT run_id, position, step, duration_seconds FROM steps "
+                f"WHERE status = 'success' AND run_id IN ({','.join('?' * len(run_ids))})",
+                run_ids,
+            ).fetchall()
+
+    def step_stats(self, pipeline=None, since=None):
+        """
+        Returns p50/p95/max duration per step over successful steps.
+
+        Returns:
+            list[dict]: step, runs, p50, p95 and max, in pipeline order.
+        """
+        runs = {run["id"]: run for run in self.runs(pipeline, since)}
+        if not runs:
+            return []
+
+        rows = self._successful_steps(list(runs))
+
+        durations, positions = {}, {}
+        for row in rows:
+            durations.setdefault(row["step"], []).append(row["duration_seconds"])
+            positions.setdefault(row["step"], row["position"])
+
+        return [
+            {
+                "step": step,
+                "runs": len(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": max(values),
+            }
+            for step, values in sorted(durations.items(), key=lambda i: positions[i[0]])
+        ]
+
+    def slowest_runs(self, pipeline=None, limit=10):
+        with self._connect() as connection:
+            query = "SELECT * FROM runs WHERE duration_seconds IS NOT NULL"
+            params = []
+            if pipeline:
+                query += " AND pipeline = ?"
+                params.append(pipeline)
+            query += " ORDER BY duration_seconds DESC LIMIT ?"
+            return connection.execute(query, params + [limit]).fetchall()
+
+    def trend(self, pipeline=None, since=None):
+        """
+        Groups runs by ISO week to show how run times drift.
+
+        Returns:
+            list[dict]: week ("2025-W05"), runs, failures, p50 duration and p50
+                real-time factor (seconds of media per wall-clock second).
+        """
+        weeks = {}
+        for run in self.runs(pipeline, since):
+            year, week, _ = datetime.fromtimestamp(run["started_at"]).isocalendar()
+            weeks.setdefault(f"{year}-W{week:02d}", []).append(run)
+
+        trend = []
+        for week, runs in sorted(weeks.items()):
+            succeeded = [r for r in runs if r["status"] == "success"]
+            rtfs = [
+                r["source_duration_seconds"] / r["duration_seconds"]
+                for r in succeeded
+                if r["source_duration_seconds"] and r["duration_seconds"]
+            ]
+            trend.append(
+                {
+                    "week": week,
+                    "runs": len(runs),
+                    "failures": len(runs) - len(succeeded),
+                    "p50": percentile([r["duration_seconds"] for r in succeeded], 0.5),
+                    "realtime_factor": percentile(rtfs, 0.5),
+                }
+            )
+        return trend
+
+    def predict(self, pipeline, media_seconds, recent=20):
+        """
+        Predicts how long a run over `media_seconds` of media will take, from the
+        wall-clock seconds past successful runs spent per second of media.
+
+        Args:
+            pipeline (str): The pipeline to predict (e.g. "video_pipeline").
+            media_seconds (float): Length of the trimmed source.
+            recent (int): How many recent runs to learn from (default: 20).
+
+        Returns:
+            dict: runs used, `p50`/`p95` predicted seconds, and `steps` with a
+                p50 prediction per step; None without usable history.
+        """
+        runs = [
+            run
+            for run in self.runs(pipeline, status="success")
+            if run["source_duration_seconds"]
+        ][-recent:]
+        if not runs or not media_seconds:
+            return None
+
+        ratios = [r["duration_seconds"] / r["source_duration_seconds"] for r in runs]
+        rows = self._successful_steps([run["id"] for run in runs])
+
+        source_seconds = {run["id"]: run["source_duration_seconds"] for run in runs}
+        step_ratios, positions = {}, {}
+        for row in rows:
+            step_ratios.setdefault(row["step"], []).append(
+                row["duration_seconds"] / source_seconds[row["run_id"]]
+            )
+            positions.setdefault(row["step"], row["position"])
+
+        return {
+            "runs": len(runs),
+            "p50": percentile(ratios, 0.5) * media_seconds,
+            "p95": percentile(ratios, 0.95) * media_seconds,
+            "steps": [
+                (step, percentile(values, 0.5) * media_seconds)
+                for step, values in sorted(
+                    step_ratios.items(), key=lambda i: positions[i[0]]
+                )
+            ],
+        }
+
+
+class RunHistoryObserver(PipelineObserver):
+    """
+    Records every job (timings, bytes, cache hits, machine) into a `RunHistory`.
+    """
+
+    def __init__(self, history: RunHistory):
+        super().__init__()
+        self.history = history
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _job(self, job=None):
+        job = job or get_current_job()
+        with self._lock:
+            if job is None and len(self._jobs) == 1:
+                # Events raised outside a runner context belong to the only job
+                return next(iter(self._jobs.values()))
+            return self._jobs.get(job)
+
+    def on_job_started(self, job, pipeline, config=None):
+        with self._lock:
+            self._jobs[job] = {
+                "pipeline": pipeline,
+                "config": config,
+                "started_at": time.time(),
+                "steps": [],
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "cache_hits": 0,
+                "cache_misses": 0,
+                "max_out_time": 0.0,
+            }
+
+    def on_step_finished(self, job, pipeline, step, elapsed_seconds, data):
+        record = self._job(job)
+        if record:
+            record["steps"].append((step, "success", elapsed_seconds))
+
+    def on_step_failed(self, job, pipeline, step, error, elapsed_seconds):
+        record = self._job(job)
+        if record:
+            record["steps"].append((step, "failure", elapsed_seconds))
+
+    def on_ffmpeg_progress(self, progress):
+        record = self._job()
+        if record and progress.finished:
+            record["bytes_out"] += progress.total_size or 0
+            record["max_out_time"] = max(
+                record["max_out_time"], progress.out_time_seconds
+            )
+
+    def on_cache_lookup(self, url, hit, shared=False):
+        record = self._job()
+        if record:
+            record["cache_hits" if hit else "cache_misses"] += 1
+
+    def on_download_finished(self, url, size_bytes):
+        record = self._job()
+        if record:
+            record["bytes_in"] += size_bytes or 0
+
+    def on_job_finished(self, job, pipeline, elapsed_seconds):
+        self._store(job, "success", elapsed_seconds)
+
+    def on_job_failed(self, job, pipeline, error, elapsed_seconds):
+        self._store(job, "failure", elapsed_seconds)
+
+    def _store(self, job, status, elapsed_seconds):
+        with self._lock:
+            record = self._jobs.pop(job, None)
+        if record is None:
+            return
+
+        config = record["config"]
+        media_seconds = source_duration(config, media_type_for(record["pipeline"]))
+        self.history.record_run(
+            {
+                "pipeline": record["pipeline"],
+                "job": job,
+                "config_hash": config_hash(config) if config is not None else None,
+                "started_at": record["started_at"],
+                "finished_at": time.time(),
+                "status": status,
+                "duration_seconds": elapsed_seconds,
+                # Without a trim window, the longest encode is the best guess
+                "source_duration_seconds": media_seconds
+                or record["max_out_time"]
+                or None,
+                "bytes_in": record["bytes_in"],
+                "bytes_out": record["bytes_out"],
+                "cache_hits": record["cache_hits"],
+                "cache_misses": record["cache_misses"],
+                "hostname": socket.gethostname(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            record["steps"],
+        )
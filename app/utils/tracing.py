@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class Span:
+    """
+    A timed region of work (a step, a subprocess, a download, a cache lookup).
+    """
+
+    def __init__(self, name, category, attributes=None, track=None):
+        self.name = name
+        self.category = category
+        self.attributes = dict(attributes or {})
+        self.thread_id = threading.get_ident()
+        # Spans on a named track (an async job) get their own row in the trace
+        self.track = track
+        self.thread_name = track or threading.current_thread().name
+        self.start_ns = None
+        self.end_ns = None
+
+    def set(self, **attributes):
+        """Adds attributes (bytes, exit code, ...) to the span."""
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self):
+        if self.start_ns is None or self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+class Tracer:
+    """
+    Collects spans for one run and exports them for later analysis.
+    """
+
+    def __init__(self, run_name="pipeline"):
+        self.run_name = run_name
+        self.started_at = datetime.now()
+        self.origin_ns = time.perf_counter_ns()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category="pipeline", track=None, **attributes):
+        span = Span(name, category, attributes, track)
+        span.start_ns = time.perf_counter_ns()
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=repr(e))
+            raise
+        finally:
+            span.end_ns = time.perf_counter_ns()
+            with self._lock:
+                self.spans.append(span)
+
+    def _relative_us(self, ns):
+        return (ns - self.origin_ns) / 1000
+
+    def to_chrome_trace(self):
+        """
+        Returns the spans as a Chrome trace-event document (loads in Perfetto).
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": self.run_name},
+            }
+        ]
+        threads, tracks = {}, {}
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            # Thread idents are addresses, so small track ids never collide
+            tid = (
+                tracks.setdefault(span.track, len(tracks) + 1)
+                if span.track
+                else span.thread_id
+            )
+            threads.setdefault(tid, span.thread_name)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": self._relative_us(span.start_ns),
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": span.attributes,
+                }
+            )
+        for thread_id, thread_name in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, trace_dir):
+        """
+        Writes `<run>.trace.json` (Chrome/Perfetto) and `<run>.jsonl` (one span
+        per line) into `trace_dir`.
+
+        Args:
+            trace_dir (str): Directory to write the files to.
+
+        Returns:
+            tuple: (chrome_trace_path, jsonl_path)
+        """
+        os.makedirs(trace_dir, exist_ok=True)
+        base = os.path.join(
+            trace_dir,
+            f"{self.started_at.strftime('%Y%m%d_%H%M%S')}_{self.run_name}",
+        )
+
+        chrome_trace_path = f"{base}.trace.json"
+        with open(chrome_trace_path, "w") as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+        jsonl_path = f"{base}.jsonl"
+        with open(jsonl_path, "w") as f:
+            for span in sorted(self.spans, key=lambda s: s.start_ns):
+                record = {
+                    "name": span.name,
+                    "category": span.category,
+                    "start_ms": self._relative_us(span.start_ns) / 1000,
+                    "duration_ms": span.duration_ms,
+                    "thread": span.thread_name,
+                    "attributes": span.attributes,
+                }
+                f.write(json.dumps(record, default=str) + "\n")
+
+        return chrome_trace_path, jsonl_path
+
+
+_active_tracer = None
+
+
+def start_trace(run_name="pipeline"):
+    """
+    Starts collecting spans process-wide.
+
+    Returns:
+        Tracer: The active tracer.
+    """
+    global _active_tracer
+    _active_tracer = Tracer(run_name)
+    return _active_tracer
+
+
+def stop_trace():
+    """
+    Stops collecting spans.
+
+    Returns:
+        Tracer: The tracer that was active, or None.
+    """
+    global _active_tracer
+    tracer, _active_tracer = _active_tracer, None
+    return tracer
+
+
+def get_tracer():
+    return _active_tracer
+
+
+@contextmanager
+def trace_span(name, category="pipeline", track=None, **attributes):
+    """
+    Records a span on the active tracer; a cheap no-op when tracing is off.
+
+    Args:
+        name (str): What is being timed.
+        category (str): "step", "subprocess", "download", "cache"...
+        track (str): Put the span on this named row instead of the current
+            thread's, e.g. for jobs that share the event loop thread.
+        **attributes: Initial attributes for the span.
+
+    Yields:
+        Span: The span, so callers can attach more attributes.
+    """
+    tracer = _active_tracer
+    if tracer is None:
+        yield Span(name, category, attributes, track)
+        return
+
+    with tracer.span(name, category, track, **attributes) as span:
+        yield span
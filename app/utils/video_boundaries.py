@@ -0,0 +1,268 @@
+import subprocess
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from app.utils.keyframe_index import get_keyframe_index
+from app.utils.media_probe import probe_media
+from app.utils.tracing import trace_span
+
+# Frames are decoded this small: enough to tell a slate from a camera
+ANALYSIS_WIDTH = 160
+ANALYSIS_HEIGHT = 90
+ANALYSIS_FPS = 2
+# Seconds looked at after the start and before the end
+WINDOW_SECONDS = 180.0
+# Decode only keyframes when they are at most this far apart
+MAX_KEYFRAME_SPACING = 4.0
+
+# A frame is black (or a dark end card) when this share of it is this dark
+DARK_LUMA = 32
+BLACK_SHARE = 0.9
+# Mean absolute luma change per pixel under which nothing moved (a slate)
+STATIC_DIFF = 0.5
+# Content has to last this long to end the pre-roll
+MIN_CONTENT_SECONDS = 2.0
+
+BLACK, STATIC, CONTENT = "black", "static", "content"
+
+
+@dataclass
+class FrameStats:
+    """
+    Per-frame statistics of a decoded region, as parallel arrays.
+    """
+
+    times: "np.ndarray"
+    luma: "np.ndarray"  # mean luma
+    dark_share: "np.ndarray"  # share of pixels darker than DARK_LUMA
+    diff: "np.ndarray"  # mean absolute luma change from the previous frame
+
+    @classmethod
+    def from_frames(cls, times, frames):
+        """
+        Args:
+            times (np.ndarray): Time of each frame in seconds.
+            frames (np.ndarray): Grey frames, shape (count, height, width).
+        """
+        frames = frames.astype(np.int16)
+        diff = np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2))
+        # The first frame has no predecessor; it changed as much as the second
+        diff = np.concatenate((diff[:1], diff)) if len(diff) else np.zeros(len(frames))
+        return cls(
+            times=np.asarray(times, dtype=np.float64),
+            luma=frames.mean(axis=(1, 2)),
+            dark_share=(frames < DARK_LUMA).mean(axis=(1, 2)),
+            diff=diff,
+        )
+
+    def kinds(self):
+        """
+        Returns BLACK, STATIC or CONTENT for every frame.
+        """
+        kinds = np.full(len(self.times), CONTENT, dtype=object)
+        # A frame identical to either neighbour is part of a still; the first
+        # frame of a slate differs from what came before but not from the next
+        next_diff = np.concatenate((self.diff[1:], self.diff[-1:]))
+        kinds[np.minimum(self.diff, next_diff) < STATIC_DIFF] = STATIC
+        kinds[self.dark_share >= BLACK_SHARE] = BLACK
+        return kinds
+
+
+@dataclass
+class VideoBoundaries:
+    """
+    Where the programme starts and ends once the slate and end card are cut.
+
+    `head` and `tail` say what was found before and after it (BLACK, STATIC
+    or None when the programme runs right to the edge of the window).
+    """
+
+    start: float
+    end: float
+    head: Optional[str] = None
+    tail: Optional[str] = None
+
+    def summary(self):
+        return {
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "head": self.head,
+            "tail": self.tail,
+        }
+
+
+def decode_gray_frames(
+    path,
+    start,
+    duration,
+    width=ANALYSIS_WIDTH,
+    height=ANALYSIS_HEIGHT,
+    fps=ANALYSIS_FPS,
+    keyframes_only=False,
+):
+    """
+    Decodes one region of a video as small grey frames.
+
+    ffmpeg seeks to the region through the container index, so only the
+    region is read; scaling happens in ffmpeg, so Python only sees a few KB per
+    frame.
+
+    Args:
+        path (str): The video.
+        start (float): Region start in seconds.
+        duration (float): Region length in seconds.
+        width (int): Frame width to decode to.
+        height (int): Frame height to decode to.
+        fps (float): Frames per second to sample (ignored with `keyframes_only`).
+        keyframes_only (bool): Have the decoder skip every non-key frame; one
+            frame per keyframe is returned.
+
+    Returns:
+        np.ndarray: uint8 frames, shape (count, height, width).
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails.
+    """
+    command = ["ffmpeg", "-v", "error"]
+    if keyframes_only:
+        command.extend(["-skip_frame", "nokey"])
+    command.extend(["-ss", f"{start:.3f}", "-t", f"{duration:.3f}", "-i", path])
+
+    filters = [f"scale={width}:{height}:flags=fast_bilinear"]
+    if keyframes_only:
+        command.extend(["-fps_mode", "passthrough"])
+    else:
+        filters.insert(0, f"fps={fps}")
+    command.extend(
+        [
+            "-map",
+            "0:v:0",
+            "-vf",
+            ",".join(filters),
+            "-pix_fmt",
+            "gray",
+            "-f",
+            "rawvideo",
+            "-",
+        ]
+    )
+
+    with trace_span("decode frames", "subprocess", command=" ".join(command)):
+        result = subprocess.run(command, capture_output=True, check=True)
+    frame_bytes = width * height
+    count = len(result.stdout) // frame_bytes
+    return np.frombuffer(result.stdout[: count * frame_bytes], np.uint8).reshape(
+        count, height, width
+    )
+
+
+def _region_stats(path, start, duration, keyframe_times=None):
+    if keyframe_times is not None:
+        frames = decode_gray_frames(path, start, duration, keyframes_only=True)
+        count = min(len(frames), len(keyframe_times))
+        return FrameStats.from_frames(keyframe_times[:count], frames[:count])
+    frames = decode_gray_frames(path, start, duration)
+    return FrameStats.from_frames(start + np.arange(len(frames)) / ANALYSIS_FPS, frames)
+
+
+def _content_runs(kinds, frame_seconds):
+    """
+    Marks the frames that begin MIN_CONTENT_SECONDS of uninterrupted content.
+    """
+    needed = max(int(np.ceil(MIN_CONTENT_SECONDS / frame_seconds)), 2)
+    content = np.concatenate(((kinds == CONTENT).astype(np.int32), np.zeros(needed)))
+    running = np.convolve(content, np.ones(needed), mode="full")[
+        needed - 1 : needed - 1 + len(kinds)
+    ]
+    return running >= needed
+
+
+def _dominant(kinds):
+    kinds = [kind for kind in kinds if kind != CONTENT]
+    return max(set(kinds), key=kinds.count) if kinds else None
+
+
+def find_content_start(stats, frame_seconds):
+    """
+    Returns (content start, what came before it) for a region that starts
+    at the configured start; (None, None) if nothing but pre-roll was found.
+    """
+    kinds = stats.kinds()
+    starts = np.flatnonzero(_content_runs(kinds, frame_seconds))
+    if not len(starts):
+        return None, None
+    first = starts[0]
+    return float(stats.times[first]), _dominant(kinds[:first])
+
+
+def find_content_end(stats, frame_seconds):
+    """
+    Returns (content end, what came after it) for a region that ends at the
+    configured end; (None, None) if nothing but an end card was found.
+    """
+    kinds = stats.kinds()[::-1]
+    starts = np.flatnonzero(_content_runs(kinds, frame_seconds))
+    if not len(starts):
+        return None, None
+    last = len(kinds) - 1 - starts[0]
+    end = float(stats.times[last]) + frame_seconds
+    if last + 1 < len(stats.times):
+        end = float(stats.times[last + 1])
+    return end, _dominant(kinds[: starts[0]])
+
+
+def find_video_boundaries(
+    path, start=0.0, end=None, window=WINDOW_SECONDS, data=None, keyframes=True
+):
+    """
+    Finds where the programme really starts and ends around a trim window,
+    skipping a countdown slate or black frames at the start and a black end
+    card at the end.
+
+    Only `window` seconds after `start` and before `end` are decoded, at
+    160x90. With `keyframes`, and when the video has a keyframe at least every
+    few seconds, only keyframes are decoded (timed from the keyframe index),
+    so each region costs a fraction of a second.
+
+    Args:
+        path (str): The video.
+        start (float): Configured start in seconds.
+        end (float): Configured end in seconds (default: the end of the file).
+        window (float): Seconds to look at on each side.
+        data (PipelineData): Optional; reuses the probe and keyframe index.
+        keyframes (bool): Decode keyframes only when possible.
+
+    Returns:
+        VideoBoundaries: The refined window (unchanged where nothing was found).
+    """
+    start = float(start)
+    end = float(end) if end is not None else probe_media(path).duration
+    window = min(window, (end - start) / 2)
+
+    keyframe_times = None
+    frame_seconds = 1 / ANALYSIS_FPS
+    if keyframes:
+        index = get_keyframe_index(path, data)
+        times = np.asarray(index.keyframes_between(start, end))
+        if len(times) > 1 and np.diff(times).max() <= MAX_KEYFRAME_SPACING:
+            keyframe_times = times
+            frame_seconds = float(np.median(np.diff(times)))
+
+    with trace_span("video boundaries", "analysis", path=path) as span:
+        head_times = tail_times = None
+        if keyframe_times is not None:
+            head_times = keyframe_times[keyframe_times < start + window]
+            tail_times = keyframe_times[keyframe_times >= end - window]
+        head = _region_stats(path, start, window, head_times)
+        tail = _region_stats(path, end - window, window, tail_times)
+
+        content_start, head_kind = find_content_start(head, frame_seconds)
+        content_end, tail_kind = find_content_end(tail, frame_seconds)
+        boundaries = VideoBoundaries(
+            start=content_start if head_kind else start,
+            end=content_end if tail_kind else end,
+            head=head_kind,
+            tail=tail_kind,
+        )
+        span.set(**boundaries.summary())
+    return boundaries
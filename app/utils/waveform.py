@@ -0,0 +1,237 @@
+import os
+import struct
+import threading
+from dataclasses import dataclass
+import numpy as np
+from app.utils.tracing import trace_span
+
+# Samples per min/max pair at each zoom level, finest first; each level is a
+# multiple of the first, so the coarser ones are derived from it
+ZOOM_LEVELS = (256, 1024, 4096)
+
+# Bytes read from ffmpeg per block (a few seconds of 16-bit mono)
+READ_BLOCK_BYTES = 1 << 18
+
+# audiowaveform's .dat format, version 1: version, flags (0 = 16-bit),
+# sample rate, samples per pixel, number of min/max pairs; then the pairs
+_DAT_HEADER = struct.Struct("<iIiiI")
+_DAT_VERSION = 1
+
+
+@dataclass
+class Peaks:
+    """
+    One zoom level of a waveform: the minimum and maximum sample of every
+    `samples_per_pixel` samples.
+    """
+
+    sample_rate: int
+    samples_per_pixel: int
+    data: "np.ndarray"  # int16, shape (pixels, 2): min, max
+
+    @property
+    def duration(self):
+        return len(self.data) * self.samples_per_pixel / self.sample_rate
+
+    def coarsen(self, samples_per_pixel):
+        """
+        Returns the same waveform at a coarser zoom level.
+
+        Args:
+            samples_per_pixel (int): A multiple of this level's.
+        """
+        if samples_per_pixel % self.samples_per_pixel:
+            raise ValueError(
+                f"{samples_per_pixel} samples per pixel is not a multiple of "
+                f"{self.samples_per_pixel}"
+            )
+        factor = samples_per_pixel // self.samples_per_pixel
+        starts = np.arange(0, len(self.data), factor)
+        data = np.empty((len(starts), 2), dtype=np.int16)
+        if len(starts):
+            data[:, 0] = np.minimum.reduceat(self.data[:, 0], starts)
+            data[:, 1] = np.maximum.reduceat(self.data[:, 1], starts)
+        return Peaks(self.sample_rate, samples_per_pixel, data)
+
+    def save(self, path):
+        """
+        Writes the peaks as an audiowaveform .dat file (peaks.js, wavesurfer
+        and audiowaveform itself read it).
+        """
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                _DAT_HEADER.pack(
+                    _DAT_VERSION,
+                    0,
+                    self.sample_rate,
+                    self.samples_per_pixel,
+                    len(self.data),
+                )
+            )
+            f.write(self.data.astype("<i2").tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a 16-bit .dat file written by `save` (or by audiowaveform).
+        """
+        with open(path, "rb") as f:
+            version, flags, sample_rate, samples_per_pixel, length = _DAT_HEADER.unpack(
+                f.read(_DAT_HEADER.size)
+            )
+            if version != _DAT_VERSION or flags & 1:
+                raise ValueError(f"Not a 16-bit version 1 waveform file: {path}")
+            data = np.frombuffer(f.read(length * 4), dtype="<i2").reshape(-1, 2)
+        return cls(sample_rate, samples_per_pixel, data.astype(np.int16))
+
+
+class PeaksBuilder:
+    """
+    Accumulates min/max pairs from blocks of 16-bit mono samples of any size.
+    """
+
+    def __init__(self, sample_rate, samples_per_pixel=ZOOM_LEVELS[0]):
+        self.sample_rate = sample_rate
+        self.samples_per_pixel = samples_per_pixel
+        self._pending = np.empty(0, dtype=np.int16)
+        self._pairs = []
+
+    def add(self, samples):
+        """
+        Args:
+            samples (np.ndarray): int16 mono samples.
+        """
+        samples = np.concatenate((self._pending, samples))
+        whole = len(samples) // self.samples_per_pixel * self.samples_per_pixel
+        if whole:
+            pixels = samples[:whole].reshape(-1, self.samples_per_pixel)
+            self._pairs.append(np.stack((pixels.min(axis=1), pixels.max(axis=1)), 1))
+        self._pending = samples[whole:]
+
+    def result(self):
+        """
+        Returns:
+            Peaks: Everything added so far; a short last pixel is kept.
+        """
+        pairs = list(self._pairs)
+        if len(self._pending):
+            pairs.append(np.array([[self._pending.min(), self._pending.max()]]))
+        data = (
+            np.concatenate(pairs).astype(np.int16)
+            if pairs
+            else np.empty((0, 2), dtype=np.int16)
+        )
+        return Peaks(self.sample_rate, self.samples_per_pixel, data)
+
+
+def peaks_path(base, samples_per_pixel):
+    """
+    Returns where the peaks for `base` (an output path without extension)
+    at one zoom level are stored.
+    """
+    return f"{base}.peaks.{samples_per_pixel}.dat"
+
+
+class WaveformTap:
+    """
+    Builds a file's waveform from an ffmpeg command that is producing it anyway.
+
+    The tap adds a second output to the command: the same decoded audio, as
+    16-bit mono, written to a pipe that a background thread turns into peaks.
+    Nothing is decoded twice and the samples are never written to disk.
+
+        with WaveformTap(44100) as tap:
+            command = ["ffmpeg", "-i", "in.wav", *tap.output_args(), "out.mp3"]
+            run_ffmpeg(command, pass_fds=tap.pass_fds)
+        paths = tap.save(base)
+    """
+
+    def __init__(self, sample_rate, zoom_levels=ZOOM_LEVELS):
+        """
+        Args:
+            sample_rate (int): Rate the audio is written to the tap at.
+            zoom_levels (tuple[int]): Samples per pixel, finest first.
+        """
+        self.sample_rate = sample_rate
+        self.zoom_levels = tuple(zoom_levels)
+        if any(level % self.zoom_levels[0] for level in self.zoom_levels):
+            raise ValueError(
+                f"Zoom levels must be multiples of the first: {zoom_levels}"
+            )
+        self._builder = PeaksBuilder(sample_rate, self.zoom_levels[0])
+        self._read_fd = self._write_fd = None
+        self._thread = None
+        self._error = None
+
+    @property
+    def pass_fds(self):
+        """
+        File descriptors the ffmpeg process has to inherit.
+        """
+        return (self._write_fd,)
+
+    def output_args(self, stream="0:a:0"):
+        """
+        The tap's output, to go before the command's real output.
+        """
+        return [
+            "-map",
+            stream,
+            "-ac",
+            "1",
+            "-ar",
+            str(self.sample_rate),
+            "-f",
+            "s16le",
+            f"pipe:{self._write_fd}",
+        ]
+
+    def _read(self):
+        with os.fdopen(self._read_fd, "rb") as pipe:
+            # Keep reading after an error, or ffmpeg would block on a full pipe
+            while True:
+                chunk = pipe.read(READ_BLOCK_BYTES)
+                if not chunk:
+                    break
+                if self._error is None:
+                    try:
+                        usable = len(chunk) - len(chunk) % 2
+                        self._builder.add(np.frombuffer(chunk[:usable], "<i2"))
+                    except Exception as e:
+                        self._error = e
+
+    def __enter__(self):
+        self._read_fd, self._write_fd = os.pipe()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # ffmpeg holds its own copy; the pipe ends once it exits
+        os.close(self._write_fd)
+        self._thread.join()
+        return False
+
+    def save(self, base):
+        """
+        Writes one .dat file per zoom level next to `base`.
+
+        Args:
+            base (str): The output's path without extension.
+
+        Returns:
+            list[str]: The files written, finest first.
+        """
+        if self._error is not None:
+            raise self._error
+        with trace_span("waveform", "analysis", path=base) as span:
+            finest = self._builder.result()
+            paths = []
+            for samples_per_pixel in self.zoom_levels:
+                path = peaks_path(base, samples_per_pixel)
+                finest.coarsen(samples_per_pixel).save(path)
+                paths.append(path)
+            span.set(pixels=len(finest.data), duration=finest.duration)
+        return paths
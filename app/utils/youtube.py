@@ -1,28 +1,55 @@
 # utils/youtube.py
+import hashlib
 import subprocess
 import json
+import os
+from app.utils.commands import run_command
 
 
-def get_youtube_upload_date(youtube_url):
+def _date_record(record_dir, youtube_url):
+    key = hashlib.sha256(youtube_url.encode()).hexdigest()[:16]
+    return os.path.join(record_dir, f"{key}.date")
+
+
+def _record_date(record_path, date):
+    os.makedirs(os.path.dirname(record_path) or ".", exist_ok=True)
+    temp_path = f"{record_path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(date)
+    os.replace(temp_path, record_path)
+
+
+def get_youtube_upload_date(youtube_url, record_dir=None):
     """
     Fetches the upload date of a YouTube video using yt-dlp.
 
     Args:
         youtube_url (str): The URL of the YouTube video.
+        record_dir (str): Optional directory with one small file per URL already
+            looked up. Upload dates never change, so a recorded date skips the
+            yt-dlp call and its network round trip.
 
     Returns:
         str: The upload date in 'YYYY-MM-DD' format, or None if not retrievable.
     """
+    record_path = _date_record(record_dir, youtube_url) if record_dir else None
+    if record_path and os.path.exists(record_path):
+        with open(record_path) as f:
+            return f.read().strip()
+
     try:
         # Use yt-dlp to fetch the metadata as JSON
         command = ["yt-dlp", "--dump-json", youtube_url]
-        result = subprocess.run(command, stdout=subprocess.PIPE, check=True, text=True)
+        result = run_command(command, stdout=subprocess.PIPE, check=True, text=True)
         video_data = json.loads(result.stdout)
 
         # Extract and format the upload date
         upload_date = video_data.get("upload_date")  # Format: 'YYYYMMDD'
         if upload_date:
-            return f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
+            date = f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
+            if record_path:
+                _record_date(record_path, date)
+            return date
     except Exception as e:
         print(f"Failed to fetch upload date for {youtube_url}: {e}")
         return None
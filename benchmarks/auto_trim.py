@@ -0,0 +1,195 @@
+import argparse
+import os
+import sys
+import time
+import wave
+import numpy as np
+from colorama import Fore, Style
+from app.utils.auto_trim import ANALYSIS_SAMPLE_RATE, detect_trim
+
+# Hand-labelled programs: (kind, seconds) segments, and where the sermon is.
+# "speech" segments longer than the gaps the analyzer bridges are sermons;
+# short ones are announcements.
+SCENARIOS = {
+    "music_sermon_music": {
+        "segments": [("music", 300), ("silence", 5), ("speech", 1200), ("music", 240)],
+        "sermon": (305, 1505),
+    },
+    "announcements_then_sermon": {
+        "segments": [
+            ("music", 180),
+            ("speech", 90),
+            ("music", 150),
+            ("speech", 1500),
+            ("silence", 10),
+            ("music", 200),
+        ],
+        "sermon": (420, 1920),
+    },
+    "sermon_from_the_start": {
+        "segments": [("speech", 900), ("music", 120)],
+        "sermon": (0, 900),
+    },
+    "song_inside_the_sermon": {
+        "segments": [
+            ("music", 200),
+            ("speech", 600),
+            ("music", 30),
+            ("speech", 600),
+            ("music", 200),
+        ],
+        "sermon": (200, 1430),
+    },
+}
+
+# A full Sunday stream, for timing
+LONG_SCENARIO = {
+    "segments": [("music", 2400), ("speech", 3600), ("music", 4800)],
+    "sermon": (2400, 6000),
+}
+
+BLOCK_SECONDS = 60
+
+
+def _speech(seconds, sample_rate, rng):
+    """
+    Syllable-like noise bursts with pauses between words and sentences.
+    """
+    frames = int(seconds * sample_rate)
+    envelope = np.zeros(frames)
+    position = 0
+    while position < frames:
+        length = int(rng.uniform(0.08, 0.25) * sample_rate)
+        end = min(position + length, frames)
+        envelope[position:end] = np.hanning(length)[: end - position]
+        gap = rng.choice([0.05, 0.3, 0.8], p=[0.6, 0.3, 0.1])
+        position = end + int(rng.uniform(0.5, 1.5) * gap * sample_rate)
+    voice = np.sin(2 * np.pi * rng.uniform(110, 180) * np.arange(frames) / sample_rate)
+    carrier = 0.6 * voice + 0.4 * rng.standard_normal(frames)
+    return 0.08 * envelope * carrier
+
+
+def _music(seconds, sample_rate, rng):
+    """
+    Sustained chords that change every couple of seconds, with a beat on top.
+    """
+    frames = int(seconds * sample_rate)
+    t = np.arange(frames) / sample_rate
+    samples = np.zeros(frames)
+    position = 0
+    while position < frames:
+        end = min(position + int(rng.uniform(1.5, 3.0) * sample_rate), frames)
+        for frequency in rng.choice([196, 247, 294, 330, 392, 440, 494], 3):
+            samples[position:end] += np.sin(2 * np.pi * frequency * t[position:end])
+        position = end
+    beat = np.exp(-((t * 2) % 1) * 12) * rng.standard_normal(frames)
+    return 0.03 * samples + 0.03 * beat
+
+
+def _silence(seconds, sample_rate, rng):
+    return np.zeros(int(seconds * sample_rate))
+
+
+GENERATORS = {"speech": _speech, "music": _music, "silence": _silence}
+
+
+def synthesize(segments, sample_rate=ANALYSIS_SAMPLE_RATE, seed=0):
+    """
+    Yields a labelled program's mono samples, a block at a time.
+
+    Every segment sits on a faint room-noise floor, like a real stream.
+
+    Args:
+        segments (list[tuple[str, float]]): (kind, seconds) pairs.
+        sample_rate (int): Sample rate in Hz.
+        seed (int): Random seed; the same seed gives the same program.
+
+    Yields:
+        np.ndarray: Float samples.
+    """
+    rng = np.random.default_rng(seed)
+    for kind, seconds in segments:
+        remaining = seconds
+        while remaining > 0:
+            block = min(remaining, BLOCK_SECONDS)
+            samples = GENERATORS[kind](block, sample_rate, rng)
+            yield samples + 0.0005 * rng.standard_normal(len(samples))
+            remaining -= block
+
+
+def write_program(path, segments, sample_rate=ANALYSIS_SAMPLE_RATE, seed=0):
+    """
+    Writes a synthetic program as a 16-bit mono WAV file.
+    """
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        for block in synthesize(segments, sample_rate, seed):
+            f.writeframes((np.clip(block, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def evaluate(path, sermon):
+    """
+    Runs the analyzer on a labelled file.
+
+    Returns:
+        dict: Suggested times, confidence, boundary errors and wall time.
+    """
+    start = time.perf_counter()
+    suggestion = detect_trim(path)
+    seconds = time.perf_counter() - start
+    if suggestion is None:
+        return {"found": False, "seconds": round(seconds, 2)}
+    return {
+        "found": True,
+        **suggestion.summary(),
+        "start_error": abs(suggestion.start - sermon[0]),
+        "end_error": abs(suggestion.end - sermon[1]),
+        "seconds": round(seconds, 2),
+    }
+
+
+def main(names=None, long=False, tolerance=5.0, fixture_dir="cache/benchmarks/trim"):
+    """
+    Measures the auto-trim analyzer's accuracy on the labelled synthetic
+    programs (and its speed on a 3-hour one with `long`).
+
+    Returns:
+        int: Exit code (1 if a boundary is off by more than `tolerance` seconds).
+    """
+    scenarios = {name: SCENARIOS[name] for name in names or SCENARIOS}
+    if long:
+        scenarios["three_hours"] = LONG_SCENARIO
+    os.makedirs(fixture_dir, exist_ok=True)
+
+    failed = False
+    for name, scenario in scenarios.items():
+        path = os.path.join(fixture_dir, f"{name}.wav")
+        if not os.path.exists(path):
+            print(f"Generating fixture {path}...")
+            write_program(path, scenario["segments"])
+        result = evaluate(path, scenario["sermon"])
+        ok = result["found"] and (
+            max(result["start_error"], result["end_error"]) <= tolerance
+        )
+        failed = failed or not ok
+        print(
+            (Fore.GREEN if ok else Fore.RED) + f"{name:>26}: {result}" + Style.RESET_ALL
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check the auto-trim analyzer against labelled synthetic programs."
+    )
+    parser.add_argument("scenarios", nargs="*", help="Scenarios (default: all).")
+    parser.add_argument(
+        "--long", action="store_true", help="Also time a 3-hour program."
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=5.0, help="Allowed error in seconds."
+    )
+    args = parser.parse_args()
+    sys.exit(main(args.scenarios, args.long, args.tolerance))
@@ -0,0 +1,230 @@
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+from app.core.pipeline_runner import run_pipeline
+from app.data_models.pipeline_data import PipelineData
+from app.downloaders.downloader_proxy import DownloaderProxy
+from app.pipelines.audio_pipeline import AudioPipelineBuilder
+from app.pipelines.video_pipeline import VideoPipelineBuilder
+from app.steps.fade_in_out_step import fade_in_out_step
+from app.steps.merge_audio_step import merge_audio_step
+from app.steps.merge_video_step import merge_video_step
+from app.steps.trim_step import trim_step
+from app.utils.tracing import start_trace, stop_trace
+from benchmarks.local_downloader import LocalDownloader
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_PATH = os.path.join(REPO_ROOT, "config", "pipeline_schema.json")
+BENCHMARK_DATE = "2025-01-05"
+YOUTUBE_URL = "https://www.youtube.com/watch?v=benchmark"
+
+
+def _timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _trim_window(params):
+    # Cut a couple of seconds off each end, like a real pre-roll/post-roll trim
+    margin = min(2, params["duration"] // 4)
+    return _timestamp(margin), _timestamp(params["duration"] - margin)
+
+
+def _copy(source, workdir, name=None):
+    destination = os.path.join(workdir, name or os.path.basename(source))
+    shutil.copyfile(source, destination)
+    return destination
+
+
+def _trim_case(media_type):
+    def setup(workdir, fixtures, params):
+        data = PipelineData(
+            active_file_path=_copy(fixtures[f"{media_type}_main"], workdir)
+        )
+        start_time, end_time = _trim_window(params)
+        return lambda: trim_step(
+            data, start_time, end_time, ffmpeg_loglevel="error", ffmpeg_hide_banner=True
+        )
+
+    return setup
+
+
+def _fade_case(media_type):
+    def setup(workdir, fixtures, params):
+        data = PipelineData(
+            active_file_path=_copy(fixtures[f"{media_type}_main"], workdir)
+        )
+        return lambda: fade_in_out_step(
+            data,
+            fade_duration=1,
+            ffmpeg_loglevel="error",
+            is_video=media_type == "video",
+        )
+
+    return setup
+
+
+def _merge_data(media_type, workdir, fixtures):
+    return PipelineData(
+        intro_file_path=_copy(fixtures[f"{media_type}_intro"], workdir),
+        active_file_path=_copy(fixtures[f"{media_type}_main"], workdir),
+        outro_file_path=_copy(fixtures[f"{media_type}_outro"], workdir),
+    )
+
+
+def merge_audio(workdir, fixtures, params):
+    data = _merge_data("audio", workdir, fixtures)
+    return lambda: merge_audio_step(data, output_format="wav")
+
+
+def merge_video(workdir, fixtures, params):
+    data = _merge_data("video", workdir, fixtures)
+    return lambda: merge_video_step(
+        data, output_format="mp4", ffmpeg_loglevel="error", ffmpeg_hide_banner=True
+    )
+
+
+def _local_pipeline_factory(builder_class, sources):
+    """
+    Returns a pipeline factory whose downloads come from local files.
+    """
+
+    class LocalSourcesBuilder(builder_class):
+        def _get_date_from_config(self, config):
+            return BENCHMARK_DATE
+
+        def _create_downloader_proxies(self, config, cache_sync=None):
+            downloader = LocalDownloader(sources)
+            return (
+                DownloaderProxy(downloader, f"cache/{self.media_type}", cache_sync),
+                DownloaderProxy(downloader, "cache/s3", cache_sync),
+            )
+
+    return LocalSourcesBuilder().build_pipeline
+
+
+def _pipeline_case(media_type, builder_class, intro_ext):
+    def setup(workdir, fixtures, params):
+        intro_url = f"https://s3.example.com/{media_type}_intro.{intro_ext}"
+        outro_url = f"https://s3.example.com/{media_type}_outro.{intro_ext}"
+        start_time, end_time = _trim_window(params)
+        config = {
+            "youtube_url": YOUTUBE_URL,
+            "manual_download": False,
+            "stream_id": "benchmark",
+            media_type: {
+                "intro_url": intro_url,
+                "outro_url": outro_url,
+                "trim": {"start_time": start_time, "end_time": end_time},
+            },
+        }
+        config_path = os.path.join(workdir, "pipeline_config.json")
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+
+        factory = _local_pipeline_factory(
+            builder_class,
+            {
+                YOUTUBE_URL: fixtures[f"{media_type}_main"],
+                intro_url: fixtures[f"{media_type}_intro"],
+                outro_url: fixtures[f"{media_type}_outro"],
+            },
+        )
+        return lambda: run_pipeline(factory, config_path, SCHEMA_PATH)
+
+    return setup
+
+
+# Name -> setup(workdir, fixtures, params), which prepares the inputs and returns
+# the callable to measure
+CASES = {
+    "trim_audio": _trim_case("audio"),
+    "trim_video": _trim_case("video"),
+    "fade_audio": _fade_case("audio"),
+    "fade_video": _fade_case("video"),
+    "merge_audio": merge_audio,
+    "merge_video": merge_video,
+    "pipeline_audio": _pipeline_case("audio", AudioPipelineBuilder, "wav"),
+    "pipeline_video": _pipeline_case("video", VideoPipelineBuilder, "mp4"),
+}
+
+
+def _cpu_seconds(usage):
+    return usage.ru_utime + usage.ru_stime
+
+
+def _bytes_written(tracer):
+    """
+    Sums what the run's ffmpeg processes and downloads wrote, from its spans.
+    """
+    total = 0
+    for span in tracer.spans:
+        if span.category == "subprocess":
+            total += span.attributes.get("output_bytes") or 0
+        elif span.category == "download":
+            total += span.attributes.get("bytes") or 0
+    return total
+
+
+def _silence_output():
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+
+def run_case(name, fixtures, params, verbose=False):
+    """
+    Runs one benchmark case in a scratch directory and measures it.
+
+    Meant to run in a fresh worker process, so peak RSS and child CPU time only
+    cover this case.
+
+    Args:
+        name (str): Key in `CASES`.
+        fixtures (dict): Fixture name -> path, from `generate_fixtures`.
+        params (dict): The fixture parameters (duration, resolution...).
+        verbose (bool): Keep the steps' and ffmpeg's output (default: False).
+
+    Returns:
+        dict: wall_seconds, cpu_seconds, peak_rss_mb and bytes_written.
+    """
+    if not verbose:
+        _silence_output()
+
+    workdir = tempfile.mkdtemp(prefix=f"benchmark_{name}_")
+    os.chdir(workdir)
+    try:
+        run = CASES[name](workdir, fixtures, params)
+
+        tracer = start_trace(name)
+        self_before = resource.getrusage(resource.RUSAGE_SELF)
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        try:
+            run()
+        finally:
+            wall_seconds = time.perf_counter() - start
+            stop_trace()
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    cpu_seconds = (
+        _cpu_seconds(self_after)
+        - _cpu_seconds(self_before)
+        + _cpu_seconds(children_after)
+        - _cpu_seconds(children_before)
+    )
+    # ru_maxrss is in KiB on Linux; take the hungrier of Python and its largest child
+    peak_rss_kb = max(self_after.ru_maxrss, children_after.ru_maxrss)
+
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 3),
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+        "bytes_written": _bytes_written(tracer),
+    }
@@ -0,0 +1,144 @@
+import os
+from app.utils.commands import run_command
+
+FIXTURE_NAMES = [
+    "audio_main",
+    "audio_intro",
+    "audio_outro",
+    "video_main",
+    "video_intro",
+    "video_outro",
+]
+
+
+def _bitexact_args():
+    # Keep encoder versions/timestamps out of the files so reruns are byte-identical
+    return ["-fflags", "+bitexact", "-flags", "+bitexact", "-map_metadata", "-1"]
+
+
+def generate_tone(path, seconds, frequency=440, sample_rate=44100, codec="pcm_s16le"):
+    """
+    Writes a stereo sine tone generated with the `lavfi` sine source.
+
+    Args:
+        path (str): Output file (the extension picks the container).
+        seconds (float): Length of the tone.
+        frequency (int): Tone frequency in Hz (default: 440).
+        sample_rate (int): Sample rate in Hz (default: 44100).
+        codec (str): Audio codec (default: pcm_s16le).
+    """
+    command = [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency={frequency}:sample_rate={sample_rate}:duration={seconds}",
+        "-ac",
+        "2",
+        "-c:a",
+        codec,
+        *_bitexact_args(),
+        path,
+    ]
+    run_command(command, check=True)
+
+
+def generate_test_pattern(
+    path, seconds, resolution="1280x720", frame_rate=30, frequency=440
+):
+    """
+    Writes an H.264/AAC clip of the `testsrc2` pattern with a sine tone.
+
+    Args:
+        path (str): Output file.
+        seconds (float): Length of the clip.
+        resolution (str): Frame size (default: 1280x720).
+        frame_rate (int): Frames per second (default: 30).
+        frequency (int): Tone frequency in Hz (default: 440).
+    """
+    command = [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={resolution}:rate={frame_rate}:duration={seconds}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency={frequency}:sample_rate=44100:duration={seconds}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        "-ac",
+        "2",
+        "-shortest",
+        *_bitexact_args(),
+        path,
+    ]
+    run_command(command, check=True)
+
+
+def generate_fixtures(
+    fixture_dir, duration=30, intro_duration=5, resolution="1280x720", frame_rate=30
+):
+    """
+    Generates (or reuses) the synthetic sources the benchmarks run against.
+
+    The files are deterministic for a given set of parameters, so they're only
+    generated once per parameter set.
+
+    Args:
+        fixture_dir (str): Root directory for generated fixtures.
+        duration (float): Length of the main audio/video in seconds (default: 30).
+        intro_duration (float): Length of the intros/outros in seconds (default: 5).
+        resolution (str): Video frame size (default: 1280x720).
+        frame_rate (int): Video frame rate (default: 30).
+
+    Returns:
+        dict: Fixture name -> path (see `FIXTURE_NAMES`).
+    """
+    fixture_dir = os.path.join(
+        fixture_dir, f"{duration}s_{intro_duration}s_{resolution}_{frame_rate}fps"
+    )
+    os.makedirs(fixture_dir, exist_ok=True)
+
+    fixtures = {
+        "audio_main": os.path.join(fixture_dir, "audio_main.m4a"),
+        "audio_intro": os.path.join(fixture_dir, "audio_intro.wav"),
+        "audio_outro": os.path.join(fixture_dir, "audio_outro.wav"),
+        "video_main": os.path.join(fixture_dir, "video_main.mp4"),
+        "video_intro": os.path.join(fixture_dir, "video_intro.mp4"),
+        "video_outro": os.path.join(fixture_dir, "video_outro.mp4"),
+    }
+    generators = {
+        "audio_main": lambda path: generate_tone(path, duration, codec="aac"),
+        "audio_intro": lambda path: generate_tone(path, intro_duration, 660),
+        "audio_outro": lambda path: generate_tone(path, intro_duration, 330),
+        "video_main": lambda path: generate_test_pattern(
+            path, duration, resolution, frame_rate
+        ),
+        "video_intro": lambda path: generate_test_pattern(
+            path, intro_duration, resolution, frame_rate, 660
+        ),
+        "video_outro": lambda path: generate_test_pattern(
+            path, intro_duration, resolution, frame_rate, 330
+        ),
+    }
+
+    for name in FIXTURE_NAMES:
+        if not os.path.exists(fixtures[name]):
+            print(f"Generating fixture {fixtures[name]}...")
+            generators[name](fixtures[name])
+
+    return fixtures
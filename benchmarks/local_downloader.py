@@ -0,0 +1,38 @@
+import shutil
+from app.downloaders.base_downloader import Downloader
+
+
+class LocalDownloader(Downloader):
+    """
+    Serves URLs from local files; stands in for YouTube and S3 in benchmarks.
+    """
+
+    def __init__(self, sources):
+        """
+        Args:
+            sources (dict): URL -> local file to hand out for it.
+        """
+        self.sources = sources
+
+    def _source(self, url):
+        if url not in self.sources:
+            raise ValueError(f"No local source for {url}")
+        return self.sources[url]
+
+    def get_output_path(self, url, destination):
+        """
+        Resolves yt-dlp's `%(ext)s` template from the source file's extension.
+        """
+        ext = self._source(url).rsplit(".", 1)[-1]
+        return destination.replace("%(ext)s", ext)
+
+    def download(self, url, destination):
+        """
+        Copies the local source for `url` to the destination.
+
+        Returns:
+            str: The path to the copied file.
+        """
+        output_path = self.get_output_path(url, destination)
+        shutil.copyfile(self._source(url), output_path)
+        return output_path
@@ -0,0 +1,138 @@
+import argparse
+import re
+import sys
+import time
+from colorama import Fore, Style
+from app.utils.commands import run_command
+from app.utils.loudness_meter import measure_loudness_series
+from benchmarks.fixtures import generate_fixtures
+
+# Largest differences from ffmpeg's ebur128 filter that still count as a match
+TOLERANCES = {"integrated_lufs": 0.1, "loudness_range_lu": 0.5}
+
+_SUMMARY_VALUE = re.compile(r"^\s*(I|LRA|Threshold|Peak):\s+(-?[\d.]+|-inf)")
+
+
+def parse_ebur128_summary(stderr):
+    """
+    Reads the integrated loudness, range and peak from the summary the
+    `ebur128` filter prints when it finishes.
+
+    Returns:
+        dict: Same keys as `LoudnessSeries.summary`.
+    """
+    summary_start = stderr.rfind("Summary:")
+    values = {}
+    section = None
+    for line in stderr[summary_start:].splitlines():
+        if "Integrated loudness" in line:
+            section = "integrated"
+        elif "Loudness range" in line:
+            section = "range"
+        elif "peak" in line:
+            section = "peak"
+        match = _SUMMARY_VALUE.match(line)
+        if not match:
+            continue
+        name, value = match.groups()
+        key = {
+            ("integrated", "I"): "integrated_lufs",
+            ("integrated", "Threshold"): "threshold_lufs",
+            ("range", "LRA"): "loudness_range_lu",
+            ("peak", "Peak"): "sample_peak_dbfs",
+        }.get((section, name))
+        if key:
+            values[key] = float(value)
+    return values
+
+
+def measure_with_ebur128(path):
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        path,
+        "-map",
+        "0:a:0",
+        "-af",
+        "ebur128=peak=sample",
+        "-f",
+        "null",
+        "-",
+    ]
+    result = run_command(command, capture_output=True, text=True, check=True)
+    return parse_ebur128_summary(result.stderr)
+
+
+def compare(path):
+    """
+    Measures a file with the in-process meter and with ffmpeg's `ebur128`.
+
+    Returns:
+        dict: path, both summaries, both wall times and the differences.
+    """
+    start = time.perf_counter()
+    meter = measure_loudness_series(path).summary()
+    meter_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ffmpeg = measure_with_ebur128(path)
+    ffmpeg_seconds = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "meter": meter,
+        "ebur128": ffmpeg,
+        "meter_seconds": round(meter_seconds, 3),
+        "ebur128_seconds": round(ffmpeg_seconds, 3),
+        "differences": {
+            key: round(abs(meter[key] - ffmpeg[key]), 2)
+            for key in TOLERANCES
+            if key in ffmpeg
+        },
+    }
+
+
+def main(paths=None, duration=30, fixture_dir="cache/benchmarks"):
+    """
+    Checks the loudness meter against `ebur128` for accuracy and speed.
+
+    Returns:
+        int: Exit code (1 if any measurement is outside `TOLERANCES`).
+    """
+    if not paths:
+        fixtures = generate_fixtures(fixture_dir, duration=duration)
+        paths = [fixtures["audio_main"], fixtures["video_main"]]
+
+    failed = False
+    for path in paths:
+        result = compare(path)
+        mismatches = [
+            key
+            for key, difference in result["differences"].items()
+            if difference > TOLERANCES[key]
+        ]
+        failed = failed or bool(mismatches)
+        color = Fore.RED if mismatches else Fore.GREEN
+        print(
+            color
+            + f"{path}: meter {result['meter']['integrated_lufs']} LUFS in "
+            + f"{result['meter_seconds']}s, ebur128 "
+            + f"{result['ebur128'].get('integrated_lufs')} LUFS in "
+            + f"{result['ebur128_seconds']}s, differences {result['differences']}"
+            + Style.RESET_ALL
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the in-process loudness meter with ffmpeg's ebur128."
+    )
+    parser.add_argument(
+        "paths", nargs="*", help="Media files (default: the benchmark fixtures)."
+    )
+    parser.add_argument("--duration", type=int, default=30, help="Fixture seconds.")
+    args = parser.parse_args()
+    sys.exit(main(args.paths, args.duration))
@@ -0,0 +1,262 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+from colorama import Fore, Style
+from benchmarks.cases import CASES, run_case
+from benchmarks.fixtures import generate_fixtures
+
+METRICS = ["wall_seconds", "cpu_seconds", "peak_rss_mb", "bytes_written"]
+# Only comparable between runs on the same kind of machine
+TIMING_METRICS = ["wall_seconds", "cpu_seconds"]
+# What makes two machines the same for timings
+MACHINE_KEYS = ["cpu_count", "processor"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def run_benchmarks(case_names, fixtures, params, repeat=3, verbose=False):
+    """
+    Runs each case `repeat` times, every run in a fresh worker process.
+
+    Args:
+        case_names (list[str]): Cases to run (keys of `CASES`).
+        fixtures (dict): Fixture name -> path.
+        params (dict): The fixture parameters, recorded with the results.
+        repeat (int): Runs per case; the median time is kept (default: 3).
+        verbose (bool): Show the steps' and ffmpeg's output (default: False).
+
+    Returns:
+        dict: Case name -> metrics.
+    """
+    # spawn + one task per child: no state (caches, RSS high-water mark) leaks
+    # from one run into the next
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for name in case_names:
+            runs = [
+                pool.apply(run_case, (name, fixtures, params, verbose))
+                for _ in range(repeat)
+            ]
+            results[name] = {
+                "wall_seconds": statistics.median(r["wall_seconds"] for r in runs),
+                "cpu_seconds": statistics.median(r["cpu_seconds"] for r in runs),
+                "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+                "bytes_written": max(r["bytes_written"] for r in runs),
+            }
+            print(f"{name:>15}: " + _format_metrics(results[name]))
+    return results
+
+
+def _format_metrics(metrics):
+    return (
+        f"{metrics['wall_seconds']:8.2f}s wall, {metrics['cpu_seconds']:8.2f}s cpu, "
+        f"{metrics['peak_rss_mb']:7.1f} MB peak RSS, "
+        f"{metrics['bytes_written'] / 1_000_000:8.1f} MB written"
+    )
+
+
+def compare_to_baseline(results, baseline_cases, tolerance=0.25, metrics=METRICS):
+    """
+    Finds metrics that got worse than the baseline by more than `tolerance`.
+
+    Args:
+        results (dict): Case name -> metrics from this run.
+        baseline_cases (dict): Case name -> metrics from the baseline.
+        tolerance (float): Allowed relative increase, e.g. 0.25 for +25%.
+        metrics (list[str]): Metrics to compare (default: all of them).
+
+    Returns:
+        list[dict]: One entry per regression with case, metric, baseline,
+            current and change (relative).
+    """
+    regressions = []
+    for name, current in results.items():
+        baseline = baseline_cases.get(name)
+        if not baseline:
+            continue
+        for metric in metrics:
+            before, after = baseline.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change > tolerance:
+                regressions.append(
+                    {
+                        "case": name,
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "change": change,
+                    }
+                )
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def same_machine(machine, other):
+    """
+    Returns True if timings from `machine` and `other` are comparable.
+    """
+    return all(
+        (machine or {}).get(key) == (other or {}).get(key) for key in MACHINE_KEYS
+    )
+
+
+def save_baseline(path, results, params):
+    baseline = {
+        "params": params,
+        "machine": machine_info(),
+        "cases": results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(
+    case_names=None,
+    duration=30,
+    intro_duration=5,
+    resolution="1280x720",
+    frame_rate=30,
+    repeat=3,
+    baseline_path=DEFAULT_BASELINE,
+    tolerance=0.25,
+    update_baseline=False,
+    fixture_dir="cache/benchmarks",
+    verbose=False,
+):
+    """
+    Benchmarks the steps and pipelines on synthetic media and checks the
+    results against the stored baseline.
+
+    Returns:
+        int: Exit code (1 if anything regressed beyond the tolerance).
+    """
+    case_names = case_names or list(CASES)
+    params = {
+        "duration": duration,
+        "intro_duration": intro_duration,
+        "resolution": resolution,
+        "frame_rate": frame_rate,
+    }
+    fixtures = {
+        name: os.path.abspath(path)
+        for name, path in generate_fixtures(fixture_dir, **params).items()
+    }
+
+    results = run_benchmarks(case_names, fixtures, params, repeat, verbose)
+
+    if update_baseline:
+        baseline = load_baseline(baseline_path) or {}
+        if baseline.get("params") == params:
+            results = {**baseline.get("cases", {}), **results}
+        save_baseline(baseline_path, results, params)
+        print(Fore.GREEN + f"Baseline written to {baseline_path}" + Style.RESET_ALL)
+        return 0
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(Fore.YELLOW + f"No baseline at {baseline_path}." + Style.RESET_ALL)
+        return 0
+    if baseline.get("params") != params:
+        print(
+            Fore.YELLOW
+            + f"Baseline was recorded with {baseline.get('params')}, not {params}; "
+            + "not comparing."
+            + Style.RESET_ALL
+        )
+        return 0
+
+    metrics = METRICS
+    if not same_machine(baseline.get("machine"), machine_info()):
+        # Another CPU count or model says nothing about the code's speed
+        metrics = [metric for metric in METRICS if metric not in TIMING_METRICS]
+        print(
+            Fore.YELLOW
+            + f"Baseline was recorded on {baseline.get('machine')}, not "
+            + f"{machine_info()}; comparing {', '.join(metrics)} only. Re-record "
+            + "it on this machine with --update-baseline to compare times."
+            + Style.RESET_ALL
+        )
+
+    regressions = compare_to_baseline(results, baseline["cases"], tolerance, metrics)
+    for regression in regressions:
+        print(
+            Fore.RED
+            + f"REGRESSION {regression['case']} {regression['metric']}: "
+            + f"{regression['baseline']} -> {regression['current']} "
+            + f"(+{regression['change']:.0%})"
+            + Style.RESET_ALL
+        )
+    if not regressions:
+        print(
+            Fore.GREEN
+            + f"No regressions beyond {tolerance:.0%} of the baseline."
+            + Style.RESET_ALL
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline steps on synthetic media."
+    )
+    parser.add_argument(
+        "cases", nargs="*", help=f"Cases to run (default: all of {', '.join(CASES)})."
+    )
+    parser.add_argument("--duration", type=int, default=30, help="Main media seconds.")
+    parser.add_argument(
+        "--intro-duration", type=int, default=5, help="Intro/outro seconds."
+    )
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--frame-rate", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)."
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store this run's results as the new baseline.",
+    )
+    parser.add_argument("--fixture-dir", default="cache/benchmarks")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    unknown_cases = set(args.cases) - set(CASES)
+    if unknown_cases:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown_cases))}")
+
+    exit(
+        main(
+            args.cases,
+            args.duration,
+            args.intro_duration,
+            args.resolution,
+            args.frame_rate,
+            args.repeat,
+            args.baseline,
+            args.tolerance,
+            args.update_baseline,
+            args.fixture_dir,
+            args.verbose,
+        )
+    )
@@ -0,0 +1,88 @@
+import argparse
+import json
+from app.utils.encoder_calibration import DEFAULT_PRESETS, calibrate_profile
+from app.utils.encoder_profiles import get_encoder_profile
+
+
+def main(
+    input_path,
+    profile_name="publish",
+    target_rtf=1.0,
+    sample_seconds=20,
+    presets=None,
+    crfs=None,
+    config_path=None,
+):
+    """
+    Calibrate an encoder profile against a sample of a real source.
+
+    Args:
+        input_path: The source video to sample
+        profile_name: The profile to tune ("archive", "publish", "preview", ...)
+        target_rtf: Minimum real-time factor the tuned profile must reach
+        sample_seconds: Length of the sample in seconds
+        presets: x264 presets to try
+        crfs: CRF values to try
+        config_path: If set, write the tuned profile into this config file
+
+    Returns:
+        EncoderProfile: The tuned profile
+    """
+    encoding_conf = None
+    if config_path:
+        with open(config_path, "r") as f:
+            config = json.load(f)
+        encoding_conf = config.get("encoding")
+
+    profile = get_encoder_profile(encoding_conf, name=profile_name)
+    tuned_profile, _ = calibrate_profile(
+        input_path,
+        profile,
+        target_rtf=target_rtf,
+        sample_seconds=sample_seconds,
+        presets=presets,
+        crfs=crfs,
+    )
+
+    tuned_settings = {"preset": tuned_profile.preset, "crf": tuned_profile.crf}
+    print(f"Tuned '{profile_name}' profile: {json.dumps(tuned_settings)}")
+
+    if config_path:
+        encoding = config.setdefault("encoding", {})
+        profiles = encoding.setdefault("profiles", {})
+        # Keep the profile's other overrides (codec, pixel format...)
+        profiles[profile_name] = {**profiles.get(profile_name, {}), **tuned_settings}
+        with open(config_path, "w") as f:
+            json.dump(config, f, indent=2)
+        print(f"Saved to {config_path}")
+
+    return tuned_profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pick the smallest x264 settings that still encode fast enough."
+    )
+    parser.add_argument("input_path", help="Source video to sample.")
+    parser.add_argument("--profile", default="publish")
+    parser.add_argument(
+        "--target-rtf",
+        type=float,
+        default=1.0,
+        help="Minimum real-time factor (2.0 = twice as fast as playback).",
+    )
+    parser.add_argument("--sample-seconds", type=float, default=20)
+    parser.add_argument("--presets", nargs="+", default=DEFAULT_PRESETS)
+    parser.add_argument("--crfs", nargs="+", type=int)
+    parser.add_argument("--config", help="Config file to write the tuned profile to.")
+    args = parser.parse_args()
+
+    main(
+        args.input_path,
+        profile_name=args.profile,
+        target_rtf=args.target_rtf,
+        sample_seconds=args.sample_seconds,
+        presets=args.presets,
+        crfs=args.crfs,
+        config_path=args.config,
+    )
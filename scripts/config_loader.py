@@ -1,14 +1,47 @@
 import json
-from jsonschema import validate
+import os
+
+# (schema path, mtime) -> compiled validator, so batches only compile it once
+_validators = {}
+
+
+def get_validator(schema_file="config/pipeline_schema.json"):
+    """
+    Returns a validator for the schema, compiled on first use and reused until
+    the schema file changes.
+
+    Args:
+        schema_file (str): Path to the JSON schema.
+
+    Returns:
+        jsonschema.protocols.Validator: The compiled validator.
+    """
+    key = (os.path.abspath(schema_file), os.path.getmtime(schema_file))
+    validator = _validators.get(key)
+    if validator is None:
+        # jsonschema takes ~100 ms to import; only pay for it when validating
+        from jsonschema.validators import validator_for
+
+        with open(schema_file, "r") as sf:
+            schema = json.load(sf)
+        validator_class = validator_for(schema)
+        validator_class.check_schema(schema)
+        validator = validator_class(schema)
+        _validators[key] = validator
+    return validator
 
 
 def load_and_validate_config(
     config_file="config/pipeline_config.json", schema_file="config/pipeline_schema.json"
 ):
-    with open(schema_file, "r") as sf:
-        schema = json.load(sf)
+    from jsonschema.exceptions import best_match
+
+    validator = get_validator(schema_file)
     with open(config_file, "r") as cf:
         config = json.load(cf)
 
-    validate(instance=config, schema=schema)
+    # Same error `jsonschema.validate` would raise
+    error = best_match(validator.iter_errors(config))
+    if error is not None:
+        raise error
     return config
@@ -0,0 +1,89 @@
+import argparse
+from app.core import run_pipelines_concurrently
+from app.pipelines.audio_pipeline import create_audio_pipeline
+from app.pipelines.video_pipeline import create_video_pipeline
+from app.utils.run_history import DEFAULT_HISTORY_PATH, RunHistory, RunHistoryObserver
+
+PIPELINE_FACTORIES = {
+    "audio": create_audio_pipeline,
+    "video": create_video_pipeline,
+}
+
+
+def main(
+    config_paths,
+    media_type="audio",
+    schema_path="config/pipeline_schema.json",
+    max_concurrent_jobs=4,
+    trace_dir="output/traces",
+    metrics_conf=None,
+    history_path=DEFAULT_HISTORY_PATH,
+):
+    """
+    Run one pipeline job per config file concurrently in a single process.
+
+    Args:
+        config_paths: Paths to the configuration files, one per job
+        media_type: Which pipeline to run ("audio" or "video")
+        schema_path: Path to the configuration schema file
+        max_concurrent_jobs: Maximum number of jobs running at the same time
+        trace_dir: Where to write the batch's Chrome trace and JSONL span log
+        metrics_conf: Optional metrics settings (`textfile` and/or `port`), shared
+            by all jobs in the batch
+        history_path: SQLite database every job's timings are recorded in
+
+    Returns:
+        list: For each config, the final PipelineData or the exception it raised
+    """
+    observers = []
+    if metrics_conf:
+        from app.utils.metrics_observer import create_metrics_observer
+
+        observers.append(create_metrics_observer(metrics_conf))
+    if history_path:
+        observers.append(RunHistoryObserver(RunHistory(history_path)))
+
+    results = run_pipelines_concurrently(
+        pipeline_factory=PIPELINE_FACTORIES[media_type],
+        config_paths=config_paths,
+        schema_path=schema_path,
+        max_concurrent_jobs=max_concurrent_jobs,
+        trace_dir=trace_dir,
+        observers=observers,
+    )
+
+    for config_path, result in zip(config_paths, results):
+        if isinstance(result, Exception):
+            print(f"FAILED {config_path}: {result}")
+        else:
+            print(f"OK {config_path}: {result.final_output_path}")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run several sermon pipeline jobs concurrently."
+    )
+    parser.add_argument("config_paths", nargs="+", help="One config file per job.")
+    parser.add_argument("--media", choices=sorted(PIPELINE_FACTORIES), default="audio")
+    parser.add_argument("--schema", default="config/pipeline_schema.json")
+    parser.add_argument("--jobs", type=int, default=4, help="Max concurrent jobs.")
+    parser.add_argument(
+        "--metrics-textfile", help="Write Prometheus metrics here after each job."
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, help="Serve Prometheus metrics on this port."
+    )
+    args = parser.parse_args()
+
+    metrics_conf = {"textfile": args.metrics_textfile, "port": args.metrics_port}
+    results = main(
+        args.config_paths,
+        args.media,
+        args.schema,
+        args.jobs,
+        metrics_conf=metrics_conf if any(metrics_conf.values()) else None,
+    )
+    if any(isinstance(result, Exception) for result in results):
+        exit(1)
@@ -0,0 +1,148 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from colorama import Fore, Style
+from app.utils.run_history import (
+    DEFAULT_HISTORY_PATH,
+    RunHistory,
+    source_duration,
+)
+from scripts.config_loader import load_and_validate_config
+
+
+def _duration(seconds):
+    if seconds is None:
+        return "-"
+    return str(timedelta(seconds=round(seconds)))
+
+
+def print_step_stats(history, pipeline=None, since=None):
+    stats = history.step_stats(pipeline, since)
+    if not stats:
+        print("No runs recorded yet.")
+        return
+    print(f"{'step':<30} {'runs':>5} {'p50':>9} {'p95':>9} {'max':>9}")
+    for row in stats:
+        print(
+            f"{row['step']:<30} {row['runs']:>5} {_duration(row['p50']):>9} "
+            f"{_duration(row['p95']):>9} {_duration(row['max']):>9}"
+        )
+
+
+def print_trend(history, pipeline=None, since=None):
+    trend = history.trend(pipeline, since)
+    if not trend:
+        print("No runs recorded yet.")
+        return
+    print(f"{'week':<10} {'runs':>5} {'failed':>7} {'p50':>9} {'x realtime':>11}")
+    for row in trend:
+        rtf = f"{row['realtime_factor']:.2f}" if row["realtime_factor"] else "-"
+        print(
+            f"{row['week']:<10} {row['runs']:>5} {row['failures']:>7} "
+            f"{_duration(row['p50']):>9} {rtf:>11}"
+        )
+
+
+def print_slowest(history, pipeline=None, limit=10):
+    for run in history.slowest_runs(pipeline, limit):
+        started = datetime.fromtimestamp(run["started_at"]).strftime("%Y-%m-%d %H:%M")
+        print(
+            f"{started}  {run['pipeline']:<15} {run['job'] or '-':<25} "
+            f"{_duration(run['duration_seconds']):>9}  {run['status']}  "
+            f"config {run['config_hash']}"
+        )
+
+
+def plan(
+    history,
+    config_path,
+    schema_path="config/pipeline_schema.json",
+    media_types=("audio", "video"),
+    deadline=None,
+):
+    """
+    Predicts how long each pipeline will take on a config, before running it.
+
+    Args:
+        history (RunHistory): Past runs to learn from.
+        config_path (str): The config to plan.
+        schema_path (str): Schema to validate it against.
+        media_types (tuple): Pipelines to predict ("audio", "video").
+        deadline (str): Optional "HH:MM" today; warns if p95 would miss it.
+
+    Returns:
+        dict: Media type -> prediction (see `RunHistory.predict`), or None.
+    """
+    config = load_and_validate_config(config_file=config_path, schema_file=schema_path)
+    predictions = {}
+    for media_type in media_types:
+        pipeline = f"{media_type}_pipeline"
+        media_seconds = source_duration(config, media_type)
+        prediction = history.predict(pipeline, media_seconds)
+        predictions[media_type] = prediction
+
+        if media_seconds is None:
+            print(f"{pipeline}: no trim window in the config; can't size the run.")
+            continue
+        if prediction is None:
+            print(f"{pipeline}: no successful runs recorded yet.")
+            continue
+
+        finish_p50 = datetime.now() + timedelta(seconds=prediction["p50"])
+        finish_p95 = datetime.now() + timedelta(seconds=prediction["p95"])
+        print(
+            Fore.GREEN
+            + f"{pipeline}: {_duration(media_seconds)} of media, "
+            + f"~{_duration(prediction['p50'])} (p95 {_duration(prediction['p95'])}) "
+            + f"from {prediction['runs']} runs; done around "
+            + f"{finish_p50:%H:%M} (p95 {finish_p95:%H:%M})"
+            + Style.RESET_ALL
+        )
+        for step, seconds in prediction["steps"]:
+            print(f"    {step:<30} {_duration(seconds):>9}")
+
+        if deadline:
+            hour, minute = map(int, deadline.split(":"))
+            deadline_at = datetime.now().replace(hour=hour, minute=minute, second=0)
+            if finish_p95 > deadline_at:
+                print(
+                    Fore.RED
+                    + f"    May miss the {deadline} deadline (p95 finish {finish_p95:%H:%M})."
+                    + Style.RESET_ALL
+                )
+    return predictions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Query the run history: step timings, trends, slow runs, ETAs."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--steps", action="store_true", help="p50/p95 per step (default)."
+    )
+    mode.add_argument("--trend", action="store_true", help="Run times per week.")
+    mode.add_argument("--slowest", type=int, metavar="N", help="The N slowest runs.")
+    mode.add_argument(
+        "--plan", metavar="CONFIG", help="Predict how long CONFIG will take."
+    )
+    parser.add_argument("--media", choices=["audio", "video"])
+    parser.add_argument("--days", type=int, help="Only runs from the last N days.")
+    parser.add_argument("--deadline", metavar="HH:MM", help="Deadline for --plan.")
+    parser.add_argument("--db", default=DEFAULT_HISTORY_PATH)
+    parser.add_argument("--schema", default="config/pipeline_schema.json")
+    args = parser.parse_args()
+
+    history = RunHistory(args.db)
+    pipeline = f"{args.media}_pipeline" if args.media else None
+    since = time.time() - args.days * 86400 if args.days else None
+
+    if args.plan:
+        media_types = [args.media] if args.media else ["audio", "video"]
+        plan(history, args.plan, args.schema, media_types, args.deadline)
+    elif args.trend:
+        print_trend(history, pipeline, since)
+    elif args.slowest:
+        print_slowest(history, pipeline, args.slowest)
+    else:
+        print_step_stats(history, pipeline, since)
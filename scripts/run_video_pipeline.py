@@ -1,10 +1,22 @@
-import sys
+import argparse
+from functools import partial
 from app.core import run_pipeline
-from app.pipelines.video_pipeline import create_video_pipeline
+from app.pipelines.base_pipeline import PREVIEW_SECONDS
+from app.pipelines.video_pipeline import (
+    create_video_pipeline,
+    create_video_preview_pipeline,
+)
+from app.utils.profiling import DEFAULT_PROFILE_DIR
+from app.utils.run_history import DEFAULT_HISTORY_PATH, RunHistory, RunHistoryObserver
 
 
 def main(
-    config_path="config/pipeline_config.json", schema_path="config/pipeline_schema.json"
+    config_path="config/pipeline_config.json",
+    schema_path="config/pipeline_schema.json",
+    trace_dir="output/traces",
+    history_path=DEFAULT_HISTORY_PATH,
+    profile_dir=None,
+    preview=None,
 ):
     """
     Run the video processing pipeline.
@@ -12,26 +24,67 @@ def main(
     Args:
         config_path: Path to the configuration file
         schema_path: Path to the configuration schema file
+        trace_dir: Where to write the run's Chrome trace and JSONL span log
+        history_path: SQLite database the run's timings are recorded in
+            (see scripts/run_history.py)
+        profile_dir: If set, profile the run and write a profile bundle here
+        preview: If set, only render this many seconds around each join, small
+            and fast, to check the trim and transitions (not recorded in the
+            run history, whose timings are for full renders)
 
     Returns:
         PipelineData: The final pipeline data after execution
     """
+    if preview:
+        history_path = None
     return run_pipeline(
-        pipeline_factory=create_video_pipeline,
+        pipeline_factory=(
+            partial(create_video_preview_pipeline, seconds=preview)
+            if preview
+            else create_video_pipeline
+        ),
         config_path=config_path,
         schema_path=schema_path,
+        trace_dir=trace_dir,
+        observers=(
+            [RunHistoryObserver(RunHistory(history_path))] if history_path else None
+        ),
+        profile_dir=profile_dir,
     )
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
-    else:
-        config_path = "config/pipeline_config.json"
-
-    if len(sys.argv) > 2:
-        schema_path = sys.argv[2]
-    else:
-        schema_path = "config/pipeline_schema.json"
+    parser = argparse.ArgumentParser(description="Run the video processing pipeline.")
+    parser.add_argument("config_path", nargs="?", default="config/pipeline_config.json")
+    parser.add_argument("schema_path", nargs="?", default="config/pipeline_schema.json")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run and write a bundle to --profile-dir.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        metavar="DIR",
+        help=f"Where profile bundles go; implies --profile (default: {DEFAULT_PROFILE_DIR}).",
+    )
+    parser.add_argument(
+        "--preview",
+        nargs="?",
+        type=float,
+        const=PREVIEW_SECONDS,
+        metavar="SECONDS",
+        help="Only render the intro and outro joins at low resolution, SECONDS "
+        f"on each side (default: {PREVIEW_SECONDS:g}).",
+    )
+    args = parser.parse_args()
 
-    main(config_path, schema_path)
+    main(
+        args.config_path,
+        args.schema_path,
+        profile_dir=(
+            args.profile_dir or DEFAULT_PROFILE_DIR
+            if args.profile or args.profile_dir
+            else None
+        ),
+        preview=args.preview,
+    )
@@ -0,0 +1,49 @@
+import argparse
+import sys
+from colorama import Fore, Style
+from app.utils.manifest import verify_artifacts
+
+
+def main(roots, max_workers=None):
+    """
+    Re-checks every recorded digest under `roots` and prints what's wrong.
+
+    Args:
+        roots (list[str]): Directories to verify.
+        max_workers (int): Files hashed at once (default: one per CPU).
+
+    Returns:
+        int: The exit code; 1 if any artifact is corrupt or missing.
+    """
+    results = verify_artifacts(roots, max_workers=max_workers)
+    failed = [r for r in results if r["status"] in ("mismatch", "missing")]
+    for result in failed:
+        print(
+            Fore.RED
+            + f"{result['status'].upper():<9} {result['path']}"
+            + Style.RESET_ALL
+        )
+
+    checked = sum(1 for r in results if r["status"] == "ok")
+    color = Fore.RED if failed else Fore.GREEN
+    print(
+        color
+        + f"Verified {checked} of {len(results)} artifacts in {', '.join(roots)}; "
+        + f"{len(failed)} failed."
+        + Style.RESET_ALL
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Verify cached and published artifacts against their SHA-256 digests."
+    )
+    parser.add_argument(
+        "roots", nargs="*", default=["cache", "output"], help="Directories to check."
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Files hashed at once (default: one per CPU)."
+    )
+    args = parser.parse_args()
+    sys.exit(main(args.roots, args.workers))
@@ -0,0 +1,19 @@
+import pytest
+from app.utils.auto_trim import rms_envelope, suggest_trim
+from benchmarks.auto_trim import SCENARIOS, synthesize
+
+# The envelope only needs the level over time; a low rate keeps the test fast
+SAMPLE_RATE = 2000
+
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_finds_the_labelled_sermon(name):
+    scenario = SCENARIOS[name]
+    envelope = rms_envelope(synthesize(scenario["segments"], SAMPLE_RATE), SAMPLE_RATE)
+
+    suggestion = suggest_trim(envelope)
+
+    start, end = scenario["sermon"]
+    assert suggestion.start == pytest.approx(start, abs=3)
+    assert suggestion.end == pytest.approx(end, abs=3)
+    assert suggestion.confidence > 0.9
@@ -0,0 +1,27 @@
+from benchmarks.loudness_meter import parse_ebur128_summary
+
+EBUR128_STDERR = """[Parsed_ebur128_0 @ 0x5581] t: 59.9 TARGET:-23 LUFS M: -24.9 S: -25.3
+[Parsed_ebur128_0 @ 0x5581] Summary:
+
+  Integrated loudness:
+    I:         -26.9 LUFS
+    Threshold: -38.5 LUFS
+
+  Loudness range:
+    LRA:        14.0 LU
+    Threshold: -48.6 LUFS
+    LRA low:   -35.2 LUFS
+    LRA high:  -21.2 LUFS
+
+  Sample peak:
+    Peak:      -14.5 dBFS
+"""
+
+
+def test_parse_ebur128_summary():
+    assert parse_ebur128_summary(EBUR128_STDERR) == {
+        "integrated_lufs": -26.9,
+        "threshold_lufs": -38.5,
+        "loudness_range_lu": 14.0,
+        "sample_peak_dbfs": -14.5,
+    }
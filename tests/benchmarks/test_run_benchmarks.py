@@ -0,0 +1,91 @@
+import pytest
+from benchmarks.local_downloader import LocalDownloader
+from benchmarks.run_benchmarks import (
+    TIMING_METRICS,
+    compare_to_baseline,
+    load_baseline,
+    same_machine,
+    save_baseline,
+)
+
+
+def _metrics(wall_seconds=10.0, cpu_seconds=9.0, peak_rss_mb=100.0, bytes_written=1000):
+    return {
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "peak_rss_mb": peak_rss_mb,
+        "bytes_written": bytes_written,
+    }
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"trim_audio": _metrics(), "merge_audio": _metrics()}
+    results = {
+        "trim_audio": _metrics(wall_seconds=12.0),  # +20%, within tolerance
+        "merge_audio": _metrics(wall_seconds=15.0, peak_rss_mb=200.0),
+    }
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+
+    assert [(r["case"], r["metric"]) for r in regressions] == [
+        ("merge_audio", "wall_seconds"),
+        ("merge_audio", "peak_rss_mb"),
+    ]
+    assert regressions[0]["change"] == pytest.approx(0.5)
+
+
+def test_compare_ignores_improvements_and_new_cases():
+    baseline = {"trim_audio": _metrics()}
+    results = {
+        "trim_audio": _metrics(wall_seconds=2.0, bytes_written=10),
+        "pipeline_video": _metrics(wall_seconds=500.0),
+    }
+
+    assert compare_to_baseline(results, baseline) == []
+
+
+def test_compare_without_timings():
+    baseline = {"merge_audio": _metrics()}
+    results = {"merge_audio": _metrics(wall_seconds=30.0, peak_rss_mb=200.0)}
+    metrics = ["peak_rss_mb", "bytes_written"]
+
+    regressions = compare_to_baseline(results, baseline, metrics=metrics)
+
+    assert [r["metric"] for r in regressions] == ["peak_rss_mb"]
+    assert not set(metrics) & set(TIMING_METRICS)
+
+
+def test_same_machine():
+    machine = {"platform": "Linux-6.1", "processor": "x86_64", "cpu_count": 8}
+
+    # A kernel update doesn't change the timings
+    assert same_machine(machine, dict(machine, platform="Linux-6.8"))
+    assert not same_machine(machine, dict(machine, cpu_count=1))
+    assert not same_machine(None, machine)
+
+
+def test_baseline_round_trip(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    params = {"duration": 30, "intro_duration": 5}
+
+    assert load_baseline(path) is None
+    save_baseline(path, {"trim_audio": _metrics()}, params)
+
+    baseline = load_baseline(path)
+    assert baseline["params"] == params
+    assert baseline["cases"]["trim_audio"] == _metrics()
+    assert "cpu_count" in baseline["machine"]
+
+
+def test_local_downloader_serves_sources(tmp_path):
+    source = tmp_path / "source.m4a"
+    source.write_bytes(b"audio")
+    downloader = LocalDownloader({"https://www.youtube.com/watch?v=x": str(source)})
+    destination = str(tmp_path / "audio.%(ext)s")
+
+    path = downloader.download("https://www.youtube.com/watch?v=x", destination)
+
+    assert path == str(tmp_path / "audio.m4a")
+    assert open(path, "rb").read() == b"audio"
+    with pytest.raises(ValueError):
+        downloader.download("https://s3.example.com/missing.wav", destination)
@@ -0,0 +1,89 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from app.caches.cache_sync import CacheSync, create_cache_sync
+from app.caches.local_cache import LocalCacheBackend
+from app.caches.s3_cache import S3CacheBackend
+
+
+@pytest.fixture
+def cache_root(tmp_path):
+    root = tmp_path / "cache"
+    root.mkdir()
+    return root
+
+
+def test_key_for(cache_root):
+    cache_sync = CacheSync(MagicMock(), root=str(cache_root))
+
+    key = cache_sync.key_for(str(cache_root / "audio" / "2025-02-02" / "audio.m4a"))
+
+    assert key == "audio/2025-02-02/audio.m4a"
+
+
+def test_key_for_outside_root(cache_root, tmp_path):
+    cache_sync = CacheSync(MagicMock(), root=str(cache_root))
+
+    with pytest.raises(ValueError, match="outside of the cache root"):
+        cache_sync.key_for(str(tmp_path / "elsewhere.m4a"))
+
+
+def test_pull_hit_and_miss(cache_root, tmp_path):
+    shared = LocalCacheBackend(str(tmp_path / "shared"))
+    source = tmp_path / "intro.wav"
+    source.write_bytes(b"intro")
+    shared.store("s3/audio_intro.wav", str(source))
+    cache_sync = CacheSync(shared, root=str(cache_root), write_back=False)
+
+    assert cache_sync.pull(str(cache_root / "s3" / "audio_intro.wav"))
+    assert (cache_root / "s3" / "audio_intro.wav").read_bytes() == b"intro"
+    assert not cache_sync.pull(str(cache_root / "s3" / "audio_outro.wav"))
+
+
+def test_push_write_through(cache_root):
+    backend = MagicMock()
+    cache_sync = CacheSync(backend, root=str(cache_root), write_back=False)
+    path = str(cache_root / "s3" / "audio_intro.wav")
+
+    cache_sync.push(path)
+
+    backend.store.assert_called_once_with("s3/audio_intro.wav", path)
+
+
+def test_push_write_back_until_flush(cache_root):
+    backend = MagicMock()
+    cache_sync = CacheSync(backend, root=str(cache_root), write_back=True)
+    path = str(cache_root / "s3" / "audio_intro.wav")
+
+    cache_sync.push(path)
+    cache_sync.flush()
+
+    backend.store.assert_called_once_with("s3/audio_intro.wav", path)
+
+
+def test_flush_raises_upload_errors(cache_root):
+    backend = MagicMock()
+    backend.store.side_effect = PermissionError("Access denied")
+    cache_sync = CacheSync(backend, root=str(cache_root), write_back=True)
+
+    cache_sync.push(str(cache_root / "s3" / "audio_intro.wav"))
+
+    with pytest.raises(PermissionError, match="Access denied"):
+        cache_sync.flush()
+
+
+def test_create_cache_sync(tmp_path):
+    assert create_cache_sync(None) is None
+
+    local_sync = create_cache_sync({"backend": "local", "path": str(tmp_path)})
+    assert isinstance(local_sync.backend, LocalCacheBackend)
+    assert local_sync.write_back
+
+    s3_sync = create_cache_sync(
+        {"backend": "s3", "bucket": "cache-bucket", "write_back": False}
+    )
+    assert isinstance(s3_sync.backend, S3CacheBackend)
+    assert not s3_sync.write_back
+
+    with pytest.raises(ValueError, match="Unsupported cache backend"):
+        create_cache_sync({"backend": "ftp"})
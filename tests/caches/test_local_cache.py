@@ -0,0 +1,78 @@
+import hashlib
+import pytest
+from app.caches.local_cache import LocalCacheBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalCacheBackend(root=str(tmp_path / "shared"))
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    source = tmp_path / "audio.m4a"
+    source.write_bytes(b"0123456789")
+    return source
+
+
+def test_store_and_fetch(backend, source_file, tmp_path):
+    key = "audio/2025-02-02/sermon/audio.m4a"
+
+    content_hash = backend.store(key, str(source_file))
+    destination = tmp_path / "node2" / "audio.m4a"
+    result = backend.fetch(key, str(destination))
+
+    assert backend.exists(key)
+    assert content_hash == hashlib.sha256(b"0123456789").hexdigest()
+    assert backend.content_hash(key) == content_hash
+    assert result == str(destination)
+    assert destination.read_bytes() == b"0123456789"
+
+
+def test_store_writes_a_sha256sum_sidecar(backend, source_file):
+    key = "audio/2025-02-02/sermon/audio.m4a"
+
+    content_hash = backend.store(key, str(source_file))
+
+    with open(f"{backend._get_path(key)}.sha256") as f:
+        assert f.read() == f"{content_hash}  audio.m4a\n"
+
+
+def test_content_hash_reads_bare_digests(backend, source_file):
+    key = "s3/audio_intro.wav"
+    backend.store(key, str(source_file))
+    with open(f"{backend._get_path(key)}.sha256", "w") as f:
+        f.write("abc123")
+
+    assert backend.content_hash(key) == "abc123"
+
+
+def test_exists_miss(backend):
+    assert not backend.exists("audio/missing.m4a")
+    assert backend.content_hash("audio/missing.m4a") is None
+
+
+def test_fetch_missing_key(backend, tmp_path):
+    with pytest.raises(FileNotFoundError, match="No cached artifact"):
+        backend.fetch("audio/missing.m4a", str(tmp_path / "out.m4a"))
+
+
+def test_fetch_detects_corruption(backend, source_file, tmp_path):
+    key = "s3/audio_intro.wav"
+    backend.store(key, str(source_file))
+
+    # Corrupt the stored artifact behind the backend's back
+    with open(backend._get_path(key), "wb") as f:
+        f.write(b"truncated")
+
+    destination = tmp_path / "out.wav"
+    with pytest.raises(ValueError, match="Content hash mismatch"):
+        backend.fetch(key, str(destination))
+    assert not destination.exists()
+
+
+def test_read_range(backend, source_file):
+    key = "s3/audio_intro.wav"
+    backend.store(key, str(source_file))
+
+    assert backend.read_range(key, 2, 4) == b"2345"
@@ -0,0 +1,79 @@
+import hashlib
+import pytest
+from app.caches.s3_cache import S3CacheBackend
+from tests.fixtures.fake_s3_client import FakeClientError, FakeS3Client
+
+
+@pytest.fixture
+def client():
+    return FakeS3Client()
+
+
+@pytest.fixture
+def backend(client):
+    return S3CacheBackend(bucket="cache-bucket", prefix="nodes/", client=client)
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    source = tmp_path / "video.mp4"
+    source.write_bytes(b"0123456789")
+    return source
+
+
+def test_store_uses_prefix_and_records_hash(backend, client, source_file):
+    content_hash = backend.store("video/video.mp4", str(source_file))
+
+    assert ("cache-bucket", "nodes/video/video.mp4") in client.objects
+    assert content_hash == hashlib.sha256(b"0123456789").hexdigest()
+    assert backend.content_hash("video/video.mp4") == content_hash
+
+
+def test_exists(backend, source_file):
+    assert not backend.exists("video/video.mp4")
+    backend.store("video/video.mp4", str(source_file))
+    assert backend.exists("video/video.mp4")
+
+
+def test_exists_propagates_other_errors(client):
+    client.head_object = lambda **kwargs: (_ for _ in ()).throw(
+        FakeClientError("AccessDenied")
+    )
+    backend = S3CacheBackend(bucket="cache-bucket", client=client)
+
+    with pytest.raises(FakeClientError):
+        backend.exists("video/video.mp4")
+
+
+def test_fetch(backend, source_file, tmp_path):
+    backend.store("video/video.mp4", str(source_file))
+    destination = tmp_path / "node2" / "video.mp4"
+
+    result = backend.fetch("video/video.mp4", str(destination))
+
+    assert result == str(destination)
+    assert destination.read_bytes() == b"0123456789"
+
+
+def test_fetch_detects_corruption(backend, client, source_file, tmp_path):
+    backend.store("video/video.mp4", str(source_file))
+    client.objects[("cache-bucket", "nodes/video/video.mp4")] = b"01234"
+
+    with pytest.raises(ValueError, match="Content hash mismatch"):
+        backend.fetch("video/video.mp4", str(tmp_path / "video.mp4"))
+
+
+def test_read_range(backend, source_file):
+    backend.store("video/video.mp4", str(source_file))
+
+    assert backend.read_range("video/video.mp4", 3, 4) == b"3456"
+
+
+def test_read_range_at_the_edges(backend, source_file):
+    backend.store("video/video.mp4", str(source_file))
+
+    # Same results as reading a local file, without an invalid Range header
+    assert backend.read_range("video/video.mp4", 3, 0) == b""
+    assert backend.read_range("video/video.mp4", 8, 4) == b"89"
+    assert backend.read_range("video/video.mp4", 10, 4) == b""
+    assert backend.read_range("video/video.mp4", 42, 4) == b""
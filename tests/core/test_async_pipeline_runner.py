@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import threading
+import pytest
+from unittest.mock import patch
+from app.core.async_pipeline_runner import (
+    AsyncPipelineRunner,
+    run_pipelines_concurrently,
+)
+from app.data_models.pipeline_data import PipelineData
+from app.utils.metrics_observer import MetricsObserver
+
+
+@pytest.fixture
+def mock_config_loader():
+    with patch(
+        "app.core.async_pipeline_runner.load_and_validate_config",
+        side_effect=lambda config_file, schema_file: {"stream_id": config_file},
+    ) as mock_loader:
+        yield mock_loader
+
+
+def test_runs_sync_and_async_steps(mock_config_loader):
+    main_thread = threading.get_ident()
+    seen_threads = {}
+
+    def sync_step(data):
+        seen_threads["sync"] = threading.get_ident()
+        data.main_file_path = "main.wav"
+        return data
+
+    async def async_step(data):
+        data.active_file_path = "active.wav"
+        return data
+
+    def wrapped_async_step(data):
+        return async_step(data)
+
+    runner = AsyncPipelineRunner(
+        lambda config: [
+            ("Sync", sync_step),
+            ("Async", async_step),
+            ("Wrapped", wrapped_async_step),
+        ]
+    )
+
+    data = asyncio.run(runner.run_job("job.json"))
+
+    assert isinstance(data, PipelineData)
+    assert data.main_file_path == "main.wav"
+    assert data.active_file_path == "active.wav"
+    # Blocking steps must not run on the event loop thread
+    assert seen_threads["sync"] != main_thread
+
+
+def test_run_many_limits_concurrency(mock_config_loader):
+    lock = threading.Lock()
+    counters = {"active": 0, "peak": 0}
+
+    async def tracked_step(data):
+        with lock:
+            counters["active"] += 1
+            counters["peak"] = max(counters["peak"], counters["active"])
+        await asyncio.sleep(0.01)
+        with lock:
+            counters["active"] -= 1
+        return data
+
+    runner = AsyncPipelineRunner(
+        lambda config: [("Tracked", tracked_step)], max_concurrent_jobs=2
+    )
+
+    results = asyncio.run(runner.run_many([f"job{i}.json" for i in range(6)]))
+
+    assert len(results) == 6
+    assert all(isinstance(result, PipelineData) for result in results)
+    assert counters["peak"] == 2
+
+
+def test_run_many_traces_each_job_on_its_own_track(mock_config_loader, tmp_path):
+    async def slow_step(data):
+        await asyncio.sleep(0.01)
+        return data
+
+    runner = AsyncPipelineRunner(
+        lambda config: [("Merge", slow_step)], trace_dir=str(tmp_path)
+    )
+    asyncio.run(runner.run_many(["a.json", "b.json"]))
+
+    (trace_file,) = [name for name in os.listdir(tmp_path) if name.endswith(".json")]
+    with open(tmp_path / trace_file) as f:
+        events = json.load(f)["traceEvents"]
+    steps = [event for event in events if event["name"] == "Merge"]
+    tracks = {
+        event["args"]["name"]: event["tid"]
+        for event in events
+        if event["name"] == "thread_name"
+    }
+    # Both jobs ran on the event loop thread but overlap on separate rows
+    assert len({event["tid"] for event in steps}) == 2
+    for event in steps:
+        assert tracks[event["args"]["job"]] == event["tid"]
+
+
+def test_run_many_isolates_failures(mock_config_loader):
+    def step(data):
+        return data
+
+    def failing_step(data):
+        raise ValueError("ffmpeg failed")
+
+    def pipeline_factory(config):
+        if config["stream_id"] == "bad.json":
+            return [("Fail", failing_step)]
+        return [("Pass", step)]
+
+    results = run_pipelines_concurrently(
+        pipeline_factory, ["good.json", "bad.json"], max_concurrent_jobs=2
+    )
+
+    assert isinstance(results[0], PipelineData)
+    assert isinstance(results[1], ValueError)
+
+
+def test_batch_reports_to_metrics_observer(mock_config_loader):
+    def failing_step(data):
+        raise RuntimeError("ffmpeg failed")
+
+    observer = MetricsObserver()
+    run_pipelines_concurrently(
+        lambda config: (
+            [("Merge", failing_step)]
+            if config["stream_id"] == "bad.json"
+            else [("Merge", lambda data: data)]
+        ),
+        ["a.json", "b.json", "bad.json"],
+        observers=[observer],
+    )
+
+    sample = observer.registry.get_sample_value
+    assert (
+        sample("sermon_jobs_total", {"pipeline": "<lambda>", "status": "success"}) == 2
+    )
+    assert (
+        sample("sermon_jobs_total", {"pipeline": "<lambda>", "status": "failure"}) == 1
+    )
+    assert (
+        sample("sermon_step_failures_total", {"pipeline": "<lambda>", "step": "Merge"})
+        == 1
+    )
+    assert sample("sermon_active_jobs", {"pipeline": "<lambda>"}) == 0
+
+
+def test_batch_uses_config_metrics_section(tmp_path):
+    textfile = str(tmp_path / "sermon.prom")
+    with patch(
+        "app.core.async_pipeline_runner.load_and_validate_config",
+        side_effect=lambda config_file, schema_file: {
+            "stream_id": config_file,
+            "metrics": {"textfile": textfile},
+        },
+    ):
+        run_pipelines_concurrently(
+            lambda config: [("Merge", lambda data: data)], ["a.json", "b.json"]
+        )
+
+    with open(textfile) as f:
+        assert 'sermon_jobs_total{pipeline="<lambda>",status="success"} 2.0' in f.read()
+
+
+def test_batch_rejects_conflicting_metrics_sections(tmp_path):
+    with patch(
+        "app.core.async_pipeline_runner.load_and_validate_config",
+        side_effect=lambda config_file, schema_file: {
+            "stream_id": config_file,
+            "metrics": {"textfile": str(tmp_path / f"{config_file}.prom")},
+        },
+    ):
+        with pytest.raises(ValueError, match="different `metrics` sections"):
+            run_pipelines_concurrently(
+                lambda config: [("Merge", lambda data: data)], ["a.json", "b.json"]
+            )
@@ -0,0 +1,165 @@
+import json
+from functools import partial
+import os
+import pytest
+from unittest.mock import patch
+from app.core.pipeline_runner import PipelineRunner
+from app.utils import profiling, tracing
+from app.utils.observers import PipelineObserver, get_event_bus
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config", return_value={})
+def test_runner_runs_async_steps(mock_config_loader):
+    async def async_step(data):
+        data.main_file_path = "main.wav"
+        return data
+
+    runner = PipelineRunner(lambda config: [("Download", async_step)])
+
+    data = runner.run()
+
+    assert data.main_file_path == "main.wav"
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config", return_value={})
+def test_runner_exports_trace(mock_config_loader, tmp_path):
+    def create_audio_pipeline(config):
+        return [("Trim audio", lambda data: data), ("Merge audio", lambda data: data)]
+
+    trace_dir = tmp_path / "traces"
+    runner = PipelineRunner(create_audio_pipeline, trace_dir=str(trace_dir))
+
+    runner.run()
+
+    files = sorted(os.listdir(trace_dir))
+    assert len(files) == 2
+    assert files[0].endswith("_audio_pipeline.jsonl")
+    with open(trace_dir / files[1]) as f:
+        names = [event["name"] for event in json.load(f)["traceEvents"]]
+    assert {"pipeline", "Trim audio", "Merge audio"} <= set(names)
+    assert tracing.get_tracer() is None
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config", return_value={})
+def test_runner_exports_trace_on_failure(mock_config_loader, tmp_path):
+    def failing_step(data):
+        raise RuntimeError("ffmpeg failed")
+
+    trace_dir = tmp_path / "traces"
+    runner = PipelineRunner(
+        lambda config: [("Merge audio", failing_step)], trace_dir=str(trace_dir)
+    )
+
+    try:
+        runner.run()
+    except RuntimeError:
+        pass
+
+    assert len(os.listdir(trace_dir)) == 2
+    assert tracing.get_tracer() is None
+
+
+class RecordingObserver(PipelineObserver):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def on_job_started(self, job, pipeline, config=None):
+        self.events.append(("job_started", pipeline))
+
+    def on_job_finished(self, job, pipeline, elapsed_seconds):
+        self.events.append(("job_finished", pipeline))
+
+    def on_job_failed(self, job, pipeline, error, elapsed_seconds):
+        self.events.append(("job_failed", pipeline))
+
+    def on_step_started(self, job, pipeline, step):
+        self.events.append(("step_started", step))
+
+    def on_step_finished(self, job, pipeline, step, elapsed_seconds, data):
+        self.events.append(("step_finished", step))
+
+    def on_step_failed(self, job, pipeline, step, error, elapsed_seconds):
+        self.events.append(("step_failed", step))
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config", return_value={})
+def test_runner_notifies_observers(mock_config_loader):
+    def create_audio_pipeline(config):
+        return [("Trim audio", lambda data: data)]
+
+    observer = RecordingObserver()
+    PipelineRunner(create_audio_pipeline, observers=[observer]).run()
+
+    assert observer.events == [
+        ("job_started", "audio_pipeline"),
+        ("step_started", "Trim audio"),
+        ("step_finished", "Trim audio"),
+        ("job_finished", "audio_pipeline"),
+    ]
+    # Observers only listen while their run is going
+    assert observer not in get_event_bus()._observers
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config", return_value={})
+def test_runner_notifies_observers_on_failure(mock_config_loader):
+    def failing_step(data):
+        raise RuntimeError("ffmpeg failed")
+
+    observer = RecordingObserver()
+    runner = PipelineRunner(
+        lambda config: [("Merge audio", failing_step)], observers=[observer]
+    )
+
+    with pytest.raises(RuntimeError):
+        runner.run()
+
+    assert observer.events[-2:] == [
+        ("step_failed", "Merge audio"),
+        ("job_failed", "<lambda>"),
+    ]
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config")
+def test_runner_writes_metrics_from_config(mock_config_loader, tmp_path):
+    textfile = tmp_path / "sermon.prom"
+    mock_config_loader.return_value = {"metrics": {"textfile": str(textfile)}}
+
+    PipelineRunner(lambda config: [("Trim audio", lambda data: data)]).run()
+
+    metrics = textfile.read_text()
+    assert 'sermon_jobs_total{pipeline="<lambda>",status="success"} 1.0' in metrics
+    assert (
+        'sermon_step_duration_seconds_count{pipeline="<lambda>",step="Trim audio"}'
+        in metrics
+    )
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config", return_value={})
+def test_runner_exports_profile(mock_config_loader, tmp_path):
+    def create_video_pipeline(config):
+        return [("Trim video", lambda data: data)]
+
+    profile_dir = tmp_path / "profiles"
+    runner = PipelineRunner(create_video_pipeline, profile_dir=str(profile_dir))
+
+    runner.run()
+
+    (bundle,) = os.listdir(profile_dir)
+    with open(profile_dir / bundle / "report.json") as f:
+        report = json.load(f)
+    assert [s["name"] for s in report["sections"]] == [
+        "load config",
+        "build pipeline",
+        "Trim video",
+    ]
+    assert profiling.get_profiler() is None
+
+
+def test_runner_names_partial_factories_after_the_wrapped_function():
+    def create_video_preview_pipeline(config, seconds=10):
+        return []
+
+    runner = PipelineRunner(partial(create_video_preview_pipeline, seconds=5))
+
+    assert runner.pipeline_name == "video_preview_pipeline"
@@ -1,7 +1,12 @@
+import asyncio
+import hashlib
 import os
-from unittest.mock import MagicMock
+import time
+from unittest.mock import AsyncMock, MagicMock
 import pytest
 from app.downloaders.downloader_proxy import DownloaderProxy
+from app.utils.checksums import read_checksum, write_checksum
+from app.utils.lazy import LazyInstance
 
 
 @pytest.fixture
@@ -46,9 +51,6 @@ def test_download_with_cache_hit_youtube(downloader_proxy, mock_downloader, tmp_
     filename = "test_file.m4a"
     cached_file_path = downloader_proxy._get_cache_path(date, stream_id, filename)
 
-    # Mock `get_output_path` for YouTubeDownloader
-    mock_downloader.get_output_path.return_value = cached_file_path
-
     # Create cached file
     os.makedirs(os.path.dirname(cached_file_path), exist_ok=True)
     with open(cached_file_path, "w") as f:
@@ -58,7 +60,7 @@ def test_download_with_cache_hit_youtube(downloader_proxy, mock_downloader, tmp_
     result_path = downloader_proxy.download(url, date, stream_id, filename)
 
     # Assert
-    mock_downloader.get_output_path.assert_called_once_with(url, cached_file_path)
+    mock_downloader.get_output_path.assert_not_called()
     mock_downloader.download.assert_not_called()
     assert result_path == cached_file_path
 
@@ -94,16 +96,15 @@ def test_download_with_cache_miss_youtube(downloader_proxy, mock_downloader, tmp
     cache_path = downloader_proxy._get_cache_path(date, stream_id, filename)
     resolved_path = os.path.join(tmp_path, date, stream_id, filename)
 
-    # Mock `get_output_path` and `download` behavior
-    mock_downloader.get_output_path.return_value = resolved_path
+    # Mock `download` behavior
     mock_downloader.download.return_value = resolved_path
 
     # Act
     result_path = downloader_proxy.download(url, date, stream_id, filename)
 
     # Assert
-    mock_downloader.get_output_path.assert_called_once_with(url, cache_path)
-    mock_downloader.download.assert_called_once_with(url, resolved_path)
+    mock_downloader.get_output_path.assert_not_called()
+    mock_downloader.download.assert_called_once_with(url, cache_path)
     assert result_path == resolved_path
 
 
@@ -126,20 +127,186 @@ def test_download_with_cache_miss_s3(downloader_proxy, mock_downloader, tmp_path
     assert result_path == expected_path
 
 
-def test_download_with_get_output_path(downloader_proxy, mock_downloader, tmp_path):
-    url = "https://example.com/test_file.mp3"
-    date = "2024-12-26"
-    stream_id = "test_stream"
-    filename = "test_file.mp3"
-    cache_path = downloader_proxy._get_cache_path(date, stream_id, filename)
-    expected_path = os.path.join(tmp_path, date, stream_id, filename)
+def test_download_records_templated_name(downloader_proxy, mock_downloader, tmp_path):
+    url = "https://youtube.com/live/x"
+    cache_path = os.path.join(tmp_path, "audio.%(ext)s")
+    resolved_path = os.path.join(tmp_path, "audio.m4a")
+
+    def download(url, destination):
+        with open(resolved_path, "wb") as f:
+            f.write(b"audio")
+        return resolved_path
+
+    mock_downloader.download.side_effect = download
+
+    assert downloader_proxy.download(url, None, None, "audio.%(ext)s") == resolved_path
+    mock_downloader.download.assert_called_once_with(url, cache_path)
+    with open(os.path.join(tmp_path, "audio.download")) as f:
+        assert f.read() == "audio.m4a"
+
+    # The rerun finds the file from the record alone
+    assert downloader_proxy.download(url, None, None, "audio.%(ext)s") == resolved_path
+    mock_downloader.download.assert_called_once()
+    mock_downloader.get_output_path.assert_not_called()
+
+
+def test_cache_hit_never_builds_the_downloader(tmp_path):
+    def build():
+        raise AssertionError("The real downloader was built on a cache hit")
+
+    proxy = DownloaderProxy(
+        real_downloader=LazyInstance(build), cache_dir=str(tmp_path)
+    )
+    with open(os.path.join(tmp_path, "video.mp4"), "w") as f:
+        f.write("cached content")
+    with open(os.path.join(tmp_path, "video.download"), "w") as f:
+        f.write("video.mp4")
+
+    result_path = proxy.download(
+        "https://youtube.com/live/x", None, None, "video.%(ext)s"
+    )
 
-    # Mock real_downloader behavior
-    mock_downloader.get_output_path.return_value = expected_path
+    assert result_path == os.path.join(tmp_path, "video.mp4")
+
+
+def test_templated_cache_miss_without_record(
+    downloader_proxy, mock_downloader, tmp_path
+):
+    # Without a record the name isn't known, so yt-dlp decides
+    mock_downloader.download.return_value = os.path.join(tmp_path, "video.mp4")
+
+    downloader_proxy.download("https://youtube.com/live/x", None, None, "video.%(ext)s")
+
+    mock_downloader.download.assert_called_once()
+
+
+def test_download_reads_through_shared_cache(mock_downloader, tmp_path):
+    cache_sync = MagicMock()
+    cache_sync.pull.return_value = True
+    proxy = DownloaderProxy(
+        real_downloader=mock_downloader, cache_dir=str(tmp_path), cache_sync=cache_sync
+    )
+    del mock_downloader.get_output_path
+    expected_path = os.path.join(tmp_path, "audio_intro.wav")
+
+    result_path = proxy.download(
+        "https://example.com/intro.wav", None, None, "audio_intro.wav"
+    )
+
+    cache_sync.pull.assert_called_once_with(expected_path)
+    mock_downloader.download.assert_not_called()
+    cache_sync.push.assert_not_called()
+    assert result_path == expected_path
+
+
+def test_download_writes_back_to_shared_cache(mock_downloader, tmp_path):
+    cache_sync = MagicMock()
+    cache_sync.pull.return_value = False
+    proxy = DownloaderProxy(
+        real_downloader=mock_downloader, cache_dir=str(tmp_path), cache_sync=cache_sync
+    )
+    del mock_downloader.get_output_path
+    expected_path = os.path.join(tmp_path, "audio_intro.wav")
     mock_downloader.download.return_value = expected_path
 
-    result_path = downloader_proxy.download(url, date, stream_id, filename)
+    result_path = proxy.download(
+        "https://example.com/intro.wav", None, None, "audio_intro.wav"
+    )
 
-    mock_downloader.get_output_path.assert_called_once_with(url, cache_path)
-    mock_downloader.download.assert_called_once_with(url, expected_path)
+    mock_downloader.download.assert_called_once_with(
+        "https://example.com/intro.wav", expected_path
+    )
+    cache_sync.push.assert_called_once_with(expected_path)
     assert result_path == expected_path
+
+
+def test_download_async_awaits_async_downloader(mock_downloader, tmp_path):
+    proxy = DownloaderProxy(real_downloader=mock_downloader, cache_dir=str(tmp_path))
+    del mock_downloader.get_output_path
+    expected_path = os.path.join(tmp_path, "audio_intro.wav")
+    mock_downloader.download_async = AsyncMock(return_value=expected_path)
+
+    result_path = asyncio.run(
+        proxy.download_async(
+            "https://example.com/intro.wav", None, None, "audio_intro.wav"
+        )
+    )
+
+    mock_downloader.download_async.assert_awaited_once_with(
+        "https://example.com/intro.wav", expected_path
+    )
+    mock_downloader.download.assert_not_called()
+    assert result_path == expected_path
+
+
+def test_download_async_falls_back_to_executor(mock_downloader, tmp_path):
+    proxy = DownloaderProxy(real_downloader=mock_downloader, cache_dir=str(tmp_path))
+    del mock_downloader.download_async
+    resolved_path = os.path.join(tmp_path, "audio.m4a")
+    mock_downloader.download.return_value = resolved_path
+
+    result_path = asyncio.run(
+        proxy.download_async("https://youtube.com/live/x", None, None, "audio.%(ext)s")
+    )
+
+    mock_downloader.download.assert_called_once()
+    assert result_path == resolved_path
+
+
+def test_download_async_cache_hit(mock_downloader, tmp_path):
+    proxy = DownloaderProxy(real_downloader=mock_downloader, cache_dir=str(tmp_path))
+    del mock_downloader.get_output_path
+    cached_path = os.path.join(tmp_path, "audio_intro.wav")
+    with open(cached_path, "w") as f:
+        f.write("cached content")
+
+    result_path = asyncio.run(
+        proxy.download_async(
+            "https://example.com/intro.wav", None, None, "audio_intro.wav"
+        )
+    )
+
+    mock_downloader.download.assert_not_called()
+    mock_downloader.download_async.assert_not_called()
+    assert result_path == cached_path
+
+
+def test_download_records_checksum(downloader_proxy, mock_downloader, tmp_path):
+    del mock_downloader.get_output_path
+    expected_path = os.path.join(tmp_path, "audio_intro.wav")
+
+    def download(url, destination):
+        with open(destination, "wb") as f:
+            f.write(b"intro")
+        return destination
+
+    mock_downloader.download.side_effect = download
+
+    downloader_proxy.download(
+        "https://example.com/intro.wav", None, None, "audio_intro.wav"
+    )
+
+    assert read_checksum(expected_path) == hashlib.sha256(b"intro").hexdigest()
+
+
+def test_download_replaces_corrupt_cached_file(
+    downloader_proxy, mock_downloader, tmp_path
+):
+    del mock_downloader.get_output_path
+    cached_path = os.path.join(tmp_path, "audio_intro.wav")
+    with open(cached_path, "wb") as f:
+        f.write(b"intro")
+    write_checksum(cached_path, hashlib.sha256(b"intro").hexdigest())
+    # Rewritten (truncated) after its digest was recorded
+    with open(cached_path, "wb") as f:
+        f.write(b"in")
+    os.utime(cached_path, (time.time() + 5, time.time() + 5))
+    mock_downloader.download.return_value = cached_path
+
+    downloader_proxy.download(
+        "https://example.com/intro.wav", None, None, "audio_intro.wav"
+    )
+
+    mock_downloader.download.assert_called_once_with(
+        "https://example.com/intro.wav", cached_path
+    )
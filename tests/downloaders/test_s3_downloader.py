@@ -1,7 +1,11 @@
+import hashlib
+import asyncio
+import httpx
 import requests
 import pytest
 from unittest.mock import patch, MagicMock
 from app.downloaders.s3_downloader import S3Downloader
+from app.utils.checksums import read_checksum
 
 
 @pytest.fixture
@@ -52,3 +56,62 @@ def test_s3_download_failure(s3_downloader):
         # Act & Assert
         with pytest.raises(requests.exceptions.HTTPError, match="403 Forbidden"):
             s3_downloader.download(url, destination)
+
+
+def test_s3_download_async_success(s3_downloader, tmp_path):
+    url = "https://s3.amazonaws.com/bucket/intro.mp4"
+    destination = tmp_path / "bucket/intro.mp4"
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b"test content")
+    )
+    real_client = httpx.AsyncClient
+
+    with patch(
+        "app.downloaders.s3_downloader.httpx.AsyncClient",
+        side_effect=lambda **kwargs: real_client(transport=transport, **kwargs),
+    ):
+        result = asyncio.run(s3_downloader.download_async(url, str(destination)))
+
+    assert result == str(destination)
+    assert destination.read_bytes() == b"test content"
+
+
+def test_s3_download_async_failure(s3_downloader, tmp_path):
+    url = "https://s3.amazonaws.com/bucket/intro.mp4"
+    transport = httpx.MockTransport(lambda request: httpx.Response(403))
+    real_client = httpx.AsyncClient
+
+    with patch(
+        "app.downloaders.s3_downloader.httpx.AsyncClient",
+        side_effect=lambda **kwargs: real_client(transport=transport, **kwargs),
+    ):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(s3_downloader.download_async(url, str(tmp_path / "intro.mp4")))
+
+
+def test_s3_download_records_checksum_and_rejects_truncation(s3_downloader, tmp_path):
+    url = "https://s3.amazonaws.com/bucket/intro.mp4"
+    destination = tmp_path / "intro.mp4"
+    mock_response = MagicMock()
+    mock_response.iter_content.return_value = [b"test ", b"content"]
+    mock_response.headers = {"Content-Length": "12"}
+
+    with patch(
+        "app.downloaders.s3_downloader.requests.get", return_value=mock_response
+    ):
+        s3_downloader.download(url, str(destination))
+
+    assert (
+        read_checksum(str(destination)) == hashlib.sha256(b"test content").hexdigest()
+    )
+
+    mock_response.headers = {"Content-Length": "100"}
+    destination.unlink()
+    with patch(
+        "app.downloaders.s3_downloader.requests.get", return_value=mock_response
+    ):
+        with pytest.raises(IOError, match="Truncated download"):
+            s3_downloader.download(url, str(destination))
+
+    assert not destination.exists()
+    assert not (tmp_path / "intro.mp4.part").exists()
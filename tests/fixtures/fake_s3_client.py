@@ -0,0 +1,89 @@
+import hashlib
+import io
+
+
+class FakeClientError(Exception):
+    """Mimics the shape of botocore's ClientError."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """
+    In-memory stand-in for a boto3 S3 client, covering the calls we use.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.metadata = {}
+        self.uploads = {}
+        self.uploaded_part_numbers = []
+        # Part numbers whose next upload attempt fails, to exercise resuming
+        self.failing_parts = set()
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError("404")
+        return {
+            "ContentLength": len(self.objects[(Bucket, Key)]),
+            "Metadata": self.metadata.get((Bucket, Key), {}),
+        }
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None):
+        with open(Filename, "rb") as f:
+            self.objects[(Bucket, Key)] = f.read()
+        self.metadata[(Bucket, Key)] = (ExtraArgs or {}).get("Metadata", {})
+
+    def download_file(self, Bucket, Key, Filename):
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError("404")
+        with open(Filename, "wb") as f:
+            f.write(self.objects[(Bucket, Key)])
+
+    def get_object(self, Bucket, Key, Range=None):
+        body = self.objects[(Bucket, Key)]
+        if Range:
+            start, end = (int(i) for i in Range.replace("bytes=", "").split("-"))
+            if start > end or start >= len(body):
+                raise FakeClientError("InvalidRange")
+            body = body[start : end + 1]
+        return {"Body": io.BytesIO(body)}
+
+    def put_object(self, Bucket, Key, Body, Metadata=None):
+        self.objects[(Bucket, Key)] = bytes(Body)
+        self.metadata[(Bucket, Key)] = Metadata or {}
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber in self.failing_parts:
+            self.failing_parts.remove(PartNumber)
+            raise FakeClientError("RequestTimeout")
+        self.uploaded_part_numbers.append(PartNumber)
+        etag = f'"{hashlib.md5(Body).hexdigest()}"'
+        self.uploads[UploadId][PartNumber] = (etag, bytes(Body))
+        return {"ETag": etag}
+
+    def list_parts(self, Bucket, Key, UploadId, PartNumberMarker=0):
+        if UploadId not in self.uploads:
+            raise FakeClientError("NoSuchUpload")
+        return {
+            "Parts": [
+                {"PartNumber": number, "ETag": etag}
+                for number, (etag, _) in sorted(self.uploads[UploadId].items())
+                if number > PartNumberMarker
+            ],
+            "IsTruncated": False,
+        }
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(
+            parts[part["PartNumber"]][1] for part in MultipartUpload["Parts"]
+        )
+        self.metadata[(Bucket, Key)] = {}
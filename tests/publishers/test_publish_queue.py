@@ -0,0 +1,158 @@
+import hashlib
+import pytest
+from unittest.mock import patch
+from app.publishers.local_publisher import LocalPublisher
+from app.publishers.publish_queue import (
+    Destination,
+    PublishQueue,
+    create_publish_queue,
+)
+from app.publishers.rsync_publisher import RsyncPublisher
+from app.publishers.s3_publisher import S3Publisher
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "2025-01-05.wav"
+    path.write_bytes(b"final audio")
+    return str(path)
+
+
+class FlakyPublisher:
+    def __init__(self, failures, sha256=None):
+        self.failures = failures
+        self.sha256 = sha256
+        self.calls = 0
+
+    def publish(self, key, source_path):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        return {"location": f"remote/{key}", "bytes": 11, "sha256": self.sha256}
+
+
+def test_local_publisher_copies_and_hashes(source, tmp_path):
+    publisher = LocalPublisher(str(tmp_path / "archive"))
+
+    result = publisher.publish("stream/2025-01-05.wav", source)
+
+    target = tmp_path / "archive" / "stream" / "2025-01-05.wav"
+    assert target.read_bytes() == b"final audio"
+    assert result["sha256"] == hashlib.sha256(b"final audio").hexdigest()
+    assert not (tmp_path / "archive" / "stream" / "2025-01-05.wav.part").exists()
+
+
+def test_queue_publishes_everywhere(source, tmp_path):
+    queue = PublishQueue(
+        [
+            Destination("archive", LocalPublisher(str(tmp_path / "archive"))),
+            Destination("podcast", FlakyPublisher(failures=0)),
+        ]
+    )
+
+    queue.submit("stream/2025-01-05.wav", source)
+    results = queue.wait()
+    queue.close()
+
+    assert [r["destination"] for r in results] == ["archive", "podcast"]
+    # The remote didn't hash the file; it reuses the local copy's digest
+    assert results[1]["sha256"] == results[0]["sha256"]
+
+
+@patch("app.publishers.publish_queue.time.sleep")
+def test_queue_retries_each_destination(mock_sleep, source):
+    flaky = FlakyPublisher(failures=2)
+    queue = PublishQueue([Destination("podcast", flaky, retries=2, retry_delay=1)])
+
+    queue.submit("stream/2025-01-05.wav", source)
+    (result,) = queue.wait()
+
+    assert result["attempts"] == 3
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+    assert result["sha256"] == hashlib.sha256(b"final audio").hexdigest()
+
+
+@patch("app.publishers.publish_queue.time.sleep")
+def test_queue_reports_failed_destinations(mock_sleep, source, tmp_path):
+    queue = PublishQueue(
+        [
+            Destination("archive", LocalPublisher(str(tmp_path / "archive"))),
+            Destination("podcast", FlakyPublisher(failures=5), retries=1),
+        ]
+    )
+
+    queue.submit("stream/2025-01-05.wav", source)
+    with pytest.raises(RuntimeError, match="Publishing failed for: podcast"):
+        queue.wait()
+
+    # The healthy destination still got the file
+    assert (tmp_path / "archive" / "stream" / "2025-01-05.wav").exists()
+
+
+def test_queue_detects_mismatched_content(source):
+    queue = PublishQueue(
+        [
+            Destination("a", FlakyPublisher(failures=0, sha256="aaa")),
+            Destination("b", FlakyPublisher(failures=0, sha256="bbb")),
+        ]
+    )
+
+    queue.submit("stream/2025-01-05.wav", source)
+    with pytest.raises(ValueError, match="different content"):
+        queue.wait()
+
+
+def test_rsync_command():
+    publisher = RsyncPublisher(
+        "archive@media.example.org:/srv/sermons/",
+        ssh_args=["-p", "2222"],
+        bandwidth_limit_kbps=5000,
+    )
+
+    command = publisher.command("stream/2025-01-05.mp4", "output/final.mp4")
+
+    assert command[0] == "rsync"
+    assert "--partial" in command
+    assert command[command.index("-e") + 1] == "ssh -p 2222"
+    assert "--bwlimit=5000" in command
+    assert command[-2:] == [
+        "output/final.mp4",
+        "archive@media.example.org:/srv/sermons/stream/2025-01-05.mp4",
+    ]
+
+
+@patch("app.publishers.rsync_publisher.run_command")
+def test_rsync_publish_runs_rsync(mock_run_command, source):
+    result = RsyncPublisher("host:/srv").publish("stream/2025-01-05.wav", source)
+
+    mock_run_command.assert_called_once()
+    assert result["location"] == "host:/srv/stream/2025-01-05.wav"
+    assert result["sha256"] is None
+
+
+def test_create_publish_queue_filters_by_media(tmp_path):
+    publish_conf = {
+        "destinations": [
+            {"type": "local", "path": str(tmp_path / "archive")},
+            {"type": "s3", "bucket": "podcast", "media": ["audio"], "part_size_mb": 8},
+            {"type": "rsync", "target": "host:/srv", "name": "archive-host"},
+        ]
+    }
+
+    audio_queue = create_publish_queue(publish_conf, "audio")
+    video_queue = create_publish_queue(publish_conf, "video")
+
+    assert [d.name for d in audio_queue.destinations] == [
+        "local-0",
+        "s3-1",
+        "archive-host",
+    ]
+    assert audio_queue.destinations[1].publisher.part_size == 8 * 1024 * 1024
+    assert isinstance(audio_queue.destinations[1].publisher, S3Publisher)
+    assert [d.name for d in video_queue.destinations] == ["local-0", "archive-host"]
+    assert create_publish_queue(None, "audio") is None
+
+
+def test_create_publish_queue_rejects_unknown_type():
+    with pytest.raises(ValueError, match="Unsupported publish destination: ftp"):
+        create_publish_queue({"destinations": [{"type": "ftp"}]}, "audio")
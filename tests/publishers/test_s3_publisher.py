@@ -0,0 +1,89 @@
+import hashlib
+import os
+import pytest
+from app.publishers.s3_publisher import MIN_PART_SIZE, S3Publisher
+from tests.fixtures.fake_s3_client import FakeClientError, FakeS3Client
+
+
+@pytest.fixture
+def client():
+    return FakeS3Client()
+
+
+@pytest.fixture
+def publisher(client, tmp_path):
+    return S3Publisher(
+        bucket="podcast",
+        prefix="sermons",
+        part_size=MIN_PART_SIZE,
+        max_concurrency=2,
+        state_dir=str(tmp_path / "state"),
+        client=client,
+    )
+
+
+def _write(path, size):
+    content = os.urandom(size)
+    path.write_bytes(content)
+    return content
+
+
+def test_small_file_is_a_single_put(publisher, client, tmp_path):
+    source = tmp_path / "final.wav"
+    content = _write(source, 1024)
+
+    result = publisher.publish("stream/2025-01-05.wav", str(source))
+
+    digest = hashlib.sha256(content).hexdigest()
+    assert result == {
+        "location": "s3://podcast/sermons/stream/2025-01-05.wav",
+        "bytes": 1024,
+        "sha256": digest,
+    }
+    assert client.objects[("podcast", "sermons/stream/2025-01-05.wav")] == content
+    assert (
+        client.objects[("podcast", "sermons/stream/2025-01-05.wav.sha256")]
+        .decode()
+        .startswith(digest)
+    )
+
+
+def test_large_file_is_uploaded_in_parts(publisher, client, tmp_path):
+    source = tmp_path / "final.mp4"
+    content = _write(source, MIN_PART_SIZE * 2 + 100)
+
+    result = publisher.publish("stream/2025-01-05.mp4", str(source))
+
+    assert sorted(client.uploaded_part_numbers) == [1, 2, 3]
+    assert client.objects[("podcast", "sermons/stream/2025-01-05.mp4")] == content
+    assert result["sha256"] == hashlib.sha256(content).hexdigest()
+    assert os.listdir(tmp_path / "state") == []
+
+
+def test_failed_upload_resumes_with_missing_parts(publisher, client, tmp_path):
+    source = tmp_path / "final.mp4"
+    content = _write(source, MIN_PART_SIZE * 2 + 100)
+    client.failing_parts = {2}
+
+    with pytest.raises(FakeClientError):
+        publisher.publish("stream/2025-01-05.mp4", str(source))
+    assert len(os.listdir(tmp_path / "state")) == 1
+
+    client.uploaded_part_numbers.clear()
+    publisher.publish("stream/2025-01-05.mp4", str(source))
+
+    assert client.uploaded_part_numbers == [2]
+    assert client.objects[("podcast", "sermons/stream/2025-01-05.mp4")] == content
+
+
+def test_expired_upload_starts_over(publisher, client, tmp_path):
+    source = tmp_path / "final.mp4"
+    _write(source, MIN_PART_SIZE + 1)
+    client.failing_parts = {1}
+    with pytest.raises(FakeClientError):
+        publisher.publish("stream/2025-01-05.mp4", str(source))
+
+    client.uploads.clear()
+    publisher.publish("stream/2025-01-05.mp4", str(source))
+
+    assert ("podcast", "sermons/stream/2025-01-05.mp4") in client.objects
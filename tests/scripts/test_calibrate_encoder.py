@@ -0,0 +1,34 @@
+import json
+from dataclasses import replace
+from unittest.mock import patch
+from scripts.calibrate_encoder import main
+
+
+def test_tuned_settings_keep_the_profiles_overrides(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "stream_id": "sermon",
+                "encoding": {"profiles": {"publish": {"codec": "libx265", "crf": 28}}},
+            }
+        )
+    )
+
+    with patch(
+        "scripts.calibrate_encoder.calibrate_profile",
+        side_effect=lambda path, profile, **kwargs: (
+            replace(profile, preset="faster", crf=24),
+            [],
+        ),
+    ) as calibrate:
+        main("video.mp4", "publish", config_path=str(config_path))
+
+    assert calibrate.call_args.args[1].codec == "libx265"
+    config = json.loads(config_path.read_text())
+    assert config["stream_id"] == "sermon"
+    assert config["encoding"]["profiles"]["publish"] == {
+        "codec": "libx265",
+        "crf": 24,
+        "preset": "faster",
+    }
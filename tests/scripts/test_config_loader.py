@@ -1,6 +1,6 @@
 import unittest
 import json
-from scripts.config_loader import load_and_validate_config
+from scripts.config_loader import get_validator, load_and_validate_config
 
 
 class TestConfigLoader(unittest.TestCase):
@@ -64,6 +64,18 @@ class TestConfigLoader(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             load_and_validate_config("tests/non_existent_config.json")
 
+    def test_validator_is_compiled_once(self):
+        self.assertIs(get_validator(), get_validator())
+
+    def test_invalid_config(self):
+        from jsonschema.exceptions import ValidationError
+
+        with open(self.sample_json_path, "w") as f:
+            json.dump({"stream_id": "my-weekly-sermon"}, f)
+
+        with self.assertRaises(ValidationError):
+            load_and_validate_config(self.sample_json_path)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+from app.utils.run_history import RunHistory
+from scripts.run_history import plan
+
+
+@patch(
+    "scripts.run_history.load_and_validate_config",
+    return_value={
+        "audio": {"trim": {"start_time": "00:00:00", "end_time": "01:00:00"}}
+    },
+)
+def test_plan_predicts_from_history(mock_config_loader, tmp_path, capsys):
+    history = RunHistory(str(tmp_path / "runs.sqlite"))
+    history.record_run(
+        {
+            "pipeline": "audio_pipeline",
+            "started_at": 0,
+            "status": "success",
+            "duration_seconds": 360,
+            "source_duration_seconds": 1800,
+        },
+        [("Merge audio", "success", 360)],
+    )
+
+    predictions = plan(history, "sermon.json", deadline="23:59")
+
+    assert predictions["audio"]["p50"] == 720
+    assert predictions["video"] is None
+    output = capsys.readouterr().out
+    assert "audio_pipeline: 1:00:00 of media, ~0:12:00" in output
+    assert "video_pipeline: no trim window" in output
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENTRY_POINTS = [
+    "scripts.run_audio_pipeline",
+    "scripts.run_video_pipeline",
+    "scripts.run_batch_pipeline",
+]
+
+# Only imported once a step needs them (see app/downloaders/registry.py)
+HEAVY_MODULES = ["yt_dlp", "requests", "httpx", "jsonschema", "prometheus_client"]
+
+# Wall-clock budget for importing all entry points (about 0.15 s today)
+IMPORT_BUDGET_SECONDS = 0.6
+
+
+def _import_times(modules):
+    """
+    Imports `modules` in a fresh interpreter and returns
+    (cumulative microseconds per module, modules loaded).
+    """
+    code = (
+        f"import sys\n"
+        f"for name in {modules!r}:\n"
+        f"    __import__(name)\n"
+        f"print(' '.join(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times, set(result.stdout.split())
+
+
+def test_entry_points_skip_heavy_imports():
+    _, loaded = _import_times(ENTRY_POINTS)
+
+    assert not [name for name in HEAVY_MODULES if name in loaded]
+
+
+def test_entry_points_import_within_budget():
+    times, _ = _import_times(ENTRY_POINTS)
+
+    total_seconds = sum(times[name] for name in ENTRY_POINTS) / 1_000_000
+    assert total_seconds < IMPORT_BUDGET_SECONDS
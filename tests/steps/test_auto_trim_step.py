@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.data_models.pipeline_data import PipelineData
+from app.steps.auto_trim_step import auto_trim_step
+from app.utils.auto_trim import TrimSuggestion
+
+
+@pytest.fixture
+def data():
+    return PipelineData(active_file_path="/tmp/stream.mp4")
+
+
+@pytest.fixture
+def mock_trim_step():
+    with patch("app.steps.auto_trim_step.trim_step") as mock:
+        mock.side_effect = lambda data, *args, **kwargs: data
+        yield mock
+
+
+def _suggestion(confidence):
+    return TrimSuggestion(
+        start=305.0, end=1505.0, confidence=confidence, labels=np.empty(0)
+    )
+
+
+def test_uses_confident_detection(data, mock_trim_step):
+    with patch(
+        "app.steps.auto_trim_step.get_trim_suggestion", return_value=_suggestion(0.95)
+    ):
+        auto_trim_step(data, start_time="00:01:00", end_time="00:30:00", overwrite=True)
+
+    mock_trim_step.assert_called_once_with(data, "00:05:05", "00:25:05", overwrite=True)
+    assert data.trim == {
+        "start_time": "00:05:05",
+        "end_time": "00:25:05",
+        "confidence": 0.95,
+        "source": "auto",
+    }
+
+
+def test_falls_back_to_configured_times(data, mock_trim_step):
+    with patch(
+        "app.steps.auto_trim_step.get_trim_suggestion", return_value=_suggestion(0.3)
+    ):
+        auto_trim_step(data, start_time="00:01:00", end_time="00:30:00")
+
+    mock_trim_step.assert_called_once_with(data, "00:01:00", "00:30:00")
+    assert data.trim["source"] == "config"
+
+
+def test_fails_without_confidence_or_fallback(data, mock_trim_step):
+    with patch("app.steps.auto_trim_step.get_trim_suggestion", return_value=None):
+        with pytest.raises(ValueError, match="no sermon found"):
+            auto_trim_step(data)
+
+    mock_trim_step.assert_not_called()
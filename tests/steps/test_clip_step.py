@@ -0,0 +1,147 @@
+import os
+import pytest
+from array import array
+from unittest.mock import patch
+from app.data_models.media_info import MediaInfo, StreamInfo
+from app.data_models.pipeline_data import PipelineData
+from app.steps.clip_step import Clip, clip_step
+from app.utils.keyframe_index import KeyframeIndex
+
+# Keyframes every 2 seconds
+INDEX = KeyframeIndex(
+    array("d", [2.0 * i for i in range(60)]),
+    array("q", [100 * i for i in range(60)]),
+    array("q", [60] * 60),
+    packet_count=3600,
+)
+
+
+@pytest.fixture
+def data(tmp_path):
+    source = tmp_path / "video_merged.mp4"
+    source.write_bytes(b"video")
+    return PipelineData(active_file_path=str(source))
+
+
+@pytest.fixture(autouse=True)
+def media():
+    info = MediaInfo(
+        path="video_merged.mp4",
+        duration=120.0,
+        streams=[
+            StreamInfo(index=0, type="video", codec="h264", width=1920, height=1080)
+        ],
+    )
+    with patch("app.steps.clip_step.get_media_info", return_value=info), patch(
+        "app.steps.clip_step.get_keyframe_index", return_value=INDEX
+    ):
+        yield
+
+
+@pytest.fixture
+def mock_run_ffmpeg():
+    def cut(command, **kwargs):
+        with open(command[-1], "wb") as f:
+            f.write(b"clip")
+
+    with patch("app.steps.clip_step.run_ffmpeg", side_effect=cut) as mock_run:
+        yield mock_run
+
+
+def _commands(mock_run_ffmpeg):
+    commands = [call.args[0] for call in mock_run_ffmpeg.call_args_list]
+    return {
+        os.path.basename(command[-1]).split(".clip-")[1]: command
+        for command in commands
+    }
+
+
+def test_clip_from_config():
+    clip = Clip.from_config(
+        {"name": "hook", "start_time": "00:01:00.500", "end_time": "00:01:30"}
+    )
+
+    assert (clip.start, clip.end, clip.duration, clip.aspect) == (
+        60.5,
+        90.0,
+        29.5,
+        None,
+    )
+    with pytest.raises(ValueError, match="ends before it starts"):
+        Clip.from_config(
+            {"name": "x", "start_time": "00:02:00", "end_time": "00:01:00"}
+        )
+
+
+def test_crop_filter_only_when_the_aspect_differs():
+    assert Clip("a", 0, 1, "16:9").crop_filter(1920, 1080) is None
+    assert Clip("a", 0, 1).crop_filter(1920, 1080) is None
+    assert Clip("a", 0, 1, "9:16").crop_filter(1920, 1080) == (
+        "crop=w='trunc(min(iw,ih*0.562500)/2)*2':h='trunc(min(ih,iw/0.562500)/2)*2'"
+    )
+
+
+def test_clips_on_keyframes_are_copied_the_rest_re_encoded(
+    data, mock_run_ffmpeg, tmp_path
+):
+    output_dir = str(tmp_path / "clips")
+    clips = [
+        {"name": "on-keyframe", "start_time": "00:00:10", "end_time": "00:00:40"},
+        {"name": "between", "start_time": "00:00:11", "end_time": "00:00:40"},
+        {
+            "name": "vertical",
+            "start_time": "00:00:10",
+            "end_time": "00:00:40",
+            "aspect": "9:16",
+        },
+    ]
+
+    clip_step(data, clips, output_dir)
+
+    commands = _commands(mock_run_ffmpeg)
+    copy = commands["on-keyframe.mp4"]
+    # Input-side seek, then a stream copy of just the clip
+    assert copy[copy.index("-i") - 2 : copy.index("-i") + 4] == [
+        "-ss",
+        "10.000000",
+        "-i",
+        data.active_file_path,
+        "-t",
+        "30.000000",
+    ]
+    assert copy[copy.index("-c") + 1] == "copy"
+
+    between = commands["between.mp4"]
+    assert between[between.index("-ss") + 1] == "11.000000"
+    assert between[between.index("-c:v") + 1] == "libx264"
+    assert "-vf" not in between
+
+    vertical = commands["vertical.mp4"]
+    assert vertical[vertical.index("-vf") + 1].startswith("crop=")
+    assert vertical[vertical.index("-c:v") + 1] == "libx264"
+
+    assert data.clip_files == [
+        os.path.join(output_dir, name)
+        for name in ("on-keyframe.mp4", "between.mp4", "vertical.mp4")
+    ]
+    # Cut next to the source, then placed whole into the output
+    assert all(os.path.exists(path) for path in data.clip_files)
+    assert all(
+        os.path.dirname(command[-1]) == os.path.dirname(data.active_file_path)
+        for command in commands.values()
+    )
+    assert not [name for name in os.listdir(tmp_path) if ".clip-" in name]
+    # The index was built for the intermediate file, so it's cleaned up with it
+    assert data.intermediate_files == [f"{data.active_file_path}.kfindex"]
+
+
+def test_without_keyframe_index_every_clip_is_re_encoded(
+    data, mock_run_ffmpeg, tmp_path
+):
+    clips = [{"name": "hook", "start_time": "00:00:10", "end_time": "00:00:40"}]
+
+    clip_step(data, clips, str(tmp_path / "clips"), keyframe_index=False)
+
+    command = _commands(mock_run_ffmpeg)["hook.mp4"]
+    assert "copy" not in command
+    assert data.intermediate_files == []
@@ -1,8 +1,9 @@
+import asyncio
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from app.data_models.pipeline_data import PipelineData
 from app.constants import PipelineKeys
-from app.steps.download_step import download_step
+from app.steps.download_step import download_step, download_step_async
 
 
 @pytest.fixture
@@ -77,3 +78,23 @@ def test_invalid_file_extension(mock_downloader, pipeline_data, tmp_path):
             filename=filename,
             key=key,
         )
+
+
+def test_successful_download_async(mock_downloader, pipeline_data, tmp_path):
+    file_path = tmp_path / "audio_intro.wav"
+    file_path.write_text("dummy content")
+    mock_downloader.download_async = AsyncMock(return_value=str(file_path))
+
+    result = asyncio.run(
+        download_step_async(
+            data=pipeline_data,
+            downloader=mock_downloader,
+            url="https://example.com/intro.wav",
+            filename="audio_intro.wav",
+            key=PipelineKeys.INTRO_FILE_PATH,
+        )
+    )
+
+    assert result.intro_file_path == str(file_path)
+    assert result.active_file_path == str(file_path)
+    assert str(file_path) in result.downloaded_files
@@ -0,0 +1,64 @@
+import hashlib
+import json
+from unittest.mock import patch
+import pytest
+from app.data_models.pipeline_data import PipelineData
+from app.steps.manifest_step import manifest_step
+from app.utils.checksums import read_checksum
+
+SUMMARY = {"format": "wav", "duration": 1.0, "streams": []}
+
+
+def test_manifest_step_records_sources_and_output(tmp_path):
+    intro = tmp_path / "intro.wav"
+    intro.write_bytes(b"intro")
+    main = tmp_path / "audio.m4a"
+    main.write_bytes(b"main")
+    final = tmp_path / "output" / "2025-02-02.wav"
+    final.parent.mkdir()
+    final.write_bytes(b"final")
+    data = PipelineData(
+        main_file_path=str(main),
+        final_output_path=str(final),
+        downloaded_files=[str(intro)],
+        checksums={str(intro): "digest-from-download"},
+    )
+    manifest_path = tmp_path / "output" / "2025-02-02.manifest.json"
+
+    with patch("app.utils.manifest._media_summary", return_value=SUMMARY):
+        result = manifest_step(data, str(manifest_path), job={"stream_id": "sermon"})
+
+    manifest = json.loads(manifest_path.read_text())
+    assert manifest["job"] == {"stream_id": "sermon"}
+    assert [(a["path"], a["role"], a["sha256"]) for a in manifest["artifacts"]] == [
+        (str(intro), "source", "digest-from-download"),
+        (str(main), "source", hashlib.sha256(b"main").hexdigest()),
+        (str(final), "output", hashlib.sha256(b"final").hexdigest()),
+    ]
+    assert manifest["artifacts"][2]["media"] == SUMMARY
+    assert read_checksum(str(final)) == hashlib.sha256(b"final").hexdigest()
+    assert result.manifest_path == str(manifest_path)
+
+
+def test_manifest_step_requires_output(tmp_path):
+    with pytest.raises(ValueError, match="No final output"):
+        manifest_step(PipelineData(), str(tmp_path / "manifest.json"))
+
+
+def test_manifest_step_records_clips(tmp_path):
+    final = tmp_path / "2025-02-02.mp4"
+    final.write_bytes(b"final")
+    clip = tmp_path / "2025-02-02_clips" / "hook.mp4"
+    clip.parent.mkdir()
+    clip.write_bytes(b"clip")
+    data = PipelineData(final_output_path=str(final), clip_files=[str(clip)])
+    manifest_path = tmp_path / "2025-02-02.manifest.json"
+
+    with patch("app.utils.manifest._media_summary", return_value=SUMMARY):
+        manifest_step(data, str(manifest_path))
+
+    artifacts = json.loads(manifest_path.read_text())["artifacts"]
+    assert [(a["path"], a["role"]) for a in artifacts] == [
+        (str(final), "output"),
+        (str(clip), "clip"),
+    ]
@@ -3,7 +3,25 @@ import pytest
 import subprocess
 from unittest.mock import patch, MagicMock
 from app.steps.merge_audio_step import merge_audio_step
+from app.data_models.media_info import MediaInfo, StreamInfo
 from app.data_models.pipeline_data import PipelineData
+from app.utils.renditions import renditions_from_config
+
+
+@pytest.fixture(autouse=True)
+def media_info():
+    """
+    Stands in for ffprobe: every input is a 10 second stereo track.
+    """
+    info = MediaInfo(
+        path="input.wav",
+        duration=10.0,
+        streams=[StreamInfo(index=0, type="audio", codec="pcm_s16le", channels=2)],
+    )
+    with patch(
+        "app.steps.merge_audio_step.get_media_info", return_value=info
+    ) as get_media_info, patch("app.steps.merge_audio_step.attach_media"):
+        yield get_media_info
 
 
 @pytest.fixture
@@ -28,14 +46,14 @@ def pipeline_data_with_audio_paths(tmp_path):
 
 
 @patch("app.steps.merge_audio_step.normalize_audio")
-@patch("subprocess.run")
+@patch("app.steps.merge_audio_step.run_ffmpeg")
 def test_merge_step_success(
     mock_subprocess_run, mock_normalize_audio, pipeline_data_with_audio_paths
 ):
     """
     Verifies a successful merge scenario:
     1) Three calls to normalize_audio (intro, main, outro).
-    2) One ffmpeg call via subprocess.run for merging.
+    2) One ffmpeg call via run_ffmpeg for merging.
     3) Final output is set to <main>_merged.mp3 in PipelineData.
     """
     data = pipeline_data_with_audio_paths
@@ -74,7 +92,10 @@ def test_merge_step_normalize_permission_error(
 
 
 @patch("app.steps.merge_audio_step.normalize_audio")
-@patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "ffmpeg"))
+@patch(
+    "app.steps.merge_audio_step.run_ffmpeg",
+    side_effect=subprocess.CalledProcessError(1, "ffmpeg"),
+)
 def test_merge_step_ffmpeg_failure(
     mock_subprocess_run, mock_normalize, pipeline_data_with_audio_paths
 ):
@@ -84,3 +105,116 @@ def test_merge_step_ffmpeg_failure(
     data = pipeline_data_with_audio_paths
     with pytest.raises(subprocess.CalledProcessError):
         merge_audio_step(data=data, output_format="mp3")
+
+
+@patch("app.steps.merge_audio_step.normalize_audio")
+@patch("app.steps.merge_audio_step.run_ffmpeg")
+def test_merge_step_uses_shared_intro_outro(
+    mock_subprocess_run, mock_normalize_audio, pipeline_data_with_audio_paths
+):
+    """
+    With a shared cache, the intro/outro normalizations are pulled instead of
+    re-encoded and are kept on disk after the merge.
+    """
+    data = pipeline_data_with_audio_paths
+    intro_base, _ = os.path.splitext(data.intro_file_path)
+    cache_sync = MagicMock()
+    cache_sync.pull.return_value = True
+
+    merge_audio_step(data=data, output_format="wav", cache_sync=cache_sync)
+
+    # Only the main file is normalized
+    assert mock_normalize_audio.call_count == 1
+    assert cache_sync.pull.call_count == 2
+    cache_sync.push.assert_not_called()
+    (intro_pull,) = cache_sync.pull.call_args_list[0].args
+    assert intro_pull.startswith(f"{intro_base}_normalized.")
+    assert intro_pull.endswith(".wav")
+
+
+@patch("app.steps.merge_audio_step.normalize_audio")
+@patch("app.steps.merge_audio_step.run_ffmpeg")
+def test_merge_step_uses_probed_durations(
+    mock_run_ffmpeg, mock_normalize_audio, media_info, pipeline_data_with_audio_paths
+):
+    merge_audio_step(data=pipeline_data_with_audio_paths, output_format="wav")
+
+    assert media_info.call_count == 3
+    assert mock_normalize_audio.call_args.kwargs["duration"] == 10.0
+    assert mock_run_ffmpeg.call_args.kwargs["duration"] == 30.0
+
+
+@patch("app.steps.merge_audio_step.normalize_audio")
+def test_merge_step_rejects_input_without_audio(
+    mock_normalize_audio, media_info, pipeline_data_with_audio_paths
+):
+    media_info.return_value = MediaInfo(path="video.mp4", duration=10.0)
+
+    with pytest.raises(ValueError, match="No audio stream"):
+        merge_audio_step(data=pipeline_data_with_audio_paths, output_format="wav")
+    mock_normalize_audio.assert_not_called()
+
+
+@patch("app.steps.merge_audio_step.normalize_audio")
+@patch("app.steps.merge_audio_step.run_ffmpeg")
+def test_merge_step_taps_the_waveform(
+    mock_run_ffmpeg, mock_normalize_audio, pipeline_data_with_audio_paths
+):
+    data = pipeline_data_with_audio_paths
+    main_base, _ = os.path.splitext(data.active_file_path)
+
+    merge_audio_step(data=data, output_format="wav", waveform=True)
+
+    command = mock_run_ffmpeg.call_args.args[0]
+    (fd,) = mock_run_ffmpeg.call_args.kwargs["pass_fds"]
+    tap_output = command.index(f"pipe:{fd}")
+    # The tap is its own output, ahead of the merged file's encode settings
+    assert command[tap_output - 8 : tap_output] == [
+        "-map",
+        "0:a:0",
+        "-ac",
+        "1",
+        "-ar",
+        "44100",
+        "-f",
+        "s16le",
+    ]
+    assert command.index("-c:a") > tap_output
+    assert data.waveform_files == [
+        f"{main_base}_merged.peaks.{level}.dat" for level in (256, 1024, 4096)
+    ]
+    assert all(os.path.exists(path) for path in data.waveform_files)
+
+
+@patch("app.steps.merge_audio_step.normalize_audio")
+@patch("app.steps.merge_audio_step.run_ffmpeg")
+def test_merge_step_encodes_renditions_from_the_same_decode(
+    mock_run_ffmpeg, mock_normalize_audio, pipeline_data_with_audio_paths
+):
+    data = pipeline_data_with_audio_paths
+    main_base, _ = os.path.splitext(data.active_file_path)
+    renditions = renditions_from_config(
+        {"renditions": [{"name": "podcast", "format": "mp3", "audio_bitrate": "128k"}]}
+    )
+
+    merge_audio_step(data=data, output_format="wav", renditions=renditions)
+
+    # One ffmpeg run; the merged file is still its last output
+    mock_run_ffmpeg.assert_called_once()
+    command = mock_run_ffmpeg.call_args.args[0]
+    podcast = f"{main_base}_merged.podcast.mp3"
+    assert command[-1] == f"{main_base}_merged.wav"
+    output = command.index(podcast)
+    assert command[output - 10 : output] == [
+        "-map",
+        "0:a:0",
+        "-c:a",
+        "libmp3lame",
+        "-b:a",
+        "128k",
+        "-ar",
+        "44100",
+        "-ac",
+        "2",
+    ]
+    assert data.rendition_files == {"podcast": podcast}
@@ -1,3 +1,4 @@
+import errno
 import os
 from app.constants import PipelineKeys
 import pytest
@@ -90,7 +91,7 @@ def test_move_step_missing_output_filename(pipeline_data_with_paths):
         move_step(data=data, output_filename=None)
 
 
-@patch("shutil.move", side_effect=PermissionError("Permission denied"))
+@patch("os.rename", side_effect=PermissionError("Permission denied"))
 def test_move_step_permission_error(mock_move, pipeline_data_with_paths):
     """
     Test that move_step raises a PermissionError if the file cannot be moved.
@@ -121,3 +122,48 @@ def test_move_step_creates_output_directory(tmp_path):
     # Assert: The directory should now exist, and the file should be moved
     assert os.path.exists(output_dir), "Output directory should be created."
     assert os.path.exists(output_file), "File should be moved to the output directory."
+
+
+def test_move_step_across_devices(pipeline_data_with_paths):
+    """
+    Test that move_step copies atomically when a rename crosses devices.
+    """
+    data, source_file, output_filename = pipeline_data_with_paths
+
+    with patch("os.rename", side_effect=OSError(errno.EXDEV, "Cross-device link")):
+        result = move_step(data=data, output_filename=output_filename)
+
+    assert not os.path.exists(source_file)
+    with open(output_filename) as f:
+        assert f.read() == "dummy audio content"
+    assert os.listdir(os.path.dirname(output_filename)) == ["final_output.wav"]
+    assert result.final_output_path == output_filename
+
+
+def test_move_step_takes_waveform_peaks_along(pipeline_data_with_paths, tmp_path):
+    data, source_file, output_filename = pipeline_data_with_paths
+    peaks_file = tmp_path / "source.peaks.256.dat"
+    peaks_file.write_bytes(b"peaks")
+    data.waveform_files = [str(peaks_file)]
+
+    move_step(data=data, output_filename=output_filename)
+
+    moved = str(tmp_path / "output" / "final_output.peaks.256.dat")
+    assert data.waveform_files == [moved]
+    assert not peaks_file.exists()
+    with open(moved, "rb") as f:
+        assert f.read() == b"peaks"
+
+
+def test_move_step_takes_renditions_along(pipeline_data_with_paths, tmp_path):
+    data, source_file, output_filename = pipeline_data_with_paths
+    podcast = tmp_path / "source.podcast.mp3"
+    podcast.write_bytes(b"mp3")
+    data.rendition_files = {"podcast": str(podcast)}
+
+    move_step(data=data, output_filename=output_filename)
+
+    moved = str(tmp_path / "output" / "final_output.podcast.mp3")
+    assert data.rendition_files == {"podcast": moved}
+    assert not podcast.exists()
+    assert os.path.exists(moved)
@@ -0,0 +1,151 @@
+import pytest
+from array import array
+from unittest.mock import patch
+from app.data_models.pipeline_data import PipelineData
+from app.steps.preview_step import preview_step
+from app.utils.keyframe_index import KeyframeIndex
+from app.utils.loudness import LoudnessMeasurement
+
+
+@pytest.fixture
+def data():
+    return PipelineData(
+        intro_file_path="intro.mp4",
+        active_file_path="main.mp4",
+        outro_file_path="outro.mp4",
+        trim={"start_time": "00:10:00", "end_time": "01:00:00"},
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_get_loudness():
+    with patch("app.steps.preview_step.get_loudness", return_value=None) as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_run_ffmpeg():
+    with patch("app.steps.preview_step.run_ffmpeg") as mock_run:
+        yield mock_run
+
+
+def _commands(mock_run_ffmpeg):
+    commands = [call.args[0] for call in mock_run_ffmpeg.call_args_list]
+    return {command[-1].rsplit(".", 2)[-2]: command for command in commands}
+
+
+def _inputs(command):
+    """
+    Returns the seek options in front of each `-i`, keyed by the input.
+    """
+    inputs, options = {}, []
+    for i, arg in enumerate(command[: command.index("-filter_complex")]):
+        if arg in ("-ss", "-sseof", "-t"):
+            options.extend([arg, command[i + 1]])
+        elif arg == "-i":
+            inputs[command[i + 1]], options = options, []
+    return inputs
+
+
+def test_preview_renders_both_joins_from_the_source(data, mock_run_ffmpeg, tmp_path):
+    output_base = str(tmp_path / "sermon" / "2025-02-02")
+
+    preview_step(data, output_base, seconds=8, fade_duration=1, is_video=True)
+
+    commands = _commands(mock_run_ffmpeg)
+    assert data.preview_files == [
+        f"{output_base}.preview-intro.mp4",
+        f"{output_base}.preview-outro.mp4",
+    ]
+    assert _inputs(commands["preview-intro"]) == {
+        "intro.mp4": ["-sseof", "-8.000"],
+        "main.mp4": ["-ss", "600.000", "-t", "8.000"],
+    }
+    assert _inputs(commands["preview-outro"]) == {
+        "main.mp4": ["-ss", "3592.000", "-t", "8.000"],
+        "outro.mp4": ["-t", "8.000"],
+    }
+
+    # The sermon gets the full render's fades; everything is small and fast
+    intro_filters = commands["preview-intro"][
+        commands["preview-intro"].index("-filter_complex") + 1
+    ]
+    assert "[1:v]scale=640:360,fps=30,setsar=1,format=yuv420p,fade=t=in:st=0:d=1" in (
+        intro_filters
+    )
+    assert "afade=t=in:st=0:d=1[a1]" in intro_filters
+    outro_filters = commands["preview-outro"][
+        commands["preview-outro"].index("-filter_complex") + 1
+    ]
+    assert "fade=t=out:st=7.000:d=1[v0]" in outro_filters
+    assert "afade=t=out:st=7.000:d=1[a0]" in outro_filters
+    for command in commands.values():
+        assert command[command.index("-preset") + 1] == "ultrafast"
+        assert command[command.index("-b:a") + 1] == "64k"
+
+
+def test_preview_audio_only(data, mock_run_ffmpeg, tmp_path):
+    preview_step(data, str(tmp_path / "2025-02-02"))
+
+    for command in _commands(mock_run_ffmpeg).values():
+        filters = command[command.index("-filter_complex") + 1]
+        assert filters.endswith("[a0][a1]concat=n=2:v=0:a=1[a]")
+        assert ":v]" not in filters
+        assert command[command.index("-c:a") + 1] == "libmp3lame"
+    assert all(path.endswith(".mp3") for path in data.preview_files)
+
+
+def test_preview_normalizes_each_input(
+    data, mock_run_ffmpeg, mock_get_loudness, tmp_path
+):
+    mock_get_loudness.side_effect = lambda path, **kwargs: {
+        "intro.mp4": LoudnessMeasurement(-20.0, -3.0, 5.0, -30.0, 0.1),
+        "outro.mp4": None,
+    }[path]
+
+    preview_step(data, str(tmp_path / "2025-02-02"))
+
+    commands = _commands(mock_run_ffmpeg)
+    intro_filters = commands["preview-intro"][
+        commands["preview-intro"].index("-filter_complex") + 1
+    ]
+    outro_filters = commands["preview-outro"][
+        commands["preview-outro"].index("-filter_complex") + 1
+    ]
+    assert "[0:a]loudnorm=I=-16:TP=-1:LRA=11:measured_I=-20.00" in intro_filters
+    # The sermon is never measured, that would decode the whole service
+    assert "[1:a]loudnorm=I=-16:TP=-1:LRA=11,aformat=" in intro_filters
+    assert "[0:a]loudnorm=I=-16:TP=-1:LRA=11,aformat=" in outro_filters
+    # No usable measurement: single-pass loudnorm
+    assert "[1:a]loudnorm=I=-16:TP=-1:LRA=11,aformat=" in outro_filters
+    assert [call.args[0] for call in mock_get_loudness.call_args_list] == [
+        "intro.mp4",
+        "outro.mp4",
+    ]
+
+
+def test_preview_starts_on_the_trim_keyframe(data, mock_run_ffmpeg, tmp_path):
+    index = KeyframeIndex(
+        array("d", [0.0, 598.0, 602.0]),
+        array("q", [0, 100, 200]),
+        array("q", [60, 60, 60]),
+        packet_count=180,
+    )
+    with patch("app.steps.preview_step.get_keyframe_index", return_value=index):
+        preview_step(
+            data, str(tmp_path / "2025-02-02"), is_video=True, keyframe_index=True
+        )
+
+    intro_join = _commands(mock_run_ffmpeg)["preview-intro"]
+    assert _inputs(intro_join)["main.mp4"][:2] == ["-ss", "598.000"]
+
+
+def test_preview_of_a_short_untrimmed_file(data, mock_run_ffmpeg, tmp_path):
+    data.trim = None
+    with patch("app.steps.preview_step.get_media_info") as get_media_info:
+        get_media_info.return_value.duration = 12.0
+        preview_step(data, str(tmp_path / "2025-02-02"), seconds=10)
+
+    # Each join gets at most half the file
+    outro_join = _commands(mock_run_ffmpeg)["preview-outro"]
+    assert _inputs(outro_join)["main.mp4"] == ["-ss", "6.000", "-t", "6.000"]
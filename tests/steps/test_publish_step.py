@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import MagicMock
+from app.data_models.pipeline_data import PipelineData
+from app.steps.publish_step import publish_step, wait_for_publish_step
+
+
+def test_publish_step_submits_final_output(tmp_path):
+    final_output = tmp_path / "2025-01-05.mp4"
+    final_output.write_bytes(b"video")
+    data = PipelineData(final_output_path=str(final_output))
+    queue = MagicMock()
+
+    result = publish_step(data, queue, key="stream/2025-01-05.mp4")
+
+    queue.submit.assert_called_once_with(
+        "stream/2025-01-05.mp4", str(final_output), sha256=None
+    )
+    assert result is data
+
+
+def test_publish_step_without_queue_is_a_no_op():
+    data = PipelineData()
+
+    assert publish_step(data, None, key="stream/2025-01-05.mp4") is data
+    assert wait_for_publish_step(data, None) is data
+
+
+def test_publish_step_missing_file(tmp_path):
+    data = PipelineData(final_output_path=str(tmp_path / "missing.mp4"))
+
+    with pytest.raises(ValueError, match="Nothing to publish"):
+        publish_step(data, MagicMock(), key="stream/2025-01-05.mp4")
+
+
+def test_wait_for_publish_step_records_results():
+    queue = MagicMock()
+    queue.wait.return_value = [{"destination": "archive", "sha256": "abc"}]
+    data = PipelineData()
+
+    wait_for_publish_step(data, queue)
+
+    assert data.published == [{"destination": "archive", "sha256": "abc"}]
+    queue.close.assert_called_once()
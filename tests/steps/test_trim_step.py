@@ -1,6 +1,10 @@
 import pytest
-from unittest.mock import patch
+from array import array
+from unittest.mock import MagicMock, patch
 from app.steps.trim_step import trim_step
+from app.utils.keyframe_index import KeyframeIndex
+from app.utils.normalized_cache import trimmed_file
+from app.utils.video_boundaries import VideoBoundaries
 from app.data_models.pipeline_data import PipelineData
 
 
@@ -14,10 +18,22 @@ def pipeline_data(tmp_path):
     return data
 
 
+def _trimmed(input_file, start_time, end_time, **mode):
+    return trimmed_file(
+        input_file,
+        dict(
+            start_time=start_time,
+            end_time=end_time,
+            keyframe_index=mode.get("keyframe_index", False),
+            detect_boundaries=mode.get("detect_boundaries", False),
+        ),
+    )
+
+
 @pytest.fixture
 def mock_subprocess_run():
-    """Mock subprocess.run to prevent actual ffmpeg calls."""
-    with patch("app.steps.trim_step.subprocess.run") as mock_run:
+    """Mock run_ffmpeg to prevent actual ffmpeg calls."""
+    with patch("app.steps.trim_step.run_ffmpeg") as mock_run:
         yield mock_run
 
 
@@ -36,7 +52,7 @@ def test_trim_step_success_audio(
     end_time = "00:00:05"
     overwrite = False
     input_file = pipeline_data.active_file_path
-    output_file = input_file.replace(".wav", "_trimmed.wav")
+    output_file = _trimmed(input_file, start_time, end_time)
 
     mock_os_path_exists.side_effect = (
         lambda path: path == input_file
@@ -65,7 +81,7 @@ def test_trim_step_success_audio(
         "copy",
         output_file,
     ]
-    mock_subprocess_run.assert_called_once_with(expected_command, check=True)
+    mock_subprocess_run.assert_called_once_with(expected_command, duration=4.0)
     assert result.active_file_path == output_file
 
 
@@ -75,7 +91,7 @@ def test_trim_step_overwrite(pipeline_data, mock_subprocess_run, mock_os_path_ex
     end_time = "00:00:05"
     overwrite = True
     input_file = pipeline_data.active_file_path
-    output_file = input_file.replace(".wav", "_trimmed.wav")
+    output_file = _trimmed(input_file, start_time, end_time)
 
     mock_os_path_exists.side_effect = lambda path: path in {
         input_file,
@@ -105,7 +121,7 @@ def test_trim_step_overwrite(pipeline_data, mock_subprocess_run, mock_os_path_ex
         "copy",
         output_file,
     ]
-    mock_subprocess_run.assert_called_once_with(expected_command, check=True)
+    mock_subprocess_run.assert_called_once_with(expected_command, duration=4.0)
     assert result.active_file_path == output_file
 
 
@@ -127,7 +143,7 @@ def test_trim_step_output_already_exists(
     start_time = "00:00:01"
     end_time = "00:00:05"
     overwrite = False
-    output_file = pipeline_data.active_file_path.replace(".wav", "_trimmed.wav")
+    output_file = _trimmed(pipeline_data.active_file_path, start_time, end_time)
     mock_os_path_exists.return_value = True  # Simulate output file exists
 
     # Act
@@ -141,3 +157,84 @@ def test_trim_step_output_already_exists(
     # Assert
     mock_subprocess_run.assert_not_called()
     assert result.active_file_path == output_file
+
+
+def test_trim_step_seeks_to_indexed_keyframe(pipeline_data, mock_subprocess_run):
+    index = KeyframeIndex(
+        array("d", [0.0, 2.0, 4.0]),
+        array("q", [0, 100, 200]),
+        array("q", [60, 60, 60]),
+        packet_count=180,
+    )
+    input_file = pipeline_data.active_file_path
+    output_file = _trimmed(input_file, "00:00:03", "00:00:05", keyframe_index=True)
+
+    with patch("app.steps.trim_step.get_keyframe_index", return_value=index), patch(
+        "app.steps.trim_step.get_media_info"
+    ), patch("app.steps.trim_step.attach_media"):
+        trim_step(pipeline_data, "00:00:03", "00:00:05", keyframe_index=True)
+
+    expected_command = [
+        "ffmpeg",
+        "-loglevel",
+        "info",
+        "-ss",
+        "2.000000",
+        "-i",
+        input_file,
+        "-t",
+        "3.000000",
+        "-c",
+        "copy",
+        "-avoid_negative_ts",
+        "make_zero",
+        output_file,
+    ]
+    mock_subprocess_run.assert_called_once_with(expected_command, duration=3.0)
+
+
+def test_trim_step_moves_past_detected_boundaries(pipeline_data, mock_subprocess_run):
+    boundaries = VideoBoundaries(start=24.0, end=84.5, head="static", tail="black")
+    input_file = pipeline_data.active_file_path
+
+    with patch(
+        "app.steps.trim_step.find_video_boundaries", return_value=boundaries
+    ) as mock_find:
+        trim_step(pipeline_data, "00:00:00", "00:01:36", detect_boundaries=True)
+
+    mock_find.assert_called_once_with(input_file, 0.0, 96.0, data=pipeline_data)
+    command = mock_subprocess_run.call_args.args[0]
+    assert command[command.index("-ss") + 1] == "00:00:24"
+    assert command[command.index("-to") + 1] == "00:01:24.500"
+    assert pipeline_data.trim["boundaries"] == boundaries.summary()
+
+
+def test_trim_step_without_cut_only_records_the_window(
+    pipeline_data, mock_subprocess_run
+):
+    input_file = pipeline_data.active_file_path
+
+    trim_step(pipeline_data, "00:00:03", "00:00:05", cut=False)
+
+    mock_subprocess_run.assert_not_called()
+    assert pipeline_data.active_file_path == input_file
+    assert pipeline_data.trim == {"start_time": "00:00:03", "end_time": "00:00:05"}
+
+
+def test_trim_step_cache_key_follows_the_window(pipeline_data, mock_subprocess_run):
+    cache_sync = MagicMock()
+    cache_sync.pull.return_value = False
+    input_file = pipeline_data.active_file_path
+
+    trim_step(pipeline_data, "00:00:01", "00:00:05", cache_sync=cache_sync)
+    pipeline_data.active_file_path = input_file
+    trim_step(pipeline_data, "00:00:02", "00:00:05", cache_sync=cache_sync)
+
+    # A new window is a new cut, never the one pulled for the old window
+    pulled = [call.args[0] for call in cache_sync.pull.call_args_list]
+    assert pulled == [
+        _trimmed(input_file, "00:00:01", "00:00:05"),
+        _trimmed(input_file, "00:00:02", "00:00:05"),
+    ]
+    assert pulled[0] != pulled[1]
+    assert [call.args[0] for call in cache_sync.push.call_args_list] == pulled
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.utils import auto_trim
+from app.utils.auto_trim import (
+    MUSIC,
+    SILENCE,
+    SPEECH,
+    TrimSuggestion,
+    find_program,
+    get_trim_suggestion,
+    rms_envelope,
+    suggest_trim,
+)
+
+
+def _labels(*runs):
+    return np.concatenate([np.full(seconds, label) for label, seconds in runs])
+
+
+def test_rms_envelope_does_not_depend_on_block_size():
+    samples = np.random.default_rng(0).standard_normal(8000 * 3) * 0.1
+
+    whole = rms_envelope([samples], 8000)
+    pieces = rms_envelope(np.array_split(samples, 7), 8000)
+
+    assert len(whole) == 60
+    np.testing.assert_allclose(whole, pieces)
+    assert whole.mean() == pytest.approx(-20.0, abs=0.5)
+
+
+def test_rms_envelope_of_digital_silence():
+    assert np.isneginf(rms_envelope([np.zeros(800)], 8000)).all()
+
+
+def test_find_program_bridges_short_gaps():
+    labels = _labels(
+        (MUSIC, 100), (SPEECH, 300), (SILENCE, 20), (SPEECH, 300), (MUSIC, 100)
+    )
+
+    assert find_program(labels) == (100, 720)
+
+
+def test_find_program_prefers_the_longest_stretch():
+    labels = _labels(
+        (MUSIC, 60), (SPEECH, 90), (MUSIC, 120), (SPEECH, 600), (MUSIC, 60)
+    )
+
+    assert find_program(labels) == (270, 870)
+
+
+def test_find_program_needs_enough_speech():
+    assert find_program(_labels((MUSIC, 300), (SPEECH, 30), (MUSIC, 300))) is None
+
+
+def test_suggest_trim_on_music_only():
+    t = np.arange(2000 * 120) / 2000
+    music = 0.1 * np.sin(2 * np.pi * 220 * t)
+
+    assert suggest_trim(rms_envelope([music], 2000)) is None
+
+
+def test_get_trim_suggestion_analyses_a_recording_once(tmp_path):
+    recording = tmp_path / "audio.m4a"
+    recording.write_bytes(b"audio")
+    cache_path = str(tmp_path / "auto_trim.json")
+    suggestion = TrimSuggestion(
+        100.0, 720.0, 0.9, np.array([MUSIC, SPEECH, SILENCE], dtype=np.int8)
+    )
+
+    with patch(
+        "app.utils.auto_trim.detect_trim", return_value=suggestion
+    ) as detect_trim:
+        assert get_trim_suggestion(str(recording), cache_path=cache_path) == suggestion
+        # A later run (a new process) reads it back from the cache file
+        auto_trim._suggestions.clear()
+        cached = get_trim_suggestion(str(recording), cache_path=cache_path)
+
+    detect_trim.assert_called_once()
+    assert (cached.start, cached.end, cached.confidence) == (100.0, 720.0, 0.9)
+    assert cached.labels.tolist() == [MUSIC, SPEECH, SILENCE]
+
+
+def test_get_trim_suggestion_remembers_no_sermon(tmp_path):
+    recording = tmp_path / "audio.m4a"
+    recording.write_bytes(b"audio")
+    cache_path = str(tmp_path / "auto_trim.json")
+
+    with patch("app.utils.auto_trim.detect_trim", return_value=None) as detect_trim:
+        assert get_trim_suggestion(str(recording), cache_path=cache_path) is None
+        auto_trim._suggestions.clear()
+        assert get_trim_suggestion(str(recording), cache_path=cache_path) is None
+
+    detect_trim.assert_called_once()
@@ -0,0 +1,57 @@
+import subprocess
+import pytest
+from unittest.mock import MagicMock, patch
+from app.utils.commands import run_command
+from app.utils.tracing import start_trace, stop_trace
+
+
+@pytest.fixture
+def tracer():
+    tracer = start_trace()
+    yield tracer
+    stop_trace()
+
+
+@patch("subprocess.run")
+def test_run_command_passes_through(mock_run):
+    run_command(["ffprobe", "-v", "error", "in.wav"], capture_output=True, check=True)
+
+    mock_run.assert_called_once_with(
+        ["ffprobe", "-v", "error", "in.wav"], capture_output=True, check=True
+    )
+
+
+@patch("subprocess.run")
+def test_run_command_records_span(mock_run, tracer, tmp_path):
+    input_path = tmp_path / "in.wav"
+    input_path.write_bytes(b"x" * 100)
+    output_path = tmp_path / "out.wav"
+
+    def fake_ffmpeg(command, **kwargs):
+        output_path.write_bytes(b"x" * 40)
+        return MagicMock(returncode=0)
+
+    mock_run.side_effect = fake_ffmpeg
+
+    run_command(
+        ["taskset", "-c", "0", "ffmpeg", "-i", str(input_path), str(output_path)],
+        span_attributes={"input_duration": 3.0},
+        check=True,
+    )
+
+    span = tracer.spans[0]
+    assert span.name == "ffmpeg"
+    assert span.category == "subprocess"
+    assert span.attributes["input_bytes"] == 100
+    assert span.attributes["output_bytes"] == 40
+    assert span.attributes["exit_code"] == 0
+    assert span.attributes["input_duration"] == 3.0
+
+
+@patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "ffmpeg"))
+def test_run_command_records_failure(mock_run, tracer):
+    with pytest.raises(subprocess.CalledProcessError):
+        run_command(["ffmpeg", "-i", "missing.wav", "out.wav"], check=True)
+
+    assert tracer.spans[0].attributes["exit_code"] == 1
+    assert "CalledProcessError" in tracer.spans[0].attributes["error"]
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+from app.utils.encoder_calibration import (
+    CalibrationResult,
+    calibrate_profile,
+    choose_setting,
+)
+from app.utils.encoder_profiles import EncoderProfile
+
+
+def make_result(preset, realtime_factor, size_bytes, crf=20):
+    return CalibrationResult(
+        preset=preset,
+        crf=crf,
+        elapsed_seconds=20 / realtime_factor,
+        realtime_factor=realtime_factor,
+        fps=30 * realtime_factor,
+        bitrate_kbps=size_bytes * 8 / 20 / 1000,
+        size_bytes=size_bytes,
+    )
+
+
+def test_choose_smallest_fast_enough_setting():
+    results = [
+        make_result("ultrafast", 6.0, 90_000_000),
+        make_result("veryfast", 3.0, 30_000_000),
+        make_result("medium", 0.8, 20_000_000),
+    ]
+
+    chosen = choose_setting(results, target_rtf=2.0)
+
+    assert chosen.preset == "veryfast"
+
+
+def test_choose_fastest_when_none_meets_target():
+    results = [
+        make_result("veryfast", 1.5, 30_000_000),
+        make_result("medium", 0.8, 20_000_000),
+    ]
+
+    chosen = choose_setting(results, target_rtf=2.0)
+
+    assert chosen.preset == "veryfast"
+
+
+def test_choose_without_results():
+    assert choose_setting([], target_rtf=1.0) is None
+
+
+@patch("app.utils.encoder_calibration.probe_duration", return_value=3600.0)
+@patch("app.utils.encoder_calibration.encode_sample")
+def test_calibrate_profile(mock_encode_sample, mock_probe_duration):
+    speeds = {"ultrafast": (8.0, 90_000_000), "veryfast": (2.5, 40_000_000)}
+    mock_encode_sample.side_effect = (
+        lambda input_path, output_path, profile, start, seconds: make_result(
+            profile.preset, *speeds[profile.preset], crf=profile.crf
+        )
+    )
+
+    tuned, results = calibrate_profile(
+        "sermon.mp4",
+        EncoderProfile("publish", preset="ultrafast", crf=20),
+        target_rtf=2.0,
+        sample_seconds=20,
+        presets=["ultrafast", "veryfast"],
+    )
+
+    assert tuned == EncoderProfile("publish", preset="veryfast", crf=20)
+    assert len(results) == 2
+    # The sample is taken from the middle of the source
+    _, _, _, start_time, sample_seconds = mock_encode_sample.call_args[0]
+    assert start_time == 1790.0
+    assert sample_seconds == 20
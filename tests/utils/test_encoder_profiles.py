@@ -0,0 +1,47 @@
+import pytest
+from app.utils.encoder_profiles import EncoderProfile, get_encoder_profile
+
+
+def test_default_profile_is_publish():
+    profile = get_encoder_profile()
+
+    assert profile.name == "publish"
+    assert profile.ffmpeg_args() == [
+        "-c:v",
+        "libx264",
+        "-crf",
+        "20",
+        "-preset",
+        "veryfast",
+    ]
+
+
+def test_profile_selected_in_config():
+    profile = get_encoder_profile({"profile": "archive"})
+
+    assert profile == EncoderProfile("archive", preset="slow", crf=18)
+
+
+def test_config_overrides_builtin_profile():
+    encoding_conf = {"profiles": {"publish": {"preset": "faster"}}}
+
+    profile = get_encoder_profile(encoding_conf)
+
+    assert profile.preset == "faster"
+    assert profile.crf == 20
+
+
+def test_custom_profile():
+    encoding_conf = {
+        "profile": "hevc",
+        "profiles": {"hevc": {"codec": "libx265", "preset": "fast", "crf": 24}},
+    }
+
+    profile = get_encoder_profile(encoding_conf)
+
+    assert profile == EncoderProfile("hevc", codec="libx265", preset="fast", crf=24)
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="Unknown encoder profile: nope"):
+        get_encoder_profile(name="nope")
@@ -0,0 +1,221 @@
+import contextvars
+import io
+import subprocess
+import threading
+import pytest
+from unittest.mock import MagicMock, call, patch
+from app.utils.ffmpeg import (
+    FfmpegCancelled,
+    FfmpegProgress,
+    add_progress_listener,
+    format_progress,
+    format_timestamp,
+    parse_timestamp,
+    remove_progress_listener,
+    run_ffmpeg,
+    set_cancel_event,
+)
+from app.utils.profiling import start_profile, stop_profile
+from app.utils.tracing import start_trace, stop_trace
+
+PROGRESS_OUTPUT = [
+    "frame=150\n",
+    "fps=75.0\n",
+    "total_size=1000000\n",
+    "out_time_us=5000000\n",
+    "speed=2.5x\n",
+    "progress=continue\n",
+    "frame=300\n",
+    "fps=N/A\n",
+    "total_size=2000000\n",
+    "out_time_us=10000000\n",
+    "speed=2.5x\n",
+    "progress=end\n",
+]
+
+
+@pytest.fixture
+def fake_popen():
+    with patch("app.utils.ffmpeg.subprocess.Popen") as mock_popen:
+        process = MagicMock()
+        process.stdout = io.StringIO("".join(PROGRESS_OUTPUT))
+        process.wait.return_value = 0
+        mock_popen.return_value = process
+        yield mock_popen
+
+
+def test_run_ffmpeg_adds_progress_flags(fake_popen):
+    run_ffmpeg(["taskset", "-c", "0", "ffmpeg", "-i", "in.mp4", "out.mp4"])
+
+    command = fake_popen.call_args[0][0]
+    assert command[:7] == [
+        "taskset",
+        "-c",
+        "0",
+        "ffmpeg",
+        "-progress",
+        "pipe:1",
+        "-nostats",
+    ]
+    assert command[-1] == "out.mp4"
+
+
+def test_run_ffmpeg_reports_progress(fake_popen):
+    updates = []
+
+    progress = run_ffmpeg(
+        ["ffmpeg", "-i", "in.mp4", "out.mp4"],
+        duration=20,
+        on_progress=lambda p: updates.append((p.out_time_seconds, p.percent)),
+    )
+
+    assert updates == [(5.0, 25.0), (10.0, 50.0)]
+    assert progress.finished
+    assert progress.frame == 300
+    assert progress.speed == 2.5
+    assert progress.fps is None
+    assert progress.total_size == 2_000_000
+    assert progress.label == "out.mp4"
+
+
+def test_progress_listeners_receive_every_run(fake_popen):
+    updates = []
+    add_progress_listener(updates.append)
+    try:
+        run_ffmpeg(["ffmpeg", "-i", "in.mp4", "out.mp4"])
+    finally:
+        remove_progress_listener(updates.append)
+
+    assert len(updates) == 2
+
+
+def test_run_ffmpeg_records_throughput(fake_popen):
+    tracer = start_trace()
+    try:
+        run_ffmpeg(["ffmpeg", "-i", "in.mp4", "out.mp4"], duration=10)
+    finally:
+        stop_trace()
+
+    attributes = tracer.spans[0].attributes
+    assert attributes["exit_code"] == 0
+    assert attributes["frames"] == 300
+    assert attributes["output_bytes"] == 2_000_000
+    assert attributes["out_time_seconds"] == 10.0
+    assert attributes["input_duration"] == 10
+    assert attributes["realtime_factor"] > 0
+
+
+def test_run_ffmpeg_failure(fake_popen):
+    fake_popen.return_value.wait.return_value = 1
+
+    with pytest.raises(subprocess.CalledProcessError):
+        run_ffmpeg(["ffmpeg", "-i", "missing.mp4", "out.mp4"])
+
+    # Failed before reporting any progress
+    fake_popen.return_value.stdout = io.StringIO("")
+    progress = run_ffmpeg(["ffmpeg", "-i", "missing.mp4", "out.mp4"], check=False)
+    assert not progress.finished
+
+
+def test_run_ffmpeg_stops_ffmpeg_when_a_listener_fails(fake_popen):
+    def on_progress(progress):
+        raise RuntimeError("listener failed")
+
+    profiler = start_profile("audio_pipeline")
+    try:
+        with pytest.raises(RuntimeError, match="listener failed"):
+            run_ffmpeg(["ffmpeg", "-i", "in.mp4", "out.mp4"], on_progress=on_progress)
+    finally:
+        stop_profile()
+
+    # Killed before the wait, which would otherwise block on the full pipe
+    process = fake_popen.return_value
+    assert process.mock_calls.index(call.kill()) < process.mock_calls.index(call.wait())
+    assert process.stdout.closed
+    assert fake_popen.call_args[1]["stderr"].closed
+    assert profiler.ffmpeg_runs == []
+
+
+def test_eta_and_format():
+    progress = FfmpegProgress(
+        label="out.mp4",
+        out_time_seconds=60,
+        speed=2.0,
+        fps=60.0,
+        total_size=5_000_000,
+        duration=180,
+        elapsed_seconds=30,
+    )
+
+    assert progress.realtime_factor == 2.0
+    assert progress.eta_seconds == 60.0
+    assert format_progress(progress) == (
+        "00:01:00 (33%), 2.00x realtime, 60.0 fps, 5.0 MB, ETA 00:01:00"
+    )
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("01:02:03") == 3723.0
+    assert parse_timestamp("00:00:01.5") == 1.5
+    assert parse_timestamp("42") == 42.0
+
+
+def test_format_timestamp():
+    assert format_timestamp(3723) == "01:02:03"
+    assert format_timestamp(1.5) == "00:00:01.500"
+    assert parse_timestamp(format_timestamp(4321.25)) == 4321.25
+
+
+def test_run_ffmpeg_records_benchmark_while_profiling(fake_popen, capsys):
+    def write_stderr(command, stdout, stderr, **kwargs):
+        stderr.write("bench:  100 user  0 sys  120 real encode_video 0.0\n")
+        stderr.write("Some warning\n")
+        return fake_popen.return_value
+
+    fake_popen.side_effect = write_stderr
+    profiler = start_profile("audio_pipeline")
+    try:
+        run_ffmpeg(["ffmpeg", "-i", "in.mp4", "out.mp4"])
+    finally:
+        stop_profile()
+
+    command = fake_popen.call_args[0][0]
+    assert "-benchmark_all" in command
+    assert profiler.ffmpeg_runs[0]["label"] == "out.mp4"
+    assert profiler.ffmpeg_runs[0]["stages"]["encode_video 0.0"]["calls"] == 1
+    assert "Some warning" in capsys.readouterr().err
+
+
+def test_run_ffmpeg_skips_benchmark_flags_without_profiler(fake_popen):
+    run_ffmpeg(["ffmpeg", "-i", "in.mp4", "out.mp4"])
+
+    assert "-benchmark_all" not in fake_popen.call_args[0][0]
+    assert fake_popen.call_args[1]["stderr"] is None
+
+
+def test_run_ffmpeg_keeps_the_commands_loglevel_while_profiling(fake_popen):
+    start_profile("audio_pipeline")
+    try:
+        run_ffmpeg(["ffmpeg", "-loglevel", "info", "-i", "in.mp4", "out.mp4"])
+        fake_popen.return_value.stdout = io.StringIO("")
+        run_ffmpeg(["ffmpeg", "-i", "in.mp4", "out.mp4"])
+    finally:
+        stop_profile()
+
+    with_level, without_level = [call[0][0] for call in fake_popen.call_args_list]
+    assert with_level.count("-loglevel") == 1
+    assert with_level[with_level.index("-loglevel") + 1] == "repeat+info"
+    assert without_level[without_level.index("-loglevel") + 1] == "+repeat"
+
+
+def test_run_ffmpeg_cancelled_before_start(fake_popen):
+    cancel = threading.Event()
+    cancel.set()
+
+    def run():
+        set_cancel_event(cancel)
+        run_ffmpeg(["ffmpeg", "-i", "in.mp4", "out.mp4"])
+
+    with pytest.raises(FfmpegCancelled, match="out.mp4"):
+        contextvars.copy_context().run(run)
+    fake_popen.assert_not_called()
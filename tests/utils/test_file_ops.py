@@ -0,0 +1,78 @@
+import errno
+import os
+from unittest.mock import patch
+import pytest
+from app.utils import file_ops
+from app.utils.file_ops import atomic_copy, kernel_copy, place_file
+
+CONTENT = os.urandom(300_000)
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "source.mp4"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+def test_place_file_renames_on_same_filesystem(source_file, tmp_path):
+    destination = str(tmp_path / "final.mp4")
+
+    result = place_file(source_file, destination)
+
+    assert result["method"] == "rename"
+    assert result["bytes"] == len(CONTENT)
+    assert not os.path.exists(source_file)
+    with open(destination, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_place_file_copies_across_devices(source_file, tmp_path):
+    destination = str(tmp_path / "out" / "final.mp4")
+    os.makedirs(os.path.dirname(destination))
+
+    with patch("os.rename", side_effect=OSError(errno.EXDEV, "Cross-device link")):
+        result = place_file(source_file, destination)
+
+    assert result["method"] in ("copy_file_range", "sendfile", "copy")
+    assert result["throughput_mb_s"] is None or result["throughput_mb_s"] > 0
+    assert not os.path.exists(source_file)
+    assert os.listdir(os.path.dirname(destination)) == ["final.mp4"]
+    with open(destination, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_place_file_can_keep_the_source(source_file, tmp_path):
+    destination = str(tmp_path / "copy.mp4")
+
+    result = place_file(source_file, destination, move=False)
+
+    assert result["method"] != "rename"
+    assert os.path.exists(source_file)
+    with open(destination, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_kernel_copy_falls_back_to_a_plain_copy(source_file, tmp_path):
+    destination = str(tmp_path / "fallback.mp4")
+    unsupported = OSError(errno.EXDEV, "Cross-device link")
+
+    with patch.object(
+        file_ops, "_copy_file_range", side_effect=unsupported
+    ), patch.object(file_ops, "_sendfile", side_effect=unsupported):
+        with open(source_file, "rb") as src, open(destination, "wb") as dst:
+            method = kernel_copy(src.fileno(), dst.fileno(), len(CONTENT))
+
+    assert method == "copy"
+    with open(destination, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_atomic_copy_leaves_no_partial_file_on_failure(source_file, tmp_path):
+    destination = str(tmp_path / "final.mp4")
+
+    with patch.object(file_ops, "kernel_copy", side_effect=OSError(errno.ENOSPC, "")):
+        with pytest.raises(OSError):
+            atomic_copy(source_file, destination)
+
+    assert sorted(os.listdir(tmp_path)) == ["source.mp4"]
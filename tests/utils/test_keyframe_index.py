@@ -0,0 +1,99 @@
+import io
+import os
+from array import array
+from unittest.mock import MagicMock, patch
+import pytest
+from app.utils.keyframe_index import (
+    INDEX_SUFFIX,
+    KeyframeIndex,
+    build_keyframe_index,
+    clear_keyframe_indexes,
+    get_keyframe_index,
+)
+
+# ffprobe -show_entries packet=pts_time,pos,flags -of csv=p=0
+PACKETS = (
+    "0.000000,304,K__\n"
+    "0.033333,6080,___\n"
+    "0.066667,6362,___\n"
+    "1.500000,37902,K__\n"
+    "1.533333,38100,___\n"
+    "3.000000,76551,K__\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    clear_keyframe_indexes()
+    yield
+    clear_keyframe_indexes()
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"not really a video")
+    return str(path)
+
+
+@pytest.fixture
+def ffprobe():
+    def popen(command, **kwargs):
+        process = MagicMock()
+        process.stdout = io.StringIO(PACKETS)
+        process.wait.return_value = 0
+        return process
+
+    with patch("app.utils.keyframe_index.subprocess.Popen", side_effect=popen) as p:
+        yield p
+
+
+def test_build_keyframe_index(video, ffprobe):
+    index = build_keyframe_index(video)
+
+    assert list(index.times) == [0.0, 1.5, 3.0]
+    assert list(index.offsets) == [304, 37902, 76551]
+    assert list(index.gop_packets) == [3, 2, 1]
+    assert index.packet_count == 6
+    assert index.is_current(video)
+
+
+def test_lookups_are_binary_searches():
+    index = KeyframeIndex(
+        array("d", [0.0, 2.0, 4.0, 6.0]),
+        array("q", [0, 100, 200, 300]),
+        array("q", [60, 60, 60, 60]),
+        packet_count=240,
+    )
+
+    assert index.keyframe_before(3.9) == 2.0
+    assert index.keyframe_before(4.0) == 4.0
+    assert index.keyframe_after(4.1) == 6.0
+    assert index.keyframe_after(6.5) is None
+    assert index.offset_before(5.0) == 200
+    assert list(index.keyframes_between(1.0, 6.0)) == [2.0, 4.0]
+
+
+def test_index_is_stored_next_to_the_source_and_reused(video, ffprobe):
+    first = get_keyframe_index(video)
+    clear_keyframe_indexes()
+    second = get_keyframe_index(video)
+
+    assert os.path.exists(video + INDEX_SUFFIX)
+    assert ffprobe.call_count == 1
+    assert list(second.times) == list(first.times)
+    assert list(second.gop_packets) == list(first.gop_packets)
+
+    # A replaced source is indexed again
+    with open(video, "ab") as f:
+        f.write(b"more")
+    get_keyframe_index(video)
+    assert ffprobe.call_count == 2
+
+
+def test_load_ignores_unreadable_files(tmp_path):
+    path = tmp_path / "video.mp4.kfindex"
+    path.write_bytes(b"garbage")
+
+    assert KeyframeIndex.load(str(path)) is None
+    assert KeyframeIndex.load(str(tmp_path / "missing.kfindex")) is None
@@ -0,0 +1,53 @@
+import pytest
+from app.utils.lazy import LazyInstance, LazyRegistry
+
+
+def test_registry_imports_on_first_lookup():
+    registry = LazyRegistry({"dumps": "json:dumps"})
+
+    assert "dumps" in registry
+    assert not registry.loaded("dumps")
+    assert registry["dumps"]({"a": 1}) == '{"a": 1}'
+    assert registry.loaded("dumps")
+
+
+def test_registry_unknown_name():
+    with pytest.raises(KeyError, match="nothing"):
+        LazyRegistry()["nothing"]
+
+
+def test_register_replaces_entry():
+    registry = LazyRegistry({"join": "os.path:join"})
+    registry["join"]
+
+    registry.register("join", "posixpath:basename")
+
+    assert registry["join"]("a/b") == "b"
+    assert registry.names() == ["join"]
+
+
+calls = []
+
+
+class Recorder:
+    def __init__(self, name):
+        calls.append(name)
+        self.name = name
+
+
+def test_create_builds_on_first_use():
+    registry = LazyRegistry({"recorder": f"{__name__}:Recorder"})
+
+    instance = registry.create("recorder", "youtube")
+
+    assert calls == []
+    assert instance.name == "youtube"
+    assert instance.name == "youtube"
+    assert calls == ["youtube"]
+
+
+def test_lazy_instance_hides_private_attributes():
+    instance = LazyInstance(lambda: object())
+
+    assert not hasattr(instance, "_missing")
+    assert instance._instance is None
@@ -0,0 +1,117 @@
+import json
+import subprocess
+import pytest
+from unittest.mock import MagicMock, patch
+from app.utils.checksums import write_checksum
+from app.utils.loudness import (
+    LoudnessMeasurement,
+    clear_loudness_cache,
+    file_fingerprint,
+    get_loudness,
+    loudnorm_filter,
+    measure_loudness,
+)
+
+LOUDNORM_STDERR = """[Parsed_loudnorm_0 @ 0x55d0c8a7e440]
+{
+\t"input_i" : "-27.61",
+\t"input_tp" : "-4.47",
+\t"input_lra" : "18.06",
+\t"input_thresh" : "-39.20",
+\t"output_i" : "-16.58",
+\t"output_tp" : "-1.50",
+\t"output_lra" : "14.78",
+\t"output_thresh" : "-27.71",
+\t"normalization_type" : "dynamic",
+\t"target_offset" : "0.58"
+}
+"""
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_loudness_cache()
+    yield
+    clear_loudness_cache()
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "intro.wav"
+    path.write_bytes(b"audio")
+    return str(path)
+
+
+@pytest.fixture
+def mock_run_command():
+    with patch("app.utils.loudness.run_command") as mock:
+        mock.return_value = MagicMock(returncode=0, stderr=LOUDNORM_STDERR)
+        yield mock
+
+
+def test_measure_loudness(mock_run_command, audio_file):
+    measurement = measure_loudness(audio_file, analysis_sample_rate=22050)
+
+    assert measurement == LoudnessMeasurement(-27.61, -4.47, 18.06, -39.2, 0.58)
+    command = mock_run_command.call_args.args[0]
+    assert command[command.index("-af") + 1] == (
+        "aresample=22050,loudnorm=I=-16:TP=-1:LRA=11:print_format=json"
+    )
+    assert command[-3:] == ["-f", "null", "-"]
+
+
+def test_measure_loudness_ffmpeg_failure(mock_run_command, audio_file):
+    mock_run_command.return_value = MagicMock(returncode=1, stderr="boom")
+
+    with pytest.raises(subprocess.CalledProcessError):
+        measure_loudness(audio_file)
+
+
+def test_loudnorm_filter_falls_back_to_dynamic_for_silence():
+    silence = LoudnessMeasurement(float("-inf"), float("-inf"), 0.0, -70.0, 0.0)
+
+    assert loudnorm_filter(silence) == "loudnorm=I=-16:TP=-1:LRA=11"
+    assert loudnorm_filter(None) == "loudnorm=I=-16:TP=-1:LRA=11"
+
+
+def test_get_loudness_is_cached_on_disk(mock_run_command, audio_file, tmp_path):
+    cache_path = str(tmp_path / "loudness.json")
+
+    first = get_loudness(audio_file, cache_path=cache_path)
+    clear_loudness_cache()
+    second = get_loudness(audio_file, cache_path=cache_path)
+
+    assert first == second
+    assert mock_run_command.call_count == 1
+    with open(cache_path) as f:
+        assert len(json.load(f)) == 1
+
+
+def test_get_loudness_measures_changed_files(mock_run_command, audio_file):
+    get_loudness(audio_file, cache_path=None)
+    with open(audio_file, "ab") as f:
+        f.write(b" and more")
+    get_loudness(audio_file, cache_path=None)
+
+    assert mock_run_command.call_count == 2
+
+
+def test_get_loudness_with_the_in_process_meter(mock_run_command, audio_file):
+    series = MagicMock(
+        integrated=-27.3, sample_peak=-14.1, loudness_range=6.2, threshold=-37.3
+    )
+    with patch(
+        "app.utils.loudness_meter.measure_loudness_series", return_value=series
+    ) as mock_meter:
+        measurement = get_loudness(audio_file, cache_path=None, meter=True)
+
+    mock_meter.assert_called_once_with(audio_file, None)
+    mock_run_command.assert_not_called()
+    assert measurement == LoudnessMeasurement(-27.3, -14.1, 6.2, -37.3, 0.0)
+    assert "measured_I=-27.30" in loudnorm_filter(measurement)
+
+
+def test_fingerprint_uses_current_checksum(audio_file):
+    write_checksum(audio_file, "ab" * 32)
+
+    assert file_fingerprint(audio_file) == f"sha256:{'ab' * 32}"
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from app.utils.loudness_meter import LoudnessMeter, k_weighting
+
+
+def _sine(seconds, amplitude, frequency=997, sample_rate=48000, channels=2):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    wave = amplitude * np.sin(2 * np.pi * frequency * t)
+    return np.repeat(wave[:, None], channels, axis=1)
+
+
+def _measure(samples, sample_rate=48000, block_frames=4096):
+    meter = LoudnessMeter(sample_rate, samples.shape[1])
+    for start in range(0, len(samples), block_frames):
+        meter.add(samples[start : start + block_frames])
+    return meter.result()
+
+
+def test_k_weighting_matches_the_standard_at_48k():
+    shelf, high_pass = k_weighting(48000)
+
+    assert shelf[:3] == pytest.approx([1.53512486, -2.69169619, 1.19839281])
+    assert shelf[4:] == pytest.approx([-1.69065929, 0.73248077])
+    assert high_pass[4:] == pytest.approx([-1.99004745, 0.99007225])
+
+
+def test_full_scale_stereo_sine_reads_zero_lufs():
+    # BS.1770: a 0 dBFS 997 Hz sine on both channels of a stereo pair is 0 LUFS
+    series = _measure(_sine(10, 1.0))
+
+    assert series.integrated == pytest.approx(0.0, abs=0.05)
+    assert series.loudness_range == pytest.approx(0.0, abs=0.05)
+    assert series.sample_peak == pytest.approx(0.0, abs=0.01)
+
+
+def test_level_steps_and_gating():
+    quiet = _sine(10, 10 ** (-36 / 20))
+    loud = _sine(10, 10 ** (-20 / 20))
+    silence = np.zeros((48000 * 5, 2))
+    series = _measure(np.concatenate([loud, quiet, silence]))
+
+    # The quiet part is more than 10 LU below, so the relative gate drops it
+    assert series.integrated == pytest.approx(-20.0, abs=0.1)
+    assert series.momentary[10] == pytest.approx(-20.0, abs=0.05)
+    assert series.momentary[150] == pytest.approx(-36.0, abs=0.05)
+    assert np.isneginf(series.momentary[-1])
+    # ffmpeg's ebur128 reads 16.8 LU for the same signal (the fades count too)
+    assert series.loudness_range == pytest.approx(16.8, abs=0.1)
+    assert series.times(series.momentary)[150] == pytest.approx(15.0)
+
+
+def test_block_size_does_not_change_the_result():
+    samples = _sine(5, 0.5, frequency=440, sample_rate=44100)
+
+    small = _measure(samples, 44100, block_frames=1000)
+    large = _measure(samples, 44100, block_frames=len(samples))
+
+    np.testing.assert_allclose(small.momentary, large.momentary)
+    assert small.integrated == pytest.approx(large.integrated)
+
+
+def test_silence_is_gated_out():
+    series = _measure(np.zeros((48000 * 2, 2)))
+
+    assert series.integrated == float("-inf")
+    assert series.loudness_range == 0.0
@@ -0,0 +1,88 @@
+import hashlib
+from app.utils.checksums import (
+    read_checksum,
+    record_checksum,
+    verify_checksum,
+    write_checksum,
+)
+from app.utils.manifest import (
+    find_artifacts,
+    verify_artifacts,
+    write_manifest,
+)
+
+
+def _digest(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def test_checksum_sidecar_round_trip(tmp_path):
+    path = tmp_path / "audio.m4a"
+    path.write_bytes(b"audio")
+
+    digest = record_checksum(str(path))
+
+    assert digest == _digest(b"audio")
+    assert (tmp_path / "audio.m4a.sha256").read_text() == f"{digest}  audio.m4a\n"
+    assert read_checksum(str(path)) == digest
+    assert verify_checksum(str(path))["status"] == "ok"
+
+
+def test_verify_checksum_statuses(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"video")
+    assert verify_checksum(str(path))["status"] == "unrecorded"
+
+    write_checksum(str(path), _digest(b"another video"))
+    assert verify_checksum(str(path))["status"] == "mismatch"
+    # A size mismatch fails without hashing
+    result = verify_checksum(str(path), _digest(b"video"), expected_bytes=3)
+    assert result["status"] == "mismatch"
+    assert result["actual"] is None
+
+    path.unlink()
+    assert verify_checksum(str(path))["status"] == "missing"
+
+
+def test_verify_artifacts_checks_sidecars_and_manifests(tmp_path):
+    cache = tmp_path / "cache"
+    output = tmp_path / "output" / "sermon"
+    cache.mkdir()
+    output.mkdir(parents=True)
+    intro = cache / "intro.wav"
+    intro.write_bytes(b"intro")
+    record_checksum(str(intro))
+    final = output / "2025-02-02.mp4"
+    final.write_bytes(b"final")
+    write_manifest(
+        str(output / "2025-02-02.manifest.json"),
+        [
+            {
+                "path": str(final),
+                "role": "output",
+                "bytes": 5,
+                "sha256": _digest(b"final"),
+            },
+            {
+                "path": str(cache / "gone.mp4"),
+                "role": "source",
+                "bytes": 1,
+                "sha256": "x",
+            },
+        ],
+    )
+
+    assert set(find_artifacts([str(cache), str(tmp_path / "output")])) == {
+        str(intro),
+        str(final),
+    }
+    results = verify_artifacts([str(cache), str(tmp_path / "output")], max_workers=2)
+    assert [r["status"] for r in results] == ["ok", "ok"]
+
+    intro.write_bytes(b"intr0")
+    final.unlink()
+    results = verify_artifacts([str(cache), str(tmp_path / "output")])
+    assert {r["path"]: r["status"] for r in results} == {
+        str(intro): "mismatch",
+        str(final): "missing",
+    }
@@ -0,0 +1,119 @@
+import json
+import subprocess
+from unittest.mock import MagicMock, patch
+import pytest
+from app.data_models.media_info import MediaInfo
+from app.data_models.pipeline_data import PipelineData
+from app.utils.media_probe import (
+    attach_media,
+    clear_media_cache,
+    get_media_info,
+    probe_media,
+)
+
+PROBE_OUTPUT = {
+    "format": {
+        "format_name": "mov,mp4,m4a,3gp,3g2,mj2",
+        "duration": "62.500000",
+        "bit_rate": "5000000",
+    },
+    "streams": [
+        {
+            "index": 0,
+            "codec_type": "video",
+            "codec_name": "h264",
+            "width": 1920,
+            "height": 1080,
+            "avg_frame_rate": "30000/1001",
+            "pix_fmt": "yuv420p",
+        },
+        {
+            "index": 1,
+            "codec_type": "audio",
+            "codec_name": "aac",
+            "sample_rate": "48000",
+            "channels": 2,
+        },
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_media_cache()
+    yield
+    clear_media_cache()
+
+
+@pytest.fixture
+def media_file(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"not really a video")
+    return str(path)
+
+
+@pytest.fixture
+def ffprobe():
+    result = MagicMock(stdout=json.dumps(PROBE_OUTPUT))
+    with patch("app.utils.media_probe.run_command", return_value=result) as run:
+        yield run
+
+
+def test_media_info_from_ffprobe():
+    info = MediaInfo.from_ffprobe("video.mp4", PROBE_OUTPUT)
+
+    assert info.duration == 62.5
+    assert info.resolution == "1920x1080"
+    assert info.fps == pytest.approx(29.97, abs=0.01)
+    assert info.sample_rate == 48000
+    assert info.audio.channels == 2
+    assert info.summary()["streams"][1] == {
+        "type": "audio",
+        "codec": "aac",
+        "sample_rate": 48000,
+        "channels": 2,
+    }
+
+
+def test_probe_media_runs_ffprobe_once_per_file_version(media_file, ffprobe):
+    first = probe_media(media_file)
+    second = probe_media(media_file)
+
+    assert first is second
+    assert ffprobe.call_count == 1
+    command = ffprobe.call_args[0][0]
+    assert "-show_format" in command and "-show_streams" in command
+
+    # A rewritten file is probed again
+    with open(media_file, "ab") as f:
+        f.write(b"more")
+    probe_media(media_file)
+    assert ffprobe.call_count == 2
+
+
+def test_derived_info_is_used_without_probing(media_file, ffprobe):
+    data = PipelineData()
+    source = MediaInfo.from_ffprobe("source.mp4", PROBE_OUTPUT)
+
+    attach_media(data, source.derive(media_file, audio={"codec": "mp3"}))
+    info = get_media_info(data, media_file)
+
+    assert ffprobe.call_count == 0
+    assert not info.probed
+    assert info.duration == 62.5
+    assert info.audio.codec == "mp3"
+    assert info.video.codec == "h264"
+    assert data.media[media_file] is info
+
+    # The manifest wants what is really in the file
+    assert get_media_info(data, media_file, exact=True).probed
+    assert ffprobe.call_count == 1
+
+
+def test_probe_media_rejects_unreadable_files(media_file):
+    with patch(
+        "app.utils.media_probe.run_command",
+        side_effect=subprocess.CalledProcessError(1, "ffprobe"),
+    ):
+        with pytest.raises(ValueError, match="Invalid or unsupported media file"):
+            probe_media(media_file)
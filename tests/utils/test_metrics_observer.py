@@ -0,0 +1,49 @@
+from app.utils.ffmpeg import FfmpegProgress
+from app.utils.metrics_observer import MetricsObserver, create_metrics_observer
+
+
+def test_cache_and_download_metrics():
+    observer = MetricsObserver()
+
+    observer.on_cache_lookup("intro", hit=True)
+    observer.on_cache_lookup("outro", hit=True, shared=True)
+    observer.on_cache_lookup("main", hit=False)
+    observer.on_download_finished("main", 1_000)
+    observer.on_download_finished("missing", None)
+
+    sample = observer.registry.get_sample_value
+    assert sample("sermon_cache_lookups_total", {"result": "hit"}) == 2
+    assert sample("sermon_cache_lookups_total", {"result": "miss"}) == 1
+    assert sample("sermon_cache_hit_ratio") == 2 / 3
+    assert sample("sermon_downloaded_bytes_total") == 1_000
+
+
+def test_step_and_job_metrics_written_to_textfile(tmp_path):
+    textfile = tmp_path / "metrics" / "sermon.prom"
+    observer = MetricsObserver(textfile_path=str(textfile))
+
+    observer.on_job_started("a.json", "video_pipeline")
+    observer.on_step_finished("a.json", "video_pipeline", "Merge clips", 42.0, None)
+    observer.on_step_failed("a.json", "video_pipeline", "Move", RuntimeError(), 0.1)
+    observer.on_ffmpeg_progress(FfmpegProgress(label="out.mp4", speed=2.5))
+    observer.on_job_failed("a.json", "video_pipeline", RuntimeError(), 50.0)
+
+    sample = observer.registry.get_sample_value
+    labels = {"pipeline": "video_pipeline", "step": "Merge clips"}
+    assert sample("sermon_step_duration_seconds_sum", labels) == 42.0
+    assert sample("sermon_step_duration_seconds_bucket", {**labels, "le": "60.0"}) == 1
+    assert sample("sermon_active_jobs", {"pipeline": "video_pipeline"}) == 0
+    assert sample("sermon_ffmpeg_speed_ratio") == 2.5
+
+    metrics = textfile.read_text()
+    assert (
+        'sermon_jobs_total{pipeline="video_pipeline",status="failure"} 1.0' in metrics
+    )
+    assert "sermon_last_job_timestamp_seconds" in metrics
+
+
+def test_create_metrics_observer():
+    assert create_metrics_observer(None) is None
+
+    observer = create_metrics_observer({"textfile": "output/metrics/sermon.prom"})
+    assert observer.textfile_path == "output/metrics/sermon.prom"
@@ -1,8 +1,25 @@
 import pytest
 import subprocess
 from unittest.mock import patch
+from app.utils.loudness import LoudnessMeasurement
 from app.utils.normalize_audio import normalize_audio
 
+MEASUREMENT = LoudnessMeasurement(
+    input_i=-27.61,
+    input_tp=-4.47,
+    input_lra=18.06,
+    input_thresh=-39.2,
+    target_offset=0.58,
+)
+
+
+@pytest.fixture(autouse=True)
+def mock_get_loudness():
+    with patch(
+        "app.utils.normalize_audio.get_loudness", return_value=MEASUREMENT
+    ) as mock:
+        yield mock
+
 
 @pytest.fixture
 def dummy_audio_file(tmp_path):
@@ -12,7 +29,7 @@ def dummy_audio_file(tmp_path):
     return input_file, output_file
 
 
-@patch("subprocess.run")
+@patch("app.utils.normalize_audio.run_ffmpeg")
 def test_normalize_audio_success(mock_run, dummy_audio_file):
     input_path, output_path = dummy_audio_file
     normalize_audio(str(input_path), str(output_path))
@@ -33,13 +50,23 @@ def test_normalize_audio_success(mock_run, dummy_audio_file):
             "-b:a",
             "192k",
             "-af",
-            "loudnorm=I=-16:TP=-1:LRA=11:linear=true",
+            "loudnorm=I=-16:TP=-1:LRA=11:measured_I=-27.61:measured_TP=-4.47"
+            ":measured_LRA=18.06:measured_thresh=-39.20:offset=0.58:linear=true",
             str(output_path),
         ],
-        check=True,
+        duration=None,
     )
 
 
+@patch("app.utils.normalize_audio.run_ffmpeg")
+def test_normalize_audio_single_pass(mock_run, mock_get_loudness, dummy_audio_file):
+    input_path, output_path = dummy_audio_file
+    normalize_audio(str(input_path), str(output_path), two_pass=False)
+
+    mock_get_loudness.assert_not_called()
+    assert "loudnorm=I=-16:TP=-1:LRA=11" in mock_run.call_args.args[0]
+
+
 def test_normalize_audio_missing_file(tmp_path):
     non_existent_path = tmp_path / "nonexistent.wav"
     output_path = tmp_path / "output_normalized.wav"
@@ -47,14 +74,20 @@ def test_normalize_audio_missing_file(tmp_path):
         normalize_audio(str(non_existent_path), str(output_path))
 
 
-@patch("subprocess.run", side_effect=PermissionError("Permission denied"))
+@patch(
+    "app.utils.normalize_audio.run_ffmpeg",
+    side_effect=PermissionError("Permission denied"),
+)
 def test_normalize_audio_permission_error(mock_run, dummy_audio_file):
     input_path, output_path = dummy_audio_file
     with pytest.raises(PermissionError, match="Permission denied"):
         normalize_audio(str(input_path), str(output_path))
 
 
-@patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "ffmpeg"))
+@patch(
+    "app.utils.normalize_audio.run_ffmpeg",
+    side_effect=subprocess.CalledProcessError(1, "ffmpeg"),
+)
 def test_normalize_audio_ffmpeg_failure(mock_run, dummy_audio_file):
     input_path, output_path = dummy_audio_file
     with pytest.raises(subprocess.CalledProcessError):
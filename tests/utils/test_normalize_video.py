@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+from app.utils import resource_scheduler
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.normalize_video import normalize_video
+
+
+@pytest.fixture
+def scheduler():
+    # A fresh scheduler over the patched cores; configuring resizes an existing one
+    resource_scheduler._scheduler = None
+    with patch(
+        "app.utils.resource_scheduler._available_cores", return_value=list(range(8))
+    ):
+        yield resource_scheduler.configure_scheduler({"slots_per_encode": 4})
+    resource_scheduler._scheduler = None
+
+
+@patch("app.utils.normalize_video.run_ffmpeg")
+def test_normalize_video_uses_cpu_budget(mock_run, scheduler, tmp_path):
+    input_path = str(tmp_path / "input.mp4")
+    output_path = str(tmp_path / "output_normalized.mp4")
+
+    normalize_video(input_path, output_path)
+
+    command = mock_run.call_args[0][0]
+    assert command[:3] == ["ffmpeg", "-filter_threads", "4"]
+    assert command[-3:] == ["-threads", "4", output_path]
+    assert scheduler.free_slots == 8
+
+
+@patch("app.utils.normalize_video.run_ffmpeg")
+def test_normalize_video_custom_slots(mock_run, scheduler, tmp_path):
+    normalize_video("in.mp4", "out.mp4", cpu_slots=2)
+
+    command = mock_run.call_args[0][0]
+    assert command[-3:] == ["-threads", "2", "out.mp4"]
+
+
+@patch("app.utils.normalize_video.run_ffmpeg")
+def test_normalize_video_splits_one_decode_between_renditions(mock_run, scheduler):
+    archive = get_encoder_profile(name="archive")
+
+    normalize_video(
+        "in.mp4",
+        "out.mp4",
+        extra_outputs=[
+            ("out.720p.mp4", "1280x720", None),
+            ("out.hq.mp4", "1920x1080", archive),
+        ],
+    )
+
+    mock_run.assert_called_once()
+    command = mock_run.call_args[0][0]
+    assert command.count("-i") == 1
+    assert command[command.index("-filter_complex") + 1] == (
+        "[0:v]fps=30,split=3[s0][s1][s2];[s0]scale=1920x1080[v0];"
+        "[s1]scale=1280x720[v1];[s2]scale=1920x1080[v2]"
+    )
+    # The main output stays last; the 4 threads are shared out by frame size
+    assert command[-3:] == ["-threads", "2", "out.mp4"]
+    assert command[command.index("out.720p.mp4") - 2 :][:2] == ["-threads", "1"]
+    assert command[command.index("out.hq.mp4") - 2 :][:2] == ["-threads", "1"]
+    hq = command[command.index("-filter_complex") + 2 : command.index("out.hq.mp4")]
+    assert hq[:4] == ["-map", "[v2]", "-map", "0:a?"]
+    assert hq[4:10] == archive.ffmpeg_args()
+    assert scheduler.free_slots == 8
+
+
+@patch("app.utils.normalize_video.run_ffmpeg")
+def test_normalize_video_reserves_a_slot_per_rendition(mock_run, scheduler):
+    normalize_video(
+        "in.mp4",
+        "out.mp4",
+        cpu_slots=1,
+        extra_outputs=[("out.720p.mp4", "1280x720", None)],
+    )
+
+    command = mock_run.call_args[0][0]
+    assert command[:3] == ["ffmpeg", "-filter_threads", "2"]
+    assert command[-3:] == ["-threads", "1", "out.mp4"]
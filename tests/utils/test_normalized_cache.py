@@ -0,0 +1,44 @@
+from app.utils.checksums import record_checksum
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.normalized_cache import normalized_file
+
+SETTINGS = dict(resolution="1920x1080", frame_rate=30, profile=get_encoder_profile())
+
+
+def test_normalized_file_is_keyed_by_settings(tmp_path):
+    intro = tmp_path / "intro.mp4"
+    intro.write_bytes(b"intro")
+
+    path = normalized_file(str(intro), "mp4", SETTINGS)
+
+    assert path.startswith(str(tmp_path / "intro_normalized."))
+    assert path.endswith(".mp4")
+    assert normalized_file(str(intro), "mp4", dict(SETTINGS)) == path
+    # Any setting that changes the encode changes the file
+    for change in (
+        {"resolution": "1280x720"},
+        {"frame_rate": 25},
+        {"profile": get_encoder_profile(name="archive")},
+    ):
+        assert normalized_file(str(intro), "mp4", dict(SETTINGS, **change)) != path
+
+
+def test_normalized_file_follows_the_input_content(tmp_path):
+    intro = tmp_path / "intro.mp4"
+    intro.write_bytes(b"intro")
+    record_checksum(str(intro))
+    path = normalized_file(str(intro), "mp4", SETTINGS)
+
+    intro.write_bytes(b"new intro")
+    record_checksum(str(intro))
+
+    assert normalized_file(str(intro), "mp4", SETTINGS) != path
+
+
+def test_normalized_file_for_a_rendition(tmp_path):
+    intro = tmp_path / "intro.mp4"
+    intro.write_bytes(b"intro")
+
+    path = normalized_file(str(intro), "mp4", SETTINGS, name="720p")
+
+    assert path.startswith(str(tmp_path / "intro_normalized.720p."))
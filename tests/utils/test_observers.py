@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+from app.utils.observers import EventBus, PipelineObserver
+
+
+def test_event_bus_calls_hooks():
+    bus = EventBus()
+    observer = MagicMock(spec=PipelineObserver)
+    bus.subscribe(observer)
+
+    bus.emit("cache_lookup", url="https://s3.example.com/intro.wav", hit=True)
+
+    observer.on_cache_lookup.assert_called_once_with(
+        url="https://s3.example.com/intro.wav", hit=True
+    )
+
+
+def test_event_bus_survives_failing_observer(capsys):
+    bus = EventBus()
+    broken = MagicMock(spec=PipelineObserver)
+    broken.on_download_finished.side_effect = RuntimeError("disk full")
+    working = MagicMock(spec=PipelineObserver)
+    bus.subscribe(broken)
+    bus.subscribe(working)
+
+    bus.emit("download_finished", url="u", size_bytes=10)
+
+    working.on_download_finished.assert_called_once_with(url="u", size_bytes=10)
+    assert "disk full" in capsys.readouterr().out
+
+
+def test_unsubscribed_observer_is_not_called():
+    bus = EventBus()
+    observer = MagicMock(spec=PipelineObserver)
+    bus.subscribe(observer)
+    bus.unsubscribe(observer)
+
+    bus.emit("step_started", job="a.json", pipeline="audio_pipeline", step="Trim")
+
+    observer.on_step_started.assert_not_called()
+
+
+def test_base_observer_logs_finished_steps():
+    observer = PipelineObserver()
+
+    observer.on_step_finished("a.json", "audio_pipeline", "Trim", 1.5, data="data")
+
+    assert observer.logs == ["Step: Trim, Data: data"]
@@ -0,0 +1,94 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from app.utils.ffmpeg import run_ffmpeg
+from app.utils.parallel_encode import run_encodes
+
+
+def _write(path, content="done"):
+    def encode():
+        with open(path, "w") as f:
+            f.write(content)
+
+    return encode
+
+
+def test_runs_encodes_side_by_side(tmp_path):
+    both_started = threading.Barrier(2, timeout=5)
+
+    def encode(path):
+        def run():
+            both_started.wait()
+            _write(path)()
+
+        return run
+
+    first, second = tmp_path / "a.wav", tmp_path / "b.wav"
+    run_encodes([(str(first), encode(first)), (str(second), encode(second))])
+
+    assert first.read_text() == "done"
+    assert second.read_text() == "done"
+
+
+def test_failure_removes_outputs_and_reraises(tmp_path):
+    intro, main = tmp_path / "intro.wav", tmp_path / "main.wav"
+
+    def fail():
+        main.write_text("partial")
+        raise RuntimeError("ffmpeg failed")
+
+    with pytest.raises(RuntimeError, match="ffmpeg failed"):
+        run_encodes([(str(intro), _write(intro)), (str(main), fail)])
+
+    assert not intro.exists()
+    assert not main.exists()
+
+
+def test_failure_keeps_finished_shared_outputs(tmp_path):
+    intro, main = tmp_path / "intro.wav", tmp_path / "main.wav"
+
+    def fail():
+        raise RuntimeError("ffmpeg failed")
+
+    with pytest.raises(RuntimeError):
+        run_encodes([(str(intro), _write(intro)), (str(main), fail)], keep=[str(intro)])
+
+    assert intro.exists()
+
+
+def test_failure_kills_running_ffmpeg(tmp_path):
+    main, outro = tmp_path / "main.mp4", tmp_path / "outro.mp4"
+    started = threading.Event()
+
+    def progress_lines():
+        started.set()
+        while True:  # a long main encode
+            time.sleep(0.01)
+            yield "progress=continue\n"
+
+    process = MagicMock()
+    process.stdout.__iter__.return_value = progress_lines()
+    process.wait.return_value = -9
+
+    def fail():
+        started.wait(5)
+        raise RuntimeError("outro failed")
+
+    with patch("app.utils.ffmpeg.subprocess.Popen", return_value=process):
+        with pytest.raises(RuntimeError, match="outro failed"):
+            run_encodes(
+                [
+                    (
+                        str(main),
+                        lambda: run_ffmpeg(["ffmpeg", "-i", "in.mp4", str(main)]),
+                    ),
+                    (str(outro), fail),
+                ]
+            )
+
+    process.kill.assert_called_once()
+
+
+def test_no_encodes():
+    run_encodes([])
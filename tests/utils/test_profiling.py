@@ -0,0 +1,117 @@
+import json
+import os
+import pytest
+from app.utils.profiling import (
+    Profiler,
+    format_report,
+    get_profiler,
+    parse_ffmpeg_benchmark,
+    profile_section,
+    start_profile,
+    stop_profile,
+)
+
+BENCHMARK_OUTPUT = [
+    "Input #0, lavfi, from 'testsrc2':\n",
+    "bench:      156 user        0 sys      156 real encode_video 0.0 \n",
+    "bench:      138 user        2 sys      144 real encode_video 0.0 \n",
+    "bench:       10 user        1 sys       12 real decode_video 0:0 \n",
+    "bench: utime=0.012s stime=0.001s rtime=0.013s\n",
+    "bench: maxrss=18688KiB\n",
+]
+
+
+def _busy_work():
+    return sum(i * i for i in range(10_000))
+
+
+def test_parse_ffmpeg_benchmark():
+    result = parse_ffmpeg_benchmark(BENCHMARK_OUTPUT)
+
+    assert list(result["stages"]) == ["encode_video 0.0", "decode_video 0:0"]
+    encode = result["stages"]["encode_video 0.0"]
+    assert encode["calls"] == 2
+    assert encode["real_seconds"] == pytest.approx(300 / 1_000_000)
+    assert encode["sys_seconds"] == 2 / 1_000_000
+    assert result["user_seconds"] == 0.012
+    assert result["real_seconds"] == 0.013
+    assert result["maxrss_kib"] == 18688
+
+
+def test_profile_section_is_noop_without_profiler():
+    assert get_profiler() is None
+    with profile_section("Trim audio"):
+        pass
+
+
+def test_sections_record_functions_and_allocations():
+    profiler = Profiler("audio_pipeline")
+    profiler.start()
+    try:
+        with profiler.section("Trim audio"):
+            _busy_work()
+            buffer = bytearray(2_000_000)
+    finally:
+        profiler.stop()
+
+    report = profiler.report()
+    section = report["sections"][0]
+    assert section["name"] == "Trim audio"
+    assert section["peak_bytes"] >= len(buffer)
+    assert any("_busy_work" in row["function"] for row in section["top_functions"])
+    assert section["top_allocations"][0]["size_bytes"] >= len(buffer)
+    assert report["top_functions"]
+
+
+def test_section_records_errors():
+    profiler = Profiler()
+    try:
+        with profiler.section("Merge audio"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+
+    assert profiler.report()["sections"][0]["error"] == "ValueError('boom')"
+
+
+def test_export_bundle(tmp_path):
+    profiler = start_profile("video_pipeline")
+    try:
+        with profile_section("Trim video"):
+            _busy_work()
+        profiler.record_ffmpeg(
+            "out.mp4",
+            ["ffmpeg", "-i", "in.mp4", "out.mp4"],
+            parse_ffmpeg_benchmark(BENCHMARK_OUTPUT),
+        )
+    finally:
+        assert stop_profile() is profiler
+
+    bundle = profiler.export(str(tmp_path / "profiles"))
+
+    assert bundle.endswith("_video_pipeline")
+    files = sorted(os.listdir(bundle))
+    assert files == ["00_trim_video.prof", "report.json", "summary.txt"]
+    with open(os.path.join(bundle, "report.json")) as f:
+        report = json.load(f)
+    assert report["ffmpeg"][0]["command"] == "ffmpeg -i in.mp4 out.mp4"
+    with open(os.path.join(bundle, "summary.txt")) as f:
+        summary = f.read()
+    assert "Trim video" in summary
+    assert "encode_video 0.0" in summary
+
+
+def test_format_report_without_sections():
+    summary = format_report(Profiler("batch").report())
+
+    assert summary.startswith("Profile of batch")
+
+
+def test_parse_ffmpeg_benchmark_ignores_wrapped_deltas():
+    line = (
+        "bench:        0 user        0 sys 18446744073709551615 real encode_video 0.0"
+    )
+
+    result = parse_ffmpeg_benchmark([line])
+
+    assert result["stages"]["encode_video 0.0"]["real_seconds"] == 0.0
@@ -0,0 +1,74 @@
+import pytest
+from app.utils.encoder_profiles import get_encoder_profile
+from app.utils.renditions import Rendition, renditions_from_config
+
+
+def test_rendition_from_config():
+    rendition = Rendition.from_config(
+        {
+            "name": "720p",
+            "format": "mp4",
+            "resolution": "1280x720",
+            "encoder_profile": "archive",
+        }
+    )
+
+    assert rendition.has_video
+    assert rendition.resolution == "1280x720"
+    assert rendition.encoder_profile == get_encoder_profile(name="archive")
+    assert rendition.path("/out/2024-01-07") == "/out/2024-01-07.720p.mp4"
+
+
+def test_rendition_encoder_profile_resolved_in_encoding_config():
+    encoding_conf = {"profiles": {"small": {"crf": 26}}}
+
+    rendition = Rendition.from_config(
+        {"name": "480p", "format": "mp4", "encoder_profile": "small"}, encoding_conf
+    )
+
+    assert rendition.encoder_profile.crf == 26
+
+
+def test_rendition_audio_args():
+    podcast = Rendition("podcast", "mp3", audio_bitrate="128k")
+    archive = Rendition("archive", "wav")
+
+    assert podcast.audio_args() == [
+        "-c:a",
+        "libmp3lame",
+        "-b:a",
+        "128k",
+        "-ar",
+        "44100",
+        "-ac",
+        "2",
+    ]
+    # PCM has no bitrate to set
+    assert archive.audio_args() == ["-c:a", "pcm_s16le", "-ar", "44100", "-ac", "2"]
+    assert not archive.has_video
+
+
+def test_rendition_rejects_unknown_format():
+    with pytest.raises(ValueError, match="Unknown rendition format"):
+        Rendition.from_config({"name": "web", "format": "webm"})
+
+
+def test_renditions_from_config():
+    renditions = renditions_from_config(
+        {
+            "renditions": [
+                {"name": "archive", "format": "wav"},
+                {"name": "podcast", "format": "mp3", "audio_bitrate": "128k"},
+            ]
+        }
+    )
+
+    assert [r.name for r in renditions] == ["archive", "podcast"]
+    assert renditions_from_config({}) == []
+
+
+def test_renditions_from_config_rejects_video_without_video():
+    with pytest.raises(ValueError, match="needs video"):
+        renditions_from_config(
+            {"renditions": [{"name": "720p", "format": "mp4"}]}, allow_video=False
+        )
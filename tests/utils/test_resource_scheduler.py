@@ -0,0 +1,131 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.utils import resource_scheduler
+from app.utils.resource_scheduler import (
+    CpuBudget,
+    ResourceScheduler,
+    configure_scheduler,
+    get_scheduler,
+    split_slots,
+)
+
+
+@pytest.fixture(autouse=True)
+def eight_cores():
+    resource_scheduler._scheduler = None
+    with patch(
+        "app.utils.resource_scheduler._available_cores", return_value=list(range(8))
+    ):
+        yield
+    resource_scheduler._scheduler = None
+
+
+def test_defaults_to_all_cores():
+    scheduler = ResourceScheduler()
+
+    assert scheduler.total_slots == 8
+    assert scheduler.slots_per_encode == 8
+
+
+def test_slots_are_capped_by_the_node():
+    scheduler = ResourceScheduler(total_slots=64, slots_per_encode=32)
+
+    assert scheduler.total_slots == 8
+    assert scheduler.slots_per_encode == 8
+
+
+def test_reserve_and_release():
+    scheduler = ResourceScheduler(slots_per_encode=3)
+
+    with scheduler.reserve() as budget:
+        assert budget.threads == 3
+        assert budget.cores == [0, 1, 2]
+        assert scheduler.free_slots == 5
+
+    assert scheduler.free_slots == 8
+
+
+def test_reserve_releases_on_failure():
+    scheduler = ResourceScheduler()
+
+    with pytest.raises(RuntimeError):
+        with scheduler.reserve(4):
+            raise RuntimeError("ffmpeg crashed")
+
+    assert scheduler.free_slots == 8
+
+
+def test_saturated_node_queues_encodes():
+    scheduler = ResourceScheduler(total_slots=4)
+    lock = threading.Lock()
+    counters = {"active": 0, "peak": 0}
+
+    def encode():
+        with scheduler.reserve(2):
+            with lock:
+                counters["active"] += 1
+                counters["peak"] = max(counters["peak"], counters["active"])
+            time.sleep(0.02)
+            with lock:
+                counters["active"] -= 1
+
+    threads = [threading.Thread(target=encode) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counters["peak"] == 2
+    assert scheduler.free_slots == 4
+
+
+def test_budget_ffmpeg_args():
+    budget = CpuBudget([2, 3])
+
+    assert budget.global_args() == ["-filter_threads", "2"]
+    assert budget.output_args() == ["-threads", "2"]
+    assert budget.wrap(["ffmpeg", "-i", "in.mp4"]) == ["ffmpeg", "-i", "in.mp4"]
+
+
+def test_budget_pins_cores():
+    budget = CpuBudget([2, 3], pin_cores=True)
+
+    assert budget.wrap(["ffmpeg"]) == ["taskset", "-c", "2,3", "ffmpeg"]
+
+
+def test_configure_scheduler():
+    scheduler = configure_scheduler(
+        {"cpu_slots": 6, "slots_per_encode": 2, "pin_cores": True}
+    )
+
+    assert get_scheduler() is scheduler
+    assert scheduler.total_slots == 6
+    assert scheduler.slots_per_encode == 2
+    assert scheduler.pin_cores
+
+
+def test_configure_scheduler_resizes_in_place():
+    scheduler = configure_scheduler({"cpu_slots": 8})
+
+    with scheduler.reserve(6):
+        # Another job's pipeline is built while this encode runs
+        assert configure_scheduler({"cpu_slots": 4}) is scheduler
+        # The running encode still holds cores 0-3 of the smaller node
+        assert scheduler.free_slots == 0
+
+    assert scheduler.free_slots == 4
+    with scheduler.reserve(4) as budget:
+        assert budget.cores == [0, 1, 2, 3]
+
+
+def test_split_slots_by_duration():
+    assert split_slots(8, [10, 3600, 10]) == [1, 6, 1]
+    assert split_slots(4, [5, 5]) == [2, 2]
+
+
+def test_split_slots_gives_every_encode_a_slot():
+    assert split_slots(2, [10, 3600, 10]) == [1, 1, 1]
+    assert split_slots(4, [0, 0]) == [2, 2]
+    assert split_slots(4, []) == []
@@ -0,0 +1,151 @@
+import os
+import pytest
+from unittest.mock import patch
+from app.core.async_pipeline_runner import run_pipelines_concurrently
+from app.core.pipeline_runner import PipelineRunner
+from app.utils.ffmpeg import FfmpegProgress
+from app.utils.observers import emit
+from app.utils.run_history import (
+    RunHistory,
+    RunHistoryObserver,
+    config_hash,
+    percentile,
+    source_duration,
+)
+
+CONFIG = {
+    "stream_id": "sermon",
+    "video": {"trim": {"start_time": "00:10:00", "end_time": "00:40:00"}},
+}
+
+
+@pytest.fixture
+def history(tmp_path):
+    return RunHistory(str(tmp_path / "history" / "runs.sqlite"))
+
+
+def _record(history, duration, media_seconds=1800, status="success", started_at=0):
+    return history.record_run(
+        {
+            "pipeline": "video_pipeline",
+            "job": "sermon.json",
+            "started_at": started_at,
+            "status": status,
+            "duration_seconds": duration,
+            "source_duration_seconds": media_seconds,
+        },
+        [
+            ("Trim video", "success", duration * 0.1),
+            ("Merge clips", status, duration * 0.9),
+        ],
+    )
+
+
+def test_helpers():
+    assert source_duration(CONFIG, "video") == 1800
+    assert source_duration(CONFIG, "audio") is None
+    assert config_hash({"a": 1, "b": 2}) == config_hash({"b": 2, "a": 1})
+    assert percentile([1, 2, 3, 4], 0.5) == 2.5
+    assert percentile([], 0.5) is None
+
+
+def test_step_stats(history):
+    for duration in [100, 200, 300]:
+        _record(history, duration)
+    _record(history, 1000, status="failure")
+
+    stats = history.step_stats("video_pipeline")
+
+    assert [row["step"] for row in stats] == ["Trim video", "Merge clips"]
+    merge = stats[1]
+    assert merge["runs"] == 3  # the failed merge is left out
+    assert merge["p50"] == pytest.approx(180)
+    assert merge["max"] == pytest.approx(270)
+
+
+def test_predict_scales_with_media_length(history):
+    # Past runs took 0.5s per second of media
+    for _ in range(3):
+        _record(history, duration=900, media_seconds=1800)
+
+    prediction = history.predict("video_pipeline", media_seconds=3600)
+
+    assert prediction["runs"] == 3
+    assert prediction["p50"] == pytest.approx(1800)
+    assert prediction["steps"][1] == ("Merge clips", pytest.approx(1620))
+    assert history.predict("audio_pipeline", 3600) is None
+
+
+def test_trend_and_slowest(history):
+    _record(history, 100, started_at=1738000000)
+    _record(history, 300, started_at=1738000000 + 7 * 86400)
+    _record(history, 50, status="failure", started_at=1738000000 + 7 * 86400)
+
+    trend = history.trend("video_pipeline")
+
+    assert [(row["runs"], row["failures"]) for row in trend] == [(1, 0), (2, 1)]
+    assert trend[1]["realtime_factor"] == pytest.approx(6.0)
+    assert [run["duration_seconds"] for run in history.slowest_runs(limit=2)] == [
+        300,
+        100,
+    ]
+
+
+@patch("app.core.pipeline_runner.load_and_validate_config", return_value=CONFIG)
+def test_observer_records_runs(mock_config_loader, history):
+    def create_video_pipeline(config):
+        def merge(data):
+            emit("cache_lookup", url="intro", hit=True)
+            emit("cache_lookup", url="main", hit=False)
+            emit("download_finished", url="main", size_bytes=5000)
+            emit(
+                "ffmpeg_progress",
+                progress=FfmpegProgress(
+                    label="out.mp4",
+                    total_size=2000,
+                    out_time_seconds=1800,
+                    finished=True,
+                ),
+            )
+            return data
+
+        return [("Trim video", lambda data: data), ("Merge clips", merge)]
+
+    runner = PipelineRunner(
+        create_video_pipeline, observers=[RunHistoryObserver(history)]
+    )
+    runner.run("config/sermon.json")
+
+    (run,) = history.runs()
+    assert run["pipeline"] == "video_pipeline"
+    assert run["job"] == os.path.abspath("config/sermon.json")
+    assert run["status"] == "success"
+    assert run["config_hash"] == config_hash(CONFIG)
+    assert run["source_duration_seconds"] == 1800
+    assert (run["bytes_in"], run["bytes_out"]) == (5000, 2000)
+    assert (run["cache_hits"], run["cache_misses"]) == (1, 1)
+    assert run["cpu_count"] > 0
+    assert [row["step"] for row in history.step_stats()] == [
+        "Trim video",
+        "Merge clips",
+    ]
+
+
+@patch("app.core.async_pipeline_runner.load_and_validate_config", return_value=CONFIG)
+def test_observer_keeps_configs_with_the_same_name_apart(mock_config_loader, history):
+    def merge(data):
+        emit("download_finished", url="main", size_bytes=5000)
+        return data
+
+    run_pipelines_concurrently(
+        lambda config: [("Merge clips", merge)],
+        ["sunday/sermon.json", "wednesday/sermon.json"],
+        observers=[RunHistoryObserver(history)],
+    )
+
+    runs = history.runs()
+    assert sorted(run["job"] for run in runs) == [
+        os.path.abspath("sunday/sermon.json"),
+        os.path.abspath("wednesday/sermon.json"),
+    ]
+    assert [run["bytes_in"] for run in runs] == [5000, 5000]
@@ -0,0 +1,115 @@
+import json
+import threading
+import pytest
+from app.utils import tracing
+from app.utils.tracing import Tracer, start_trace, stop_trace, trace_span
+
+
+@pytest.fixture(autouse=True)
+def reset_tracer():
+    yield
+    stop_trace()
+
+
+def test_trace_span_is_noop_without_tracer():
+    with trace_span("Trim audio", "step") as span:
+        span.set(bytes=10)
+
+    assert tracing.get_tracer() is None
+
+
+def test_spans_record_attributes_and_duration():
+    tracer = start_trace("audio_pipeline")
+
+    with trace_span("ffmpeg", "subprocess", input_duration=12.5) as span:
+        span.set(exit_code=0)
+
+    assert len(tracer.spans) == 1
+    recorded = tracer.spans[0]
+    assert recorded.category == "subprocess"
+    assert recorded.attributes == {"input_duration": 12.5, "exit_code": 0}
+    assert recorded.duration_ms >= 0
+
+
+def test_span_records_errors():
+    tracer = start_trace()
+
+    with pytest.raises(ValueError):
+        with trace_span("Merge audio", "step"):
+            raise ValueError("ffmpeg failed")
+
+    assert "ffmpeg failed" in tracer.spans[0].attributes["error"]
+
+
+def test_chrome_trace_events():
+    tracer = Tracer("video_pipeline")
+    with tracer.span("Merge clips", "step"):
+        with tracer.span("ffmpeg", "subprocess"):
+            pass
+
+    events = tracer.to_chrome_trace()["traceEvents"]
+    complete_events = [event for event in events if event["ph"] == "X"]
+
+    assert [event["name"] for event in complete_events] == ["Merge clips", "ffmpeg"]
+    step, subprocess_event = complete_events
+    # The subprocess nests inside the step on the same thread
+    assert step["tid"] == subprocess_event["tid"]
+    assert step["ts"] <= subprocess_event["ts"]
+    assert subprocess_event["ts"] + subprocess_event["dur"] <= step["ts"] + step["dur"]
+    assert any(event["name"] == "thread_name" for event in events)
+
+
+def test_spans_on_named_tracks():
+    tracer = Tracer("batch")
+    with tracer.span("Merge clips", "step", track="a.json"):
+        with tracer.span("Merge clips", "step", track="b.json"):
+            pass
+
+    events = tracer.to_chrome_trace()["traceEvents"]
+    steps = [event for event in events if event["ph"] == "X"]
+    names = {
+        event["tid"]: event["args"]["name"]
+        for event in events
+        if event["name"] == "thread_name"
+    }
+
+    assert steps[0]["tid"] != steps[1]["tid"]
+    assert [names[event["tid"]] for event in steps] == ["a.json", "b.json"]
+
+
+def test_spans_from_several_threads():
+    tracer = start_trace()
+    barrier = threading.Barrier(4)
+
+    def work():
+        with trace_span("download", "download"):
+            # Keep all threads alive at once so their idents are distinct
+            barrier.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tracer.spans) == 4
+    assert len({span.thread_id for span in tracer.spans}) == 4
+
+
+def test_export(tmp_path):
+    tracer = Tracer("audio_pipeline")
+    with tracer.span("Trim audio", "step", bytes=42):
+        pass
+
+    chrome_trace_path, jsonl_path = tracer.export(str(tmp_path / "traces"))
+
+    with open(chrome_trace_path) as f:
+        chrome_trace = json.load(f)
+    assert chrome_trace_path.endswith("_audio_pipeline.trace.json")
+    assert any(event["name"] == "Trim audio" for event in chrome_trace["traceEvents"])
+
+    with open(jsonl_path) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 1
+    assert records[0]["name"] == "Trim audio"
+    assert records[0]["attributes"] == {"bytes": 42}
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from app.utils.video_boundaries import (
+    BLACK,
+    CONTENT,
+    STATIC,
+    FrameStats,
+    decode_gray_frames,
+    find_content_end,
+    find_content_start,
+)
+
+HEIGHT, WIDTH = 90, 160
+
+
+def _frames(*runs, seed=0):
+    """
+    Builds a clip from ("black" | "slate" | "camera", count) runs.
+    """
+    rng = np.random.default_rng(seed)
+    slate = rng.integers(40, 220, (HEIGHT, WIDTH))
+    frames = []
+    for kind, count in runs:
+        for _ in range(count):
+            if kind == "black":
+                frames.append(np.full((HEIGHT, WIDTH), 12))
+            elif kind == "slate":
+                frames.append(slate)
+            else:
+                frames.append(rng.integers(0, 256, (HEIGHT, WIDTH)))
+    return np.array(frames, dtype=np.uint8)
+
+
+def _stats(frames, start=0.0, frame_seconds=0.5):
+    return FrameStats.from_frames(
+        start + np.arange(len(frames)) * frame_seconds, frames
+    )
+
+
+def test_kinds():
+    stats = _stats(_frames(("black", 3), ("slate", 4), ("camera", 4)))
+
+    assert list(stats.kinds()) == [BLACK] * 3 + [STATIC] * 4 + [CONTENT] * 4
+
+
+def test_content_start_skips_black_and_slate():
+    stats = _stats(_frames(("black", 4), ("slate", 40), ("camera", 20)), start=10.0)
+
+    assert find_content_start(stats, 0.5) == (32.0, STATIC)
+
+
+def test_content_start_without_pre_roll():
+    assert find_content_start(_stats(_frames(("camera", 20))), 0.5) == (0.0, None)
+
+
+def test_content_start_needs_lasting_content():
+    # A single changed frame inside the slate is not the start of the programme
+    stats = _stats(_frames(("slate", 10), ("camera", 1), ("slate", 10), ("camera", 8)))
+
+    assert find_content_start(stats, 0.5) == (10.5, STATIC)
+
+
+def test_content_end_before_the_end_card():
+    stats = _stats(_frames(("camera", 20), ("black", 30)), start=100.0)
+
+    assert find_content_end(stats, 0.5) == (110.0, BLACK)
+
+
+def test_only_pre_roll():
+    assert find_content_start(_stats(_frames(("slate", 10))), 0.5) == (None, None)
+
+
+def test_decode_gray_frames_keyframes_only():
+    frames = _frames(("camera", 3))
+    with patch("app.utils.video_boundaries.subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(stdout=frames.tobytes())
+        decoded = decode_gray_frames("vod.mp4", 12.5, 60, keyframes_only=True)
+
+    command = mock_run.call_args.args[0]
+    assert command[:9] == [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-skip_frame",
+        "nokey",
+        "-ss",
+        "12.500",
+        "-t",
+        "60.000",
+    ]
+    assert command[command.index("-vf") + 1] == "scale=160:90:flags=fast_bilinear"
+    np.testing.assert_array_equal(decoded, frames)
+
+
+def test_decode_gray_frames_samples_the_frame_rate():
+    with patch("app.utils.video_boundaries.subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(stdout=b"")
+        decoded = decode_gray_frames("vod.mp4", 0, 60)
+
+    command = mock_run.call_args.args[0]
+    assert "-skip_frame" not in command
+    assert command[command.index("-vf") + 1].startswith("fps=2,")
+    assert decoded.shape == (0, HEIGHT, WIDTH)
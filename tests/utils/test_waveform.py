@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import pytest
+from app.utils.waveform import Peaks, PeaksBuilder, WaveformTap, peaks_path
+
+
+def _samples(count=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(-32768, 32767, count).astype(np.int16)
+
+
+def _expected(samples, samples_per_pixel):
+    return np.array(
+        [
+            [
+                samples[i : i + samples_per_pixel].min(),
+                samples[i : i + samples_per_pixel].max(),
+            ]
+            for i in range(0, len(samples), samples_per_pixel)
+        ]
+    )
+
+
+def test_builder_is_independent_of_block_sizes():
+    samples = _samples()
+    builder = PeaksBuilder(44100, 256)
+    for block in np.split(samples, [7, 300, 301, 5000]):
+        builder.add(block)
+
+    peaks = builder.result()
+
+    np.testing.assert_array_equal(peaks.data, _expected(samples, 256))
+    # 39 whole pixels and a short last one
+    assert peaks.data.shape == (40, 2)
+
+
+def test_coarsen_matches_building_at_that_level():
+    samples = _samples()
+    builder = PeaksBuilder(44100, 256)
+    builder.add(samples)
+
+    coarse = builder.result().coarsen(1024)
+
+    assert coarse.samples_per_pixel == 1024
+    np.testing.assert_array_equal(coarse.data, _expected(samples, 1024))
+
+
+def test_coarsen_needs_a_multiple():
+    with pytest.raises(ValueError, match="not a multiple"):
+        Peaks(44100, 256, np.zeros((4, 2), np.int16)).coarsen(300)
+
+
+def test_save_writes_an_audiowaveform_dat_file(tmp_path):
+    path = str(tmp_path / "out.peaks.256.dat")
+    data = np.array([[-3, 5], [-1, 2]], dtype=np.int16)
+
+    Peaks(44100, 256, data).save(path)
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    # version 1, 16-bit, 44100 Hz, 256 samples per pixel, 2 pairs
+    assert raw[:20] == bytes.fromhex(
+        "01000000" "00000000" "44ac0000" "00010000" "02000000"
+    )
+    assert raw[20:] == data.astype("<i2").tobytes()
+    loaded = Peaks.load(path)
+    assert (loaded.sample_rate, loaded.samples_per_pixel) == (44100, 256)
+    np.testing.assert_array_equal(loaded.data, data)
+
+
+def test_tap_reads_what_ffmpeg_writes_to_the_pipe(tmp_path):
+    samples = _samples(50_000)
+    with WaveformTap(8000, (256, 512)) as tap:
+        assert tap.output_args()[-1] == f"pipe:{tap.pass_fds[0]}"
+        # Stands in for ffmpeg writing its second output
+        view = memoryview(samples.astype("<i2").tobytes())
+        while view:
+            view = view[os.write(tap.pass_fds[0], view[:4096]) :]
+
+    base = str(tmp_path / "out")
+    paths = tap.save(base)
+
+    assert paths == [peaks_path(base, 256), peaks_path(base, 512)]
+    np.testing.assert_array_equal(Peaks.load(paths[0]).data, _expected(samples, 256))
+    np.testing.assert_array_equal(Peaks.load(paths[1]).data, _expected(samples, 512))
+
+
+def test_tap_rejects_zoom_levels_it_cannot_derive():
+    with pytest.raises(ValueError, match="multiples"):
+        WaveformTap(44100, (256, 1000))
@@ -26,3 +26,19 @@ def test_get_youtube_upload_date(youtube_url, expected_date, mocker):
 
     date = get_youtube_upload_date(youtube_url)
     assert date == expected_date
+
+
+def test_get_youtube_upload_date_is_recorded(tmp_path, mocker):
+    mock_subprocess = mocker.patch("subprocess.run")
+    mock_subprocess.return_value.stdout = '{"upload_date": "20250202"}'
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    first = get_youtube_upload_date(url, record_dir=str(tmp_path))
+    second = get_youtube_upload_date(url, record_dir=str(tmp_path))
+
+    assert first == second == "2025-02-02"
+    assert mock_subprocess.call_count == 1
+    # Failures aren't recorded, so the next run asks again
+    mock_subprocess.side_effect = Exception("yt-dlp error")
+    assert get_youtube_upload_date("https://youtu.be/other", str(tmp_path)) is None
+    assert len(list(tmp_path.iterdir())) == 1